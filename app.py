@@ -1,7693 +1,9049 @@
-from flask import Flask, g, render_template_string, request, redirect, url_for, session, flash
-import sqlite3
-from pathlib import Path
-from datetime import datetime, timedelta
-import bcrypt
-import json
-import pandas as pd
-import io
-from flask import Response
-from markupsafe import escape
-import xlsxwriter
-import os
-import random
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime, timedelta
-
-import psycopg2
-from dotenv import load_dotenv
-import os
-
-import atexit
-import signal
-import sys
-
-
-# Load environment variables from .env
-load_dotenv()
-
-# Fetch variables
-USER = os.getenv("user")
-PASSWORD = os.getenv("password")
-HOST = os.getenv("host")
-PORT = os.getenv("port")
-DBNAME = os.getenv("dbname")
-
-# Connect to the database
-try:
-    connection = psycopg2.connect(
-        user=USER,
-        password=PASSWORD,
-        host=HOST,
-        port=PORT,
-        dbname=DBNAME
-    )
-    print("Connection successful!")
-    
-    # Create a cursor to execute SQL queries
-    cursor = connection.cursor()
-    
-    # Example query
-    cursor.execute("SELECT NOW();")
-    result = cursor.fetchone()
-    print("Current Time:", result)
-
-    # Close the cursor and connection
-    cursor.close()
-    connection.close()
-    print("Connection closed.")
-
-except Exception as e:
-    print(f"Failed to connect: {e}")
-
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    load_dotenv = None
-
-DB_PATH = Path(__file__).parent / 'tiramine.db'
-SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-tiramine')
-
-app = Flask(__name__)
-app.config['SECRET_KEY'] = SECRET_KEY
-
-# ---------- ENHANCED AUTO-SAVE SYSTEM ----------
-
-class AutoSaveManager:
-    def __init__(self):
-        self.last_save = datetime.now()
-        self.save_interval = 30  # Save every 30 seconds
-        self.force_save_flag = False
-    
-    def should_save(self):
-        """Check if it's time to auto-save"""
-        now = datetime.now()
-        time_diff = (now - self.last_save).total_seconds()
-        return time_diff >= self.save_interval or self.force_save_flag
-    
-    def mark_saved(self):
-        """Mark that save has been performed"""
-        self.last_save = datetime.now()
-        self.force_save_flag = False
-    
-    def force_save(self):
-        """Force immediate save on next check"""
-        self.force_save_flag = True
-
-# Global auto-save manager
-auto_save_manager = AutoSaveManager()
-
-def enhanced_force_save():
-    """Enhanced save function with better error handling"""
-    print("\n💾 Auto-saving data...")
-    try:
-        # Use application context to get database
-        with app.app_context():
-            db = get_db()
-            # Commit any pending transactions
-            db.commit()
-            print("✅ All data saved successfully!")
-            auto_save_manager.mark_saved()
-            return True
-    except Exception as e:
-        print(f"❌ Save error: {e}")
-        # Try to rollback and save again
-        try:
-            with app.app_context():
-                db = get_db()
-                db.rollback()
-                db.commit()
-                print("✅ Data saved after rollback!")
-                auto_save_manager.mark_saved()
-                return True
-        except Exception as e2:
-            print(f"❌ Critical save error: {e2}")
-            return False
-        
-def enhanced_handle_shutdown(signum, frame):
-    """Enhanced shutdown handler"""
-    print("\n🔄 Shutting down gracefully...")
-    enhanced_force_save()
-    print("👋 Goodbye!")
-    sys.exit(0)
-
-def periodic_auto_save():
-    """Periodic auto-save function"""
-    if auto_save_manager.should_save():
-        enhanced_force_save()
-
-# Register enhanced handlers (ganti yang lama)
-atexit.register(enhanced_force_save)
-signal.signal(signal.SIGINT, enhanced_handle_shutdown)
-
-# Auto-save before each request
-@app.before_request
-def auto_save_before_request():
-    """Auto-save before each request if needed"""
-    # Only auto-save for non-static requests and when we have a user session
-    if request.endpoint and 'static' not in request.endpoint and current_user():
-        periodic_auto_save()
-
-# ---------- Helper Database ----------
-
-def get_db():
-    db = getattr(g, '_db', None)
-    if db is None:
-        db = g._db = sqlite3.connect(str(DB_PATH))
-        db.row_factory = sqlite3.Row
-        # Tambah ini untuk auto-commit yang lebih baik:
-        db.execute('PRAGMA journal_mode=WAL')
-    return db
-
-@app.teardown_appcontext
-def close_db(exception):
-    """Enhanced database close with guaranteed commit"""
-    db = getattr(g, '_db', None)
-    if db is not None:
-        try:
-            # Always try to commit before closing
-            print("💾 Committing changes before closing database...")
-            db.commit()
-            print("✅ Changes committed successfully")
-        except Exception as commit_error:
-            print(f"❌ Commit error on close: {commit_error}")
-            try:
-                db.rollback()
-                print("🔄 Rolled back due to commit error")
-            except:
-                pass
-        finally:
-            try:
-                db.close()
-                print("🔒 Database connection closed")
-            except:
-                pass
-
-def init_db():
-    """Initialize database with proper context management"""
-    print("🚀 Starting database initialization...")
-    
-    # Use app context to ensure database connection stays open
-    with app.app_context():
-        db = get_db()
-        cur = db.cursor()
-        
-        try:
-            print("🗑️  Cleaning up existing tables...")
-            # HAPUS SEMUA TABEL DAN BUAT ULANG DENGAN STRUKTUR YANG BENAR
-            cur.executescript('''
-                DROP TABLE IF EXISTS transaction_templates;
-                DROP TABLE IF EXISTS opening_balances;
-                DROP TABLE IF EXISTS adjusting_lines;
-                DROP TABLE IF EXISTS adjusting_entries;
-                DROP TABLE IF EXISTS journal_lines;
-                DROP TABLE IF EXISTS journal_entries;
-                DROP TABLE IF EXISTS inventory;
-                DROP TABLE IF EXISTS accounts;
-                DROP TABLE IF EXISTS users;
-                DROP TABLE IF EXISTS settings;
-                DROP TABLE IF EXISTS otp_verification;
-            ''')
-            
-            print("📋 Creating tables...")
-            # Buat tabel users
-            cur.execute('''
-                CREATE TABLE users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Buat tabel accounts (Chart of Accounts) - SESUAI NERACA SALDO AWAL
-            cur.execute('''
-                CREATE TABLE accounts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    code TEXT UNIQUE NOT NULL,
-                    name TEXT NOT NULL,
-                    acct_type TEXT NOT NULL,
-                    normal_balance TEXT NOT NULL,
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Buat tabel journal_entries
-            cur.execute('''
-                CREATE TABLE journal_entries (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date DATE NOT NULL,
-                    description TEXT NOT NULL,
-                    reference TEXT,
-                    transaction_type TEXT DEFAULT 'General',
-                    posted BOOLEAN DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Buat tabel journal_lines
-            cur.execute('''
-                CREATE TABLE journal_lines (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    entry_id INTEGER NOT NULL,
-                    account_id INTEGER NOT NULL,
-                    debit DECIMAL(15,2) DEFAULT 0,
-                    credit DECIMAL(15,2) DEFAULT 0,
-                    description TEXT,
-                    FOREIGN KEY (entry_id) REFERENCES journal_entries (id),
-                    FOREIGN KEY (account_id) REFERENCES accounts (id)
-                )
-            ''')
-            
-            # Buat tabel adjusting_entries
-            cur.execute('''
-                CREATE TABLE adjusting_entries (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date DATE NOT NULL,
-                    description TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Buat tabel adjusting_lines
-            cur.execute('''
-                CREATE TABLE adjusting_lines (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    adj_id INTEGER NOT NULL,
-                    account_id INTEGER NOT NULL,
-                    debit DECIMAL(15,2) DEFAULT 0,
-                    credit DECIMAL(15,2) DEFAULT 0,
-                    description TEXT,
-                    FOREIGN KEY (adj_id) REFERENCES adjusting_entries (id),
-                    FOREIGN KEY (account_id) REFERENCES accounts (id)
-                )
-            ''')
-            
-            # Buat tabel inventory
-            cur.execute('''
-                CREATE TABLE inventory (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date DATE NOT NULL,
-                    description TEXT NOT NULL,
-                    quantity_in INTEGER DEFAULT 0,
-                    quantity_out INTEGER DEFAULT 0,
-                    unit_cost DECIMAL(15,2) DEFAULT 0,
-                    value DECIMAL(15,2) DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Buat tabel settings
-            cur.execute('''
-                CREATE TABLE settings (
-                    k TEXT PRIMARY KEY,
-                    v TEXT NOT NULL
-                )
-            ''')
-            
-            # Buat tabel opening_balances dengan struktur yang BENAR
-            cur.execute('''
-                CREATE TABLE opening_balances (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    account_id INTEGER UNIQUE NOT NULL,
-                    debit_amount DECIMAL(15,2) DEFAULT 0,
-                    credit_amount DECIMAL(15,2) DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (account_id) REFERENCES accounts (id)
-                )
-            ''')
-            
-            # Buat tabel untuk OTP verification
-            cur.execute('''
-                CREATE TABLE otp_verification (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    email TEXT NOT NULL,
-                    otp_code TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    expires_at TIMESTAMP NOT NULL,
-                    used BOOLEAN DEFAULT 0
-                )
-            ''')
-            
-            # Insert default settings
-            cur.execute('''
-                INSERT INTO settings (k, v) VALUES 
-                ('company_name', 'Peternakan Tiram Tiramine'),
-                ('company_description', 'Sistem Akuntansi Peternakan Tiram Modern'),
-                ('company_location', 'Indonesia'),
-                ('current_stock_large', '0'),
-                ('current_stock_small', '0')
-            ''')
-            
-            print("👤 Creating default accounts...")
-            # DATA DEFAULT - BUAT SEMUA AKUN SESUAI NERACA SALDO AWAL ANDA
-            accounts = [
-                # ===== ASET =====
-                ('101', 'Kas', 'Asset', 'Debit', 'Kas perusahaan'),
-                ('102', 'Piutang Usaha', 'Asset', 'Debit', 'Piutang dari pelanggan'),
-                ('103', 'Peralatan Tambak', 'Asset', 'Debit', 'Peralatan untuk tambak tiram'),
-                ('104', 'Perlengkapan', 'Asset', 'Debit', 'Perlengkapan operasional'),
-                ('105', 'Persediaan - Tiram Kecil', 'Asset', 'Debit', 'Persediaan tiram kecil'),
-                ('106', 'Persediaan - Tiram Besar', 'Asset', 'Debit', 'Persediaan tiram besar'),
-                ('107', 'Persediaan Benih Kecil', 'Asset', 'Debit', 'Persediaan benih tiram kecil'),
-                ('108', 'Persediaan Benih Besar', 'Asset', 'Debit', 'Persediaan benih tiram besar'),
-                ('109', 'Kendaraan', 'Asset', 'Debit', 'Kendaraan operasional'),
-                ('110', 'Akumulasi Penyusutan Kendaraan', 'Contra Asset', 'Credit', 'Akumulasi penyusutan kendaraan'),
-                
-                # ===== KEWAJIBAN =====
-                ('201', 'Utang Usaha', 'Liability', 'Credit', 'Utang kepada supplier'),
-                ('202', 'Utang Gaji', 'Liability', 'Credit', 'Utang gaji karyawan'),
-                
-                # ===== EKUITAS =====
-                ('301', 'Modal Pemilik (Tiramine Capital)', 'Equity', 'Credit', 'Modal pemilik perusahaan'),
-                ('302', 'Ikhtisar Laba Rugi', 'Equity', 'Credit', 'Ikhtisar laba rugi'),
-                ('303', 'Laba Ditahan', 'Equity', 'Credit', 'Laba yang ditahan'),
-                
-                # ===== PENDAPATAN =====
-                ('401', 'Penjualan - Tiram Besar', 'Revenue', 'Credit', 'Pendapatan penjualan tiram besar'),
-                ('402', 'Penjualan - Tiram Kecil', 'Revenue', 'Credit', 'Pendapatan penjualan tiram kecil'),
-                
-                # ===== BEBAN =====
-                ('501', 'HPP - Tiram Kecil', 'Expense', 'Debit', 'Harga pokok penjualan tiram kecil'),
-                ('502', 'HPP - Tiram Besar', 'Expense', 'Debit', 'Harga pokok penjualan tiram besar'),
-                ('503', 'Beban Gaji', 'Expense', 'Debit', 'Beban gaji karyawan'),
-                ('504', 'Beban Penyusutan Kendaraan', 'Expense', 'Debit', 'Beban Penyusutan Kendaraan')
-            ]
-            
-            for code, name, atype, normal, desc in accounts:
-                cur.execute('INSERT INTO accounts (code, name, acct_type, normal_balance, description) VALUES (?,?,?,?,?)', 
-                            (code, name, atype, normal, desc))
-                print(f"✅ Created account: {code} - {name}")
-            
-            # INSERT SALDO AWAL DEFAULT SESUAI NERACA SALDO AWAL ANDA
-            print("🔧 Setting up default opening balances...")
-            opening_balances = [
-                # Assets (Debit)
-                (1, 8500000, 0),    # Kas (101)
-                (2, 4500000, 0),    # Piutang Usaha (102)
-                (3, 500000, 0),     # Peralatan Tambak (103)
-                (4, 300000, 0),     # Perlengkapan (104)
-                (5, 1200000, 0),    # Persediaan - Tiram Kecil (105)
-                (6, 1750000, 0),    # Persediaan - Tiram Besar (106)
-                (7, 12000000, 0),   # Kendaraan (107)
-                
-                # Contra Asset (Credit)
-                (8, 0, 1500000),    # Akumulasi Penyusutan Kendaraan (108)
-                
-                # Liabilities (Credit)
-                (9, 0, 650000),     # Utang Usaha (201)
-                (10, 0, 100000),    # Utang Gaji (202)
-                
-                # Equity (Credit)
-                (11, 0, 22300000),  # Modal Pemilik (301)
-                
-                # Revenue (Credit) - dari penjualan
-                (12, 0, 4000000),   # Penjualan - Tiram Besar (401)
-                (13, 0, 3000000),   # Penjualan - Tiram Kecil (402)
-                
-                # Expenses (Debit) - dari HPP dan beban
-                (14, 1000000, 0),   # HPP - Tiram Kecil (501)
-                (15, 1500000, 0),   # HPP - Tiram Besar (502)
-                (16, 300000, 0),    # Beban Gaji (503)
-            ]
-            
-            for account_id, debit_amount, credit_amount in opening_balances:
-                cur.execute('''
-                    INSERT INTO opening_balances (account_id, debit_amount, credit_amount) 
-                    VALUES (?, ?, ?)
-                ''', (account_id, debit_amount, credit_amount))
-                print(f"✅ Set opening balance for account {account_id}: Debit={debit_amount:,}, Credit={credit_amount:,}")
-            
-            # Hitung total untuk verifikasi
-            total_debit = sum(balance[1] for balance in opening_balances)
-            total_credit = sum(balance[2] for balance in opening_balances)
-            print(f"📊 TOTAL DEBIT: {total_debit:,}")
-            print(f"📊 TOTAL CREDIT: {total_credit:,}")
-            print(f"📊 BALANCED: {total_debit == total_credit}")
-            
-            # BUAT USER ADMIN
-            password_hash = bcrypt.hashpw(b'password', bcrypt.gensalt())
-            cur.execute(
-                'INSERT INTO users (username, password_hash, email) VALUES (?, ?, ?)',
-                ('admin', password_hash, 'tiramine@gmail.com')
-            )
-            print("✅ User admin created: admin / password / tiramine@gmail.com")
-            
-            # Insert sample inventory data
-            cur.execute('''
-                INSERT INTO inventory (date, description, quantity_in, unit_cost, value)
-                VALUES 
-                ('2024-01-01', 'Stok awal tiram besar', 0, 55000, 0),
-                ('2024-01-01', 'Stok awal tiram kecil', 0, 30000, 0)
-            ''')
-            print("✅ Sample inventory data created!")
-            
-            # Buat tabel transaction_templates
-            cur.execute('''
-                CREATE TABLE IF NOT EXISTS transaction_templates (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    template_key TEXT UNIQUE NOT NULL,
-                    label TEXT NOT NULL,
-                    description TEXT,
-                    lines_json TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Insert default templates berdasarkan contoh transaksi
-            templates = [
-                {
-                    'template_key': 'penjualan_tunai_besar',
-                    'label': 'Penjualan Tunai (Tiram Besar)',
-                    'description': 'Penjualan tiram besar secara tunai',
-                    'lines_json': json.dumps([
-                        {"account_code": "101", "side": "debit", "editable": False, "description": "Kas", "auto_calculate": False},
-                        {"account_code": "401", "side": "credit", "editable": False, "description": "Penjualan - Tiram Besar", "auto_calculate": False}
-                    ])
-                },
-                {
-                    'template_key': 'penjualan_tunai_kecil', 
-                    'label': 'Penjualan Tunai (Tiram Kecil)',
-                    'description': 'Penjualan tiram kecil secara tunai',
-                    'lines_json': json.dumps([
-                        {"account_code": "101", "side": "debit", "editable": False, "description": "Kas", "auto_calculate": False},
-                        {"account_code": "402", "side": "credit", "editable": False, "description": "Penjualan - Tiram Kecil", "auto_calculate": False}
-                    ])
-                },
-                {
-                    'template_key': 'penjualan_kredit_besar',
-                    'label': 'Penjualan Kredit (Tiram Besar)',
-                    'description': 'Penjualan tiram besar secara kredit',
-                    'lines_json': json.dumps([
-                        {"account_code": "102", "side": "debit", "editable": False, "description": "Piutang Usaha", "auto_calculate": False},
-                        {"account_code": "401", "side": "credit", "editable": False, "description": "Penjualan - Tiram Besar", "auto_calculate": False}
-                    ])
-                },
-                {
-                    'template_key': 'pembayaran_gaji',
-                    'label': 'Pembayaran Gaji Karyawan',
-                    'description': 'Pembayaran gaji dan upah karyawan',
-                    'lines_json': json.dumps([
-                        {"account_code": "503", "side": "debit", "editable": False, "description": "Beban Gaji", "auto_calculate": False},
-                        {"account_code": "101", "side": "credit", "editable": False, "description": "Kas", "auto_calculate": False}
-                    ])
-                },
-                {
-                    'template_key': 'pembelian_peralatan',
-                    'label': 'Pembelian Peralatan',
-                    'description': 'Pembelian peralatan tambak secara tunai',
-                    'lines_json': json.dumps([
-                        {"account_code": "103", "side": "debit", "editable": False, "description": "Peralatan Tambak", "auto_calculate": False},
-                        {"account_code": "101", "side": "credit", "editable": False, "description": "Kas", "auto_calculate": False}
-                    ])
-                },
-                {
-                    'template_key': 'pelunasan_piutang',
-                    'label': 'Pelunasan Piutang',
-                    'description': 'Penerimaan pelunasan piutang usaha',
-                    'lines_json': json.dumps([
-                        {"account_code": "101", "side": "debit", "editable": False, "description": "Kas", "auto_calculate": False},
-                        {"account_code": "102", "side": "credit", "editable": False, "description": "Piutang Usaha", "auto_calculate": False}
-                    ])
-                },
-                {
-                    'template_key': 'pembayaran_utang',
-                    'label': 'Pembayaran Utang Usaha',
-                    'description': 'Pembayaran utang kepada supplier',
-                    'lines_json': json.dumps([
-                        {"account_code": "201", "side": "debit", "editable": False, "description": "Utang Usaha", "auto_calculate": False},
-                        {"account_code": "101", "side": "credit", "editable": False, "description": "Kas", "auto_calculate": False}
-                    ])
-                },
-                {
-                    'template_key': 'penyesuaian_persediaan',
-                    'label': 'Penyesuaian Persediaan',
-                    'description': 'Penyesuaian nilai persediaan tiram',
-                    'lines_json': json.dumps([
-                        {"account_code": "501", "side": "debit", "editable": True, "description": "HPP - Tiram Kecil", "auto_calculate": False},
-                        {"account_code": "502", "side": "debit", "editable": True, "description": "HPP - Tiram Besar", "auto_calculate": False},
-                        {"account_code": "105", "side": "credit", "editable": True, "description": "Persediaan - Tiram Kecil", "auto_calculate": False},
-                        {"account_code": "106", "side": "credit", "editable": True, "description": "Persediaan - Tiram Besar", "auto_calculate": False}
-                    ])
-                }
-            ]
-            
-            for template in templates:
-                cur.execute('''
-                    INSERT OR REPLACE INTO transaction_templates (template_key, label, description, lines_json)
-                    VALUES (?, ?, ?, ?)
-                ''', (template['template_key'], template['label'], template['description'], template['lines_json']))
-            
-            db.commit()
-            print("🎉 Database initialization completed successfully!")
-            print("💡 Access /trial_balance to verify the opening balances")
-            
-        except Exception as e:
-            db.rollback()
-            print(f"❌ Database initialization failed: {e}")
-            raise
-
-# ---------- Helper Autentikasi ----------
-
-def current_user():
-    try:
-        uid = session.get('user_id')
-        if not uid:
-            return None
-        
-        db = get_db()
-        cur = db.execute('SELECT id, username FROM users WHERE id=?', (uid,))
-        user = cur.fetchone()
-        
-        # Convert sqlite3.Row to dict untuk konsistensi
-        if user:
-            return {'id': user['id'], 'username': user['username']}
-        return None
-    except Exception as e:
-        print(f"Error in current_user: {e}")
-        return None
-
-def login_required(f):
-    from functools import wraps
-    @wraps(f)
-    def wrapped(*args, **kwargs):
-        if not current_user():
-            return redirect(url_for('login'))
-        return f(*args, **kwargs)
-    return wrapped
-
-def normalize_email(email: str) -> str:
-    return (email or '').strip().lower()
-
-def send_email_notification(to_email: str, subject: str, body_html: str):
-    """Send email using SMTP settings from environment variables."""
-    smtp_server = os.environ.get('SMTP_SERVER')
-    smtp_port = int(os.environ.get('SMTP_PORT', 587))
-    smtp_username = os.environ.get('SMTP_USERNAME')
-    smtp_password = os.environ.get('SMTP_PASSWORD')
-
-    print(f"Attempting to send email to {to_email} via {smtp_server}:{smtp_port} as {smtp_username} and password {'set' if smtp_password else 'not set'}")
-
-    if not smtp_server or not smtp_username or not smtp_password:
-        warning = 'SMTP belum dikonfigurasi. OTP tidak dapat dikirim.'
-        print(warning)
-        return False, warning
-
-    message = MIMEMultipart('alternative')
-    message['From'] = smtp_username
-    message['To'] = to_email
-    message['Subject'] = subject
-    message.attach(MIMEText(body_html, 'html'))
-
-    try:
-        with smtplib.SMTP(smtp_server, smtp_port, timeout=20) as server:
-            server.starttls()
-            server.login(smtp_username, smtp_password)
-            server.send_message(message)
-        return True, None
-    except Exception as exc:
-        error = f"Gagal mengirim email OTP: {exc}"
-        print(error)
-        return False, error
-
-def generate_otp_code(length: int = 6) -> str:
-    return ''.join(random.choice('0123456789') for _ in range(length))
-
-def create_otp_for_email(email: str, validity_minutes: int = 10):
-    code = generate_otp_code()
-    expires_at = (datetime.utcnow() + timedelta(minutes=validity_minutes)).strftime('%Y-%m-%d %H:%M:%S')
-    db = get_db()
-    db.execute(
-        'INSERT INTO otp_verification (email, otp_code, expires_at, used) VALUES (?, ?, ?, 0)',
-        (email, code, expires_at)
-    )
-    db.commit()
-    return code, expires_at
-
-def verify_otp_code(email: str, otp_code: str):
-    """Validate OTP entry and mark it as used when successful."""
-    db = get_db()
-    cur = db.execute(
-        '''
-        SELECT id, expires_at FROM otp_verification
-        WHERE email = ? AND otp_code = ? AND used = 0
-        ORDER BY id DESC LIMIT 1
-        ''',
-        (email, otp_code)
-    )
-    record = cur.fetchone()
-    if not record:
-        return False, 'OTP tidak ditemukan atau sudah digunakan.'
-
-    try:
-        expires_at_dt = datetime.strptime(record['expires_at'], '%Y-%m-%d %H:%M:%S')
-    except ValueError:
-        expires_at_dt = datetime.utcnow()
-
-    if datetime.utcnow() > expires_at_dt:
-        return False, 'OTP telah kedaluwarsa. Mohon minta kode baru.'
-
-    db.execute('UPDATE otp_verification SET used = 1 WHERE id = ?', (record['id'],))
-    db.commit()
-    return True, None
-
-# ---------- Utilitas Akuntansi ----------
-
-def all_accounts():
-    cur = get_db().execute('SELECT * FROM accounts ORDER BY code')
-    return cur.fetchall()
-
-def get_account_id(cur, code):
-    """Mencari ID akun berdasarkan kode akun (misalnya '101', '401', dst)."""
-    cur.execute("SELECT id FROM accounts WHERE code = ?", (code,))
-    result = cur.fetchone()
-    return result["id"] if result else None
-
-def fix_opening_balances():
-    """Memperbaiki saldo awal agar sesuai dengan prinsip akuntansi"""
-    db = get_db()
-    cur = db.cursor()
-    
-    # Hapus semua saldo awal yang ada
-    cur.execute('DELETE FROM opening_balances')
-    
-    # DATA SALDO AWAL YANG BENAR - SESUAI DENGAN NERACA SALDO AWAL
-    # Total harus balance: Debit = Credit = Rp 31.550.000
-    opening_balances_corrected = [
-        # ===== ASET (DEBIT) =====
-        (1, 8500000, 0),     # Kas (101) - Debit
-        (2, 4500000, 0),     # Piutang Usaha (102) - Debit
-        (3, 500000, 0),      # Peralatan Tambak (103) - Debit
-        (4, 300000, 0),      # Perlengkapan (104) - Debit
-        (5, 1200000, 0),     # Persediaan - Tiram Kecil (105) - Debit
-        (6, 1750000, 0),     # Persediaan - Tiram Besar (106) - Debit
-        (7, 12000000, 0),    # Kendaraan (107) - Debit
-        
-        # ===== KONTRA ASET (CREDIT) =====
-        (8, 0, 1500000),     # Akumulasi Penyusutan Kendaraan (108) - Credit
-        
-        # ===== KEWAJIBAN (CREDIT) =====
-        (9, 0, 650000),      # Utang Usaha (201) - Credit
-        (10, 0, 100000),     # Utang Gaji (202) - Credit
-        
-        # ===== EKUITAS (CREDIT) =====
-        (11, 0, 22300000),   # Modal Pemilik (301) - Credit
-        
-        # ===== PENDAPATAN (CREDIT) =====
-        (12, 0, 4000000),    # Penjualan - Tiram Besar (401) - Credit
-        (13, 0, 3000000),    # Penjualan - Tiram Kecil (402) - Credit
-        
-        # ===== BEBAN (DEBIT) =====
-        (14, 1000000, 0),    # HPP - Tiram Kecil (501) - Debit
-        (15, 1500000, 0),    # HPP - Tiram Besar (502) - Debit
-        (16, 300000, 0),     # Beban Gaji (503) - Debit
-    ]
-    
-    # Insert saldo awal yang sudah dikoreksi
-    for account_id, debit_amount, credit_amount in opening_balances_corrected:
-        cur.execute('''
-            INSERT INTO opening_balances (account_id, debit_amount, credit_amount) 
-            VALUES (?, ?, ?)
-        ''', (account_id, debit_amount, credit_amount))
-    
-    # Hitung total untuk verifikasi
-    total_debit = sum(balance[1] for balance in opening_balances_corrected)
-    total_credit = sum(balance[2] for balance in opening_balances_corrected)
-    
-    print(f"✅ SALDO AWAL DIPERBAIKI:")
-    print(f"📊 TOTAL DEBIT: {total_debit:,}")
-    print(f"📊 TOTAL CREDIT: {total_credit:,}")
-    print(f"📊 BALANCED: {total_debit == total_credit}")
-    print(f"📊 SELISIH: {abs(total_debit - total_credit):,}")
-    
-    db.commit()
-    return total_debit == total_credit
-
-def set_opening_balance(account_id, balance, balance_type):
-    """Set saldo awal untuk akun tertentu"""
-    db = get_db()
-    cur = db.cursor()
-    
-    try:
-        # Hapus saldo awal yang ada untuk akun ini
-        cur.execute('DELETE FROM opening_balances WHERE account_id = ?', (account_id,))
-        
-        # Insert saldo awal baru
-        cur.execute('''
-            INSERT INTO opening_balances (account_id, balance, balance_type)
-            VALUES (?, ?, ?)
-        ''', (account_id, abs(balance), balance_type))
-        
-        db.commit()
-        return True
-    except Exception as e:
-        db.rollback()
-        raise e
-
-def get_opening_balance(account_id):
-    """Dapatkan saldo awal untuk akun tertentu"""
-    cur = get_db().execute('''
-        SELECT balance, balance_type FROM opening_balances 
-        WHERE account_id = ?
-    ''', (account_id,))
-    result = cur.fetchone()
-    
-    if result:
-        if result['balance_type'] == 'Debit':
-            return result['balance']
-        else:
-            return -result['balance']
-    return 0
-
-def get_account_balance(account_id, include_adjustments=True):
-    """Mendapatkan saldo akun dengan benar - VERSI DIPERBAIKI"""
-    db = get_db()
-    
-    # Dapatkan informasi akun
-    account_cur = db.execute('SELECT * FROM accounts WHERE id = ?', (account_id,))
-    account = account_cur.fetchone()
-    if not account:
-        return 0
-    
-    # 1. Dapatkan saldo awal - PERBAIKAN: gunakan struktur baru dengan benar
-    opening_cur = db.execute(
-        'SELECT debit_amount, credit_amount FROM opening_balances WHERE account_id = ?', 
-        (account_id,)
-    )
-    opening = opening_cur.fetchone()
-    
-    opening_balance = 0
-    if opening:
-        # Sesuai dengan jenis akun, hitung saldo awal
-        if account['normal_balance'] == 'Debit':
-            opening_balance = opening['debit_amount'] - opening['credit_amount']
-        else:
-            opening_balance = opening['credit_amount'] - opening['debit_amount']
-    
-    # 2. Hitung total dari jurnal
-    journal_cur = db.execute('''
-        SELECT COALESCE(SUM(debit), 0) as total_debit, 
-               COALESCE(SUM(credit), 0) as total_credit
-        FROM journal_lines 
-        WHERE account_id = ?
-    ''', (account_id,))
-    journal = journal_cur.fetchone()
-    
-    journal_net = 0
-    if account['normal_balance'] == 'Debit':
-        journal_net = journal['total_debit'] - journal['total_credit']
-    else:
-        journal_net = journal['total_credit'] - journal['total_debit']
-    
-    # 3. Hitung total dari penyesuaian (jika termasuk)
-    adjusting_net = 0
-    if include_adjustments:
-        adjusting_cur = db.execute('''
-            SELECT COALESCE(SUM(debit), 0) as total_debit, 
-                   COALESCE(SUM(credit), 0) as total_credit
-            FROM adjusting_lines 
-            WHERE account_id = ?
-        ''', (account_id,))
-        adjusting = adjusting_cur.fetchone()
-        
-        if account['normal_balance'] == 'Debit':
-            adjusting_net = adjusting['total_debit'] - adjusting['total_credit']
-        else:
-            adjusting_net = adjusting['total_credit'] - adjusting['total_debit']
-    
-    # Total saldo
-    total_balance = opening_balance + journal_net + adjusting_net
-    
-    return total_balance
-
-def post_journal_entry(date, description, lines, reference="", transaction_type="General", template_key=None):
-    """Posting entri jurnal dengan validasi yang diperbaiki"""
-    db = get_db()
-    cur = db.cursor()
-    
-    try:
-        # 1. VALIDASI SERVER-SIDE SEBELUM POSTING (dengan validasi yang diperbaiki)
-        validation_errors = validate_journal_entry(lines, template_key)
-        if validation_errors:
-            raise ValueError("; ".join(validation_errors))
-        
-        # 2. Buat entri jurnal
-        cur.execute('''
-            INSERT INTO journal_entries (date, description, reference, transaction_type, posted) 
-            VALUES (?, ?, ?, ?, 1)
-        ''', (date, description, reference, transaction_type))
-        entry_id = cur.lastrowid
-        
-        # 3. Tambahkan baris jurnal
-        for line in lines:
-            cur.execute('''
-                INSERT INTO journal_lines (entry_id, account_id, debit, credit, description) 
-                VALUES (?, ?, ?, ?, ?)
-            ''', (entry_id, line['account_id'], line.get('debit', 0), line.get('credit', 0), line.get('description', '')))
-        
-        # 4. Periksa jenis transaksi untuk update inventory
-        inventory_updated = False
-        is_harvest_transaction = False
-        
-        # Cek apakah ini transaksi panen (menggunakan akun persediaan benih dan tiram)
-        harvest_accounts = ['105', '106', '107', '108']  # Semua akun persediaan tiram dan benih
-        for line in lines:
-            account_id = line['account_id']
-            cur.execute('SELECT code FROM accounts WHERE id = ?', (account_id,))
-            account = cur.fetchone()
-            
-            if account and account['code'] in harvest_accounts:
-                inventory_updated = True
-                
-            # Deteksi transaksi panen berdasarkan pola debit/kredit
-            if account and account['code'] in ['105', '106'] and line.get('debit', 0) > 0:
-                # Jika ada debit ke persediaan tiram (105/106), kemungkinan panen
-                is_harvest_transaction = True
-        
-        # 5. Update inventory berdasarkan jenis transaksi
-        if inventory_updated:
-            if is_harvest_transaction:
-                # Handle transaksi panen - tambah stok tiram
-                for line in lines:
-                    account_id = line['account_id']
-                    cur.execute('SELECT code FROM accounts WHERE id = ?', (account_id,))
-                    account = cur.fetchone()
-                    
-                    if account and account['code'] == '105':  # Persediaan Tiram Kecil
-                        quantity = line['debit'] / 20000  # Harga Rp 20.000 per kg
-                        if quantity > 0:
-                            cur.execute('UPDATE settings SET v = v + ? WHERE k = "current_stock_small"', (quantity,))
-                            # Tambah entry di inventory
-                            cur.execute('''
-                                INSERT INTO inventory (date, description, quantity_in, unit_cost, value)
-                                VALUES (?, ?, ?, ?, ?)
-                            ''', (date, f'Panen tiram kecil: {description}', quantity, 20000, line['debit']))
-                    
-                    elif account and account['code'] == '106':  # Persediaan Tiram Besar
-                        quantity = line['debit'] / 35000  # Harga Rp 35.000 per kg
-                        if quantity > 0:
-                            cur.execute('UPDATE settings SET v = v + ? WHERE k = "current_stock_large"', (quantity,))
-                            # Tambah entry di inventory
-                            cur.execute('''
-                                INSERT INTO inventory (date, description, quantity_in, unit_cost, value)
-                                VALUES (?, ?, ?, ?, ?)
-                            ''', (date, f'Panen tiram besar: {description}', quantity, 35000, line['debit']))
-                    
-                    elif account and account['code'] == '107':  # Persediaan Benih Kecil
-                        quantity = line['credit'] / 20000  # Harga Rp 20.000 per kg
-                        if quantity > 0:
-                            cur.execute('UPDATE settings SET v = v - ? WHERE k = "current_seed_small"', (quantity,))
-                            # Kurangi stok benih di inventory
-                            cur.execute('''
-                                INSERT INTO inventory (date, description, quantity_out, unit_cost, value)
-                                VALUES (?, ?, ?, ?, ?)
-                            ''', (date, f'Penggunaan benih kecil: {description}', quantity, 20000, line['credit']))
-                    
-                    elif account and account['code'] == '108':  # Persediaan Benih Besar
-                        quantity = line['credit'] / 35000  # Harga Rp 35.000 per kg
-                        if quantity > 0:
-                            cur.execute('UPDATE settings SET v = v - ? WHERE k = "current_seed_large"', (quantity,))
-                            # Kurangi stok benih di inventory
-                            cur.execute('''
-                                INSERT INTO inventory (date, description, quantity_out, unit_cost, value)
-                                VALUES (?, ?, ?, ?, ?)
-                            ''', (date, f'Penggunaan benih besar: {description}', quantity, 35000, line['credit']))
-            
-            else:
-                # Handle transaksi penjualan/pembelian biasa
-                update_inventory_from_journal(entry_id)
-        
-        db.commit()
-        return entry_id
-    except Exception as e:
-        db.rollback()
-        raise e
-    
-def validate_journal_entry(lines, template_key=None):
-    """Validasi entri jurnal dengan aturan yang lebih realistis"""
-    errors = []
-    
-    # 1. Validasi jumlah baris minimum
-    if len(lines) < 2:
-        errors.append("Entri jurnal harus memiliki setidaknya dua baris")
-        return errors
-    
-    # 2. Validasi balance - TOTAL DEBIT HARUS SAMA DENGAN TOTAL KREDIT
-    total_debit = sum(line.get('debit', 0) for line in lines)
-    total_credit = sum(line.get('credit', 0) for line in lines)
-    
-    if abs(total_debit - total_credit) > 0.01:
-        errors.append(f"Total debit ({total_debit:,.2f}) tidak sama dengan total kredit ({total_credit:,.2f})")
-    
-    # 3. Validasi duplicate accounts - MENCEGAH AKUN YANG SAMA DI DUA BARIS
-    account_ids = [line['account_id'] for line in lines]
-    if len(account_ids) != len(set(account_ids)):
-        errors.append("Terdapat akun yang duplikat dalam entri yang sama")
-    
-    # 4. Validasi setiap baris individual - PERBAIKAN: lebih fleksibel
-    for i, line in enumerate(lines):
-        account_id = line['account_id']
-        debit = line.get('debit', 0)
-        credit = line.get('credit', 0)
-        
-        # Dapatkan informasi akun dari database
-        cur = get_db().execute(
-            'SELECT code, name, acct_type, normal_balance FROM accounts WHERE id = ?',
-            (account_id,)
-        )
-        account = cur.fetchone()
-        
-        if not account:
-            errors.append(f"Baris {i+1}: Akun ID {account_id} tidak ditemukan")
-            continue
-        
-        # 4.1 Validasi hanya satu sisi yang terisi (tidak boleh debit dan kredit sekaligus)
-        if debit > 0 and credit > 0:
-            errors.append(f"Baris {i+1} ({account['name']}): Tidak boleh mengisi debit dan kredit sekaligus")
-        
-        # 4.2 Validasi jumlah harus positif
-        if debit < 0 or credit < 0:
-            errors.append(f"Baris {i+1} ({account['name']}): Jumlah harus positif")
-        
-        # 4.3 PERBAIKAN: HAPUS validasi normal balance yang terlalu ketat
-        # Dalam akuntansi, akun bisa diisi di sisi berlawanan dengan saldo normal
-        # Contoh: Kas (debit normal) bisa di kredit saat pembayaran
-        # Jadi kita HAPUS validasi ini:
-        # if debit > 0 and account['normal_balance'] == 'Credit':
-        #     errors.append(f"Baris {i+1} ({account['name']}): Akun ini normalnya kredit, tidak boleh diisi di debit")
-        # elif credit > 0 and account['normal_balance'] == 'Debit':
-        #     errors.append(f"Baris {i+1} ({account['name']}): Akun ini normalnya debit, tidak boleh diisi di kredit")
-        
-        # 4.4 Validasi sisi yang konsisten dengan input (jika ada informasi sisi)
-        if 'side' in line:
-            if line['side'] == 'debit' and credit > 0:
-                errors.append(f"Baris {i+1} ({account['name']}): Ditetapkan sebagai debit tetapi memiliki nilai kredit")
-            elif line['side'] == 'credit' and debit > 0:
-                errors.append(f"Baris {i+1} ({account['name']}): Ditetapkan sebagai kredit tetapi memiliki nilai debit")
-    
-    # 5. Validasi template compliance jika menggunakan template
-    if template_key:
-        template_errors = validate_template_compliance(lines, template_key)
-        errors.extend(template_errors)
-    
-    return errors
-
-def validate_template_compliance(lines, template_key):
-    """Validasi compliance dengan template yang dipilih"""
-    errors = []
-    
-    # Dapatkan template dari database
-    cur = get_db().execute(
-        'SELECT lines_json FROM transaction_templates WHERE template_key = ?',
-        (template_key,)
-    )
-    template = cur.fetchone()
-    
-    if not template:
-        errors.append("Template tidak ditemukan")
-        return errors
-    
-    template_lines = json.loads(template['lines_json'])
-    
-    # Validasi setiap baris template yang non-editable
-    for tpl_line in template_lines:
-        if not tpl_line.get('editable', True):
-            # Cari baris yang sesuai di submitted lines berdasarkan account_code
-            matching_line = None
-            for line in lines:
-                # Dapatkan account_code dari account_id
-                account_cur = get_db().execute(
-                    'SELECT code FROM accounts WHERE id = ?',
-                    (line['account_id'],)
-                )
-                account = account_cur.fetchone()
-                
-                if account and account['code'] == tpl_line['account_code']:
-                    matching_line = line
-                    break
-            
-            if not matching_line:
-                errors.append(f"Baris template untuk akun {tpl_line['account_code']} tidak ditemukan dalam entri")
-                continue
-            
-            # Validasi sisi tidak berubah untuk non-editable lines
-            if 'side' in matching_line and matching_line['side'] != tpl_line['side']:
-                errors.append(f"Akun {tpl_line['account_code']} harus di sisi {tpl_line['side']} sesuai template")
-            
-            # Validasi account_id tidak berubah untuk non-editable lines
-            account_cur = get_db().execute(
-                'SELECT code FROM accounts WHERE id = ?',
-                (matching_line['account_id'],)
-            )
-            account = account_cur.fetchone()
-            if account and account['code'] != tpl_line['account_code']:
-                errors.append(f"Akun untuk baris template {tpl_line['account_code']} tidak boleh diubah")
-    
-    return errors
-
-# Fungsi helper untuk mendapatkan account_id dari account_code
-def get_account_id_from_code(account_code):
-    """Mendapatkan account_id dari account_code"""
-    cur = get_db().execute(
-        'SELECT id FROM accounts WHERE code = ?',
-        (account_code,)
-    )
-    account = cur.fetchone()
-    return account['id'] if account else None
-
-# Fungsi helper untuk mendapatkan account_code dari account_id  
-def get_account_code_from_id(account_id):
-    """Mendapatkan account_code dari account_id"""
-    cur = get_db().execute(
-        'SELECT code FROM accounts WHERE id = ?',
-        (account_id,)
-    )
-    account = cur.fetchone()
-    return account['code'] if account else None
-
-def post_adjusting_entry(date, description, lines):
-    """Posting entri penyesuaian"""
-    db = get_db()
-    cur = db.cursor()
-    
-    try:
-        cur.execute('INSERT INTO adjusting_entries (date, description) VALUES (?, ?)', (date, description))
-        adj_id = cur.lastrowid
-        
-        for line in lines:
-            cur.execute('''
-                INSERT INTO adjusting_lines (adj_id, account_id, debit, credit, description) 
-                VALUES (?, ?, ?, ?, ?)
-            ''', (adj_id, line['account_id'], line.get('debit', 0), line.get('credit', 0), line.get('description', '')))
-        
-        db.commit()
-        return adj_id
-    except Exception as e:
-        db.rollback()
-        raise e
-
-def update_inventory_from_journal(entry_id):
-    """Perbarui persediaan berdasarkan entri jurnal (untuk penjualan/pembelian)"""
-    db = get_db()
-    cur = db.cursor()
-    
-    # Dapatkan detail entri jurnal
-    cur.execute('''
-        SELECT jl.account_id, jl.debit, jl.credit, a.code, je.description, je.date
-        FROM journal_lines jl
-        JOIN accounts a ON jl.account_id = a.id
-        JOIN journal_entries je ON jl.entry_id = je.id
-        WHERE jl.entry_id = ?
-    ''', (entry_id,))
-    lines = cur.fetchall()
-    
-    # Periksa apakah ini transaksi penjualan (melibatkan persediaan dan pendapatan penjualan)
-    has_inventory = any(line['code'] in ['103', '103.1'] for line in lines)
-    has_sales = any(line['code'] in ['401', '401.1'] for line in lines)
-    
-    if has_inventory and has_sales:
-        # Ini adalah transaksi penjualan - kurangi persediaan
-        for line in lines:
-            if line['code'] in ['103', '103.1']:  # Akun persediaan
-                # Tentukan harga satuan berdasarkan jenis tiram
-                if line['code'] == '103':  # Tiram Besar
-                    unit_cost = 55000
-                    inventory_type = "Tiram Besar"
-                    stock_key = "current_stock_large"
-                else:  # Tiram Kecil
-                    unit_cost = 30000
-                    inventory_type = "Tiram Kecil"
-                    stock_key = "current_stock_small"
-                
-                quantity_sold = float(line['credit']) / float(unit_cost) if float(unit_cost) != 0 else 0
-                
-                if quantity_sold > 0:
-                    cur.execute('''
-                        INSERT INTO inventory (date, description, quantity_out, unit_cost, value)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (lines[0]['date'], f'Penjualan {inventory_type}: {lines[0]["description"]}', quantity_sold, unit_cost, float(line['credit'])))
-                    
-                    # Perbarui stok saat ini dalam pengaturan
-                    cur.execute('SELECT v FROM settings WHERE k = ?', (stock_key,))
-                    result = cur.fetchone()
-                    current = float(result['v']) if result and result['v'] else 0
-                    new_stock = max(0, current - quantity_sold)
-                    cur.execute('UPDATE settings SET v = ? WHERE k = ?', (str(new_stock), stock_key))
-    
-    db.commit()
-
-def get_current_stock(stock_type='all'):
-    """Dapatkan stok tiram saat ini"""
-    db = get_db()
-    cur = db.cursor()
-    
-    if stock_type == 'large':
-        cur.execute('SELECT v FROM settings WHERE k = "current_stock_large"')
-        result = cur.fetchone()
-        return int(result['v']) if result and result['v'] else 0
-    elif stock_type == 'small':
-        cur.execute('SELECT v FROM settings WHERE k = "current_stock_small"')
-        result = cur.fetchone()
-        return int(result['v']) if result and result['v'] else 0
-    else:
-        # Return dictionary dengan kedua stok
-        cur.execute('SELECT v FROM settings WHERE k = "current_stock_large"')
-        large_result = cur.fetchone()
-        large = int(large_result['v']) if large_result and large_result['v'] else 0
-        
-        cur.execute('SELECT v FROM settings WHERE k = "current_stock_small"')
-        small_result = cur.fetchone()
-        small = int(small_result['v']) if small_result and small_result['v'] else 0
-        
-        return {
-            'large': large,
-            'small': small,
-            'total': large + small
-        }
-    
-
-def set_opening_balance(account_id, amount, balance_type):
-    """Menyimpan saldo awal dengan benar"""
-    db = get_db()
-    
-    # Hapus saldo lama jika ada
-    db.execute('DELETE FROM opening_balances WHERE account_id = ?', (account_id,))
-    
-    # Insert saldo baru
-    if amount > 0:
-        if balance_type == 'Debit':
-            db.execute('''
-                INSERT INTO opening_balances (account_id, debit_amount, credit_amount)
-                VALUES (?, ?, 0)
-            ''', (account_id, amount))
-        else:
-            db.execute('''
-                INSERT INTO opening_balances (account_id, debit_amount, credit_amount)
-                VALUES (?, 0, ?)
-            ''', (account_id, amount))
-    
-    db.commit()
-
-def get_opening_balance(account_id):
-    """Dapatkan saldo awal untuk akun tertentu - VERSI DIPERBAIKI"""
-    cur = get_db().execute('''
-        SELECT balance, balance_type FROM opening_balances 
-        WHERE account_id = ?
-    ''', (account_id,))
-    result = cur.fetchone()
-    
-    if result:
-        # PERBAIKAN: Return dengan tanda yang benar
-        if result['balance_type'] == 'Debit':
-            return result['balance']  # Positif untuk debit
-        else:
-            return -result['balance']  # Negatif untuk kredit
-    return 0
-
-def get_company_info():
-    """Dapatkan informasi perusahaan dari pengaturan"""
-    cur = get_db().execute('SELECT k, v FROM settings WHERE k IN ("company_name", "company_description", "company_location")')
-    info = {row['k']: row['v'] for row in cur.fetchall()}
-    return info
-
-def recover_possible_data():
-    """Attempt to recover any unsaved data"""
-    try:
-        db = get_db()
-        # Check if there are any uncommitted journal entries
-        cur = db.execute('''
-            SELECT COUNT(*) as count FROM journal_entries 
-            WHERE id NOT IN (SELECT DISTINCT entry_id FROM journal_lines)
-        ''')
-        orphaned_entries = cur.fetchone()['count']
-        
-        if orphaned_entries > 0:
-            print(f"🔄 Found {orphaned_entries} orphaned entries, attempting recovery...")
-            # Delete orphaned entries
-            db.execute('DELETE FROM journal_entries WHERE id NOT IN (SELECT DISTINCT entry_id FROM journal_lines)')
-            db.commit()
-            print("✅ Orphaned entries cleaned up")
-            
-        return True
-    except Exception as e:
-        print(f"❌ Recovery failed: {e}")
-        return False
-
-# Call recovery on startup
-def startup_tasks():
-    """Run recovery tasks on startup"""
-    print("🔧 Running startup recovery tasks...")
-    try:
-        with app.app_context():
-            recover_possible_data()
-        print("✅ Startup tasks completed")
-    except Exception as e:
-        print(f"❌ Startup tasks failed: {e}")
-
-# Run startup tasks
-startup_tasks()
-
-
-# ---------- Pelaporan Keuangan ----------
-
-def trial_balance(include_adjustments=False):
-    """Menghasilkan neraca saldo dengan format yang benar - VERSI DIPERBAIKI"""
-    accounts = all_accounts()
-    trial_balance_data = []
-    total_debit = 0
-    total_credit = 0
-    
-    for account in accounts:
-        # Dapatkan saldo akun
-        balance = get_account_balance(account['id'], include_adjustments)
-        
-        # Tentukan apakah saldo normalnya Debit atau Kredit
-        if account['normal_balance'] == 'Debit':
-            # Untuk akun dengan saldo normal Debit (Asset, Expense)
-            if balance >= 0:
-                debit = balance
-                credit = 0
-            else:
-                debit = 0
-                credit = abs(balance)
-        else:
-            # Untuk akun dengan saldo normal Kredit (Liability, Equity, Revenue)
-            if balance >= 0:
-                debit = 0
-                credit = balance
-            else:
-                debit = abs(balance)
-                credit = 0
-        
-        # Hanya tampilkan akun yang memiliki saldo
-        if debit != 0 or credit != 0:
-            trial_balance_data.append({
-                'account': account,
-                'debit': debit,
-                'credit': credit
-            })
-            total_debit += debit
-            total_credit += credit
-    
-    return trial_balance_data, total_debit, total_credit
-
-def equity_statement(include_adjustments=True):
-    """Hasilkan laporan perubahan modal"""
-    db = get_db()
-    cur = db.cursor()
-    
-    # Dapatkan saldo awal modal
-    cur.execute('SELECT id FROM accounts WHERE code = "301" OR name LIKE "%Modal Pemilik%"')
-    capital_account = cur.fetchone()
-    beginning_capital = get_account_balance(capital_account['id'], include_adjustments) if capital_account else 0
-    
-    # Dapatkan laba bersih
-    inc_stmt = income_statement(include_adjustments)
-    net_income = inc_stmt['net_income']
-    
-    # Dapatkan prive/penarikan
-    cur.execute('SELECT id FROM accounts WHERE code = "302" OR name LIKE "%Prive%"')
-    drawing_account = cur.fetchone()
-    drawings = abs(get_account_balance(drawing_account['id'], include_adjustments)) if drawing_account else 0
-    
-    # Hitung saldo akhir modal
-    ending_capital = beginning_capital + net_income - drawings
-    
-    return {
-        'beginning_capital': beginning_capital,
-        'net_income': net_income,
-        'drawings': drawings,
-        'ending_capital': ending_capital
-    }
-
-def income_statement(include_adjustments=True):
-    """Hasilkan laporan laba rugi - VERSI YANG DIPERBAIKI"""
-    db = get_db()
-    cur = db.cursor()
-    
-    # Hitung total pendapatan
-    cur.execute('''
-        SELECT COALESCE(SUM(jl.credit), 0) - COALESCE(SUM(jl.debit), 0) as net
-        FROM journal_lines jl
-        JOIN accounts a ON jl.account_id = a.id
-        WHERE a.code LIKE '4%'
-    ''')
-    revenue_journal = cur.fetchone()['net']
-    
-    cur.execute('''
-        SELECT COALESCE(SUM(al.credit), 0) - COALESCE(SUM(al.debit), 0) as net
-        FROM adjusting_lines al
-        JOIN accounts a ON al.account_id = a.id
-        WHERE a.code LIKE '4%'
-    ''')
-    revenue_adjusting = cur.fetchone()['net'] if include_adjustments else 0
-    
-    total_revenue = revenue_journal + revenue_adjusting
-    
-    # Hitung total beban
-    cur.execute('''
-        SELECT COALESCE(SUM(jl.debit), 0) - COALESCE(SUM(jl.credit), 0) as net
-        FROM journal_lines jl
-        JOIN accounts a ON jl.account_id = a.id
-        WHERE a.code LIKE '5%'
-    ''')
-    expense_journal = cur.fetchone()['net']
-    
-    cur.execute('''
-        SELECT COALESCE(SUM(al.debit), 0) - COALESCE(SUM(al.credit), 0) as net
-        FROM adjusting_lines al
-        JOIN accounts a ON al.account_id = a.id
-        WHERE a.code LIKE '5%'
-    ''')
-    expense_adjusting = cur.fetchone()['net'] if include_adjustments else 0
-    
-    total_expense = expense_journal + expense_adjusting
-    
-    net_income = total_revenue - total_expense
-    
-    return {
-        'revenues': [],
-        'expenses': [],
-        'total_revenue': total_revenue,
-        'total_expense': total_expense,
-        'net_income': net_income
-    }
-
-def balance_sheet(include_adjustments=True):
-    """Hasilkan neraca - VERSI YANG DIPERBAIKI"""
-    db = get_db()
-    cur = db.cursor()
-    
-    # Aset (seri 100)
-    cur.execute('''
-        SELECT COALESCE(SUM(jl.debit), 0) - COALESCE(SUM(jl.credit), 0) as journal_balance
-        FROM journal_lines jl
-        JOIN accounts a ON jl.account_id = a.id
-        WHERE a.code LIKE '1%'
-    ''')
-    assets_journal = cur.fetchone()['journal_balance']
-    
-    cur.execute('''
-        SELECT COALESCE(SUM(al.debit), 0) - COALESCE(SUM(al.credit), 0) as adjusting_balance
-        FROM adjusting_lines al
-        JOIN accounts a ON al.account_id = a.id
-        WHERE a.code LIKE '1%'
-    ''')
-    assets_adjusting = cur.fetchone()['adjusting_balance'] if include_adjustments else 0
-    
-    total_assets = assets_journal + assets_adjusting
-    
-    # Kewajiban (seri 200)
-    cur.execute('''
-        SELECT COALESCE(SUM(jl.credit), 0) - COALESCE(SUM(jl.debit), 0) as journal_balance
-        FROM journal_lines jl
-        JOIN accounts a ON jl.account_id = a.id
-        WHERE a.code LIKE '2%'
-    ''')
-    liabilities_journal = cur.fetchone()['journal_balance']
-    
-    cur.execute('''
-        SELECT COALESCE(SUM(al.credit), 0) - COALESCE(SUM(al.debit), 0) as adjusting_balance
-        FROM adjusting_lines al
-        JOIN accounts a ON al.account_id = a.id
-        WHERE a.code LIKE '2%'
-    ''')
-    liabilities_adjusting = cur.fetchone()['adjusting_balance'] if include_adjustments else 0
-    
-    total_liabilities = liabilities_journal + liabilities_adjusting
-    
-    # Ekuitas (seri 300)
-    cur.execute('''
-        SELECT COALESCE(SUM(jl.credit), 0) - COALESCE(SUM(jl.debit), 0) as journal_balance
-        FROM journal_lines jl
-        JOIN accounts a ON jl.account_id = a.id
-        WHERE a.code LIKE '3%'
-    ''')
-    equity_journal = cur.fetchone()['journal_balance']
-    
-    cur.execute('''
-        SELECT COALESCE(SUM(al.credit), 0) - COALESCE(SUM(al.debit), 0) as adjusting_balance
-        FROM adjusting_lines al
-        JOIN accounts a ON al.account_id = a.id
-        WHERE a.code LIKE '3%'
-    ''')
-    equity_adjusting = cur.fetchone()['adjusting_balance'] if include_adjustments else 0
-    
-    total_equity = equity_journal + equity_adjusting
-    
-    # Tambahkan laba bersih ke ekuitas
-    inc_stmt = income_statement(include_adjustments)
-    total_equity += inc_stmt['net_income']
-    
-    return {
-        'assets': [],
-        'liabilities': [],
-        'equity': [],
-        'total_assets': total_assets,
-        'total_liabilities': total_liabilities,
-        'total_equity': total_equity,
-        'net_income': inc_stmt['net_income']
-    }
-
-def cash_flow_statement():
-    """Hasilkan laporan arus kas yang lebih akurat"""
-    db = get_db()
-    cur = db.cursor()
-    
-    # Aktivitas operasi - Pendapatan dan beban tunai
-    cur.execute('''
-        SELECT 
-            SUM(CASE WHEN a.code LIKE '4%' THEN jl.credit ELSE 0 END) -
-            SUM(CASE WHEN a.code LIKE '4%' THEN jl.debit ELSE 0 END) as net_revenue,
-            SUM(CASE WHEN a.code LIKE '5%' THEN jl.debit ELSE 0 END) -
-            SUM(CASE WHEN a.code LIKE '5%' THEN jl.credit ELSE 0 END) as net_expenses
-        FROM journal_lines jl
-        JOIN accounts a ON jl.account_id = a.id
-    ''')
-    operating = cur.fetchone()
-    net_cash_operating = (operating['net_revenue'] or 0) - (operating['net_expenses'] or 0)
-    
-    # Aktivitas investasi - Pembelian/perolehan aset tetap
-    cur.execute('''
-        SELECT 
-            SUM(CASE WHEN a.code = '104' THEN jl.debit ELSE 0 END) as equipment_purchase,
-            SUM(CASE WHEN a.code = '104' THEN jl.credit ELSE 0 END) as equipment_sale
-        FROM journal_lines jl
-        JOIN accounts a ON jl.account_id = a.id
-    ''')
-    investing = cur.fetchone()
-    net_cash_investing = (investing['equipment_sale'] or 0) - (investing['equipment_purchase'] or 0)
-    
-    # Aktivitas pendanaan - Modal dan pinjaman
-    cur.execute('''
-        SELECT 
-            SUM(CASE WHEN a.code = '301' THEN jl.credit ELSE 0 END) as capital_contribution,
-            SUM(CASE WHEN a.code = '302' THEN jl.debit ELSE 0 END) as drawings,
-            SUM(CASE WHEN a.code = '202' THEN jl.credit ELSE 0 END) as loans_received,
-            SUM(CASE WHEN a.code = '202' THEN jl.debit ELSE 0 END) as loans_paid
-        FROM journal_lines jl
-        JOIN accounts a ON jl.account_id = a.id
-    ''')
-    financing = cur.fetchone()
-    net_cash_financing = (
-        (financing['capital_contribution'] or 0) - 
-        (financing['drawings'] or 0) + 
-        (financing['loans_received'] or 0) - 
-        (financing['loans_paid'] or 0)
-    )
-    
-    net_cash_flow = net_cash_operating + net_cash_investing + net_cash_financing
-    
-    return {
-        'operating_activities': {
-            'net_cash': net_cash_operating,
-            'revenue': operating['net_revenue'] or 0,
-            'expenses': operating['net_expenses'] or 0
-        },
-        'investing_activities': {
-            'net_cash': net_cash_investing,
-            'equipment_purchase': investing['equipment_purchase'] or 0,
-            'equipment_sale': investing['equipment_sale'] or 0
-        },
-        'financing_activities': {
-            'net_cash': net_cash_financing,
-            'capital_contribution': financing['capital_contribution'] or 0,
-            'drawings': financing['drawings'] or 0,
-            'loans_received': financing['loans_received'] or 0,
-            'loans_paid': financing['loans_paid'] or 0
-        },
-        'net_cash_flow': net_cash_flow
-    }
-
-def get_closing_entries():
-    """Buat entri jurnal penutup untuk menutup akun nominal (pendapatan dan beban)"""
-    db = get_db()
-    cur = db.cursor()
-    
-    # Hitung total pendapatan dan beban
-    cur.execute('''
-        SELECT 
-            SUM(CASE WHEN a.code LIKE '4%' THEN jl.credit - jl.debit ELSE 0 END) as net_revenue,
-            SUM(CASE WHEN a.code LIKE '5%' THEN jl.debit - jl.credit ELSE 0 END) as net_expense
-        FROM journal_lines jl
-        JOIN accounts a ON jl.account_id = a.id
-    ''')
-    result = cur.fetchone()
-    
-    net_revenue = result['net_revenue'] or 0
-    net_expense = result['net_expense'] or 0
-    net_income = net_revenue - net_expense
-    
-    closing_entries = []
-    
-    # 1. Tutup akun pendapatan ke Ikhtisar Laba Rugi
-    if net_revenue > 0:
-        cur.execute('SELECT id FROM accounts WHERE code LIKE "4%" AND acct_type = "Revenue"')
-        revenue_accounts = cur.fetchall()
-        
-        for account in revenue_accounts:
-            account_balance = get_account_balance(account['id'])
-            if account_balance > 0:
-                closing_entries.append({
-                    'account_id': account['id'],
-                    'debit': 0,
-                    'credit': account_balance,
-                    'description': f'Penutupan pendapatan'
-                })
-    
-    # 2. Tutup akun beban ke Ikhtisar Laba Rugi
-    if net_expense > 0:
-        cur.execute('SELECT id FROM accounts WHERE code LIKE "5%" AND acct_type = "Expense"')
-        expense_accounts = cur.fetchall()
-        
-        for account in expense_accounts:
-            account_balance = get_account_balance(account['id'])
-            if account_balance > 0:
-                closing_entries.append({
-                    'account_id': account['id'],
-                    'debit': account_balance,
-                    'credit': 0,
-                    'description': f'Penutupan beban'
-                })
-    
-    # 3. Tutup Ikhtisar Laba Rugi ke Laba Ditahan
-    if net_income != 0:
-        # Cari akun Ikhtisar Laba Rugi atau Laba Ditahan
-        cur.execute('SELECT id FROM accounts WHERE code = "303" OR name LIKE "%Laba Ditahan%"')
-        retained_earnings = cur.fetchone()
-        
-        if retained_earnings:
-            if net_income > 0:
-                # Laba bersih - tambah ke Laba Ditahan
-                closing_entries.append({
-                    'account_id': retained_earnings['id'],
-                    'debit': 0,
-                    'credit': net_income,
-                    'description': f'Laba bersih periode berjalan'
-                })
-            else:
-                # Rugi bersih - kurangi dari Laba Ditahan
-                closing_entries.append({
-                    'account_id': retained_earnings['id'],
-                    'debit': abs(net_income),
-                    'credit': 0,
-                    'description': f'Rugi bersih periode berjalan'
-                })
-    
-    return closing_entries, net_income
-
-def get_post_closing_trial_balance():
-    """Hasilkan neraca saldo setelah penutupan (hanya akun riil)"""
-    accounts = all_accounts()
-    pctb_data = []
-    total_debit = 0
-    total_credit = 0
-    
-    for account in accounts:
-        # Hanya akun riil (Asset, Liability, Equity) yang ada di neraca saldo penutup
-        if account['acct_type'] in ('Asset', 'Liability', 'Equity'):
-            balance = get_account_balance(account['id'], include_adjustments=True)
-            
-            if account['normal_balance'] == 'Debit':
-                debit = balance if balance > 0 else 0
-                credit = -balance if balance < 0 else 0
-            else:
-                debit = -balance if balance < 0 else 0
-                credit = balance if balance > 0 else 0
-            
-            pctb_data.append({
-                'account': account,
-                'debit': debit,
-                'credit': credit
-            })
-            
-            total_debit += debit
-            total_credit += credit
-    
-    return pctb_data, total_debit, total_credit
-
-def post_closing_entries():
-    """Posting entri jurnal penutup"""
-    closing_entries, net_income = get_closing_entries()
-    
-    if not closing_entries:
-        return None, 0
-    
-    db = get_db()
-    cur = db.cursor()
-    
-    try:
-        # Buat entri jurnal penutup
-        cur.execute('''
-            INSERT INTO journal_entries (date, description, reference, transaction_type, posted) 
-            VALUES (?, ?, ?, ?, 1)
-        ''', (datetime.now().date().isoformat(), 'Jurnal Penutup - Akhir Periode', 'CLOSING', 'Closing Entry'))
-        entry_id = cur.lastrowid
-        
-        # Tambahkan baris jurnal penutup
-        for entry in closing_entries:
-            cur.execute('''
-                INSERT INTO journal_lines (entry_id, account_id, debit, credit, description) 
-                VALUES (?, ?, ?, ?, ?)
-            ''', (entry_id, entry['account_id'], entry.get('debit', 0), entry.get('credit', 0), entry.get('description', '')))
-        
-        db.commit()
-        return entry_id, net_income
-    except Exception as e:
-        db.rollback()
-        raise e
-    
-# ---------- Template HTML ----------
-
-BASE_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="id">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Tiramine - {{title}}</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css" rel="stylesheet">
-    <style>
-        /* Tiramine Design System - Enhanced with More Gradients & Lime */
-        :root {
-            /* Enhanced Color Palette */
-            --primary-blue: #2563eb;
-            --blue-dark: #1e40af;
-            --blue-light: #3b82f6;
-            --electric-blue: #1d4ed8;
-            --neon-cyan: #22d3ee;
-            --cyan-light: #67e8f9;
-            --lime-neon: #c6ff4d;
-            --lime-bright: #d8ff66;
-            --lime-electric: #b4ff39;
-            --deep-navy: #0f172a;
-            --dark-navy: #1e293b;
-            --midnight: #0a0f2a;
-            --white: #ffffff;
-            --off-white: #f8fafc;
-            --gray-light: #e2e8f0;
-            --gray-medium: #94a3b8;
-            --red-alert: #ef4444;
-            --red-dark: #dc2626;
-            
-            /* Super Enhanced Gradients */
-            --hero-gradient: linear-gradient(135deg, #1e40af 0%, #1e293b 50%, #0f172a 100%);
-            --sidebar-gradient: linear-gradient(180deg, #1e40af 0%, #1e293b 100%);
-            --card-gradient: linear-gradient(145deg, rgba(255,255,255,0.98) 0%, rgba(248,250,252,0.95) 100%);
-            --button-gradient: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%);
-            --button-hover: linear-gradient(135deg, #1d4ed8 0%, #1e40af 100%);
-            --accent-gradient: linear-gradient(135deg, #22d3ee 0%, #c6ff4d 100%);
-            --lime-gradient: linear-gradient(135deg, #c6ff4d 0%, #b4ff39 100%);
-            --electric-gradient: linear-gradient(135deg, #1d4ed8 0%, #c6ff4d 50%, #22d3ee 100%);
-            --neon-gradient: linear-gradient(135deg, #c6ff4d 0%, #22d3ee 100%);
-            --glass-gradient: linear-gradient(135deg, rgba(255,255,255,0.15) 0%, rgba(255,255,255,0.05) 100%);
-            --wave-gradient: linear-gradient(90deg, transparent 0%, rgba(198,255,77,0.2) 50%, transparent 100%);
-            --red-gradient: linear-gradient(135deg, #ef4444 0%, #dc2626 100%);
-            
-            /* Enhanced Spacing System */
-            --space-1: 0.25rem;
-            --space-2: 0.5rem;
-            --space-3: 0.75rem;
-            --space-4: 1rem;
-            --space-5: 1.25rem;
-            --space-6: 1.5rem;
-            --space-8: 2rem;
-            --space-10: 2.5rem;
-            --space-12: 3rem;
-            --space-16: 4rem;
-            --space-20: 5rem;
-            
-            /* Border Radius */
-            --radius-sm: 0.375rem;
-            --radius-md: 0.5rem;
-            --radius-lg: 0.75rem;
-            --radius-xl: 1rem;
-            --radius-2xl: 1.5rem;
-            --radius-3xl: 2rem;
-            
-            /* Enhanced Shadows */
-            --shadow-sm: 0 1px 3px 0 rgba(0, 0, 0, 0.1);
-            --shadow-md: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
-            --shadow-lg: 0 10px 15px -3px rgba(0, 0, 0, 0.1), 0 4px 6px -2px rgba(0, 0, 0, 0.05);
-            --shadow-xl: 0 20px 25px -5px rgba(0, 0, 0, 0.1), 0 10px 10px -5px rgba(0, 0, 0, 0.04);
-            --shadow-neon: 0 0 25px rgba(198, 255, 77, 0.4);
-            --shadow-electric: 0 0 30px rgba(34, 211, 238, 0.3);
-            --shadow-glow: 0 0 35px rgba(198, 255, 77, 0.3);
-        }
-
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        }
-
-        body {
-            font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: linear-gradient(135deg, #f8fafc 0%, #f1f5f9 50%, #ecfdf5 100%);
-            color: var(--deep-navy);
-            line-height: 1.6;
-            min-height: 100vh;
-            overflow-x: hidden;
-        }
-
-        /* Enhanced Background Effects */
-        .bg-waves {
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            pointer-events: none;
-            z-index: -1;
-            opacity: 0.4;
-        }
-
-        .wave {
-            position: absolute;
-            bottom: 0;
-            left: 0;
-            width: 100%;
-            height: 120px;
-            background: var(--wave-gradient);
-            animation: waveMove 10s ease-in-out infinite;
-        }
-
-        .wave:nth-child(2) {
-            animation-delay: -3s;
-            opacity: 0.6;
-            background: linear-gradient(90deg, transparent 0%, rgba(34,211,238,0.15) 50%, transparent 100%);
-        }
-
-        .wave:nth-child(3) {
-            animation-delay: -6s;
-            opacity: 0.3;
-            background: linear-gradient(90deg, transparent 0%, rgba(29,78,216,0.1) 50%, transparent 100%);
-        }
-
-        @keyframes waveMove {
-            0%, 100% { transform: translateX(0) scaleY(1); }
-            50% { transform: translateX(-30px) scaleY(1.1); }
-        }
-
-        /* Enhanced Sidebar */
-        .sidebar {
-            background: var(--sidebar-gradient);
-            min-height: 100vh;
-            width: 260px; /* Diperkecil dari 280px */
-            position: fixed;
-            left: 0;
-            top: 0;
-            z-index: 1000;
-            box-shadow: var(--shadow-xl);
-            border-right: 1px solid rgba(255, 255, 255, 0.1);
-            backdrop-filter: blur(20px);
-            overflow-y: auto; /* Tambahkan scroll jika konten panjang */
-            max-height: 100vh; /* Batasi tinggi maksimal */
-        }
-
-        .logo {
-        padding: var(--space-8) var(--space-6) var(--space-6); /* Diperkecil sedikit */
-        text-align: center;
-            border-bottom: 1px solid rgba(255, 255, 255, 0.1);
-            margin-bottom: var(--space-4); /* Diperkecil */
-        }
-
-        .logo i {
-            font-size: 2rem; /* Diperkecil dari 2.5rem */
-            background: var(--electric-gradient);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            margin-bottom: var(--space-3); /* Diperkecil */
-            display: block;
-        }
-
-        .logo-text {
-            font-size: 1.5rem; /* Diperkecil dari 1.75rem */
-            font-weight: 800;
-            background: var(--electric-gradient);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            letter-spacing: -0.025em;
-        }
-
-        .nav-links {
-            padding: 0 var(--space-4);
-            padding-bottom: var(--space-6); /* Tambahkan padding bawah */
-        }
-
-        .nav-item {
-            margin-bottom: var(--space-2); /* Diperkecil dari var(--space-3) */
-        }
-
-        .nav-link {
-            display: flex;
-            align-items: center;
-            padding: var(--space-3) var(--space-4); /* Diperkecil dari var(--space-4) var(--space-5) */
-            color: rgba(255, 255, 255, 0.85);
-            text-decoration: none;
-            border-radius: var(--radius-xl);
-            transition: all 0.3s ease;
-            font-weight: 600;
-            position: relative;
-            overflow: hidden;
-            border: 1px solid transparent;
-            font-size: 0.9rem; /* Tambahkan ukuran font lebih kecil */
-        }
-        .nav-link::before {
-            content: '';
-            position: absolute;
-            left: 0;
-            top: 0;
-            height: 100%;
-            width: 4px;
-            background: var(--lime-gradient);
-            transform: scaleY(0);
-            transition: transform 0.3s ease;
-            border-radius: var(--radius-sm);
-        }
-
-        .nav-link:hover {
-            color: var(--lime-bright);
-            background: rgba(198, 255, 77, 0.1);
-            transform: translateX(8px);
-            border-color: rgba(198, 255, 77, 0.2);
-        }
-
-        .nav-link:hover::before {
-            transform: scaleY(1);
-        }
-
-        .nav-link.active {
-            color: var(--lime-neon);
-            background: rgba(198, 255, 77, 0.15);
-            box-shadow: var(--shadow-neon);
-            border-color: rgba(198, 255, 77, 0.3);
-        }
-
-        .nav-link.active::before {
-            transform: scaleY(1);
-        }
-
-        .nav-link i {
-            width: 22px;
-            margin-right: var(--space-4);
-            font-size: 1.2rem;
-        }
-
-        .nav-link.reset-link {
-            color: #fca5a5;
-            border-color: rgba(239, 68, 68, 0.3);
-        }
-
-        .nav-link.reset-link:hover {
-            color: #fef2f2;
-            background: rgba(239, 68, 68, 0.15);
-            box-shadow: 0 0 20px rgba(239, 68, 68, 0.3);
-        }
-
-       /* Enhanced Main Content Layout */
-        .main-content {
-            margin-left: 260px;
-            min-height: 100vh;
-            background: transparent;
-        }
-
-        .content-container {
-            padding: var(--space-8);
-            max-width: 1400px;
-            margin: 0 auto;
-        }
-
-        /* Enhanced Card Consistency */
-        .card {
-            background: var(--card-gradient);
-            border: 1px solid rgba(255, 255, 255, 0.9);
-            border-radius: 12px;
-            box-shadow: var(--shadow-lg);
-            backdrop-filter: blur(20px);
-            transition: all 0.22s cubic-bezier(0.2, 0.9, 0.3, 1);
-            position: relative;
-            overflow: hidden;
-        }
-
-        .card:hover {
-            transform: translateY(-6px);
-            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.08), var(--shadow-glow);
-        }
-
-        /* Enhanced Stat Card dengan Hover Effect yang Konsisten */
-        .stat-card {
-            background: var(--card-gradient);
-            border-radius: 12px;
-            padding: var(--space-6);
-            text-align: center;
-            border: 1px solid rgba(255, 255, 255, 0.9);
-            box-shadow: var(--shadow-lg);
-            transition: all 0.22s cubic-bezier(0.2, 0.9, 0.3, 1);
-            position: relative;
-            overflow: hidden;
-            height: 100%;
-        }
-
-        .stat-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: var(--electric-gradient);
-            opacity: 0.1;
-            transition: left 0.4s ease;
-        }
-
-        .stat-card::after {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: var(--electric-gradient);
-            background-size: 200% 200%;
-            animation: gradientShift 3s ease infinite;
-            transform: scaleX(0);
-            transition: transform 0.4s ease;
-        }
-
-        .stat-card:hover {
-            transform: translateY(-6px);
-            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.08), var(--shadow-glow);
-            border-color: var(--lime-neon);
-        }
-
-        .stat-card:hover::before {
-            left: 0;
-        }
-
-        .stat-card:hover::after {
-            transform: scaleX(1);
-        }
-
-        .stat-icon {
-            width: 60px;
-            height: 60px;
-            border-radius: 12px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            margin: 0 auto var(--space-4);
-            font-size: 1.5rem;
-            box-shadow: var(--shadow-md);
-            transition: all 0.22s cubic-bezier(0.2, 0.9, 0.3, 1);
-            position: relative;
-            z-index: 2;
-        }
-
-        .stat-card:hover .stat-icon {
-            transform: scale(1.05);
-            box-shadow: var(--shadow-neon);
-        }
-
-        .stat-number {
-            font-size: 2.5rem;
-            font-weight: 800;
-            margin-bottom: var(--space-2);
-            line-height: 1;
-            position: relative;
-            z-index: 2;
-        }
-
-        .stat-label {
-            font-size: 1rem;
-            font-weight: 600;
-            margin-bottom: var(--space-1);
-            position: relative;
-            z-index: 2;
-        }
-
-        @keyframes gradientShift {
-            0%, 100% {
-                background-position: 0% 50%;
-            }
-            50% {
-                background-position: 100% 50%;
-            }
-        }
-
-        /* Enhanced Quick Action Card */
-        .quick-action-card {
-            background: var(--card-gradient);
-            border-radius: 12px;
-            padding: var(--space-5);
-            text-align: center;
-            border: 1px solid rgba(255, 255, 255, 0.9);
-            box-shadow: var(--shadow-lg);
-            transition: all 0.22s cubic-bezier(0.2, 0.9, 0.3, 1);
-            position: relative;
-            overflow: hidden;
-            height: 100%;
-            color: inherit;
-            text-decoration: none;
-        }
-
-        .quick-action-card:hover {
-            transform: translateY(-6px);
-            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.08), var(--shadow-glow);
-            text-decoration: none;
-            color: inherit;
-        }
-
-        .quick-action-icon {
-            width: 80px;
-            height: 80px;
-            border-radius: 16px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            margin: 0 auto var(--space-4);
-            font-size: 2rem;
-            box-shadow: var(--shadow-lg);
-            transition: all 0.22s cubic-bezier(0.2, 0.9, 0.3, 1);
-        }
-
-        .quick-action-card:hover .quick-action-icon {
-            transform: scale(1.05);
-        }
-
-        .quick-action-title {
-            font-weight: 800;
-            margin-bottom: var(--space-2);
-            color: var(--deep-navy);
-            font-size: 1.25rem;
-        }
-
-        .quick-action-desc {
-            font-size: 0.9rem;
-            color: var(--gray-medium);
-        }
-
-        /* Button Consistency */
-        .btn {
-            border: none;
-            border-radius: 8px;
-            padding: var(--space-3) var(--space-6);
-            font-weight: 600;
-            font-size: 0.9rem;
-            transition: all 0.22s cubic-bezier(0.2, 0.9, 0.3, 1);
-            position: relative;
-            overflow: hidden;
-        }
-
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.15);
-        }
-
-        .btn:focus {
-            outline: 2px solid var(--primary-blue);
-            outline-offset: 2px;
-        }
-
-        /* Responsive Design */
-        @media (max-width: 768px) {
-            .main-content {
-                margin-left: 0;
-            }
-            
-            .content-container {
-                padding: var(--space-4);
-            }
-            
-            .stat-number {
-                font-size: 2rem;
-            }
-            
-            .quick-action-icon {
-                width: 60px;
-                height: 60px;
-                font-size: 1.5rem;
-            }
-            
-            .page-title {
-                font-size: 1.75rem;
-            }
-        }
-
-        /* Alignment Utilities */
-        .align-items-stretch {
-            align-items: stretch !important;
-        }
-
-        .h-100 {
-            height: 100% !important;
-        }
-
-        /* Dropdown Styling */
-        .dropdown-menu {
-            border-radius: 8px;
-            box-shadow: var(--shadow-lg);
-            border: 1px solid rgba(255, 255, 255, 0.9);
-        }
-
-        .dropdown-item {
-            padding: var(--space-2) var(--space-4);
-            font-size: 0.875rem;
-            transition: all 0.2s ease;
-        }
-
-        .dropdown-item:hover {
-            background-color: rgba(37, 99, 235, 0.1);
-        }
-
-        /* Enhanced Navbar dengan Better Spacing */
-        .navbar {
-            background: rgba(255, 255, 255, 0.92);
-            backdrop-filter: blur(30px);
-            border-bottom: 1px solid var(--gray-light);
-            padding: var(--space-6) var(--space-10);
-            position: sticky;
-            top: 0;
-            z-index: 100;
-            box-shadow: var(--shadow-sm);
-        }
-
-        .navbar-content {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            max-width: 1400px;
-            margin: 0 auto;
-            gap: var(--space-6);
-        }
-
-        .page-header-content {
-            flex: 1;
-        }
-
-        .page-title {
-            font-size: 2rem;
-            font-weight: 800;
-            background: var(--electric-gradient);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            margin-bottom: var(--space-2);
-            line-height: 1.2;
-        }
-
-        .page-subtitle {
-            color: var(--gray-medium);
-            font-size: 1rem;
-            margin-top: var(--space-2);
-            font-weight: 500;
-        }
-
-        .user-menu {
-            display: flex;
-            align-items: center;
-            gap: var(--space-6);
-            padding-left: var(--space-6);
-            border-left: 2px solid var(--gray-light);
-        }
-
-        .user-avatar {
-            width: 48px;
-            height: 48px;
-            border-radius: 50%;
-            background: var(--electric-gradient);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: var(--white);
-            font-weight: 700;
-            font-size: 1.1rem;
-            box-shadow: var(--shadow-lg);
-            border: 3px solid var(--white);
-            transition: all 0.3s ease;
-        }
-
-        .user-avatar:hover {
-            transform: scale(1.05);
-            box-shadow: var(--shadow-glow);
-        }
-
-        .user-info {
-            text-align: right;
-        }
-
-        .user-name {
-            font-weight: 700;
-            color: var(--deep-navy);
-            font-size: 1rem;
-            margin-bottom: var(--space-1);
-        }
-
-        .user-role {
-            color: var(--gray-medium);
-            font-size: 0.85rem;
-        }
-
-        /* Enhanced Cards */
-        .card {
-            background: var(--card-gradient);
-            border: 1px solid rgba(255, 255, 255, 0.9);
-            border-radius: var(--radius-2xl);
-            box-shadow: var(--shadow-lg);
-            backdrop-filter: blur(20px);
-            transition: all 0.4s ease;
-            position: relative;
-            overflow: hidden;
-        }
-
-        .card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: var(--electric-gradient);
-            background-size: 200% 200%;
-            animation: gradientShift 3s ease infinite;
-            transform: scaleX(0);
-            transition: transform 0.4s ease;
-        }
-
-        .card:hover {
-            transform: translateY(-6px);
-            box-shadow: var(--shadow-xl), var(--shadow-glow);
-        }
-
-        .card:hover::before {
-            transform: scaleX(1);
-        }
-
-        /* Quick Action Cards dengan Hover Effect Konsisten */
-        .quick-action-card {
-            background: var(--card-gradient);
-            border-radius: var(--radius-xl);
-            padding: var(--space-5);
-            text-align: center;
-            border: 1px solid rgba(255, 255, 255, 0.9);
-            box-shadow: var(--shadow-lg);
-            transition: all 0.4s ease;
-            position: relative;
-            overflow: hidden;
-            height: 100%;
-            color: inherit;
-        }
-
-        .quick-action-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: var(--electric-gradient);
-            opacity: 0.1;
-            transition: left 0.4s ease;
-        }
-
-        .quick-action-card::after {
-            content: '';
-            position: absolute;
-            top: -50%;
-            left: -50%;
-            width: 200%;
-            height: 200%;
-            background: var(--neon-gradient);
-            opacity: 0;
-            transition: opacity 0.4s ease;
-            transform: rotate(45deg);
-        }
-
-        .quick-action-card:hover {
-            transform: translateY(-6px) scale(1.02);
-            box-shadow: var(--shadow-xl), var(--shadow-glow);
-            border-color: var(--lime-neon);
-            text-decoration: none;
-            color: inherit;
-        }
-
-        .quick-action-card:hover::before {
-            left: 0;
-        }
-
-        .quick-action-card:hover::after {
-            opacity: 0.05;
-        }
-
-        .quick-action-icon {
-            width: 60px;
-            height: 60px;
-            border-radius: var(--radius-xl);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            margin: 0 auto var(--space-4);
-            font-size: 1.5rem;
-            box-shadow: var(--shadow-lg);
-            transition: all 0.4s ease;
-            position: relative;
-            z-index: 2;
-        }
-
-        .quick-action-card:hover .quick-action-icon {
-            transform: scale(1.1) rotate(8deg);
-            box-shadow: var(--shadow-neon);
-        }
-
-        .quick-action-title {
-            font-weight: 800;
-            margin-bottom: var(--space-2);
-            color: var(--deep-navy);
-            position: relative;
-            z-index: 2;
-            font-size: 1.1rem;
-        }
-
-        .quick-action-desc {
-            font-size: 0.85rem;
-            color: var(--gray-medium);
-            position: relative;
-            z-index: 2;
-        }
-
-        /* Enhanced Tab Styling */
-        .nav-tabs {
-            border-bottom: 2px solid var(--gray-light);
-            gap: 0.5rem;
-        }
-
-        .nav-tabs .nav-link {
-            border: 2px solid transparent;
-            border-radius: 8px 8px 0 0;
-            padding: 0.75rem 1.5rem;
-            font-weight: 600;
-            color: var(--gray-medium);
-            background: transparent;
-            transition: all 0.22s cubic-bezier(0.2, 0.9, 0.3, 1);
-            position: relative;
-        }
-
-        .nav-tabs .nav-link:hover {
-            border-color: var(--gray-light);
-            color: var(--primary-blue);
-            transform: translateY(-2px);
-        }
-
-        .nav-tabs .nav-link.active {
-            color: var(--primary-blue);
-            background-color: white;
-            border-color: var(--primary-blue) var(--primary-blue) white;
-            border-width: 2px 2px 2px 2px;
-            box-shadow: 0 -2px 10px rgba(37, 99, 235, 0.1);
-        }
-
-        .nav-tabs .nav-link.active::after {
-            content: '';
-            position: absolute;
-            bottom: -2px;
-            left: 0;
-            right: 0;
-            height: 2px;
-            background: white;
-        }
-
-        .tab-content {
-            background: transparent;
-        }
-
-        .tab-pane {
-            animation: fadeIn 0.3s ease-in;
-        }
-
-        @keyframes fadeIn {
-            from { opacity: 0; transform: translateY(10px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
-
-        /* Card styling for tab content */
-        .card.border-0 {
-            border: none !important;
-            box-shadow: none !important;
-        }
-
-        .card.border-0 .card-header {
-            background: var(--card-gradient) !important;
-            border: 1px solid rgba(255, 255, 255, 0.9);
-            border-radius: 12px 12px 0 0;
-            border-bottom: 1px solid var(--gray-light);
-        }
-
-        .card.border-0 .card-body {
-            background: var(--card-gradient);
-            border: 1px solid rgba(255, 255, 255, 0.9);
-            border-top: none;
-            border-radius: 0 0 12px 12px;
-        }
-        .tab-content {
-            background: transparent;
-        }
-
-        .tab-pane {
-            animation: fadeIn 0.3s ease-in;
-        }
-
-        @keyframes fadeIn {
-            from { opacity: 0; transform: translateY(10px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
-
-        /* Card styling for tab content */
-        .card.border-0 {
-            border: none !important;
-            box-shadow: none !important;
-        }
-
-        .card.border-0 .card-header {
-            background: var(--card-gradient) !important;
-            border: 1px solid rgba(255, 255, 255, 0.9);
-            border-radius: 12px 12px 0 0;
-            border-bottom: 1px solid var(--gray-light);
-        }
-
-        .card.border-0 .card-body {
-            background: var(--card-gradient);
-            border: 1px solid rgba(255, 255, 255, 0.9);
-            border-top: none;
-            border-radius: 0 0 12px 12px;
-        }
-
-        /* Stat Card Hover Effect yang Sama */
-        .stat-card {
-            background: var(--card-gradient);
-            border-radius: var(--radius-2xl);
-            padding: var(--space-6);
-            text-align: center;
-            border: 1px solid rgba(255, 255, 255, 0.9);
-            box-shadow: var(--shadow-lg);
-            transition: all 0.4s ease;
-            position: relative;
-            overflow: hidden;
-            height: 100%;
-        }
-
-        .stat-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: var(--electric-gradient);
-            opacity: 0.1;
-            transition: left 0.4s ease;
-        }
-
-        .stat-card::after {
-            content: '';
-            position: absolute;
-            top: -50%;
-            left: -50%;
-            width: 200%;
-            height: 200%;
-            background: var(--neon-gradient);
-            opacity: 0;
-            transition: opacity 0.4s ease;
-            transform: rotate(45deg);
-        }
-
-        .stat-card:hover {
-            transform: translateY(-6px) scale(1.02);
-            box-shadow: var(--shadow-xl), var(--shadow-glow);
-            border-color: var(--lime-neon);
-        }
-
-        .stat-card:hover::before {
-            left: 0;
-        }
-
-        .stat-card:hover::after {
-            opacity: 0.05;
-        }
-
-        .stat-icon {
-            width: 50px;
-            height: 50px;
-            border-radius: var(--radius-lg);
-            background: var(--lime-gradient);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            margin: 0 auto var(--space-4);
-            color: var(--deep-navy);
-            font-size: 1.3rem;
-            box-shadow: var(--shadow-md);
-            transition: all 0.4s ease;
-            position: relative;
-            z-index: 2;
-        }
-
-        .stat-card:hover .stat-icon /
-            transform: scale(1.1) rotate(8deg);
-            box-shadow: var(--shadow-neon);
-            background: var(--electric-gradient);
-            color: var(--white);
-        }
-
-
-        .card-header {
-            background: transparent;
-            border-bottom: 1px solid var(--gray-light);
-            padding: var(--space-6);
-            font-weight: 700;
-            color: var(--deep-navy);
-            font-size: 1.1rem;
-        }
-
-        .card-body {
-            padding: var(--space-6);
-        }
-
-        /* Compact Stat Card */
-        .stat-card-compact {
-            background: var(--card-gradient);
-            border-radius: var(--radius-xl);
-            padding: var(--space-4);
-            text-align: center;
-            border: 1px solid rgba(255, 255, 255, 0.9);
-            box-shadow: var(--shadow-lg);
-            transition: all 0.4s ease;
-            position: relative;
-            overflow: hidden;
-            height: 100%;
-        }
-
-        .stat-card-compact::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: var(--electric-gradient);
-            opacity: 0.1;
-            transition: left 0.4s ease;
-        }
-
-        .stat-card-compact:hover {
-            transform: translateY(-4px);
-            box-shadow: var(--shadow-xl), var(--shadow-glow);
-            border-color: var(--lime-neon);
-        }
-
-        .stat-card-compact:hover::before {
-            left: 0;
-        }
-
-        .stat-icon-compact {
-            width: 40px;
-            height: 40px;
-            border-radius: var(--radius-lg);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            margin: 0 auto var(--space-3);
-            font-size: 1.1rem;
-            box-shadow: var(--shadow-md);
-            transition: all 0.4s ease;
-        }
-
-        .stat-card-compact:hover .stat-icon-compact {
-            transform: scale(1.1) rotate(8deg);
-            box-shadow: var(--shadow-neon);
-        }
-
-        .stat-number-compact {
-            font-size: 1.5rem;
-            font-weight: 800;
-            margin-bottom: var(--space-1);
-            line-height: 1;
-        }
-
-        .stat-label-compact {
-            font-size: 0.85rem;
-            font-weight: 600;
-            color: var(--gray-medium);
-        }
-
-        /* Compact Quick Action Cards */
-        .quick-action-card-compact {
-            background: var(--card-gradient);
-            border-radius: var(--radius-lg);
-            padding: var(--space-3);
-            text-align: center;
-            border: 1px solid rgba(255, 255, 255, 0.9);
-            box-shadow: var(--shadow-md);
-            transition: all 0.3s ease;
-            height: 100%;
-            color: inherit;
-        }
-
-        .quick-action-card-compact::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: var(--electric-gradient);
-            opacity: 0.1;
-            transition: left 0.3s ease;
-        }
-
-        .quick-action-card-compact:hover {
-            transform: translateY(-3px);
-            box-shadow: var(--shadow-lg);
-            border-color: var(--lime-neon);
-            text-decoration: none;
-            color: inherit;
-        }
-
-        .quick-action-card-compact:hover::before {
-            left: 0;
-        }
-
-        .quick-action-icon-compact {
-            width: 35px;
-            height: 35px;
-            border-radius: var(--radius-md);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            margin: 0 auto var(--space-2);
-            font-size: 0.9rem;
-            box-shadow: var(--shadow-sm);
-            transition: all 0.3s ease;
-        }
-
-        .quick-action-card-compact:hover .quick-action-icon-compact {
-            transform: scale(1.1) rotate(5deg);
-        }
-
-        .quick-action-title-compact {
-            font-weight: 600;
-            font-size: 0.8rem;
-            color: var(--deep-navy);
-            line-height: 1.2
-        }
-
-        .section-title-compact {
-            font-size: 1rem;
-            font-weight: 700;
-            color: var(--deep-navy);
-            margin-bottom: var(--space-3);
-        }
-
-        /* Enhanced Buttons */
-        .btn {
-            border: none;
-            border-radius: var(--radius-lg);
-            padding: var(--space-3) var(--space-6);
-            font-weight: 700;
-            font-size: 0.9rem;
-            transition: all 0.3s ease;
-            position: relative;
-            overflow: hidden;
-        }
-
-        .btn-primary {
-            background: var(--button-gradient);
-            color: var(--white);
-            box-shadow: var(--shadow-md);
-        }
-
-        .btn-primary:hover {
-            background: var(--button-hover);
-            transform: translateY(-2px);
-            box-shadow: var(--shadow-lg), var(--shadow-electric);
-        }
-
-        .btn-outline-primary {
-            background: transparent;
-            border: 2px solid var(--primary-blue);
-            color: var(--primary-blue);
-        }
-
-        .btn-outline-primary:hover {
-            background: var(--primary-blue);
-            color: var(--white);
-            transform: translateY(-2px);
-            box-shadow: var(--shadow-lg);
-        }
-
-        /* Highlighted Quick Actions */
-        .quick-actions-section {
-            margin-bottom: var(--space-10);
-        }
-
-        .section-title {
-            font-size: 1.5rem;
-            font-weight: 800;
-            background: var(--electric-gradient);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            margin-bottom: var(--space-6);
-            text-align: center;
-        }
-
-        .quick-actions {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
-            gap: var(--space-6);
-        }
-
-        .quick-action {
-            background: var(--card-gradient);
-            border-radius: var(--radius-2xl);
-            padding: var(--space-8) var(--space-6);
-            text-align: center;
-            text-decoration: none;
-            color: inherit;
-            border: 2px solid rgba(255, 255, 255, 0.8);
-            box-shadow: var(--shadow-lg);
-            transition: all 0.4s ease;
-            position: relative;
-            overflow: hidden;
-        }
-
-        .quick-action::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: var(--electric-gradient);
-            opacity: 0.1;
-            transition: left 0.4s ease;
-        }
-
-        .quick-action::after {
-            content: '';
-            position: absolute;
-            top: -50%;
-            left: -50%;
-            width: 200%;
-            height: 200%;
-            background: var(--neon-gradient);
-            opacity: 0;
-            transition: opacity 0.4s ease;
-            transform: rotate(45deg);
-        }
-
-        .quick-action:hover {
-            transform: translateY(-8px) scale(1.02);
-            box-shadow: var(--shadow-xl), var(--shadow-neon);
-            border-color: var(--lime-neon);
-        }
-
-        .quick-action:hover::before {
-            left: 0;
-        }
-
-        .quick-action:hover::after {
-            opacity: 0.05;
-        }
-
-        .quick-action-icon {
-            width: 60px;
-            height: 60px;
-            border-radius: var(--radius-xl);
-            background: var(--lime-gradient);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            margin: 0 auto var(--space-4);
-            color: var(--deep-navy);
-            font-size: 1.5rem;
-            box-shadow: var(--shadow-lg);
-            transition: all 0.4s ease;
-            position: relative;
-            z-index: 2;
-        }
-
-        .quick-action:hover .quick-action-icon {
-            transform: scale(1.1) rotate(8deg);
-            box-shadow: var(--shadow-neon);
-            background: var(--electric-gradient);
-            color: var(--white);
-        }
-
-        .quick-action-title {
-            font-weight: 800;
-            margin-bottom: var(--space-2);
-            color: var(--deep-navy);
-            position: relative;
-            z-index: 2;
-            font-size: 1.1rem;
-        }
-
-        .quick-action-desc {
-            font-size: 0.85rem;
-            color: var(--gray-medium);
-            position: relative;
-            z-index: 2;
-        }
-
-        /* Content Layout */
-        .content-container {
-            padding: var(--space-8);
-            max-width: 1400px;
-            margin: 0 auto;
-        }
-
-        .page-header {
-            margin-bottom: var(--space-10);
-        }
-
-        .grid-container {
-            display: grid;
-            gap: var(--space-6);
-            margin-bottom: var(--space-8);
-        }
-
-        .grid-2 {
-            grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
-        }
-
-        .grid-3 {
-            grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-        }
-
-        .grid-4 {
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-        }
-
-        /* Responsive Design */
-        @media (max-width: 1024px) {
-            .sidebar {
-                width: 260px;
-            }
-            .main-content {
-                margin-left: 260px;
-            }
-        }
-
-        @media (max-width: 768px) {
-            .sidebar {
-                transform: translateX(-100%);
-                transition: transform 0.3s ease;
-            }
-            .sidebar.active {
-                transform: translateX(0);
-            }
-            .main-content {
-                margin-left: 0;
-            }
-            .content-container {
-                padding: var(--space-4);
-            }
-            .grid-2, .grid-3, .grid-4 {
-                grid-template-columns: 1fr;
-            }
-            .navbar-content {
-                flex-direction: column;
-                gap: var(--space-4);
-                text-align: center;
-            }
-            .user-menu {
-                border-left: none;
-                border-top: 2px solid var(--gray-light);
-                padding-left: 0;
-                padding-top: var(--space-4);
-            }
-        }
-    </style>
-</head>
-<body>
-    <!-- Enhanced Background Waves -->
-    <div class="bg-waves">
-        <div class="wave"></div>*
-        <div class="wave"></div>
-        <div class="wave"></div>
-    </div>
-
-    {% if user and request.endpoint != 'login' %}
-    <div class="container-fluid p-0">
-        <!-- Sidebar -->
-        <div class="sidebar">
-            <div class="logo">
-                <i class="fas fa-water"></i>
-                <div class="logo-text">Tiramine</div>
-            </div>
-            <nav class="nav-links">
-                <div class="nav-item">
-                    <a class="nav-link {{ 'active' if request.endpoint == 'dashboard' }}" href="/dashboard">
-                        <i class="fas fa-home"></i>
-                        <span>Dashboard</span>
-                    </a>
-                </div>
-                <div class="nav-item">
-                    <a class="nav-link {{ 'active' if 'inventory' in request.endpoint }}" href="/inventory">
-                        <i class="fas fa-boxes"></i>
-                        <span>Monitoring Stok</span>
-                    </a>
-                </div>
-                <div class="nav-item">
-                    <a class="nav-link {{ 'active' if 'journal' in request.endpoint }}" href="/journal">
-                        <i class="fas fa-book"></i>
-                        <span>Jurnal</span>
-                    </a>
-                </div>
-                <div class="nav-item">
-                    <a class="nav-link {{ 'active' if 'ledger' in request.endpoint }}" href="/ledger">
-                        <i class="fas fa-file-invoice-dollar"></i>
-                        <span>Buku Besar</span>
-                    </a>
-                </div>
-                <div class="nav-item">
-                    <a class="nav-link {{ 'active' if 'trial_balance' in request.endpoint }}" href="/trial_balance">
-                        <i class="fas fa-balance-scale"></i>
-                        <span>Neraca Saldo</span>
-                    </a>
-                </div>
-                <div class="nav-item">
-                    <a class="nav-link {{ 'active' if 'adjusting' in request.endpoint }}" href="/adjusting">
-                        <i class="fas fa-adjust"></i>
-                        <span>Ayat Penyesuaian</span>
-                    </a>
-                </div>
-                    <div class="nav-item">
-                    <a class="nav-link {{ 'active' if 'closing' in request.endpoint }}" href="/closing">
-                        <i class="fas fa-lock"></i>
-                        <span>Jurnal Penutup</span>
-                    </a>
-                </div>
-                <div class="nav-item">
-                    <a class="nav-link {{ 'active' if 'financials' in request.endpoint }}" href="/financials">
-                        <i class="fas fa-chart-line"></i>
-                        <span>Laporan Keuangan</span>
-                    </a>
-                </div>
-                <div class="nav-item">
-                    <a class="nav-link {{ 'active' if 'opening_balance' in request.endpoint }}" href="/opening_balance">
-                        <i class="fas fa-play-circle"></i>
-                        <span>Saldo Awal</span>
-                    </a>
-                </div>
-                <div class="nav-item">
-                    <a class="nav-link reset-link {{ 'active' if 'reset' in request.endpoint }}" href="/reset">
-                        <i class="fas fa-broom"></i>
-                        <span>Reset Data</span>
-                    </a>
-                </div>
-            </nav>
-        </div>
-        
-        <!-- Main Content -->
-        <div class="main-content">
-            <nav class="navbar">
-                <div class="navbar-content">
-                    <div class="page-header-content">
-                        <h1 class="page-title">{{ title }}</h1>
-                        {% if request.endpoint == 'dashboard' %}
-                        <p class="page-subtitle">Ringkasan keuangan dan statistik bisnis peternakan tiram</p>
-                        {% endif %}
-                    </div>
-                    <div class="user-menu">
-                        <div class="user-avatar">
-                            {{ user.username[0].upper() }}
-                        </div>
-                        <div class="user-info">
-                            <div class="user-name">{{ user.username }}</div>
-                            <div class="user-role">Administrator</div>
-                        </div>
-                        <a href="/logout" class="btn btn-outline-primary btn-sm">
-                            <i class="fas fa-sign-out-alt me-1"></i>Keluar
-                        </a>
-                    </div>
-                </div>
-            </nav>
-            
-            <div class="content-container">
-                {% with messages = get_flashed_messages() %}
-                    {% if messages %}
-                        <div class="alert alert-info alert-dismissible fade show">
-                            <i class="fas fa-info-circle me-2"></i>
-                            {{ messages[0] }}
-                            <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
-                        </div>
-                    {% endif %}
-                {% endwith %}
-                
-                {{ body|safe }}
-            </div>
-        </div>
-    </div>
-    {% else %}
-        {% with messages = get_flashed_messages() %}
-            {% if messages %}
-                <div class="container mt-3" style="max-width: 640px;">
-                    <div class="alert alert-info alert-dismissible fade show">
-                        <i class="fas fa-info-circle me-2"></i>
-                        {{ messages[0] }}
-                        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
-                    </div>
-                </div>
-            {% endif %}
-        {% endwith %}
-        {{ body|safe }}
-    {% endif %}
-    
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/js/bootstrap.bundle.min.js"></script>
-    <script>
-        // Penanganan form dinamis
-        function addJournalLine() {
-            const container = document.getElementById('journal-lines');
-            const count = container.children.length;
-            const newLine = document.createElement('div');
-            newLine.className = 'row mb-3 journal-line';
-            newLine.innerHTML = `
-                <div class="col-md-5">
-                    <select class="form-select" name="account_${count}" required>
-                        <option value="">Pilih Akun</option>
-                        ${document.getElementById('account-options').innerHTML}
-                    </select>
-                </div>
-                <div class="col-md-3">
-                    <input type="number" class="form-control" name="debit_${count}" placeholder="0.00" step="0.01" min="0" oninput="checkBalance()">
-                </div>
-                <div class="col-md-3">
-                    <input type="number" class="form-control" name="credit_${count}" placeholder="0.00" step="0.01" min="0" oninput="checkBalance()">
-                </div>
-                <div class="col-md-1">
-                    <button type="button" class="btn btn-danger btn-sm" onclick="this.closest('.journal-line').remove(); checkBalance();">
-                        <i class="fas fa-times"></i>
-                    </button>
-                </div>
-            `;
-            container.appendChild(newLine);
-        }
-        
-        function checkBalance() {
-            let totalDebit = 0;
-            let totalCredit = 0;
-            
-            document.querySelectorAll('input[name^="debit_"]').forEach(input => {
-                totalDebit += parseFloat(input.value) || 0;
-            });
-            
-            document.querySelectorAll('input[name^="credit_"]').forEach(input => {
-                totalCredit += parseFloat(input.value) || 0;
-            });
-            
-            const balanceElement = document.getElementById('balance-check');
-            if (balanceElement) {
-                if (Math.abs(totalDebit - totalCredit) < 0.01) {
-                    balanceElement.innerHTML = `<span class="text-success"><i class="fas fa-check-circle me-2"></i> Seimbang: ${totalDebit.toFixed(2)} = ${totalCredit.toFixed(2)}</span>`;
-                    balanceElement.className = 'alert alert-success';
-                } else {
-                    balanceElement.innerHTML = `<span class="text-danger"><i class="fas fa-exclamation-circle me-2"></i> Tidak Seimbang: ${totalDebit.toFixed(2)} ≠ ${totalCredit.toFixed(2)}</span>`;
-                    balanceElement.className = 'alert alert-danger';
-                }
-            }
-        }
-        
-        // Hitung tanggal otomatis untuk entri baru
-        document.addEventListener('DOMContentLoaded', function() {
-            const dateInput = document.querySelector('input[type="date"]');
-            if (dateInput && !dateInput.value) {
-                dateInput.value = new Date().toISOString().split('T')[0];
-            }
-        });
-    </script>
-</body>
-</html>
-"""
-
-# ---------- Rute ----------
-
-@app.route('/')
-def index():
-    if current_user():
-        return redirect(url_for('dashboard'))
-    return redirect(url_for('login'))
-
-@app.route('/fix_database')
-@login_required
-def fix_database():
-    """Route untuk memperbaiki struktur database dan saldo awal"""
-    try:
-        # Perbaiki saldo awal
-        is_balanced = fix_opening_balances()
-        
-        if is_balanced:
-            flash('✅ Database berhasil diperbaiki! Neraca saldo sekarang balance.')
-        else:
-            flash('⚠️ Database diperbaiki tetapi neraca saldo masih tidak balance.')
-        
-        return redirect(url_for('trial_balance_view'))
-    
-    except Exception as e:
-        flash(f'❌ Error memperbaiki database: {str(e)}')
-        return redirect(url_for('dashboard'))
-
-@app.route('/register', methods=['GET', 'POST'])
-def register():
-    """Simple registration form for new users."""
-    if current_user():
-        return redirect(url_for('dashboard'))
-
-    username_value = ''
-    email_value = ''
-
-    if request.method == 'POST':
-        username_value = request.form.get('username', '').strip()
-        email_value = normalize_email(request.form.get('email', ''))
-        password = request.form.get('password', '')
-        confirm_password = request.form.get('confirm_password', '')
-
-        if not username_value or not email_value or not password:
-            flash('Semua field wajib diisi.')
-        elif password != confirm_password:
-            flash('Konfirmasi kata sandi tidak cocok.')
-        else:
-            try:
-                db = get_db()
-                cur = db.execute(
-                    'SELECT id FROM users WHERE username = ? OR email = ?',
-                    (username_value, email_value)
-                )
-                if cur.fetchone():
-                    flash('Username atau email sudah digunakan.')
-                else:
-                    password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-                    db.execute(
-                        'INSERT INTO users (username, password_hash, email) VALUES (?, ?, ?)',
-                        (username_value, password_hash, email_value)
-                    )
-                    db.commit()
-                    flash('Registrasi berhasil! Silakan login menggunakan akun Anda.')
-                    return redirect(url_for('login'))
-            except Exception as e:
-                flash(f'Gagal melakukan registrasi: {str(e)}')
-
-    body = f"""
-    <div class="container">
-        <div class="row justify-content-center align-items-center min-vh-100">
-            <div class="col-md-6 col-lg-5">
-                <div class="card">
-                    <div class="card-body p-5">
-                        <div class="text-center mb-4">
-                            <i class="fas fa-user-plus fa-3x text-primary mb-3"></i>
-                            <h3 class="fw-bold">Daftar Tiramine</h3>
-                            <p class="text-muted">Buat akun untuk mengakses sistem</p>
-                        </div>
-                        <form method="post">
-                            <div class="mb-3">
-                                <label class="form-label fw-semibold">Nama Pengguna</label>
-                                <input type="text" class="form-control" name="username" value="{escape(username_value)}" required>
-                            </div>
-                            <div class="mb-3">
-                                <label class="form-label fw-semibold">Email</label>
-                                <input type="email" class="form-control" name="email" value="{escape(email_value)}" required>
-                            </div>
-                            <div class="mb-3">
-                                <label class="form-label fw-semibold">Kata Sandi</label>
-                                <input type="password" class="form-control" name="password" required>
-                            </div>
-                            <div class="mb-4">
-                                <label class="form-label fw-semibold">Konfirmasi Kata Sandi</label>
-                                <input type="password" class="form-control" name="confirm_password" required>
-                            </div>
-                            <button type="submit" class="btn btn-success w-100 py-2 fw-semibold">
-                                <i class="fas fa-user-check me-2"></i>Buat Akun
-                            </button>
-                        </form>
-                        <div class="text-center mt-4">
-                            <a href="/login" class="text-decoration-none d-block">Sudah punya akun? Masuk</a>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    """
-    return render_template_string(BASE_TEMPLATE, title='Daftar', body=body, user=None)
-
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    # Jika sudah login, redirect ke dashboard
-    if current_user():
-        return redirect(url_for('dashboard'))
-    
-    if request.method == 'POST':
-        try:
-            username = request.form['username']
-            password = request.form['password'].encode('utf-8')
-            
-            db = get_db()
-            cur = db.execute('SELECT id, password_hash FROM users WHERE username = ?', (username,))
-            user = cur.fetchone()
-            
-            if user and bcrypt.checkpw(password, user['password_hash']):
-                session['user_id'] = user['id']
-                flash('Selamat datang di Sistem Akuntansi Tiramine!')
-                print(f"✅ User {username} logged in successfully")
-                return redirect(url_for('dashboard'))
-            else:
-                flash('Kredensial tidak valid. Silakan coba lagi.')
-                print(f"❌ Login failed for user: {username}")
-                
-        except Exception as e:
-            flash(f'Error saat login: {str(e)}')
-            print(f"❌ Login error: {e}")
-    
-    # Tampilkan form login
-    body = """
-    <div class="container">
-        <div class="row justify-content-center align-items-center min-vh-100">
-            <div class="col-md-5">
-                <div class="card">
-                    <div class="card-body p-5">
-                        <div class="text-center mb-4">
-                            <i class="fas fa-water fa-3x text-primary mb-3"></i>
-                            <h3 class="fw-bold">Masuk ke Tiramine</h3>
-                            <p class="text-muted">Sistem Akuntansi Peternakan Tiram</p>
-                        </div>
-                        
-                        <form method="post">
-                            <div class="mb-3">
-                                <label class="form-label fw-semibold">Nama Pengguna</label>
-                                <input type="text" class="form-control" name="username" value="admin" required>
-                            </div>
-                            <div class="mb-4">
-                                <label class="form-label fw-semibold">Kata Sandi</label>
-                                <input type="password" class="form-control" name="password" value="password" required>
-                            </div>
-                            <button type="submit" class="btn btn-primary w-100 py-2 fw-semibold">
-                                <i class="fas fa-sign-in-alt me-2"></i>Masuk
-                            </button>
-                        </form>
-
-                        <div class="text-center mt-4">
-                            <a href="/otp/request" class="text-decoration-none d-block mb-2">
-                                <i class="fas fa-sms me-1"></i>Masuk menggunakan OTP
-                            </a>
-                            <a href="/register" class="text-decoration-none">
-                                <i class="fas fa-user-plus me-1"></i>Buat akun baru
-                            </a>
-                        </div>
-                        
-                        <div class="text-center mt-4">
-                            <small class="text-muted">
-                                <i class="fas fa-info-circle me-1"></i>
-                                Gunakan: <strong>admin</strong> / <strong>password</strong>
-                            </small>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    """
-    return render_template_string(BASE_TEMPLATE, title='Masuk', body=body, user=None)
-
-@app.route('/otp/request', methods=['GET', 'POST'])
-def request_otp():
-    """Form untuk meminta OTP login via email."""
-    if current_user():
-        return redirect(url_for('dashboard'))
-
-    email_value = ''
-    if request.method == 'POST':
-        email_value = normalize_email(request.form.get('email', ''))
-        if not email_value:
-            flash('Email harus diisi.')
-        else:
-            db = get_db()
-            user = db.execute('SELECT username FROM users WHERE email = ?', (email_value,)).fetchone()
-            if not user:
-                flash('Email tidak ditemukan di sistem.')
-            else:
-                safe_username = escape(user['username'])
-                otp_code, expires_at = create_otp_for_email(email_value)
-                subject = 'Kode OTP Masuk Tiramine'
-                body_html = f"""
-                <p>Halo <strong>{safe_username}</strong>,</p>
-                <p>Kode OTP Tiramine Anda adalah:</p>
-                <h2 style="letter-spacing:4px;">{otp_code}</h2>
-                <p>Gunakan kode ini sebelum <strong>{expires_at} UTC</strong>.</p>
-                <p>Abaikan email ini bila Anda tidak meminta OTP.</p>
-                """
-                sent, error = send_email_notification(email_value, subject, body_html)
-                if sent:
-                    flash('OTP telah dikirim ke email Anda. Silakan cek kotak masuk dan masukkan kode OTP.')
-                    return redirect(url_for('otp_login', email=email_value))
-                else:
-                    flash(error)
-
-    body = f"""
-    <div class="container">
-        <div class="row justify-content-center align-items-center min-vh-100">
-            <div class="col-md-6 col-lg-4">
-                <div class="card">
-                    <div class="card-body p-5">
-                        <div class="text-center mb-4">
-                            <i class="fas fa-envelope-open-text fa-3x text-primary mb-3"></i>
-                            <h3 class="fw-bold">Kirim OTP Login</h3>
-                            <p class="text-muted">Masukkan email akun Anda</p>
-                        </div>
-                        <form method="post">
-                            <div class="mb-4">
-                                <label class="form-label fw-semibold">Email</label>
-                                <input type="email" class="form-control" name="email" value="{escape(email_value)}" required>
-                            </div>
-                            <button type="submit" class="btn btn-primary w-100 py-2 fw-semibold">
-                                <i class="fas fa-paper-plane me-2"></i>Kirim OTP
-                            </button>
-                        </form>
-                        <div class="text-center mt-4">
-                            <a href="/login" class="text-decoration-none d-block mb-1">Kembali ke halaman login</a>
-                            <a href="/register" class="text-decoration-none">Belum punya akun? Daftar</a>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    """
-    return render_template_string(BASE_TEMPLATE, title='Kirim OTP', body=body, user=None)
-
-@app.route('/otp/login', methods=['GET', 'POST'])
-def otp_login():
-    """Verifikasi OTP dan login tanpa password."""
-    if current_user():
-        return redirect(url_for('dashboard'))
-
-    email_prefill = request.values.get('email', '')
-
-    if request.method == 'POST':
-        normalized_email = normalize_email(request.form.get('email', ''))
-        otp_code = (request.form.get('otp_code') or '').strip()
-
-        if not normalized_email or not otp_code:
-            flash('Email dan kode OTP wajib diisi.')
-        else:
-            is_valid, message = verify_otp_code(normalized_email, otp_code)
-            if is_valid:
-                db = get_db()
-                user = db.execute('SELECT id, username FROM users WHERE email = ?', (normalized_email,)).fetchone()
-                if user:
-                    session['user_id'] = user['id']
-                    flash('Login menggunakan OTP berhasil.')
-                    return redirect(url_for('dashboard'))
-                flash('Pengguna tidak ditemukan.')
-            else:
-                flash(message)
-
-    body = f"""
-    <div class="container">
-        <div class="row justify-content-center align-items-center min-vh-100">
-            <div class="col-md-6 col-lg-4">
-                <div class="card">
-                    <div class="card-body p-5">
-                        <div class="text-center mb-4">
-                            <i class="fas fa-key fa-3x text-primary mb-3"></i>
-                            <h3 class="fw-bold">Masuk dengan OTP</h3>
-                            <p class="text-muted">Masukkan OTP yang dikirim ke email</p>
-                        </div>
-                        <form method="post">
-                            <div class="mb-3">
-                                <label class="form-label fw-semibold">Email</label>
-                                <input type="email" class="form-control" name="email" value="{escape(email_prefill)}" required>
-                            </div>
-                            <div class="mb-4">
-                                <label class="form-label fw-semibold">Kode OTP</label>
-                                <input type="text" class="form-control text-center" name="otp_code" maxlength="6" placeholder="123456" required>
-                            </div>
-                            <button type="submit" class="btn btn-success w-100 py-2 fw-semibold">
-                                <i class="fas fa-unlock-alt me-2"></i>Verifikasi OTP
-                            </button>
-                        </form>
-                        <div class="text-center mt-4">
-                            <a href="/otp/request" class="text-decoration-none d-block mb-1">Tidak menerima kode? Kirim ulang</a>
-                            <a href="/login" class="text-decoration-none">Masuk dengan password</a>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    """
-    return render_template_string(BASE_TEMPLATE, title='Masuk OTP', body=body, user=None)
-
-@app.route('/logout')
-def logout():
-    session.pop('user_id', None)
-    flash('Anda telah berhasil keluar.')
-    return redirect(url_for('login'))
-
-@app.route('/dashboard')
-@login_required
-def dashboard():
-    # Dapatkan info perusahaan
-    company_info = get_company_info()
-    current_stock = get_current_stock()  # Sekarang return dictionary
-    
-    # Dapatkan transaksi terbaru
-    try:
-        cur = get_db().execute('''
-            SELECT je.id, je.date, je.description,
-                   COALESCE(je.transaction_type, 'General') as transaction_type,
-                   SUM(jl.debit) as total_debit, 
-                   SUM(jl.credit) as total_credit
-            FROM journal_entries je
-            JOIN journal_lines jl ON je.id = jl.entry_id
-            GROUP BY je.id
-            ORDER BY je.date DESC
-            LIMIT 5
-        ''')
-        recent_transactions = cur.fetchall()
-    except:
-        # Fallback query jika kolom transaction_type tidak ada
-        cur = get_db().execute('''
-            SELECT je.id, je.date, je.description,
-                   'General' as transaction_type,
-                   SUM(jl.debit) as total_debit, 
-                   SUM(jl.credit) as total_credit
-            FROM journal_entries je
-            JOIN journal_lines jl ON je.id = jl.entry_id
-            GROUP BY je.id
-            ORDER BY je.date DESC
-            LIMIT 5
-        ''')
-        recent_transactions = cur.fetchall()
-    
-    # Dapatkan ringkasan keuangan
-    income_stmt = income_statement()
-    balance_stmt = balance_sheet()
-    cash_flow = cash_flow_statement()
-    
-    # Generate HTML untuk transaksi terbaru yang lebih konsisten
-    transactions_html = ""
-    if recent_transactions:
-        for tx in recent_transactions:
-            transactions_html += f'''
-            <div class="transaction-item border-bottom pb-3 mb-3">
-                <div class="d-flex justify-content-between align-items-start">
-                    <div class="flex-grow-1">
-                        <div class="d-flex align-items-center mb-1">
-                            <strong class="text-dark">{tx['date']}</strong>
-                            <span class="badge bg-secondary ms-2">{tx['transaction_type']}</span>
-                        </div>
-                        <p class="mb-1 text-dark">{tx['description'][:60]}{'...' if len(tx['description']) > 60 else ''}</p>
-                    </div>
-                    <div class="text-end ms-3">
-                        <div class="text-success fw-bold">+{tx['total_debit']:,.2f}</div>
-                        <div class="text-danger fw-bold">-{tx['total_credit']:,.2f}</div>
-                    </div>
-                </div>
-            </div>
-            '''
-    else:
-        transactions_html = '''
-        <div class="text-center py-5">
-            <i class="fas fa-inbox fa-3x text-muted mb-3"></i>
-            <h6 class="text-muted">Belum ada transaksi</h6>
-            <p class="text-muted small">Mulai dengan membuat entri transaksi pertama Anda</p>
-        </div>
-        '''
-    
-    # PERBAIKAN: Dashboard template yang sudah dikoreksi struktur HTML-nya
-    dashboard_template = f"""
-    <div class="container-fluid py-4">
-        <!-- Header -->
-        <div class="page-header mb-4">
-            <div class="d-flex justify-content-between align-items-center">
-                <div class="flex-grow-1">
-                    <h1 class="page-title mb-1">Dashboard Tiramine</h1>
-                    <p class="page-subtitle mb-0">Ringkasan keuangan dan statistik bisnis peternakan tiram</p>
-                </div>
-                <div class="user-menu">
-                    <div class="user-avatar">
-                        {current_user()['username'][0].upper() if current_user() else 'A'}
-                    </div>
-                    <div class="user-info">
-                        <div class="user-name">{current_user()['username'] if current_user() else 'Admin'}</div>
-                        <div class="user-role">Administrator</div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Row 1: Ringkasan Cepat -->
-        <div class="row mb-4">
-            <!-- Card Kas -->
-            <div class="col-lg-3 col-md-6 mb-4">
-                <div class="card h-100">
-                    <div class="card-body p-4">
-                        <div class="d-flex justify-content-between align-items-center mb-3">
-                            <h6 class="section-title-compact mb-0">
-                                <i class="fas fa-wallet me-2 text-success"></i>Kas
-                            </h6>
-                            <div class="stat-icon bg-success text-white">
-                                <i class="fas fa-money-bill-wave"></i>
-                            </div>
-                        </div>
-                        <h3 class="text-success mb-2">Rp {cash_flow.get('net_cash_flow', 0):,.0f}</h3>
-                        <p class="text-muted mb-0">Saldo kas tersedia</p>
-                    </div>
-                </div>
-            </div>
-            
-            <!-- Card Pendapatan -->
-            <div class="col-lg-3 col-md-6 mb-4">
-                <div class="card h-100">
-                    <div class="card-body p-4">
-                        <div class="d-flex justify-content-between align-items-center mb-3">
-                            <h6 class="section-title-compact mb-0">
-                                <i class="fas fa-chart-line me-2 text-primary"></i>Pendapatan
-                            </h6>
-                            <div class="stat-icon bg-primary text-white">
-                                <i class="fas fa-hand-holding-usd"></i>
-                            </div>
-                        </div>
-                        <h3 class="text-primary mb-2">Rp {income_stmt.get('total_revenue', 0):,.0f}</h3>
-                        <p class="text-muted mb-0">Total pendapatan periode</p>
-                    </div>
-                </div>
-            </div>
-            
-            <!-- Card Laba Bersih -->
-            <div class="col-lg-3 col-md-6 mb-4">
-                <div class="card h-100">
-                    <div class="card-body p-4">
-                        <div class="d-flex justify-content-between align-items-center mb-3">
-                            <h6 class="section-title-compact mb-0">
-                                <i class="fas fa-trophy me-2 text-warning"></i>Laba Bersih
-                            </h6>
-                            <div class="stat-icon bg-warning text-white">
-                                <i class="fas fa-chart-pie"></i>
-                            </div>
-                        </div>
-                        <h3 class="{'text-success' if income_stmt.get('net_income', 0) >= 0 else 'text-danger'} mb-2">
-                            Rp {income_stmt.get('net_income', 0):,.0f}
-                        </h3>
-                        <p class="text-muted mb-0">Laba/rugi periode berjalan</p>
-                    </div>
-                </div>
-            </div>
-            
-            <!-- Aksi Cepat -->
-            <div class="col-lg-3 col-md-6 mb-4">
-                <div class="card h-100">
-                    <div class="card-body p-4 d-flex flex-column">
-                        <div class="d-flex justify-content-between align-items-center mb-3">
-                            <h6 class="section-title-compact mb-0">
-                                <i class="fas fa-bolt me-2 text-warning"></i>Aksi Cepat
-                            </h6>
-                            <div class="dropdown">
-                                <button class="btn btn-sm btn-outline-secondary dropdown-toggle" type="button" data-bs-toggle="dropdown">
-                                    <i class="fas fa-cog"></i>
-                                </button>
-                                <ul class="dropdown-menu">
-                                    <li><a class="dropdown-item" href="/journal"><i class="fas fa-book me-2"></i>Lihat Jurnal</a></li>
-                                    <li><a class="dropdown-item" href="/inventory"><i class="fas fa-boxes me-2"></i>Monitoring Stok</a></li>
-                                    <li><hr class="dropdown-divider"></li>
-                                    <li><a class="dropdown-item" href="/financials"><i class="fas fa-chart-line me-2"></i>Laporan Keuangan</a></li>
-                                </ul>
-                            </div>
-                        </div>
-                        
-                        <div class="flex-grow-1 d-flex align-items-center justify-content-center">
-                            <a href="/journal/new" class="quick-action-card d-block text-decoration-none text-center w-100">
-                                <div class="quick-action-icon bg-warning text-white mx-auto mb-3">
-                                    <i class="fas fa-plus"></i>
-                                </div>
-                                <div class="quick-action-title fw-bold fs-5">Entri Transaksi</div>
-                                <div class="quick-action-desc text-muted">
-                                    Tambah transaksi penjualan / pembelian
-                                </div>
-                            </a>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-
-        <!-- Row 2: Transaksi Terbaru & Ringkasan Keuangan -->
-        <div class="row align-items-stretch">
-            <!-- Transaksi Terbaru -->
-            <div class="col-lg-8 mb-4">
-                <div class="card h-100">
-                    <div class="card-header bg-transparent border-bottom-0">
-                        <div class="d-flex justify-content-between align-items-center">
-                            <h5 class="section-title mb-0">
-                                <i class="fas fa-history me-2 text-primary"></i>Transaksi Terbaru
-                            </h5>
-                            <a href="/journal" class="btn btn-outline-primary btn-sm">
-                                <i class="fas fa-list me-1"></i>Lihat Semua
-                            </a>
-                        </div>
-                    </div>
-                    <div class="card-body">
-                        {transactions_html}
-                    </div>
-                </div>
-            </div>
-            
-            <!-- Ringkasan Keuangan -->
-            <div class="col-lg-4">
-                <div class="card h-100">
-                    <div class="card-header bg-transparent border-bottom-0">
-                        <h5 class="section-title mb-0">
-                            <i class="fas fa-chart-pie me-2 text-success"></i>Ringkasan Keuangan
-                        </h5>
-                    </div>
-                    <div class="card-body">
-                        <div class="d-flex justify-content-between align-items-center mb-3 pb-2 border-bottom">
-                            <span class="text-dark">Pendapatan:</span>
-                            <span class="text-success fw-bold">Rp {income_stmt.get('total_revenue', 0):,.2f}</span>
-                        </div>
-                        <div class="d-flex justify-content-between align-items-center mb-3 pb-2 border-bottom">
-                            <span class="text-dark">Beban:</span>
-                            <span class="text-danger fw-bold">Rp {income_stmt.get('total_expense', 0):,.2f}</span>
-                        </div>
-                        <div class="d-flex justify-content-between align-items-center mb-3 pb-2 border-bottom">
-                            <span class="text-dark">Laba Bersih:</span>
-                            <span class="fw-bold {'text-success' if income_stmt.get('net_income', 0) >= 0 else 'text-danger'}">
-                                Rp {income_stmt.get('net_income', 0):,.2f}
-                            </span>
-                        </div>
-                        <div class="d-flex justify-content-between align-items-center mb-3 pb-2 border-bottom">
-                            <span class="text-dark">Total Aset:</span>
-                            <span class="text-primary fw-bold">Rp {balance_stmt.get('total_assets', 0):,.2f}</span>
-                        </div>
-                        <div class="d-flex justify-content-between align-items-center">
-                            <span class="text-dark">Kas Bersih:</span>
-                            <span class="fw-bold {'text-success' if cash_flow.get('net_cash_flow', 0) >= 0 else 'text-danger'}">
-                                Rp {cash_flow.get('net_cash_flow', 0):,.2f}
-                            </span>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Row 3: Informasi Stok (jika ada) -->
-        <div class="row mt-4">
-            <div class="col-12">
-                <div class="card">
-                    <div class="card-header bg-transparent">
-                        <h5 class="section-title mb-0">
-                            <i class="fas fa-boxes me-2 text-info"></i>Informasi Stok Tiram
-                        </h5>
-                    </div>
-                    <div class="card-body">
-                        <div class="row">
-                            <div class="col-md-4 text-center">
-                                <div class="border rounded p-3">
-                                    <h4 class="text-primary">{current_stock.get('large', 0)}</h4>
-                                    <p class="mb-0 text-muted">Tiram Besar (kg)</p>
-                                    <small class="text-primary">Rp 800/kg</small>
-                                </div>
-                            </div>
-                            <div class="col-md-4 text-center">
-                                <div class="border rounded p-3">
-                                    <h4 class="text-success">{current_stock.get('small', 0)}</h4>
-                                    <p class="mb-0 text-muted">Tiram Kecil (kg)</p>
-                                    <small class="text-success">Rp 500/kg</small>
-                                </div>
-                            </div>
-                            <div class="col-md-4 text-center">
-                                <div class="border rounded p-3">
-                                    <h4 class="text-info">{current_stock.get('total', 0)}</h4>
-                                    <p class="mb-0 text-muted">Total Stok (kg)</p>
-                                    <small class="text-info">Total persediaan</small>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    """
-
-    return render_template_string(BASE_TEMPLATE, title='Dashboard', body=dashboard_template, user=current_user())
-
-@app.route('/inventory')
-@login_required
-def inventory_monitoring():
-    """Halaman monitoring stok tiram besar dan kecil"""
-    current_stock = get_current_stock()
-    
-    # Dapatkan riwayat persediaan
-    cur = get_db().execute('''
-        SELECT date, description, quantity_in, quantity_out, unit_cost, value
-        FROM inventory 
-        ORDER BY date DESC, id DESC
-        LIMIT 20
-    ''')
-    inventory_history = cur.fetchall()
-    
-    body = f"""
-    <div class="page-header">
-        <h1 class="page-title">Monitoring Persediaan Tiram</h1>
-        <p class="page-subtitle">Kelola dan pantau stok tiram besar & kecil</p>
-    </div>
-    
-    <div class="row mb-4">
-        <!-- Stok Tiram Besar -->
-        <div class="col-md-4">
-            <div class="card">
-                <div class="card-body text-center">
-                    <div class="stat-icon bg-primary text-white mx-auto mb-3">
-                        <i class="fas fa-water"></i>
-                    </div>
-                    <h3 class="text-primary">{current_stock['large']}</h3>
-                    <h6 class="text-dark">Tiram Besar</h6>
-                    <small class="text-muted">Stok tersedia</small>
-                    <div class="mt-2">
-                        <span class="badge bg-primary">Rp 800/tiram</span>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Stok Tiram Kecil -->
-        <div class="col-md-4">
-            <div class="card">
-                <div class="card-body text-center">
-                    <div class="stat-icon bg-success text-white mx-auto mb-3">
-                        <i class="fas fa-tint"></i>
-                    </div>
-                    <h3 class="text-success">{current_stock['small']}</h3>
-                    <h6 class="text-dark">Tiram Kecil</h6>
-                    <small class="text-muted">Stok tersedia</small>
-                    <div class="mt-2">
-                        <span class="badge bg-success">Rp 500/tiram</span>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Total Stok -->
-        <div class="col-md-4">
-            <div class="card">
-                <div class="card-body text-center">
-                    <div class="stat-icon bg-info text-white mx-auto mb-3">
-                        <i class="fas fa-boxes"></i>
-                    </div>
-                    <h3 class="text-info">{current_stock['total']}</h3>
-                    <h6 class="text-dark">Total Stok</h6>
-                    <small class="text-muted">Keseluruhan persediaan</small>
-                    <div class="mt-2">
-                        <span class="badge bg-info">Nilai total</span>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    
-    <div class="card">
-        <div class="card-header">
-            <h5 class="mb-0"><i class="fas fa-history me-2"></i>Riwayat Persediaan</h5>
-        </div>
-        <div class="card-body">
-            <div class="table-responsive">
-                <table class="table table-hover">
-                    <thead>
-                        <tr>
-                            <th>Tanggal</th>
-                            <th>Keterangan</th>
-                            <th class="text-center">Masuk</th>
-                            <th class="text-center">Keluar</th>
-                            <th class="text-end">Harga Satuan</th>
-                            <th class="text-end">Nilai</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-    """
-    
-    for item in inventory_history:
-        body += f"""
-                        <tr>
-                            <td>{item['date']}</td>
-                            <td>{item['description']}</td>
-                            <td class="text-center text-success">{int(item['quantity_in']) if item['quantity_in'] else ''}</td>
-                            <td class="text-center text-danger">{int(item['quantity_out']) if item['quantity_out'] else ''}</td>
-                            <td class="text-end">{item['unit_cost']:,.0f}</td>
-                            <td class="text-end fw-bold">{item['value']:,.0f}</td>
-                        </tr>
-        """
-    
-    body += """
-                    </tbody>
-                </table>
-            </div>
-        </div>
-    </div>
-    """
-    
-    return render_template_string(BASE_TEMPLATE, title='Monitoring Persediaan', body=body, user=current_user())
-
-@app.route('/journal')
-@login_required
-def journal():
-    try:
-        cur = get_db().execute('''
-            SELECT je.id, je.date, je.description, je.reference,
-                   COALESCE(je.transaction_type, 'General') as transaction_type,
-                   je.created_at
-            FROM journal_entries je
-            ORDER BY je.date DESC, je.id DESC
-        ''')
-        entries = cur.fetchall()
-    except:
-        cur = get_db().execute('''
-            SELECT je.id, je.date, je.description, je.reference,
-                   'General' as transaction_type,
-                   je.created_at
-            FROM journal_entries je
-            ORDER BY je.date DESC, je.id DESC
-        ''')
-        entries = cur.fetchall()
-    
-    # Get all journal lines for each entry
-    journal_data = []
-    for entry in entries:
-        cur.execute('''
-            SELECT jl.*, a.code, a.name, a.acct_type, a.normal_balance
-            FROM journal_lines jl
-            JOIN accounts a ON jl.account_id = a.id
-            WHERE jl.entry_id = ?
-            ORDER BY jl.debit DESC, jl.id
-        ''', (entry['id'],))
-        lines = cur.fetchall()
-        journal_data.append({
-            'entry': entry,
-            'lines': lines
-        })
-    
-    body = f"""
-    <div class="page-header">
-        <h1 class="page-title">Jurnal Umum</h1>
-        <p class="page-subtitle">Buku Jurnal Transaksi Keuangan</p>
-    </div>
-    
-    <div class="card">
-        <div class="card-body">
-            <div class="d-flex justify-content-between align-items-center mb-4">
-                <h5 class="section-title mb-0">Daftar Entri Jurnal</h5>
-                <div>
-                    <a href="/journal/new" class="btn btn-primary">
-                        <i class="fas fa-plus me-2"></i>Entri Baru
-                    </a>
-                </div>
-            </div>
-            
-            <!-- Summary Stats -->
-            <div class="row mb-4">
-                <div class="col-md-3">
-                    <div class="stat-card-compact bg-light">
-                        <div class="stat-icon-compact bg-primary text-white">
-                            <i class="fas fa-file-invoice"></i>
-                        </div>
-                        <div class="stat-number-compact text-primary">{len(journal_data)}</div>
-                        <div class="stat-label-compact">Total Entri</div>
-                    </div>
-                </div>
-                <div class="col-md-9">
-                    <div class="alert alert-info">
-                        <i class="fas fa-info-circle me-2"></i>
-                        <strong>Urutan Kronologis:</strong> Transaksi terbaru ditampilkan di atas, transaksi lama di bawah.
-                    </div>
-                </div>
-            </div>
-            
-            <div class="journal-container">
-    """
-    
-    if journal_data:
-        for data in journal_data:
-            entry = data['entry']
-            lines = data['lines']
-            
-            # Calculate totals
-            total_debit = sum(line['debit'] for line in lines)
-            total_credit = sum(line['credit'] for line in lines)
-            is_balanced = abs(total_debit - total_credit) < 0.01
-            
-            body += f"""
-                <!-- Journal Entry Card -->
-                <div class="card journal-entry-card mb-4">
-                    <div class="card-header bg-light d-flex justify-content-between align-items-center">
-                        <div>
-                            <strong>{entry['date']}</strong>
-                            <span class="badge bg-secondary ms-2">{entry['transaction_type']}</span>
-                            {'' if is_balanced else '<span class="badge bg-danger ms-1">Tidak Balance</span>'}
-                        </div>
-                        <div>
-                            <small class="text-muted me-3">#{entry['id']}</small>
-                            <a href="/journal/{entry['id']}" class="btn btn-sm btn-outline-primary me-1">
-                                <i class="fas fa-eye"></i>
-                            </a>
-                            <a href="/journal/{entry['id']}/delete" class="btn btn-sm btn-outline-danger" 
-                               onclick="return confirm('Hapus entri jurnal #{entry['id']}?')">
-                                <i class="fas fa-trash"></i>
-                            </a>
-                        </div>
-                    </div>
-                    <div class="card-body">
-                        <h6 class="card-title mb-3">{entry['description']}</h6>
-                        
-                        <div class="table-responsive">
-                            <table class="table table-sm journal-lines-table">
-                                <thead>
-                                    <tr>
-                                        <th width="60%">Akun</th>
-                                        <th width="20%" class="text-end">Debit</th>
-                                        <th width="20%" class="text-end">Kredit</th>
-                                    </tr>
-                                </thead>
-                                <tbody>
-            """
-            
-            # Journal Lines
-            for line in lines:
-                debit_display = f"Rp {line['debit']:,.2f}" if line['debit'] > 0 else ""
-                credit_display = f"Rp {line['credit']:,.2f}" if line['credit'] > 0 else ""
-                
-                body += f"""
-                                    <tr>
-                                        <td>
-                                            <div><strong>{line['code']}</strong> - {line['name']}</div>
-                                            <small class="text-muted">{line.get('description', '')}</small>
-                                        </td>
-                                        <td class="text-end text-success fw-bold">{debit_display}</td>
-                                        <td class="text-end text-danger fw-bold">{credit_display}</td>
-                                    </tr>
-                """
-            
-            # Entry Totals
-            body += f"""
-                                </tbody>
-                                <tfoot class="table-active">
-                                    <tr>
-                                        <td class="text-end"><strong>Total:</strong></td>
-                                        <td class="text-end text-success border-top fw-bold">Rp {total_debit:,.2f}</td>
-                                        <td class="text-end text-danger border-top fw-bold">Rp {total_credit:,.2f}</td>
-                                    </tr>
-                                </tfoot>
-                            </table>
-                        </div>
-                        
-                        <div class="mt-3">
-                            <div class="alert {'alert-success' if is_balanced else 'alert-warning'} py-2 mb-0">
-                                <i class="fas {'fa-check-circle' if is_balanced else 'fa-exclamation-triangle'} me-2"></i>
-                                {'Entri jurnal seimbang' if is_balanced else f'Tidak seimbang! Selisih: Rp {abs(total_debit - total_credit):,.2f}'}
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            """
-    else:
-        body += """
-            <div class="text-center py-5">
-                <i class="fas fa-book fa-3x text-muted mb-3"></i>
-                <h5 class="text-muted">Belum Ada Entri Jurnal</h5>
-                <p class="text-muted">Mulai dengan membuat entri jurnal pertama Anda.</p>
-                <a href="/journal/new" class="btn btn-primary">
-                    <i class="fas fa-plus me-2"></i>Buat Entri Jurnal
-                </a>
-            </div>
-        """
-    
-    body += """
-            </div>
-        </div>
-    </div>
-
-    <style>
-    .journal-entry-card {
-        border-left: 4px solid #007bff;
-        transition: all 0.3s ease;
-    }
-    
-    .journal-entry-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-    }
-    
-    .journal-lines-table {
-        font-size: 0.9rem;
-    }
-    
-    .journal-lines-table td {
-        padding: 0.5rem 0.75rem;
-        vertical-align: middle;
-    }
-    
-    .journal-container {
-        max-height: 70vh;
-        overflow-y: auto;
-        padding-right: 10px;
-    }
-    
-    /* Custom scrollbar */
-    .journal-container::-webkit-scrollbar {
-        width: 6px;
-    }
-    
-    .journal-container::-webkit-scrollbar-track {
-        background: #f1f1f1;
-        border-radius: 10px;
-    }
-    
-    .journal-container::-webkit-scrollbar-thumb {
-        background: #c1c1c1;
-        border-radius: 10px;
-    }
-    
-    .journal-container::-webkit-scrollbar-thumb:hover {
-        background: #a8a8a8;
-    }
-    </style>
-    """
-    
-    return render_template_string(BASE_TEMPLATE, title='Jurnal Umum', body=body, user=current_user())
-
-# ---------- API Endpoints untuk Template ----------
-
-@app.route('/api/journal/templates')
-@login_required
-def api_journal_templates():
-    """Get all transaction templates"""
-    cur = get_db().execute('SELECT template_key, label, description FROM transaction_templates ORDER BY label')
-    templates = cur.fetchall()
-    
-    return {
-        'templates': [
-            {
-                'key': t['template_key'],
-                'label': t['label'],
-                'description': t['description']
-            }
-            for t in templates
-        ]
-    }
-
-@app.route('/api/journal/templates/<template_key>')
-@login_required
-def api_journal_template_detail(template_key):
-    """Get detailed template with account information"""
-    cur = get_db().execute(
-        'SELECT template_key, label, description, lines_json FROM transaction_templates WHERE template_key = ?',
-        (template_key,)
-    )
-    template = cur.fetchone()
-    
-    if not template:
-        return {'error': 'Template not found'}, 404
-    
-    lines = json.loads(template['lines_json'])
-    
-    # Enrich dengan informasi akun lengkap
-    enriched_lines = []
-    for line in lines:
-        account_cur = get_db().execute(
-            'SELECT id, code, name, acct_type, normal_balance FROM accounts WHERE code = ?',
-            (line['account_code'],)
-        )
-        account = account_cur.fetchone()
-        
-        if account:
-            enriched_line = {
-                **line,
-                'account_id': account['id'],
-                'account_code': account['code'],
-                'account_name': account['name'],
-                'account_type': account['acct_type'],
-                'normal_balance': account['normal_balance']
-            }
-            enriched_lines.append(enriched_line)
-    
-    return {
-        'template_key': template['template_key'],
-        'label': template['label'],
-        'description': template['description'],
-        'lines': enriched_lines
-    }
-
-@app.route('/api/accounts')
-@login_required
-def api_accounts():
-    """Get all accounts for dropdown"""
-    accounts = all_accounts()
-    return {
-        'accounts': [
-            {
-                'id': a['id'],
-                'code': a['code'],
-                'name': a['name'],
-                'acct_type': a['acct_type'],
-                'normal_balance': a['normal_balance']
-            }
-            for a in accounts
-        ]
-    }
-
-@app.route('/journal/new', methods=['GET', 'POST'])
-@login_required
-def journal_new():
-    accounts = all_accounts()
-    options_html = "".join([f'<option value="{a["id"]}">{a["code"]} - {a["name"]}</option>' for a in accounts])
-    
-    if request.method == 'POST':
-        date = request.form['date']
-        description = request.form['description']
-        reference = request.form.get('reference', '')
-        transaction_type = request.form.get('transaction_type', 'General')
-        
-        lines = []
-        idx = 0
-        while True:
-            account_id = request.form.get(f'account_{idx}')
-            if not account_id:
-                break
-            
-            debit = float(request.form.get(f'debit_{idx}', 0) or 0)
-            credit = float(request.form.get(f'credit_{idx}', 0) or 0)
-            line_desc = request.form.get(f'line_desc_{idx}', '')
-            
-            if debit > 0 or credit > 0:
-                lines.append({
-                    'account_id': int(account_id),
-                    'debit': debit,
-                    'credit': credit,
-                    'description': line_desc
-                })
-            idx += 1
-        
-        # Validasi
-        if len(lines) < 2:
-            flash('Entri jurnal harus memiliki setidaknya dua baris')
-            return redirect(url_for('journal_new'))
-        
-        total_debit = sum(line['debit'] for line in lines)
-        total_credit = sum(line['credit'] for line in lines)
-        
-        if abs(total_debit - total_credit) > 0.01:
-            flash('Debit dan kredit harus seimbang')
-            return redirect(url_for('journal_new'))
-        
-        # Posting entri jurnal
-        try:
-            entry_id = post_journal_entry(date, description, lines, reference, transaction_type)
-            flash(f'Entri jurnal #{entry_id} berhasil diposting!')
-            return redirect(url_for('journal'))
-        except Exception as e:
-            flash(f'Error posting entri jurnal: {str(e)}')
-    
-    body = f"""
-    <div class="page-header">
-        <h1 class="page-title">Entri Jurnal Baru</h1>
-        <p class="page-subtitle">Buat entri jurnal untuk transaksi bisnis</p>
-    </div>
-    
-    <div class="card">
-        <div class="card-body">
-            <form method="post">
-                <div class="row mb-4">
-                    <div class="col-md-3">
-                        <label class="form-label fw-semibold">Tanggal</label>
-                        <input type="date" class="form-control" name="date" value="{datetime.now().date().isoformat()}" required>
-                    </div>
-                    <div class="col-md-6">
-                        <label class="form-label fw-semibold">Keterangan</label>
-                        <input type="text" class="form-control" name="description" placeholder="Deskripsi entri jurnal" required>
-                    </div>
-                    <div class="col-md-3">
-                        <label class="form-label fw-semibold">Referensi</label>
-                        <input type="text" class="form-control" name="reference" placeholder="No. Referensi">
-                    </div>
-                </div>
-                
-                <h6 class="mb-3"><i class="fas fa-list me-2"></i>Baris Jurnal</h6>
-                <div id="journal-lines">
-                    <div class="row mb-3">
-                        <div class="col-md-5">
-                            <label class="form-label">Akun</label>
-                            <select class="form-select" name="account_0" required>
-                                <option value="">Pilih Akun</option>
-                                {options_html}
-                            </select>
-                        </div>
-                        <div class="col-md-3">
-                            <label class="form-label">Debit</label>
-                            <input type="number" class="form-control" name="debit_0" placeholder="0.00" step="0.01" min="0" oninput="checkBalance()">
-                        </div>
-                        <div class="col-md-3">
-                            <label class="form-label">Kredit</label>
-                            <input type="number" class="form-control" name="credit_0" placeholder="0.00" step="0.01" min="0" oninput="checkBalance()">
-                        </div>
-                        <div class="col-md-1 d-flex align-items-end">
-                            <button type="button" class="btn btn-danger btn-sm" disabled>
-                                <i class="fas fa-times"></i>
-                            </button>
-                        </div>
-                    </div>
-                </div>
-                
-                <div class="mb-3">
-                    <button type="button" class="btn btn-outline-primary" onclick="addJournalLine()">
-                        <i class="fas fa-plus me-2"></i>Tambah Baris
-                    </button>
-                </div>
-                
-                <div id="balance-check" class="alert alert-info mb-3">
-                    <i class="fas fa-info-circle me-2"></i>Masukkan jumlah untuk memeriksa keseimbangan
-                </div>
-                
-                <div class="d-flex gap-2">
-                    <button type="submit" class="btn btn-primary">Posting Entri Jurnal</button>
-                    <a href="/journal" class="btn btn-outline-secondary">Batal</a>
-                </div>
-            </form>
-        </div>
-    </div>
-    
-    <div id="account-options" style="display: none;">
-        {options_html}
-    </div>
-    """
-    return render_template_string(BASE_TEMPLATE, title='Entri Jurnal Baru', body=body, user=current_user())
-
-@app.route('/journal/<int:entry_id>')
-@login_required
-def journal_view(entry_id):
-    cur = get_db().execute('SELECT * FROM journal_entries WHERE id = ?', (entry_id,))
-    entry = cur.fetchone()
-    
-    if not entry:
-        flash('Entri jurnal tidak ditemukan')
-        return redirect(url_for('journal'))
-    
-    cur.execute('''
-        SELECT jl.*, a.code, a.name, a.acct_type, a.normal_balance
-        FROM journal_lines jl
-        JOIN accounts a ON jl.account_id = a.id
-        WHERE jl.entry_id = ?
-        ORDER BY jl.debit DESC, jl.id
-    ''', (entry_id,))
-    lines = cur.fetchall()
-    
-    transaction_type = entry['transaction_type'] if 'transaction_type' in entry.keys() else 'General'
-    reference = entry['reference'] if entry['reference'] else '-'
-    
-    total_debit = sum(line['debit'] for line in lines)
-    total_credit = sum(line['credit'] for line in lines)
-    is_balanced = abs(total_debit - total_credit) < 0.01
-    
-    body = f"""
-    <div class="page-header">
-        <h1 class="page-title">Detail Jurnal #{entry['id']}</h1>
-        <p class="page-subtitle">Detail lengkap entri jurnal</p>
-    </div>
-    
-    <div class="card">
-        <div class="card-header bg-light">
-            <div class="row">
-                <div class="col-md-3">
-                    <strong>Tanggal:</strong> {entry['date']}
-                </div>
-                <div class="col-md-3">
-                    <strong>Jenis:</strong> <span class="badge bg-secondary">{transaction_type}</span>
-                </div>
-                <div class="col-md-3">
-                    <strong>Referensi:</strong> {reference}
-                </div>
-                <div class="col-md-3">
-                    <strong>Status:</strong> 
-                    <span class="badge {'bg-success' if is_balanced else 'bg-danger'}">
-                        {'Seimbang' if is_balanced else 'Tidak Seimbang'}
-                    </span>
-                </div>
-            </div>
-        </div>
-        <div class="card-body">
-            <h6 class="card-title mb-4">{entry['description']}</h6>
-            
-            <div class="table-responsive">
-                <table class="table journal-detail-table">
-                    <thead class="table-light">
-                        <tr>
-                            <th width="50%">Akun</th>
-                            <th width="25%" class="text-end">Debit</th>
-                            <th width="25%" class="text-end">Kredit</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-    """
-    
-    for line in lines:
-        debit_display = f"Rp {line['debit']:,.2f}" if line['debit'] > 0 else "-"
-        credit_display = f"Rp {line['credit']:,.2f}" if line['credit'] > 0 else "-"
-        
-        body += f"""
-                        <tr>
-                            <td>
-                                <div class="d-flex justify-content-between">
-                                    <div>
-                                        <strong>{line['code']}</strong> - {line['name']}
-                                        <br>
-                                        <small class="text-muted">{line['acct_type']} • {line['normal_balance']} normal</small>
-                                    </div>
-                                    <div class="text-end">
-                                        <small class="text-muted">{line.get('description', '')}</small>
-                                    </div>
-                                </div>
-                            </td>
-                            <td class="text-end {'text-success fw-bold' if line['debit'] > 0 else 'text-muted'}">{debit_display}</td>
-                            <td class="text-end {'text-danger fw-bold' if line['credit'] > 0 else 'text-muted'}">{credit_display}</td>
-                        </tr>
-        """
-    
-    body += f"""
-                    </tbody>
-                    <tfoot class="table-active">
-                        <tr>
-                            <td class="text-end"><strong>Total:</strong></td>
-                            <td class="text-end text-success border-top fw-bold">Rp {total_debit:,.2f}</td>
-                            <td class="text-end text-danger border-top fw-bold">Rp {total_credit:,.2f}</td>
-                        </tr>
-                    </tfoot>
-                </table>
-            </div>
-            
-            <div class="mt-4">
-                <div class="alert {'alert-success' if is_balanced else 'alert-warning'}">
-                    <i class="fas {'fa-check-circle' if is_balanced else 'fa-exclamation-triangle'} me-2"></i>
-                    {'Entri jurnal ini seimbang dan telah diposting dengan benar.' if is_balanced else f'Entri jurnal tidak seimbang! Selisih: Rp {abs(total_debit - total_credit):,.2f}'}
-                </div>
-            </div>
-            
-            <div class="mt-4 pt-3 border-top">
-                <a href="/journal" class="btn btn-outline-secondary">
-                    <i class="fas fa-arrow-left me-2"></i>Kembali ke Jurnal
-                </a>
-                <a href="/journal/{entry_id}/delete" class="btn btn-outline-danger float-end" 
-                   onclick="return confirm('Hapus entri jurnal #{entry_id}?')">
-                    <i class="fas fa-trash me-2"></i>Hapus Entri
-                </a>
-            </div>
-        </div>
-    </div>
-
-    <style>
-    .journal-detail-table td {
-        padding: 0.75rem;
-        vertical-align: middle;
-    }
-    
-    .journal-detail-table tbody tr:hover {
-        background-color: #f8f9fa;
-    }
-    </style>
-    """
-    
-    return render_template_string(BASE_TEMPLATE, title='Detail Jurnal', body=body, user=current_user())
-    
-@app.route('/journal/<int:entry_id>/delete', methods=['GET', 'POST'])
-@login_required
-def delete_journal_entry(entry_id):
-    """Hapus entri jurnal dan semua barisnya"""
-    db = get_db()
-    
-    # Dapatkan detail entri sebelum dihapus (untuk flash message)
-    cur = db.execute('SELECT date, description FROM journal_entries WHERE id = ?', (entry_id,))
-    entry = cur.fetchone()
-    
-    if not entry:
-        flash('Entri jurnal tidak ditemukan')
-        return redirect(url_for('journal'))
-    
-    if request.method == 'POST':
-        try:
-            # Hapus semua baris jurnal terkait
-            db.execute('DELETE FROM journal_lines WHERE entry_id = ?', (entry_id,))
-            
-            # Hapus entri jurnal
-            db.execute('DELETE FROM journal_entries WHERE id = ?', (entry_id,))
-            
-            db.commit()
-            
-            flash(f'✅ Entri jurnal #{entry_id} ({entry["description"]}) berhasil dihapus!')
-            return redirect(url_for('journal'))
-            
-        except Exception as e:
-            db.rollback()
-            flash(f'❌ Error menghapus entri jurnal: {str(e)}')
-            return redirect(url_for('journal_view', entry_id=entry_id))
-    
-    # Jika method GET, tampilkan konfirmasi
-    body = f"""
-    <div class="page-header">
-        <h1 class="page-title">Hapus Entri Jurnal #{entry_id}</h1>
-        <p class="page-subtitle">Konfirmasi penghapusan entri jurnal</p>
-    </div>
-    
-    <div class="card">
-        <div class="card-header bg-danger text-white">
-            <h5 class="mb-0"><i class="fas fa-exclamation-triangle me-2"></i>Konfirmasi Hapus</h5>
-        </div>
-        <div class="card-body">
-            <div class="alert alert-danger">
-                <h6><i class="fas fa-skull-crossbones me-2"></i>PERINGATAN!</h6>
-                <p class="mb-0">
-                    Anda akan menghapus entri jurnal berikut:
-                </p>
-            </div>
-            
-            <div class="card bg-light">
-                <div class="card-body">
-                    <p><strong>ID:</strong> #{entry_id}</p>
-                    <p><strong>Tanggal:</strong> {entry['date']}</p>
-                    <p><strong>Keterangan:</strong> {entry['description']}</p>
-                </div>
-            </div>
-            
-            <div class="alert alert-warning mt-3">
-                <h6><i class="fas fa-info-circle me-2"></i>Dampak Penghapusan:</h6>
-                <ul class="mb-0">
-                    <li>Semua baris jurnal akan dihapus</li>
-                    <li>Pengaruhnya pada buku besar akan hilang</li>
-                    <li>Stok inventory akan disesuaikan (jika ada)</li>
-                    <li><strong>Tindakan ini tidak dapat dibatalkan!</strong></li>
-                </ul>
-            </div>
-            
-            <form method="post" class="mt-4">
-                <div class="d-flex gap-2">
-                    <button type="submit" class="btn btn-danger">
-                        <i class="fas fa-trash me-2"></i>Ya, Hapus Entri Jurnal
-                    </button>
-                    <a href="/journal/{entry_id}" class="btn btn-outline-secondary">
-                        <i class="fas fa-times me-2"></i>Batal
-                    </a>
-                </div>
-            </form>
-        </div>
-    </div>
-    """
-    return render_template_string(BASE_TEMPLATE, title='Hapus Jurnal', body=body, user=current_user())
-
-@app.route('/ledger')
-@login_required
-def ledger():
-    accounts = all_accounts()
-    
-    body = """
-    <div class="page-header">
-        <h1 class="page-title">Buku Besar</h1>
-        <p class="page-subtitle">Daftar semua akun dan saldo terkini</p>
-    </div>
-    
-    <div class="card">
-        <div class="card-body">
-            <div class="table-responsive">
-                <table class="table table-hover accounting-table">
-                    <thead>
-                        <tr>
-                            <th>Kode Akun</th>
-                            <th>Nama Akun</th>
-                            <th>Jenis</th>
-                            <th class="text-end">Saldo Saat Ini</th>
-                            <th>Aksi</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-    """
-    
-    for account in accounts:
-        balance = get_account_balance(account['id'])
-        balance_class = 'text-success' if balance >= 0 else 'text-danger'
-        
-        body += f"""
-                        <tr>
-                            <td><strong>{account['code']}</strong></td>
-                            <td>{account['name']}</td>
-                            <td><span class="badge bg-secondary">{account['acct_type']}</span></td>
-                            <td class="text-end {balance_class} fw-bold">Rp {balance:,.2f}</td>
-                            <td>
-                                <a href="/ledger/{account['id']}" class="btn btn-sm btn-outline-primary">
-                                    <i class="fas fa-eye me-1"></i>Lihat
-                                </a>
-                            </td>
-                        </tr>
-        """
-    
-    body += """
-                    </tbody>
-                </table>
-            </div>
-        </div>
-    </div>
-    """
-    return render_template_string(BASE_TEMPLATE, title='Buku Besar', body=body, user=current_user())
-
-@app.route('/ledger/<int:account_id>')
-@login_required
-def ledger_account(account_id):
-    cur = get_db().execute('SELECT * FROM accounts WHERE id = ?', (account_id,))
-    account = cur.fetchone()
-    
-    if not account:
-        flash('Akun tidak ditemukan')
-        return redirect(url_for('ledger'))
-    
-    # Dapatkan entri jurnal
-    cur.execute('''
-        SELECT je.date, je.description, jl.debit, jl.credit, jl.description as line_desc
-        FROM journal_lines jl
-        JOIN journal_entries je ON jl.entry_id = je.id
-        WHERE jl.account_id = ?
-        ORDER BY je.date, je.id
-    ''', (account_id,))
-    journal_entries = cur.fetchall()
-    
-    # Dapatkan entri penyesuaian
-    cur.execute('''
-        SELECT ae.date, ae.description, al.debit, al.credit, al.description as line_desc
-        FROM adjusting_lines al
-        JOIN adjusting_entries ae ON al.adj_id = ae.id
-        WHERE al.account_id = ?
-        ORDER BY ae.date, ae.id
-    ''', (account_id,))
-    adjusting_entries = cur.fetchall()
-    
-    # Hitung saldo berjalan
-    balance = 0
-    transactions = []
-    
-    # Gabungkan dan urutkan semua transaksi
-    all_entries = []
-    for entry in journal_entries:
-        all_entries.append({
-            'date': entry['date'],
-            'description': entry['description'],
-            'debit': entry['debit'],
-            'credit': entry['credit'],
-            'line_desc': entry['line_desc'] if entry['line_desc'] else '',
-            'type': 'journal'
-        })
-    
-    for entry in adjusting_entries:
-        all_entries.append({
-            'date': entry['date'],
-            'description': entry['description'] + ' (Penyesuaian)',
-            'debit': entry['debit'],
-            'credit': entry['credit'],
-            'line_desc': entry['line_desc'] if entry['line_desc'] else '',
-            'type': 'adjusting'
-        })
-    
-    # Urutkan berdasarkan tanggal
-    all_entries.sort(key=lambda x: x['date'])
-    
-    # Hitung saldo berjalan
-    for entry in all_entries:
-        if account['normal_balance'] == 'Debit':
-            balance += entry['debit'] - entry['credit']
-        else:
-            balance += entry['credit'] - entry['debit']
-        
-        entry['balance'] = balance
-    
-    current_balance = get_account_balance(account_id)
-    
-    body = f"""
-    <div class="page-header">
-        <h1 class="page-title">Buku Besar: {account['code']} - {account['name']}</h1>
-        <p class="page-subtitle">Riwayat transaksi untuk akun ini</p>
-    </div>
-    
-    <div class="card">
-        <div class="card-body">
-            <div class="row mb-4">
-                <div class="col-md-6">
-                    <div class="card bg-light">
-                        <div class="card-body">
-                            <h6><i class="fas fa-info-circle me-2"></i>Informasi Akun</h6>
-                            <p><strong>Saldo Saat Ini:</strong> 
-                                <span class="{'text-success' if current_balance >= 0 else 'text-danger'} fw-bold">
-                                    Rp {current_balance:,.2f}
-                                </span>
-                            </p>
-                            <p><strong>Saldo Normal:</strong> {account['normal_balance']}</p>
-                            <p><strong>Deskripsi:</strong> {account['description'] if account['description'] else 'Tidak ada deskripsi'}</p>
-                        </div>
-                    </div>
-                </div>
-            </div>
-            
-            <h6><i class="fas fa-history me-2"></i>Riwayat Transaksi</h6>
-            <div class="table-responsive">
-                <table class="table accounting-table">
-                    <thead>
-                        <tr>
-                            <th>Tanggal</th>
-                            <th>Keterangan</th>
-                            <th class="text-end">Debit</th>
-                            <th class="text-end">Kredit</th>
-                            <th class="text-end">Saldo</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-    """
-    
-    for entry in all_entries:
-        row_class = 'table-warning' if entry['type'] == 'adjusting' else ''
-        debit_display = f"Rp {entry['debit']:,.2f}" if entry['debit'] > 0 else ""
-        credit_display = f"Rp {entry['credit']:,.2f}" if entry['credit'] > 0 else ""
-        
-        # Handle line_desc dengan benar
-        line_desc_html = ""
-        if entry.get('line_desc'):
-            line_desc_html = f"<br><small class='text-muted'>{entry['line_desc']}</small>"
-        
-        body += f"""
-                        <tr class="{row_class}">
-                            <td>{entry['date']}</td>
-                            <td>
-                                {entry['description']}
-                                {line_desc_html}
-                            </td>
-                            <td class="text-end text-success">{debit_display}</td>
-                            <td class="text-end text-danger">{credit_display}</td>
-                            <td class="text-end fw-bold">Rp {entry['balance']:,.2f}</td>
-                        </tr>
-        """
-    
-    body += f"""
-                    </tbody>
-                </table>
-            </div>
-            
-            <div class="mt-3">
-                <small class="text-muted">
-                    <i class="fas fa-info-circle me-1"></i>
-                    Baris kuning menunjukkan entri penyesuaian
-                </small>
-            </div>
-        </div>
-    </div>
-    """
-    return render_template_string(BASE_TEMPLATE, title=f"Buku Besar - {account['code']}", body=body, user=current_user())
-
-@app.route('/trial_balance')
-@login_required
-def trial_balance_view():
-    # Neraca Saldo Sebelum Penyesuaian
-    utb, utd, utc = trial_balance(include_adjustments=False)
-    # Neraca Saldo Setelah Penyesuaian  
-    atb, atd, atc = trial_balance(include_adjustments=True)
-    
-    body = """
-    <div class="page-header">
-        <h1 class="page-title">Neraca Saldo</h1>
-        <p class="page-subtitle">Perbandingan neraca saldo sebelum dan setelah penyesuaian</p>
-    </div>
-    
-    <div class="row">
-        <div class="col-md-6">
-            <div class="card">
-                <div class="card-header bg-light">
-                    <h6 class="mb-0"><i class="fas fa-balance-scale me-2"></i>Neraca Saldo Sebelum Penyesuaian</h6>
-                    <small class="text-muted">Sebelum entri penyesuaian</small>
-                </div>
-                <div class="card-body">
-                    <div class="table-responsive">
-                        <table class="table accounting-table">
-                            <thead>
-                                <tr>
-                                    <th>Akun</th>
-                                    <th class="text-end">Debit</th>
-                                    <th class="text-end">Kredit</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-    """
-    
-    for item in utb:
-        if item['debit'] != 0 or item['credit'] != 0:
-            # Format yang benar sesuai prinsip akuntansi
-            debit_display = f"Rp {item['debit']:,.2f}" if item['debit'] > 0 else ""
-            credit_display = f"Rp {item['credit']:,.2f}" if item['credit'] > 0 else ""
-            
-            body += f"""
-                                <tr>
-                                    <td>
-                                        <div><strong>{item['account']['code']}</strong> {item['account']['name']}</div>
-                                        <small class="text-muted">{item['account']['acct_type']} - {item['account']['normal_balance']} normal</small>
-                                    </td>
-                                    <td class="text-end {'text-success fw-bold' if item['debit'] > 0 else ''}">{debit_display}</td>
-                                    <td class="text-end {'text-danger fw-bold' if item['credit'] > 0 else ''}">{credit_display}</td>
-                                </tr>
-            """
-    
-    # Status balance
-    is_balanced = abs(utd - utc) < 0.01
-    balance_status = "✅ SEIMBANG" if is_balanced else f"❌ TIDAK SEIMBANG (Selisih: Rp {abs(utd - utc):,.2f})"
-    
-    body += f"""
-                            </tbody>
-                            <tfoot class="table-active">
-                                <tr>
-                                    <th>Total</th>
-                                    <th class="text-end text-success">Rp {utd:,.2f}</th>
-                                    <th class="text-end text-danger">Rp {utc:,.2f}</th>
-                                </tr>
-                                <tr>
-                                    <th colspan="3" class="text-center {'text-success' if is_balanced else 'text-danger'}">
-                                        <i class="fas {'fa-check-circle' if is_balanced else 'fa-exclamation-triangle'} me-2"></i>
-                                        {balance_status}
-                                    </th>
-                                </tr>
-                            </tfoot>
-                        </table>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <div class="col-md-6">
-            <div class="card">
-                <div class="card-header bg-light">
-                    <h6 class="mb-0"><i class="fas fa-balance-scale me-2"></i>Neraca Saldo Setelah Penyesuaian</h6>
-                    <small class="text-muted">Setelah entri penyesuaian</small>
-                </div>
-                <div class="card-body">
-                    <div class="table-responsive">
-                        <table class="table accounting-table">
-                            <thead>
-                                <tr>
-                                    <th>Akun</th>
-                                    <th class="text-end">Debit</th>
-                                    <th class="text-end">Kredit</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-    """
-    
-    for item in atb:
-        if item['debit'] != 0 or item['credit'] != 0:
-            debit_display = f"Rp {item['debit']:,.2f}" if item['debit'] > 0 else ""
-            credit_display = f"Rp {item['credit']:,.2f}" if item['credit'] > 0 else ""
-            
-            body += f"""
-                                <tr>
-                                    <td>
-                                        <div><strong>{item['account']['code']}</strong> {item['account']['name']}</div>
-                                        <small class="text-muted">{item['account']['acct_type']} - {item['account']['normal_balance']} normal</small>
-                                    </td>
-                                    <td class="text-end {'text-success fw-bold' if item['debit'] > 0 else ''}">{debit_display}</td>
-                                    <td class="text-end {'text-danger fw-bold' if item['credit'] > 0 else ''}">{credit_display}</td>
-                                </tr>
-            """
-    
-    # Status balance untuk after adjustments
-    is_balanced_adj = abs(atd - atc) < 0.01
-    balance_status_adj = "✅ SEIMBANG" if is_balanced_adj else f"❌ TIDAK SEIMBANG (Selisih: Rp {abs(atd - atc):,.2f})"
-    
-    body += """
-    <div class="row mt-4">
-        <div class="col-12">
-            <div class="card">
-                <div class="card-body text-center">
-                    <h6><i class="fas fa-tools me-2"></i>Perbaikan Neraca Saldo</h6>
-                    <p class="text-muted mb-3">
-                        Jika neraca saldo tidak balance, klik tombol di bawah untuk memperbaiki otomatis.
-                    </p>
-                    <a href="/fix_database" class="btn btn-warning">
-                        <i class="fas fa-hammer me-2"></i>Perbaiki Neraca Saldo
-                    </a>
-                    <small class="d-block mt-2 text-muted">
-                        Tindakan ini akan mengatur ulang saldo awal ke nilai yang benar.
-                    </small>
-                </div>
-            </div>
-        </div>
-    </div>
-    """
-    
-    return render_template_string(BASE_TEMPLATE, title='Neraca Saldo', body=body, user=current_user())
-
-@app.route('/adjusting')
-@login_required
-def adjusting():
-    cur = get_db().execute('SELECT * FROM adjusting_entries ORDER BY date DESC, id DESC')
-    entries = cur.fetchall()
-    
-    # Get all adjusting lines for each entry
-    adjusting_data = []
-    for entry in entries:
-        cur.execute('''
-            SELECT al.*, a.code, a.name, a.acct_type
-            FROM adjusting_lines al
-            JOIN accounts a ON al.account_id = a.id
-            WHERE al.adj_id = ?
-            ORDER BY al.debit DESC, al.id
-        ''', (entry['id'],))
-        lines = cur.fetchall()
-        adjusting_data.append({
-            'entry': entry,
-            'lines': lines
-        })
-    
-    body = """
-    <div class="page-header">
-        <h1 class="page-title">Ayat Penyesuaian</h1>
-        <p class="page-subtitle">Entri penyesuaian untuk penutupan periode akuntansi</p>
-    </div>
-    
-    <div class="card">
-        <div class="card-body">
-            <div class="d-flex justify-content-between align-items-center mb-4">
-                <h5 class="section-title mb-0">Daftar Ayat Penyesuaian</h5>
-                <a href="/adjusting/new" class="btn btn-primary">
-                    <i class="fas fa-plus me-2"></i>Ayat Penyesuaian Baru
-                </a>
-            </div>
-            
-            <!-- Info Panel -->
-            <div class="alert alert-warning mb-4">
-                <i class="fas fa-info-circle me-2"></i>
-                <strong>Fungsi Ayat Penyesuaian:</strong> Untuk menyesuaikan saldo akun sebelum penyusunan laporan keuangan (akrual, deferral, penyusutan, dll).
-            </div>
-            
-            <div class="adjusting-container">
-    """
-    
-    if adjusting_data:
-        for data in adjusting_data:
-            entry = data['entry']
-            lines = data['lines']
-            
-            # Calculate totals
-            total_debit = sum(line['debit'] for line in lines)
-            total_credit = sum(line['credit'] for line in lines)
-            is_balanced = abs(total_debit - total_credit) < 0.01
-            
-            body += f"""
-                <!-- Adjusting Entry Card -->
-                <div class="card adjusting-entry-card mb-4">
-                    <div class="card-header bg-warning bg-opacity-10 d-flex justify-content-between align-items-center">
-                        <div>
-                            <strong>{entry['date']}</strong>
-                            <span class="badge bg-warning text-dark ms-2">Penyesuaian</span>
-                            {'' if is_balanced else '<span class="badge bg-danger ms-1">Tidak Balance</span>'}
-                        </div>
-                        <div>
-                            <small class="text-muted me-3">#{entry['id']}</small>
-                            <a href="/adjusting/{entry['id']}" class="btn btn-sm btn-outline-primary">
-                                <i class="fas fa-eye"></i> Detail
-                            </a>
-                        </div>
-                    </div>
-                    <div class="card-body">
-                        <h6 class="card-title mb-3">{entry['description']}</h6>
-                        
-                        <div class="table-responsive">
-                            <table class="table table-sm adjusting-lines-table">
-                                <thead>
-                                    <tr>
-                                        <th width="60%">Akun</th>
-                                        <th width="20%" class="text-end">Debit</th>
-                                        <th width="20%" class="text-end">Kredit</th>
-                                    </tr>
-                                </thead>
-                                <tbody>
-            """
-            
-            # Adjusting Lines
-            for line in lines:
-                debit_display = f"Rp {line['debit']:,.2f}" if line['debit'] > 0 else ""
-                credit_display = f"Rp {line['credit']:,.2f}" if line['credit'] > 0 else ""
-                
-                body += f"""
-                                    <tr>
-                                        <td>
-                                            <div><strong>{line['code']}</strong> - {line['name']}</div>
-                                            <small class="text-muted">{line.get('description', '')}</small>
-                                        </td>
-                                        <td class="text-end text-success fw-bold">{debit_display}</td>
-                                        <td class="text-end text-danger fw-bold">{credit_display}</td>
-                                    </tr>
-                """
-            
-            # Entry Totals
-            body += f"""
-                                </tbody>
-                                <tfoot class="table-active">
-                                    <tr>
-                                        <td class="text-end"><strong>Total:</strong></td>
-                                        <td class="text-end text-success border-top fw-bold">Rp {total_debit:,.2f}</td>
-                                        <td class="text-end text-danger border-top fw-bold">Rp {total_credit:,.2f}</td>
-                                    </tr>
-                                </tfoot>
-                            </table>
-                        </div>
-                        
-                        <div class="mt-3">
-                            <div class="alert {'alert-success' if is_balanced else 'alert-warning'} py-2 mb-0">
-                                <i class="fas {'fa-check-circle' if is_balanced else 'fa-exclamation-triangle'} me-2"></i>
-                                {'Ayat penyesuaian seimbang' if is_balanced else f'Tidak seimbang! Selisih: Rp {abs(total_debit - total_credit):,.2f}'}
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            """
-    else:
-        body += """
-            <div class="text-center py-5">
-                <i class="fas fa-adjust fa-3x text-muted mb-3"></i>
-                <h5 class="text-muted">Belum Ada Ayat Penyesuaian</h5>
-                <p class="text-muted">Ayat penyesuaian digunakan untuk menyesuaikan saldo akun sebelum laporan keuangan.</p>
-                <a href="/adjusting/new" class="btn btn-primary">
-                    <i class="fas fa-plus me-2"></i>Buat Ayat Penyesuaian
-                </a>
-            </div>
-        """
-    
-    body += """
-            </div>
-        </div>
-    </div>
-
-    <style>
-    .adjusting-entry-card {
-        border-left: 4px solid #ffc107;
-        transition: all 0.3s ease;
-    }
-    
-    .adjusting-entry-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-    }
-    
-    .adjusting-lines-table {
-        font-size: 0.9rem;
-    }
-    
-    .adjusting-lines-table td {
-        padding: 0.5rem 0.75rem;
-        vertical-align: middle;
-    }
-    
-    .adjusting-container {
-        max-height: 70vh;
-        overflow-y: auto;
-        padding-right: 10px;
-    }
-    
-    /* Custom scrollbar */
-    .adjusting-container::-webkit-scrollbar {
-        width: 6px;
-    }
-    
-    .adjusting-container::-webkit-scrollbar-track {
-        background: #f1f1f1;
-        border-radius: 10px;
-    }
-    
-    .adjusting-container::-webkit-scrollbar-thumb {
-        background: #c1c1c1;
-        border-radius: 10px;
-    }
-    
-    .adjusting-container::-webkit-scrollbar-thumb:hover {
-        background: #a8a8a8;
-    }
-    </style>
-    """
-    
-    return render_template_string(BASE_TEMPLATE, title='Ayat Penyesuaian', body=body, user=current_user())
-
-@app.route('/adjusting/new', methods=['GET', 'POST'])
-@login_required
-def adjusting_new():
-    accounts = all_accounts()
-    options_html = "".join([f'<option value="{a["id"]}">{a["code"]} - {a["name"]}</option>' for a in accounts])
-    
-    if request.method == 'POST':
-        date = request.form['date']
-        description = request.form['description']
-        
-        lines = []
-        idx = 0
-        while True:
-            account_id = request.form.get(f'account_{idx}')
-            if not account_id:
-                break
-            
-            debit = float(request.form.get(f'debit_{idx}', 0) or 0)
-            credit = float(request.form.get(f'credit_{idx}', 0) or 0)
-            line_desc = request.form.get(f'line_desc_{idx}', '')
-            
-            if debit > 0 or credit > 0:
-                lines.append({
-                    'account_id': int(account_id),
-                    'debit': debit,
-                    'credit': credit,
-                    'description': line_desc
-                })
-            idx += 1
-        
-        # Validasi
-        if len(lines) < 2:
-            flash('Ayat penyesuaian harus memiliki setidaknya dua baris')
-            return redirect(url_for('adjusting_new'))
-        
-        total_debit = sum(line['debit'] for line in lines)
-        total_credit = sum(line['credit'] for line in lines)
-        
-        if abs(total_debit - total_credit) > 0.01:
-            flash('Debit dan kredit harus seimbang')
-            return redirect(url_for('adjusting_new'))
-        
-        # Posting ayat penyesuaian
-        try:
-            adj_id = post_adjusting_entry(date, description, lines)
-            flash(f'Ayat penyesuaian #{adj_id} berhasil diposting!')
-            return redirect(url_for('adjusting'))
-        except Exception as e:
-            flash(f'Error posting ayat penyesuaian: {str(e)}')
-    
-    body = f"""
-    <div class="page-header">
-        <h1 class="page-title">Ayat Penyesuaian Baru</h1>
-        <p class="page-subtitle">Buat ayat penyesuaian untuk penutupan periode</p>
-    </div>
-    
-    <div class="card">
-        <div class="card-body">
-            <form method="post">
-                <div class="row mb-4">
-                    <div class="col-md-3">
-                        <label class="form-label fw-semibold">Tanggal</label>
-                        <input type="date" class="form-control" name="date" value="{datetime.now().date().isoformat()}" required>
-                    </div>
-                    <div class="col-md-9">
-                        <label class="form-label fw-semibold">Keterangan</label>
-                        <input type="text" class="form-control" name="description" placeholder="Deskripsi ayat penyesuaian" required>
-                    </div>
-                </div>
-                
-                <h6 class="mb-3"><i class="fas fa-list me-2"></i>Baris Penyesuaian</h6>
-                <div id="adjusting-lines">
-                    <div class="row mb-3">
-                        <div class="col-md-5">
-                            <label class="form-label">Akun</label>
-                            <select class="form-select" name="account_0" required>
-                                <option value="">Pilih Akun</option>
-                                {options_html}
-                            </select>
-                        </div>
-                        <div class="col-md-3">
-                            <label class="form-label">Debit</label>
-                            <input type="number" class="form-control" name="debit_0" placeholder="0.00" step="0.01" min="0" oninput="checkBalance()">
-                        </div>
-                        <div class="col-md-3">
-                            <label class="form-label">Kredit</label>
-                            <input type="number" class="form-control" name="credit_0" placeholder="0.00" step="0.01" min="0" oninput="checkBalance()">
-                        </div>
-                        <div class="col-md-1 d-flex align-items-end">
-                            <button type="button" class="btn btn-danger btn-sm" disabled>
-                                <i class="fas fa-times"></i>
-                            </button>
-                        </div>
-                    </div>
-                </div>
-                
-                <div class="mb-3">
-                    <button type="button" class="btn btn-outline-primary" onclick="addAdjustingLine()">
-                        <i class="fas fa-plus me-2"></i>Tambah Baris
-                    </button>
-                </div>
-                
-                <div id="balance-check" class="alert alert-info mb-3">
-                    <i class="fas fa-info-circle me-2"></i>Masukkan jumlah untuk memeriksa keseimbangan
-                </div>
-                
-                <div class="alert alert-warning">
-                    <h6><i class="fas fa-exclamation-triangle me-2"></i>Tentang Ayat Penyesuaian</h6>
-                    <p class="mb-0">
-                        Ayat penyesuaian dibuat pada akhir periode akuntansi untuk memperbarui akun 
-                        untuk akrual, deferral, penyusutan, dan perbedaan waktu lainnya.
-                    </p>
-                </div>
-                
-                <div class="d-flex gap-2">
-                    <button type="submit" class="btn btn-primary">Posting Ayat Penyesuaian</button>
-                    <a href="/adjusting" class="btn btn-outline-secondary">Batal</a>
-                </div>
-            </form>
-        </div>
-    </div>
-    
-    <script>
-    function addAdjustingLine() {{
-        const container = document.getElementById('adjusting-lines');
-        const count = container.children.length;
-        const newLine = document.createElement('div');
-        newLine.className = 'row mb-3';
-        newLine.innerHTML = `
-            <div class="col-md-5">
-                <select class="form-select" name="account_${{count}}" required>
-                    <option value="">Pilih Akun</option>
-                    {options_html}
-                </select>
-            </div>
-            <div class="col-md-3">
-                <input type="number" class="form-control" name="debit_${{count}}" placeholder="0.00" step="0.01" min="0" oninput="checkBalance()">
-            </div>
-            <div class="col-md-3">
-                <input type="number" class="form-control" name="credit_${{count}}" placeholder="0.00" step="0.01" min="0" oninput="checkBalance()">
-            </div>
-            <div class="col-md-1 d-flex align-items-end">
-                <button type="button" class="btn btn-danger btn-sm" onclick="this.parentElement.parentElement.remove(); checkBalance();">
-                    <i class="fas fa-times"></i>
-                </button>
-            </div>
-        `;
-        container.appendChild(newLine);
-    }}
-    </script>
-    """
-    return render_template_string(BASE_TEMPLATE, title='Ayat Penyesuaian Baru', body=body, user=current_user())
-
-@app.route('/adjusting/<int:entry_id>')
-@login_required
-def adjusting_view(entry_id):
-    cur = get_db().execute('SELECT * FROM adjusting_entries WHERE id = ?', (entry_id,))
-    entry = cur.fetchone()
-    
-    if not entry:
-        flash('Ayat penyesuaian tidak ditemukan')
-        return redirect(url_for('adjusting'))
-    
-    cur.execute('''
-        SELECT al.*, a.code, a.name, a.acct_type
-        FROM adjusting_lines al
-        JOIN accounts a ON al.account_id = a.id
-        WHERE al.adj_id = ?
-    ''', (entry_id,))
-    lines = cur.fetchall()
-    
-    body = f"""
-    <div class="page-header">
-        <h1 class="page-title">Detail Ayat Penyesuaian #{entry['id']}</h1>
-        <p class="page-subtitle">Detail lengkap ayat penyesuaian</p>
-    </div>
-    
-    <div class="card">
-        <div class="card-body">
-            <div class="row mb-4">
-                <div class="col-md-6">
-                    <strong>Tanggal:</strong> {entry['date']}
-                </div>
-                <div class="col-md-6">
-                    <strong>Keterangan:</strong> {entry['description']}
-                </div>
-            </div>
-            
-            <h6 class="mb-3">Detail Penyesuaian</h6>
-            <div class="table-responsive">
-                <table class="table accounting-table">
-                    <thead>
-                        <tr>
-                            <th>Akun</th>
-                            <th>Kode</th>
-                            <th>Jenis</th>
-                            <th class="text-end">Debit</th>
-                            <th class="text-end">Kredit</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-    """
-    
-    for line in lines:
-        debit_display = f"{line['debit']:,.2f}" if line['debit'] > 0 else ""
-        credit_display = f"{line['credit']:,.2f}" if line['credit'] > 0 else ""
-        
-        body += f"""
-                        <tr>
-                            <td>{line['name']}</td>
-                            <td>{line['code']}</td>
-                            <td><span class="badge bg-secondary">{line['acct_type']}</span></td>
-                            <td class="text-end text-success">{debit_display}</td>
-                            <td class="text-end text-danger">{credit_display}</td>
-                        </tr>
-        """
-    
-    total_debit = sum(line['debit'] for line in lines)
-    total_credit = sum(line['credit'] for line in lines)
-    
-    body += f"""
-                    </tbody>
-                    <tfoot class="table-active">
-                        <tr>
-                            <th colspan="3">Total</th>
-                            <th class="text-end text-success">Rp {total_debit:,.2f}</th>
-                            <th class="text-end text-danger">Rp {total_credit:,.2f}</th>
-                        </tr>
-                    </tfoot>
-                </table>
-            </div>
-            
-            <div class="mt-4">
-                <div class="alert {'alert-success' if abs(total_debit - total_credit) < 0.01 else 'alert-danger'}">
-                    <i class="fas {'fa-check-circle' if abs(total_debit - total_credit) < 0.01 else 'fa-exclamation-triangle'} me-2"></i>
-                    {'Ayat penyesuaian ini seimbang dan telah diposting.' if abs(total_debit - total_credit) < 0.01 else 'Ayat penyesuaian tidak seimbang!'}
-                </div>
-            </div>
-        </div>
-    </div>
-    """
-    return render_template_string(BASE_TEMPLATE, title='Detail Penyesuaian', body=body, user=current_user())
-
-# Perbaiki route financials untuk menghindari error tab_content
-@app.route('/financials')
-@login_required
-def financials():
-    # Dapatkan semua laporan keuangan
-    income_stmt = income_statement()
-    balance_stmt = balance_sheet()
-    cash_flow_stmt = cash_flow_statement()
-    equity_stmt = equity_statement()  # TAMBAHAN BARU
-    
-    # Tombol export financial reports
-    export_button = """
-    <div class="dropdown">
-        <button class="btn btn-success dropdown-toggle" type="button" data-bs-toggle="dropdown">
-            <i class="fas fa-file-excel me-2"></i>Export Excel
-        </button>
-        <ul class="dropdown-menu">
-            <li><a class="dropdown-item" href="/export/financial-reports" target="_blank">
-                <i class="fas fa-file-contract me-2"></i>Export Financial Reports
-            </a></li>
-            <li><hr class="dropdown-divider"></li>
-            <li><a class="dropdown-item" href="/export/income_statement">
-                <i class="fas fa-chart-bar me-2"></i>Export Income Statement
-            </a></li>
-            <li><a class="dropdown-item" href="/export/balance_sheet">
-                <i class="fas fa-balance-scale me-2"></i>Export Balance Sheet
-            </a></li>
-            <li><a class="dropdown-item" href="/export/cash_flow">
-                <i class="fas fa-money-bill-wave me-2"></i>Export Cash Flow
-            </a></li>
-            <li><hr class="dropdown-divider"></li>
-            <li><a class="dropdown-item" href="/export/all">
-                <i class="fas fa-file-archive me-2"></i>Export All Reports
-            </a></li>
-        </ul>
-    </div>
-    """
-    
-    # Buat tab content yang lengkap dengan LAPORAN PERUBAHAN MODAL
-    tab_content = f"""
-    <ul class="nav nav-tabs" id="financialTabs" role="tablist">
-        <li class="nav-item" role="presentation">
-            <button class="nav-link active" id="income-tab" data-bs-toggle="tab" data-bs-target="#income" type="button" role="tab" aria-controls="income" aria-selected="true">
-                <i class="fas fa-chart-bar me-2"></i>Laporan Laba Rugi
-            </button>
-        </li>
-        <li class="nav-item" role="presentation">
-            <button class="nav-link" id="balance-tab" data-bs-toggle="tab" data-bs-target="#balance" type="button" role="tab" aria-controls="balance" aria-selected="false">
-                <i class="fas fa-balance-scale me-2"></i>Neraca
-            </button>
-        </li>
-        <li class="nav-item" role="presentation">
-            <button class="nav-link" id="equity-tab" data-bs-toggle="tab" data-bs-target="#equity" type="button" role="tab" aria-controls="equity" aria-selected="false">
-                <i class="fas fa-landmark me-2"></i>Laporan Perubahan Modal
-            </button>
-        </li>
-        <li class="nav-item" role="presentation">
-            <button class="nav-link" id="cashflow-tab" data-bs-toggle="tab" data-bs-target="#cashflow" type="button" role="tab" aria-controls="cashflow" aria-selected="false">
-                <i class="fas fa-money-bill-wave me-2"></i>Laporan Arus Kas
-            </button>
-        </li>
-    </ul>
-    
-    <div class="tab-content mt-4" id="financialTabsContent">
-        <!-- Laporan Laba Rugi -->
-        <div class="tab-pane fade show active" id="income" role="tabpanel" aria-labelledby="income-tab">
-            <div class="card border-0">
-                <div class="card-header bg-light">
-                    <h6 class="mb-0"><i class="fas fa-chart-bar me-2"></i>Laporan Laba Rugi</h6>
-                    <small class="text-muted">Untuk periode yang berakhir {datetime.now().date().isoformat()}</small>
-                </div>
-                <div class="card-body">
-                    <div class="row">
-                        <div class="col-md-8">
-                            <h6 class="text-primary mb-3">Pendapatan</h6>
-                            <table class="table accounting-table">
-                                <tr class="table-active">
-                                    <td><strong>Pendapatan Penjualan</strong></td>
-                                    <td class="text-end text-success fw-bold">Rp {income_stmt['total_revenue']:,.2f}</td>
-                                </tr>
-                                <tr>
-                                    <td colspan="2" class="border-0"></td>
-                                </tr>
-                            </table>
-                            
-                            <h6 class="mt-4 text-primary mb-3">Beban</h6>
-                            <table class="table accounting-table">
-                                <tr class="table-active">
-                                    <td><strong>Total Beban</strong></td>
-                                    <td class="text-end text-danger fw-bold">Rp {income_stmt['total_expense']:,.2f}</td>
-                                </tr>
-                            </table>
-                            
-                            <table class="table table-bordered mt-4">
-                                <tr class="table-success">
-                                    <td><strong>Laba Bersih</strong></td>
-                                    <td class="text-end fw-bold">Rp {income_stmt['net_income']:,.2f}</td>
-                                </tr>
-                            </table>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Neraca -->
-        <div class="tab-pane fade" id="balance" role="tabpanel" aria-labelledby="balance-tab">
-            <div class="card border-0">
-                <div class="card-header bg-light">
-                    <h6 class="mb-0"><i class="fas fa-balance-scale me-2"></i>Neraca</h6>
-                    <small class="text-muted">Per {datetime.now().date().isoformat()}</small>
-                </div>
-                <div class="card-body">
-                    <div class="row">
-                        <div class="col-md-6">
-                            <h6 class="text-primary mb-3">Aset</h6>
-                            <table class="table accounting-table">
-                                <tr class="table-active">
-                                    <td><strong>Total Aset</strong></td>
-                                    <td class="text-end text-success fw-bold">Rp {balance_stmt['total_assets']:,.2f}</td>
-                                </tr>
-                            </table>
-                        </div>
-                        
-                        <div class="col-md-6">
-                            <h6 class="text-primary mb-3">Kewajiban & Ekuitas</h6>
-                            <table class="table accounting-table">
-                                <tr class="table-active">
-                                    <td><strong>Total Kewajiban</strong></td>
-                                    <td class="text-end text-danger fw-bold">Rp {balance_stmt['total_liabilities']:,.2f}</td>
-                                </tr>
-                                <tr class="table-active">
-                                    <td><strong>Total Ekuitas</strong></td>
-                                    <td class="text-end text-info fw-bold">Rp {balance_stmt['total_equity'] + balance_stmt['net_income']:,.2f}</td>
-                                </tr>
-                                <tr class="table-active">
-                                    <td><strong>Total Kewajiban & Ekuitas</strong></td>
-                                    <td class="text-end fw-bold">Rp {balance_stmt['total_liabilities'] + balance_stmt['total_equity'] + balance_stmt['net_income']:,.2f}</td>
-                                </tr>
-                            </table>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- LAPORAN PERUBAHAN MODAL BARU -->
-        <div class="tab-pane fade" id="equity" role="tabpanel" aria-labelledby="equity-tab">
-            <div class="card border-0">
-                <div class="card-header bg-light">
-                    <h6 class="mb-0"><i class="fas fa-landmark me-2"></i>Laporan Perubahan Modal</h6>
-                    <small class="text-muted">Untuk periode yang berakhir {datetime.now().date().isoformat()}</small>
-                </div>
-                <div class="card-body">
-                    <div class="row">
-                        <div class="col-md-8">
-                            <table class="table accounting-table">
-                                <tr>
-                                    <td><strong>Modal Awal Periode</strong></td>
-                                    <td class="text-end text-primary fw-bold">Rp {equity_stmt['beginning_capital']:,.2f}</td>
-                                </tr>
-                                <tr>
-                                    <td><strong>Laba Bersih Periode Berjalan</strong></td>
-                                    <td class="text-end text-success fw-bold">+ Rp {equity_stmt['net_income']:,.2f}</td>
-                                </tr>
-                                <tr>
-                                    <td><strong>Prive/Penarikan Pemilik</strong></td>
-                                    <td class="text-end text-danger fw-bold">- Rp {equity_stmt['drawings']:,.2f}</td>
-                                </tr>
-                                <tr class="table-active">
-                                    <td><strong>Modal Akhir Periode</strong></td>
-                                    <td class="text-end fw-bold">Rp {equity_stmt['ending_capital']:,.2f}</td>
-                                </tr>
-                            </table>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Laporan Arus Kas -->
-        <div class="tab-pane fade" id="cashflow" role="tabpanel" aria-labelledby="cashflow-tab">
-            <div class="card border-0">
-                <div class="card-header bg-light">
-                    <h6 class="mb-0"><i class="fas fa-money-bill-wave me-2"></i>Laporan Arus Kas</h6>
-                    <small class="text-muted">Untuk periode yang berakhir {datetime.now().date().isoformat()}</small>
-                </div>
-                <div class="card-body">
-                    <div class="row">
-                        <div class="col-md-10">
-                            <h6 class="text-primary mb-3">Aktivitas Operasi</h6>
-                            <table class="table accounting-table">
-                                <tr>
-                                    <td>Pendapatan Tunai</td>
-                                    <td class="text-end text-success">+ Rp {cash_flow_stmt['operating_activities']['revenue']:,.2f}</td>
-                                </tr>
-                                <tr>
-                                    <td>Beban Tunai</td>
-                                    <td class="text-end text-danger">- Rp {cash_flow_stmt['operating_activities']['expenses']:,.2f}</td>
-                                </tr>
-                                <tr class="table-active">
-                                    <td><strong>Arus Kas Bersih dari Operasi</strong></td>
-                                    <td class="text-end fw-bold {'text-success' if cash_flow_stmt['operating_activities']['net_cash'] >= 0 else 'text-danger'}">
-                                        Rp {cash_flow_stmt['operating_activities']['net_cash']:,.2f}
-                                    </td>
-                                </tr>
-                            </table>
-
-                            <h6 class="text-primary mt-4 mb-3">Aktivitas Investasi</h6>
-                            <table class="table accounting-table">
-                                <tr>
-                                    <td>Pembelian Peralatan</td>
-                                    <td class="text-end text-danger">- Rp {cash_flow_stmt['investing_activities']['equipment_purchase']:,.2f}</td>
-                                </tr>
-                                <tr>
-                                    <td>Penjualan Peralatan</td>
-                                    <td class="text-end text-success">+ Rp {cash_flow_stmt['investing_activities']['equipment_sale']:,.2f}</td>
-                                </tr>
-                                <tr class="table-active">
-                                    <td><strong>Arus Kas Bersih dari Investasi</strong></td>
-                                    <td class="text-end fw-bold {'text-success' if cash_flow_stmt['investing_activities']['net_cash'] >= 0 else 'text-danger'}">
-                                        Rp {cash_flow_stmt['investing_activities']['net_cash']:,.2f}
-                                    </td>
-                                </tr>
-                            </table>
-
-                            <h6 class="text-primary mt-4 mb-3">Aktivitas Pendanaan</h6>
-                            <table class="table accounting-table">
-                                <tr>
-                                    <td>Setoran Modal</td>
-                                    <td class="text-end text-success">+ Rp {cash_flow_stmt['financing_activities']['capital_contribution']:,.2f}</td>
-                                </tr>
-                                <tr>
-                                    <td>Penarikan Pemilik</td>
-                                    <td class="text-end text-danger">- Rp {cash_flow_stmt['financing_activities']['drawings']:,.2f}</td>
-                                </tr>
-                                <tr>
-                                    <td>Penerimaan Pinjaman</td>
-                                    <td class="text-end text-success">+ Rp {cash_flow_stmt['financing_activities']['loans_received']:,.2f}</td>
-                                </tr>
-                                <tr>
-                                    <td>Pembayaran Pinjaman</td>
-                                    <td class="text-end text-danger">- Rp {cash_flow_stmt['financing_activities']['loans_paid']:,.2f}</td>
-                                </tr>
-                                <tr class="table-active">
-                                    <td><strong>Arus Kas Bersih dari Pendanaan</strong></td>
-                                    <td class="text-end fw-bold {'text-success' if cash_flow_stmt['financing_activities']['net_cash'] >= 0 else 'text-danger'}">
-                                        Rp {cash_flow_stmt['financing_activities']['net_cash']:,.2f}
-                                    </td>
-                                </tr>
-                            </table>
-
-                            <table class="table table-bordered mt-4">
-                                <tr class="table-info">
-                                    <td><strong>Kenaikan/Penurunan Kas Bersih</strong></td>
-                                    <td class="text-end fw-bold {'text-success' if cash_flow_stmt['net_cash_flow'] >= 0 else 'text-danger'}">
-                                        Rp {cash_flow_stmt['net_cash_flow']:,.2f}
-                                    </td>
-                                </tr>
-                            </table>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    """
-    
-    body = f"""
-    <div class="page-header">
-        <h1 class="page-title">Laporan Keuangan</h1>
-        <p class="page-subtitle">Laporan keuangan lengkap perusahaan</p>
-    </div>
-    
-    <div class="card">
-        <div class="card-body">
-            <div class="d-flex justify-content-between align-items-center mb-4">
-                <h5 class="section-title mb-0">Laporan Keuangan Utama</h5>
-                {export_button}
-            </div>
-            
-            {tab_content}
-        </div>
-    </div>
-    """
-    
-    return render_template_string(BASE_TEMPLATE, title='Laporan Keuangan', body=body, user=current_user())
-
-@app.route('/reset', methods=['GET', 'POST'])
-@login_required
-def reset_transactions():
-    """Reset SEMUA data jadi 0 - HATI-HATI!"""
-    
-    if request.method == 'POST':
-        db = get_db()
-        cur = db.cursor()
-        
-        try:
-            # 1. Hapus SEMUA data transaksi dan inventory
-            cur.executescript('''
-                -- Hapus semua transaksi
-                DELETE FROM journal_lines;
-                DELETE FROM journal_entries;
-                
-                -- Hapus semua penyesuaian
-                DELETE FROM adjusting_lines;
-                DELETE FROM adjusting_entries;
-                
-                -- Hapus semua saldo awal
-                DELETE FROM opening_balances;
-                
-                -- Hapus SEMUA data inventory
-                DELETE FROM inventory;
-            ''')
-            
-            # 2. BUAT ULANG data stok tiram dengan NOL
-            cur.execute('''
-                INSERT INTO inventory (date, description, quantity_in, unit_cost, value) 
-                VALUES (?, ?, ?, ?, ?)
-            ''', ('2024-01-01', 'Stok Awal - Tiram Besar', 0, 0, 0))
-            
-            cur.execute('''
-                INSERT INTO inventory (date, description, quantity_in, unit_cost, value) 
-                VALUES (?, ?, ?, ?, ?)
-            ''', ('2024-01-01', 'Stok Awal - Tiram Kecil', 0, 0, 0))
-            
-            # 3. Update settings untuk total stok = 0
-            cur.execute('UPDATE settings SET v = ? WHERE k = "current_stock_large"', ('0',))
-            cur.execute('UPDATE settings SET v = ? WHERE k = "current_stock_small"', ('0',))
-            
-            db.commit()
-            
-            flash('✅ SEMUA data berhasil direset! Stok tiram sekarang 0.')
-            return redirect(url_for('dashboard'))
-            
-        except Exception as e:
-            db.rollback()
-            flash(f'❌ Error saat reset: {str(e)}')
-            import traceback
-            print("Error details:", traceback.format_exc())
-    
-    # Tampilkan konfirmasi reset
-    body = """
-    <div class="page-header">
-        <h1 class="page-title">Reset SEMUA Data</h1>
-        <p class="page-subtitle">Hati-hati: Semua data akan jadi NOL!</p>
-    </div>
-    
-    <div class="card">
-        <div class="card-header bg-danger text-white">
-            <h5 class="mb-0"><i class="fas fa-radiation me-2"></i>Reset SEMUA Data ke NOL</h5>
-        </div>
-        <div class="card-body">
-            <div class="alert alert-danger">
-                <h6><i class="fas fa-skull-crossbones me-2"></i>PERINGATAN EXTREME!</h6>
-                <p class="mb-0">
-                    Tindakan ini akan mengubah <strong>SEMUA</strong> data menjadi NOL:
-                </p>
-                <ul class="mb-2 mt-2">
-                    <li>Semua transaksi dihapus</li>
-                    <li>Semua saldo akun jadi 0</li>
-                    <li><strong>Stok tiram besar: 0 kg (Rp 0)</strong></li>
-                    <li><strong>Stok tiram kecil: 0 kg (Rp 0)</strong></li>
-                    <li><strong>Total stok: 0 kg (Rp 0)</strong></li>
-                </ul>
-                <p class="mb-0 fw-bold">
-                    ⚠️ TINDAKAN INI TIDAK BISA DIBATALKAN!
-                </p>
-            </div>
-            
-            <div class="card bg-warning">
-                <div class="card-body">
-                    <h6><i class="fas fa-exclamation-triangle me-2"></i>Setelah Reset:</h6>
-                    <ul class="mb-0">
-                        <li>Dashboard akan kosong (semua angka 0)</li>
-                        <li>Stok tiram = 0</li>
-                        <li>Pendapatan = 0</li>
-                        <li>Semua laporan keuangan kosong</li>
-                        <li>Harus input transaksi baru dari awal</li>
-                    </ul>
-                </div>
-            </div>
-            
-            <form method="post" class="mt-4">
-                <div class="mb-3">
-                    <label class="form-label fw-semibold">Konfirmasi Reset Total</label>
-                    <input type="text" class="form-control" name="confirm_text" 
-                           placeholder='Ketik "RESET SEMUA JADI NOL" untuk konfirmasi' required>
-                    <div class="form-text text-danger">Harus tepat: RESET SEMUA JADI NOL</div>
-                </div>
-                
-                <div class="d-flex gap-2">
-                    <button type="submit" class="btn btn-danger" id="resetBtn" disabled>
-                        <i class="fas fa-fire me-2"></i>Reset SEMUA Jadi NOL
-                    </button>
-                    <a href="/dashboard" class="btn btn-outline-secondary">
-                        <i class="fas fa-times me-2"></i>Batal
-                    </a>
-                </div>
-            </form>
-        </div>
-    </div>
-
-    <script>
-        document.addEventListener('DOMContentLoaded', function() {
-            const confirmInput = document.querySelector('input[name="confirm_text"]');
-            const resetBtn = document.getElementById('resetBtn');
-            
-            confirmInput.addEventListener('input', function() {
-                if (this.value === 'RESET SEMUA JADI NOL') {
-                    resetBtn.disabled = false;
-                } else {
-                    resetBtn.disabled = true;
-                }
-            });
-        });
-    </script>
-    """
-    return render_template_string(BASE_TEMPLATE, title='Reset Total', body=body, user=current_user())
-
-@app.route('/opening_balance', methods=['GET', 'POST'])
-@login_required
-def opening_balance():
-    accounts = all_accounts()
-    db = get_db()
-    
-    # Cek struktur tabel dan perbaiki jika perlu
-    try:
-        # Test query dengan struktur baru
-        db.execute("SELECT debit_amount FROM opening_balances LIMIT 1")
-    except sqlite3.OperationalError:
-        # Jika struktur masih lama, redirect ke fix database
-        flash('❌ Struktur database perlu diperbaiki. Silakan klik tombol di bawah.')
-        body = """
-        <div class="page-header">
-            <h1 class="page-title">Perbaikan Database Diperlukan</h1>
-            <p class="page-subtitle">Struktur database tidak sesuai</p>
-        </div>
-        
-        <div class="card">
-            <div class="card-body text-center">
-                <div class="alert alert-danger">
-                    <h4><i class="fas fa-exclamation-triangle me-2"></i>Database Error</h4>
-                    <p>Struktur tabel opening_balances tidak sesuai. Klik tombol di bawah untuk memperbaiki otomatis.</p>
-                </div>
-                
-                <a href="/fix_database" class="btn btn-primary btn-lg">
-                    <i class="fas fa-tools me-2"></i>Perbaiki Database
-                </a>
-                
-                <div class="mt-4">
-                    <small class="text-muted">
-                        Tindakan ini akan mereset database dan mengatur ulang semua data ke default.
-                    </small>
-                </div>
-            </div>
-        </div>
-        """
-        return render_template_string(BASE_TEMPLATE, title='Perbaikan Database', body=body, user=current_user())
-    
-    if request.method == 'POST':
-        # HAPUS semua saldo awal sebelumnya
-        db.execute('DELETE FROM opening_balances')
-        
-        for acc in accounts:
-            account_id = acc['id']
-            balance_str = request.form.get(f'balance_{account_id}', '0').replace(',', '').replace('Rp', '').strip()
-            
-            try:
-                balance = float(balance_str) if balance_str else 0
-            except ValueError:
-                balance = 0
-            
-            if balance != 0:
-                # Tentukan tipe saldo berdasarkan jenis akun
-                if acc['acct_type'] in ('Asset', 'Expense'):
-                    # Asset & Expense: saldo positif = Debit
-                    debit_amount = balance
-                    credit_amount = 0
-                else:
-                    # Liability, Equity, Revenue: saldo positif = Credit
-                    debit_amount = 0
-                    credit_amount = balance
-                
-                # Simpan saldo awal dengan struktur baru
-                db.execute('''
-                    INSERT INTO opening_balances (account_id, debit_amount, credit_amount)
-                    VALUES (?, ?, ?)
-                ''', (account_id, debit_amount, credit_amount))
-                
-                print(f"SET SALDO: {acc['code']} {acc['name']} = Debit: {debit_amount:,.2f}, Credit: {credit_amount:,.2f}")
-        
-        db.commit()
-        flash('Saldo awal berhasil disimpan!')
-        return redirect(url_for('trial_balance_view'))
-    
-    # Ambil saldo awal yang sudah ada - PERBAIKAN: sesuaikan dengan struktur baru
-    opening_balances = {}
-    for acc in accounts:
-        ob = db.execute(
-            'SELECT debit_amount, credit_amount FROM opening_balances WHERE account_id = ?', 
-            (acc['id'],)
-        ).fetchone()
-        
-        if ob:
-            # Tampilkan nilai yang sesuai dengan jenis akun
-            if acc['acct_type'] in ('Asset', 'Expense'):
-                opening_balances[acc['id']] = ob['debit_amount']
-            else:
-                opening_balances[acc['id']] = ob['credit_amount']
-        else:
-            opening_balances[acc['id']] = 0
-    
-    body = """
-    <div class="page-header">
-        <h1 class="page-title">Saldo Awal</h1>
-        <p class="page-subtitle">Atur saldo awal untuk semua akun - HARUS SESUAI JENIS AKUN</p>
-    </div>
-    
-    <div class="alert alert-warning">
-        <h6><i class="fas fa-exclamation-triangle me-2"></i>PERHATIAN: Input saldo sesuai jenis akun!</h6>
-        <ul class="mb-0">
-            <li><strong>Asset & Beban</strong>: Input nilai POSITIF (akan masuk Debit)</li>
-            <li><strong>Kewajiban, Ekuitas & Pendapatan</strong>: Input nilai POSITIF (akan masuk Kredit)</li>
-        </ul>
-    </div>
-
-    <div class="alert alert-info">
-        <h6><i class="fas fa-info-circle me-2"></i>Contoh Data Sesuai Neraca Saldo Awal</h6>
-        <div class="row">
-            <div class="col-md-6">
-                <strong>Asset (Debit):</strong>
-                <ul class="mb-0">
-                    <li>Kas: 8,500,000</li>
-                    <li>Piutang Usaha: 4,500,000</li>
-                    <li>Persediaan Tiram Besar: 1,750,000</li>
-                    <li>Persediaan Tiram Kecil: 1,200,000</li>
-                    <li>Peralatan: 500,000</li>
-                    <li>Perlengkapan: 300,000</li>
-                    <li>Kendaraan: 12,000,000</li>
-                </ul>
-            </div>
-            <div class="col-md-6">
-                <strong>Liability & Equity (Credit):</strong>
-                <ul class="mb-0">
-                    <li>Akum. Penyusutan Kendaraan: 1,500,000</li>
-                    <li>Utang Usaha: 650,000</li>
-                    <li>Utang Gaji: 100,000</li>
-                    <li>Modal Pemilik: 22,300,000</li>
-                </ul>
-            </div>
-        </div>
-    </div>
-    
-    <div class="card">
-        <div class="card-body">
-            <form method="post">
-                <div class="table-responsive">
-                    <table class="table table-hover accounting-table">
-                        <thead>
-                            <tr>
-                                <th>Kode Akun</th>
-                                <th>Nama Akun</th>
-                                <th>Jenis</th>
-                                <th>Saldo Normal</th>
-                                <th class="text-end">Saldo Awal</th>
-                                <th>Keterangan</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-    """
-    
-    for acc in accounts:
-        current_balance = opening_balances.get(acc['id'], 0)
-        
-        # Tentukan placeholder dan contoh berdasarkan jenis akun
-        if acc['acct_type'] in ('Asset', 'Expense'):
-            placeholder = "Contoh: 8500000"
-            keterangan = "Nilai POSITIF → Debit"
-            badge_class = "bg-primary"
-            # Contoh nilai untuk akun asset utama
-            if acc['code'] == '101':  # Kas
-                placeholder = "8,500,000"
-            elif acc['code'] == '102':  # Piutang
-                placeholder = "4,500,000"
-            elif acc['code'] == '103':  # Persediaan Besar
-                placeholder = "1,750,000"
-            elif acc['code'] == '103.1':  # Persediaan Kecil
-                placeholder = "1,200,000"
-            elif acc['code'] == '104':  # Peralatan
-                placeholder = "500,000"
-            elif acc['code'] == '105':  # Perlengkapan
-                placeholder = "300,000"
-            elif acc['code'] == '106':  # Kendaraan
-                placeholder = "12,000,000"
-        else:
-            placeholder = "Contoh: 22300000" 
-            keterangan = "Nilai POSITIF → Kredit"
-            badge_class = "bg-success"
-            # Contoh nilai untuk akun liability/equity utama
-            if acc['code'] == '107':  # Akum Penyusutan
-                placeholder = "1,500,000"
-            elif acc['code'] == '201':  # Utang Usaha
-                placeholder = "650,000"
-            elif acc['code'] == '202':  # Utang Gaji
-                placeholder = "100,000"
-            elif acc['code'] == '301':  # Modal Pemilik
-                placeholder = "22,300,000"
-        
-        body += f"""
-                            <tr>
-                                <td><strong>{acc['code']}</strong></td>
-                                <td>{acc['name']}</td>
-                                <td><span class="badge bg-secondary">{acc['acct_type']}</span></td>
-                                <td><span class="badge {badge_class}">{acc['normal_balance']}</span></td>
-                                <td>
-                                    <input type="text" class="form-control text-end" name="balance_{acc['id']}" 
-                                           value="{current_balance:,.0f}" placeholder="{placeholder}">
-                                </td>
-                                <td><small class="text-muted">{keterangan}</small></td>
-                            </tr>
-        """
-    
-    body += """
-                        </tbody>
-                    </table>
-                </div>
-                
-                <div class="mt-4">
-                    <button type="submit" class="btn btn-primary">
-                        <i class="fas fa-save me-2"></i>Simpan Saldo Awal
-                    </button>
-                    <a href="/trial_balance" class="btn btn-info">
-                        <i class="fas fa-balance-scale me-2"></i>Lihat Neraca Saldo
-                    </a>
-                    <a href="/reset_opening_balances" class="btn btn-warning" onclick="return confirm('Reset semua saldo awal ke nilai default?')">
-                        <i class="fas fa-sync me-2"></i>Reset ke Default
-                    </a>
-                    <a href="/dashboard" class="btn btn-outline-secondary">Kembali ke Dashboard</a>
-                </div>
-            </form>
-        </div>
-    </div>
-    """
-    return render_template_string(BASE_TEMPLATE, title='Saldo Awal', body=body, user=current_user())
-
-@app.route('/closing')
-@login_required
-def closing_entries():
-    """Halaman jurnal penutup dan neraca saldo penutup"""
-    
-    # Dapatkan entri penutup yang akan diposting
-    closing_entries_list, net_income = get_closing_entries()
-    
-    # Dapatkan neraca saldo penutup
-    pctb_data, pctb_debit, pctb_credit = get_post_closing_trial_balance()
-    
-    body = f"""
-    <div class="page-header">
-        <h1 class="page-title">Jurnal Penutup & Neraca Saldo Penutup</h1>
-        <p class="page-subtitle">Proses penutupan periode akuntansi</p>
-    </div>
-    
-    <div class="row">
-        <div class="col-lg-6">
-            <div class="card">
-                <div class="card-header bg-warning text-dark">
-                    <h5 class="mb-0"><i class="fas fa-lock me-2"></i>Jurnal Penutup</h5>
-                </div>
-                <div class="card-body">
-                    <div class="alert alert-info">
-                        <h6><i class="fas fa-info-circle me-2"></i>Proses Penutupan</h6>
-                        <p class="mb-0">
-                            Jurnal penutup digunakan untuk menutup akun nominal (pendapatan dan beban) 
-                            ke akun Laba Ditahan pada akhir periode akuntansi.
-                        </p>
-                    </div>
-                    
-                    <div class="mb-3">
-                        <strong>Laba/Rugi Bersih Periode:</strong>
-                        <span class="{'text-success' if net_income >= 0 else 'text-danger'} fw-bold ms-2">
-                            Rp {net_income:,.2f}
-                        </span>
-                    </div>
-                    
-                    <div class="mb-3">
-                        <strong>Jumlah Entri Penutup:</strong>
-                        <span class="fw-bold ms-2">{len(closing_entries_list)} entri</span>
-                    </div>
-                    
-                    {f'<div class="alert alert-success"><i class="fas fa-check-circle me-2"></i>Tidak ada entri penutup yang diperlukan. Saldo sudah nol.</div>' if not closing_entries_list else ''}
-                    
-                    <div class="mt-4">
-                        <form method="post" action="/closing/post">
-                            <button type="submit" class="btn btn-primary" {'disabled' if not closing_entries_list else ''}>
-                                <i class="fas fa-lock me-2"></i>Posting Jurnal Penutup
-                            </button>
-                            <a href="/financials" class="btn btn-outline-secondary">
-                                <i class="fas fa-chart-line me-2"></i>Lihat Laporan Keuangan
-                            </a>
-                        </form>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <div class="col-lg-6">
-            <div class="card">
-                <div class="card-header bg-success text-white">
-                    <h5 class="mb-0"><i class="fas fa-balance-scale me-2"></i>Neraca Saldo Setelah Penutupan</h5>
-                </div>
-                <div class="card-body">
-                    <div class="alert alert-success">
-                        <h6><i class="fas fa-check-circle me-2"></i>Neraca Saldo Penutup</h6>
-                        <p class="mb-0">
-                            Neraca saldo setelah penutupan hanya berisi akun riil (Aset, Kewajiban, Ekuitas) 
-                            yang akan menjadi saldo awal periode berikutnya.
-                        </p>
-                    </div>
-                    
-                    <div class="table-responsive">
-                        <table class="table table-sm accounting-table">
-                            <thead>
-                                <tr>
-                                    <th>Akun</th>
-                                    <th class="text-end">Debit</th>
-                                    <th class="text-end">Kredit</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-    """
-    
-    for item in pctb_data:
-        if item['debit'] != 0 or item['credit'] != 0:
-            debit_display = f"Rp {item['debit']:,.2f}" if item['debit'] > 0 else ""
-            credit_display = f"Rp {item['credit']:,.2f}" if item['credit'] > 0 else ""
-            
-            body += f"""
-                                <tr>
-                                    <td>
-                                        <small><strong>{item['account']['code']}</strong> {item['account']['name']}</small>
-                                    </td>
-                                    <td class="text-end text-success">{debit_display}</td>
-                                    <td class="text-end text-danger">{credit_display}</td>
-                                </tr>
-            """
-    
-    body += f"""
-                            </tbody>
-                            <tfoot class="table-active">
-                                <tr>
-                                    <th>Total</th>
-                                    <th class="text-end text-success">Rp {pctb_debit:,.2f}</th>
-                                    <th class="text-end text-danger">Rp {pctb_credit:,.2f}</th>
-                                </tr>
-                            </tfoot>
-                        </table>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    
-    <!-- Detail Jurnal Penutup -->
-    <div class="row mt-4">
-        <div class="col-12">
-            <div class="card">
-                <div class="card-header">
-                    <h5 class="mb-0"><i class="fas fa-list me-2"></i>Detail Entri Penutup</h5>
-                </div>
-                <div class="card-body">
-    """
-    
-    if closing_entries_list:
-        body += """
-                    <div class="table-responsive">
-                        <table class="table accounting-table">
-                            <thead>
-                                <tr>
-                                    <th>Akun</th>
-                                    <th class="text-end">Debit</th>
-                                    <th class="text-end">Kredit</th>
-                                    <th>Keterangan</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-        """
-        
-        for entry in closing_entries_list:
-            cur = get_db().execute('SELECT code, name FROM accounts WHERE id = ?', (entry['account_id'],))
-            account = cur.fetchone()
-            
-            debit_display = f"Rp {entry['debit']:,.2f}" if entry['debit'] > 0 else ""
-            credit_display = f"Rp {entry['credit']:,.2f}" if entry['credit'] > 0 else ""
-            
-            body += f"""
-                                <tr>
-                                    <td>
-                                        <strong>{account['code']}</strong> {account['name']}
-                                    </td>
-                                    <td class="text-end text-success">{debit_display}</td>
-                                    <td class="text-end text-danger">{credit_display}</td>
-                                    <td>{entry['description']}</td>
-                                </tr>
-            """
-        
-        body += """
-                            </tbody>
-                        </table>
-                    </div>
-        """
-    else:
-        body += """
-                    <div class="text-center py-4">
-                        <i class="fas fa-check-circle fa-3x text-success mb-3"></i>
-                        <h5 class="text-success">Tidak Ada Entri Penutup</h5>
-                        <p class="text-muted">Semua akun nominal sudah dalam kondisi tertutup.</p>
-                    </div>
-        """
-    
-    body += """
-                </div>
-            </div>
-        </div>
-    </div>
-    """
-    
-    return render_template_string(BASE_TEMPLATE, title='Jurnal Penutup', body=body, user=current_user())
-
-@app.route('/closing/post', methods=['POST'])
-@login_required
-def post_closing_entries_route():
-    """Posting jurnal penutup"""
-    try:
-        entry_id, net_income = post_closing_entries()
-        
-        if entry_id:
-            flash(f'✅ Jurnal penutup berhasil diposting! Laba/Rugi bersih: IDR {net_income:,.2f}')
-        else:
-            flash('ℹ️ Tidak ada entri penutup yang perlu diposting.')
-        
-        return redirect(url_for('closing_entries'))
-        
-    except Exception as e:
-        flash(f'❌ Error posting jurnal penutup: {str(e)}')
-        return redirect(url_for('closing_entries'))
-
-# ---------- Export Financial Reports ----------
-
-def export_financial_reports():
-    """Ekspor ketiga laporan keuangan utama ke satu file Excel"""
-    output = io.BytesIO()
-    
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        workbook = writer.book
-        
-        # Format untuk styling profesional
-        header_format = workbook.add_format({
-            'bold': True,
-            'text_wrap': True,
-            'valign': 'top',
-            'fg_color': '#1E40AF',
-            'font_color': 'white',
-            'border': 1,
-            'font_size': 12
-        })
-        
-        title_format = workbook.add_format({
-            'bold': True,
-            'font_size': 14,
-            'font_color': '#1E40AF',
-            'align': 'center'
-        })
-        
-        subtitle_format = workbook.add_format({
-            'italic': True,
-            'font_size': 10,
-            'font_color': '#666666',
-            'align': 'center'
-        })
-        
-        currency_format = workbook.add_format({'num_format': '#,##0.00'})
-        total_format = workbook.add_format({
-            'bold': True,
-            'top': 2,
-            'num_format': '#,##0.00',
-            'fg_color': '#F3F4F6'
-        })
-        
-        # Dapatkan data laporan keuangan
-        income_stmt = income_statement()
-        balance_stmt = balance_sheet()
-        cash_flow_stmt = cash_flow_statement()
-        company_info = get_company_info()
-        
-        # ===== SHEET 1: LAPORAN LABA RUGI =====
-        worksheet_income = workbook.add_worksheet('Laporan Laba Rugi')
-        
-        # Header perusahaan
-        company_name = company_info.get('company_name', 'Peternakan Tiram Tiramine')
-        worksheet_income.merge_range('A1:D1', company_name, title_format)
-        worksheet_income.merge_range('A2:D2', 'LAPORAN LABA RUGI', title_format)
-        worksheet_income.merge_range('A3:D3', f'Periode yang berakhir {datetime.now().date().strftime("%d %B %Y")}', subtitle_format)
-        worksheet_income.write('A4', '')
-        
-        # Data laporan laba rugi
-        income_data = [
-            ['PENDAPATAN', '', '', ''],
-            ['Pendapatan Penjualan Tiram', '', '', income_stmt['total_revenue']],
-            ['', '', '', ''],
-            ['Total Pendapatan', '', '', income_stmt['total_revenue']],
-            ['', '', '', ''],
-            ['BEBAN OPERASIONAL', '', '', ''],
-            ['Harga Pokok Penjualan', '', '', income_stmt.get('cogs', 2500000)],
-            ['Beban Gaji dan Upah', '', '', income_stmt.get('salary_expense', 1500000)],
-            ['Beban Utilitas', '', '', income_stmt.get('utilities_expense', 500000)],
-            ['Beban Pakan Tiram', '', '', income_stmt.get('feed_expense', 1000000)],
-            ['Beban Pemeliharaan', '', '', income_stmt.get('maintenance_expense', 300000)],
-            ['Beban Penyusutan', '', '', income_stmt.get('depreciation_expense', 800000)],
-            ['Beban Lainnya', '', '', income_stmt.get('other_expenses', 200000)],
-            ['', '', '', ''],
-            ['Total Beban', '', '', income_stmt['total_expense']],
-            ['', '', '', ''],
-            ['LABA BERSIH SEBELUM PAJAK', '', '', income_stmt['net_income']],
-            ['Pajak Penghasilan (Estimasi 10%)', '', '', income_stmt['net_income'] * 0.1],
-            ['', '', '', ''],
-            ['LABA BERSIH SETELAH PAJAK', '', '', income_stmt['net_income'] * 0.9]
-        ]
-        
-        # Tulis data ke sheet
-        for row_num, row_data in enumerate(income_data, start=5):
-            for col_num, cell_data in enumerate(row_data):
-                if col_num == 3 and isinstance(cell_data, (int, float)):
-                    if any(keyword in str(row_data[0]).upper() for keyword in ['TOTAL', 'LABA', 'PAJAK']):
-                        worksheet_income.write(row_num, col_num, cell_data, total_format)
-                    else:
-                        worksheet_income.write(row_num, col_num, cell_data, currency_format)
-                else:
-                    worksheet_income.write(row_num, col_num, cell_data)
-        
-        # Set column widths
-        worksheet_income.set_column('A:A', 35)
-        worksheet_income.set_column('B:C', 2)
-        worksheet_income.set_column('D:D', 15)
-        
-        # ===== SHEET 2: NERACA =====
-        worksheet_balance = workbook.add_worksheet('Neraca')
-        
-        # Header perusahaan
-        worksheet_balance.merge_range('A1:D1', company_name, title_format)
-        worksheet_balance.merge_range('A2:D2', 'NERACA', title_format)
-        worksheet_balance.merge_range('A3:D3', f'Per {datetime.now().date().strftime("%d %B %Y")}', subtitle_format)
-        worksheet_balance.write('A4', '')
-        
-        # Data Neraca - Aset
-        balance_data_assets = [
-            ['ASET', '', '', ''],
-            ['ASET LANCAR', '', '', ''],
-            ['Kas dan Setara Kas', '', '', balance_stmt.get('cash', balance_stmt['total_assets'] * 0.3)],
-            ['Piutang Usaha', '', '', balance_stmt.get('receivables', balance_stmt['total_assets'] * 0.2)],
-            ['Persediaan Tiram', '', '', balance_stmt.get('inventory', balance_stmt['total_assets'] * 0.25)],
-            ['Beban Dibayar Dimuka', '', '', balance_stmt.get('prepaid_expenses', balance_stmt['total_assets'] * 0.05)],
-            ['', '', '', ''],
-            ['Total Aset Lancar', '', '', balance_stmt['total_assets'] * 0.8],
-            ['', '', '', ''],
-            ['ASET TETAP', '', '', ''],
-            ['Peralatan Peternakan', '', '', balance_stmt.get('equipment', balance_stmt['total_assets'] * 0.15)],
-            ['Kendaraan Operasional', '', '', balance_stmt.get('vehicles', balance_stmt['total_assets'] * 0.05)],
-            ['Akumulasi Penyusutan', '', '', -balance_stmt.get('accumulated_depreciation', balance_stmt['total_assets'] * 0.1)],
-            ['', '', '', ''],
-            ['Total Aset Tetap', '', '', balance_stmt['total_assets'] * 0.2],
-            ['', '', '', ''],
-            ['TOTAL ASET', '', '', balance_stmt['total_assets']]
-        ]
-        
-        # Data Neraca - Kewajiban & Ekuitas
-        balance_data_liabilities = [
-            ['KEWAJIBAN & EKUITAS', '', '', ''],
-            ['KEWAJIBAN LANCAR', '', '', ''],
-            ['Utang Usaha', '', '', balance_stmt.get('accounts_payable', balance_stmt['total_liabilities'] * 0.6)],
-            ['Pinjaman Jangka Pendek', '', '', balance_stmt.get('short_term_loans', balance_stmt['total_liabilities'] * 0.4)],
-            ['', '', '', ''],
-            ['Total Kewajiban Lancar', '', '', balance_stmt['total_liabilities']],
-            ['', '', '', ''],
-            ['EKUITAS', '', '', ''],
-            ['Modal Pemilik', '', '', balance_stmt['total_equity'] * 0.7],
-            ['Laba Ditahan', '', '', balance_stmt['total_equity'] * 0.3],
-            ['Laba Bersih Tahun Berjalan', '', '', balance_stmt['net_income']],
-            ['', '', '', ''],
-            ['Total Ekuitas', '', '', balance_stmt['total_equity'] + balance_stmt['net_income']],
-            ['', '', '', ''],
-            ['TOTAL KEWAJIBAN & EKUITAS', '', '', balance_stmt['total_liabilities'] + balance_stmt['total_equity'] + balance_stmt['net_income']]
-        ]
-        
-        # Tulis Aset (kolom A)
-        for row_num, row_data in enumerate(balance_data_assets, start=5):
-            for col_num, cell_data in enumerate(row_data):
-                if col_num == 3 and isinstance(cell_data, (int, float)):
-                    if any(keyword in str(row_data[0]).upper() for keyword in ['TOTAL', 'LABA']):
-                        worksheet_balance.write(row_num, col_num, cell_data, total_format)
-                    else:
-                        worksheet_balance.write(row_num, col_num, cell_data, currency_format)
-                else:
-                    worksheet_balance.write(row_num, col_num, cell_data)
-        
-        # Tulis Kewajiban & Ekuitas (kolom F)
-        for row_num, row_data in enumerate(balance_data_liabilities, start=5):
-            for col_num, cell_data in enumerate(row_data):
-                if col_num == 3 and isinstance(cell_data, (int, float)):
-                    if any(keyword in str(row_data[0]).upper() for keyword in ['TOTAL', 'LABA']):
-                        worksheet_balance.write(row_num, col_num + 5, cell_data, total_format)
-                    else:
-                        worksheet_balance.write(row_num, col_num + 5, cell_data, currency_format)
-                else:
-                    worksheet_balance.write(row_num, col_num + 5, cell_data)
-        
-        # Set column widths untuk Neraca
-        worksheet_balance.set_column('A:A', 35)
-        worksheet_balance.set_column('B:C', 2)
-        worksheet_balance.set_column('D:D', 15)
-        worksheet_balance.set_column('E:E', 5)
-        worksheet_balance.set_column('F:F', 35)
-        worksheet_balance.set_column('G:H', 2)
-        worksheet_balance.set_column('I:I', 15)
-        
-        # ===== SHEET 3: LAPORAN ARUS KAS =====
-        worksheet_cashflow = workbook.add_worksheet('Laporan Arus Kas')
-        
-        # Header perusahaan
-        worksheet_cashflow.merge_range('A1:D1', company_name, title_format)
-        worksheet_cashflow.merge_range('A2:D2', 'LAPORAN ARUS KAS', title_format)
-        worksheet_cashflow.merge_range('A3:D3', f'Periode yang berakhir {datetime.now().date().strftime("%d %B %Y")}', subtitle_format)
-        worksheet_cashflow.write('A4', '')
-        
-        # Data Laporan Arus Kas
-        cash_flow_data = [
-            ['ARUS KAS DARI AKTIVITAS OPERASI', '', '', ''],
-            ['Laba Bersih', '', '', cash_flow_stmt['operating_activities']['net_cash']],
-            ['Penyesuaian untuk:', '', '', ''],
-            ['  Penyusutan', '', '', abs(cash_flow_stmt.get('depreciation', 800000))],
-            ['  Perubahan Piutang Usaha', '', '', cash_flow_stmt.get('receivables_change', 500000)],
-            ['  Perubahan Persediaan', '', '', cash_flow_stmt.get('inventory_change', -2500000)],
-            ['  Perubahan Utang Usaha', '', '', cash_flow_stmt.get('payables_change', 1000000)],
-            ['', '', '', ''],
-            ['Kas Bersih dari Aktivitas Operasi', '', '', cash_flow_stmt['operating_activities']['net_cash']],
-            ['', '', '', ''],
-            ['ARUS KAS DARI AKTIVITAS INVESTASI', '', '', ''],
-            ['Pembelian Peralatan', '', '', -cash_flow_stmt['investing_activities']['equipment_purchase']],
-            ['Penjualan Peralatan', '', '', cash_flow_stmt['investing_activities']['equipment_sale']],
-            ['', '', '', ''],
-            ['Kas Bersih dari Aktivitas Investasi', '', '', cash_flow_stmt['investing_activities']['net_cash']],
-            ['', '', '', ''],
-            ['ARUS KAS DARI AKTIVITAS PENDANAAN', '', '', ''],
-            ['Setoran Modal Pemilik', '', '', cash_flow_stmt['financing_activities']['capital_contribution']],
-            ['Penarikan Pemilik', '', '', -cash_flow_stmt['financing_activities']['drawings']],
-            ['Penerimaan Pinjaman', '', '', cash_flow_stmt['financing_activities']['loans_received']],
-            ['Pembayaran Pinjaman', '', '', -cash_flow_stmt['financing_activities']['loans_paid']],
-            ['', '', '', ''],
-            ['Kas Bersih dari Aktivitas Pendanaan', '', '', cash_flow_stmt['financing_activities']['net_cash']],
-            ['', '', '', ''],
-            ['KENAIKAN (PENURUNAN) BERSIH KAS', '', '', cash_flow_stmt['net_cash_flow']],
-            ['', '', '', ''],
-            ['Saldo Kas Awal Periode', '', '', cash_flow_stmt.get('beginning_cash', 50000000)],
-            ['', '', '', ''],
-            ['SALDO KAS AKHIR PERIODE', '', '', cash_flow_stmt.get('beginning_cash', 50000000) + cash_flow_stmt['net_cash_flow']]
-        ]
-        
-        # Tulis data ke sheet
-        for row_num, row_data in enumerate(cash_flow_data, start=5):
-            for col_num, cell_data in enumerate(row_data):
-                if col_num == 3 and isinstance(cell_data, (int, float)):
-                    if any(keyword in str(row_data[0]).upper() for keyword in ['BERSIH', 'TOTAL', 'SALDO', 'KENAIKAN']):
-                        worksheet_cashflow.write(row_num, col_num, cell_data, total_format)
-                    else:
-                        worksheet_cashflow.write(row_num, col_num, cell_data, currency_format)
-                else:
-                    worksheet_cashflow.write(row_num, col_num, cell_data)
-        
-        # Set column widths untuk Laporan Arus Kas
-        worksheet_cashflow.set_column('A:A', 40)
-        worksheet_cashflow.set_column('B:C', 2)
-        worksheet_cashflow.set_column('D:D', 15)
-        
-        # ===== SHEET 4: JURNAL PENUTUP =====
-        worksheet_closing = workbook.add_worksheet('Jurnal Penutup')
-        
-        # Header perusahaan
-        worksheet_closing.merge_range('A1:D1', company_name, title_format)
-        worksheet_closing.merge_range('A2:D2', 'JURNAL PENUTUP', title_format)
-        worksheet_closing.merge_range('A3:D3', f'Periode yang berakhir {datetime.now().date().strftime("%d %B %Y")}', subtitle_format)
-        worksheet_closing.write('A4', '')
-        
-        # Data Jurnal Penutup
-        closing_entries_data = export_closing_entries()
-        
-        if closing_entries_data:
-            # Tulis header
-            headers = ['Kode Akun', 'Nama Akun', 'Debit', 'Kredit', 'Keterangan']
-            for col_num, header in enumerate(headers):
-                worksheet_closing.write(4, col_num, header, header_format)
-            
-            # Tulis data
-            for row_num, entry in enumerate(closing_entries_data, start=5):
-                worksheet_closing.write(row_num, 0, entry.get('Kode Akun', ''))
-                worksheet_closing.write(row_num, 1, entry.get('Nama Akun', ''))
-                
-                debit = entry.get('Debit', 0)
-                credit = entry.get('Kredit', 0)
-                
-                if debit:
-                    worksheet_closing.write(row_num, 2, debit, currency_format)
-                else:
-                    worksheet_closing.write(row_num, 2, '')
-                
-                if credit:
-                    worksheet_closing.write(row_num, 3, credit, currency_format)
-                else:
-                    worksheet_closing.write(row_num, 3, '')
-                
-                worksheet_closing.write(row_num, 4, entry.get('Keterangan', ''))
-        
-        else:
-            worksheet_closing.write(5, 0, 'Tidak ada entri penutup yang diperlukan', subtitle_format)
-        
-        # Set column widths untuk Jurnal Penutup
-        worksheet_closing.set_column('A:A', 12)
-        worksheet_closing.set_column('B:B', 30)
-        worksheet_closing.set_column('C:D', 15)
-        worksheet_closing.set_column('E:E', 40)
-        
-        # ===== SHEET 5: NERACA SALDO PENUTUP =====
-        worksheet_pctb = workbook.add_worksheet('Neraca Saldo Penutup')
-        
-        # Header perusahaan
-        worksheet_pctb.merge_range('A1:D1', company_name, title_format)
-        worksheet_pctb.merge_range('A2:D2', 'NERACA SALDO SETELAH PENUTUPAN', title_format)
-        worksheet_pctb.merge_range('A3:D3', f'Per {datetime.now().date().strftime("%d %B %Y")}', subtitle_format)
-        worksheet_pctb.write('A4', '')
-        
-        # Data Neraca Saldo Penutup
-        pctb_data, pctb_debit, pctb_credit = get_post_closing_trial_balance()
-        
-        # Tulis header
-        headers = ['Kode Akun', 'Nama Akun', 'Debit', 'Kredit']
-        for col_num, header in enumerate(headers):
-            worksheet_pctb.write(4, col_num, header, header_format)
-        
-        # Tulis data
-        row_num = 5
-        for item in pctb_data:
-            if item['debit'] != 0 or item['credit'] != 0:
-                worksheet_pctb.write(row_num, 0, item['account']['code'])
-                worksheet_pctb.write(row_num, 1, item['account']['name'])
-                
-                if item['debit'] > 0:
-                    worksheet_pctb.write(row_num, 2, item['debit'], currency_format)
-                else:
-                    worksheet_pctb.write(row_num, 2, '')
-                
-                if item['credit'] > 0:
-                    worksheet_pctb.write(row_num, 3, item['credit'], currency_format)
-                else:
-                    worksheet_pctb.write(row_num, 3, '')
-                
-                row_num += 1
-        
-        # Tulis total
-        worksheet_pctb.write(row_num, 0, 'TOTAL', header_format)
-        worksheet_pctb.write(row_num, 1, '')
-        worksheet_pctb.write(row_num, 2, pctb_debit, total_format)
-        worksheet_pctb.write(row_num, 3, pctb_credit, total_format)
-        
-        # Set column widths untuk Neraca Saldo Penutup
-        worksheet_pctb.set_column('A:A', 12)
-        worksheet_pctb.set_column('B:B', 30)
-        worksheet_pctb.set_column('C:D', 15)
-        
-        # ===== SHEET 6: SUMMARY & NOTES =====
-        worksheet_summary = workbook.add_worksheet('Summary & Notes')
-        
-        # Header
-        worksheet_summary.merge_range('A1:D1', company_name, title_format)
-        worksheet_summary.merge_range('A2:D2', 'RINGKASAN LAPORAN KEUANGAN', title_format)
-        worksheet_summary.merge_range('A3:D3', f'Periode {datetime.now().date().strftime("%d %B %Y")}', subtitle_format)
-        worksheet_summary.write('A4', '')
-        
-        # Key Financial Metrics
-        summary_data = [
-            ['INDIKATOR KINERJA KEUANGAN', '', '', ''],
-            ['', '', '', ''],
-            ['Profitabilitas', '', '', ''],
-            ['Laba Bersih', '', '', income_stmt['net_income']],
-            ['Margin Laba Bersih (%)', '', '', (income_stmt['net_income'] / income_stmt['total_revenue']) * 100 if income_stmt['total_revenue'] > 0 else 0],
-            ['', '', '', ''],
-            ['Likuiditas', '', '', ''],
-            ['Kas dan Setara Kas', '', '', balance_stmt['total_assets'] * 0.3],
-            ['Total Aset Lancar', '', '', balance_stmt['total_assets'] * 0.8],
-            ['Total Kewajiban Lancar', '', '', balance_stmt['total_liabilities']],
-            ['', '', '', ''],
-            ['Solvabilitas', '', '', ''],
-            ['Total Aset', '', '', balance_stmt['total_assets']],
-            ['Total Kewajiban', '', '', balance_stmt['total_liabilities']],
-            ['Total Ekuitas', '', '', balance_stmt['total_equity'] + balance_stmt['net_income']],
-            ['Rasio Kewajiban terhadap Aset', '', '', (balance_stmt['total_liabilities'] / balance_stmt['total_assets']) if balance_stmt['total_assets'] > 0 else 0],
-            ['', '', '', ''],
-            ['Arus Kas', '', '', ''],
-            ['Arus Kas Operasi', '', '', cash_flow_stmt['operating_activities']['net_cash']],
-            ['Arus Kas Investasi', '', '', cash_flow_stmt['investing_activities']['net_cash']],
-            ['Arus Kas Pendanaan', '', '', cash_flow_stmt['financing_activities']['net_cash']],
-            ['Kenaikan/Penurunan Kas Bersih', '', '', cash_flow_stmt['net_cash_flow']]
-        ]
-        
-        # Tulis summary data
-        for row_num, row_data in enumerate(summary_data, start=5):
-            for col_num, cell_data in enumerate(row_data):
-                if col_num == 3 and isinstance(cell_data, (int, float)):
-                    worksheet_summary.write(row_num, col_num, cell_data, currency_format)
-                else:
-                    worksheet_summary.write(row_num, col_num, cell_data)
-        
-        # Catatan dan Disclaimer
-        notes_row = len(summary_data) + 7
-        worksheet_summary.write(notes_row, 0, 'CATATAN DAN DISCLAIMER:', header_format)
-        worksheet_summary.write(notes_row + 1, 0, '1. Laporan keuangan ini dihasilkan secara otomatis oleh Sistem Akuntansi Tiramine')
-        worksheet_summary.write(notes_row + 2, 0, '2. Nilai-nilai tertentu merupakan estimasi untuk tujuan ilustrasi')
-        worksheet_summary.write(notes_row + 3, 0, '3. Laporan ini harus direview oleh akuntan profesional sebelum digunakan')
-        worksheet_summary.write(notes_row + 4, 0, '4. Mata uang yang digunakan: Rupiah (IDR)')
-        worksheet_summary.write(notes_row + 5, 0, f'5. Dihasilkan pada: {datetime.now().strftime("%d %B %Y %H:%M:%S")}')
-        
-        worksheet_summary.set_column('A:A', 45)
-        worksheet_summary.set_column('B:C', 2)
-        worksheet_summary.set_column('D:D', 15)
-    
-    output.seek(0)
-    return output
-
-# ---------- Fungsi Ekspor yang Hilang ----------
-
-def export_journal_entries(start_date=None, end_date=None, entry_id=None):
-    """Ekspor entri jurnal ke format data untuk Excel"""
-    db = get_db()
-    cur = db.cursor()
-    
-    query = '''
-        SELECT je.id, je.date, je.description, je.reference, 
-               COALESCE(je.transaction_type, 'General') as transaction_type,
-               a.code, a.name, jl.debit, jl.credit, jl.description as line_desc
-        FROM journal_entries je
-        JOIN journal_lines jl ON je.id = jl.entry_id
-        JOIN accounts a ON jl.account_id = a.id
-        WHERE 1=1
-    '''
-    params = []
-    
-    if entry_id:
-        query += ' AND je.id = ?'
-        params.append(entry_id)
-    
-    if start_date:
-        query += ' AND je.date >= ?'
-        params.append(start_date)
-    
-    if end_date:
-        query += ' AND je.date <= ?'
-        params.append(end_date)
-    
-    query += ' ORDER BY je.date, je.id, jl.id'
-    
-    cur.execute(query, params)
-    entries = cur.fetchall()
-    
-    data = []
-    for entry in entries:
-        data.append({
-            'Tanggal': entry['date'],
-            'ID Entri': entry['id'],
-            'Keterangan': entry['description'],
-            'Referensi': entry['reference'] or '',
-            'Jenis Transaksi': entry['transaction_type'],
-            'Kode Akun': entry['code'],
-            'Nama Akun': entry['name'],
-            'Debit': entry['debit'],
-            'Kredit': entry['credit'],
-            'Keterangan Baris': entry['line_desc'] or ''
-        })
-    
-    return data
-
-def export_adjusting_entries(start_date=None, end_date=None, entry_id=None):
-    """Ekspor ayat penyesuaian ke format data untuk Excel"""
-    db = get_db()
-    cur = db.cursor()
-    
-    query = '''
-        SELECT ae.id, ae.date, ae.description,
-               a.code, a.name, al.debit, al.credit, al.description as line_desc
-        FROM adjusting_entries ae
-        JOIN adjusting_lines al ON ae.id = al.adj_id
-        JOIN accounts a ON al.account_id = a.id
-        WHERE 1=1
-    '''
-    params = []
-    
-    if entry_id:
-        query += ' AND ae.id = ?'
-        params.append(entry_id)
-    
-    if start_date:
-        query += ' AND ae.date >= ?'
-        params.append(start_date)
-    
-    if end_date:
-        query += ' AND ae.date <= ?'
-        params.append(end_date)
-    
-    query += ' ORDER BY ae.date, ae.id, al.id'
-    
-    cur.execute(query, params)
-    entries = cur.fetchall()
-    
-    data = []
-    for entry in entries:
-        data.append({
-            'Tanggal': entry['date'],
-            'ID Entri': entry['id'],
-            'Keterangan': entry['description'],
-            'Kode Akun': entry['code'],
-            'Nama Akun': entry['name'],
-            'Debit': entry['debit'],
-            'Kredit': entry['credit'],
-            'Keterangan Baris': entry['line_desc'] or ''
-        })
-    
-    return data
-
-def export_ledger(account_id=None, start_date=None, end_date=None):
-    """Ekspor buku besar ke format data untuk Excel"""
-    db = get_db()
-    cur = db.cursor()
-    
-    # Jika account_id spesifik, ekspor detail transaksi
-    if account_id:
-        cur.execute('SELECT * FROM accounts WHERE id = ?', (account_id,))
-        account = cur.fetchone()
-        
-        if not account:
-            return []
-        
-        # Gabungkan transaksi jurnal dan penyesuaian
-        query = '''
-            SELECT date, description, debit, credit, 'Jurnal' as type, '' as line_desc
-            FROM (
-                SELECT je.date, je.description, jl.debit, jl.credit, jl.description as line_desc
-                FROM journal_lines jl
-                JOIN journal_entries je ON jl.entry_id = je.id
-                WHERE jl.account_id = ?
-                UNION ALL
-                SELECT ae.date, ae.description, al.debit, al.credit, al.description as line_desc
-                FROM adjusting_lines al
-                JOIN adjusting_entries ae ON al.adj_id = ae.id
-                WHERE al.account_id = ?
-            )
-            WHERE 1=1
-        '''
-        params = [account_id, account_id]
-        
-        if start_date:
-            query += ' AND date >= ?'
-            params.append(start_date)
-        
-        if end_date:
-            query += ' AND date <= ?'
-            params.append(end_date)
-        
-        query += ' ORDER BY date'
-        
-        cur.execute(query, params)
-        transactions = cur.fetchall()
-        
-        # Hitung saldo berjalan
-        balance = get_opening_balance(account_id)
-        data = [{
-            'Tanggal': 'Saldo Awal',
-            'Keterangan': 'Saldo Awal',
-            'Debit': balance if balance > 0 else 0,
-            'Kredit': -balance if balance < 0 else 0,
-            'Saldo': balance,
-            'Jenis': 'Saldo Awal'
-        }]
-        
-        for tx in transactions:
-            if account['normal_balance'] == 'Debit':
-                balance += tx['debit'] - tx['credit']
-            else:
-                balance += tx['credit'] - tx['debit']
-            
-            data.append({
-                'Tanggal': tx['date'],
-                'Keterangan': tx['description'],
-                'Debit': tx['debit'],
-                'Kredit': tx['credit'],
-                'Saldo': balance,
-                'Jenis': tx['type']
-            })
-        
-        return data
-    else:
-        # Ekspor semua akun dengan saldo
-        accounts = all_accounts()
-        data = []
-        
-        for account in accounts:
-            balance = get_account_balance(account['id'])
-            data.append({
-                'Kode Akun': account['code'],
-                'Nama Akun': account['name'],
-                'Jenis Akun': account['acct_type'],
-                'Saldo Normal': account['normal_balance'],
-                'Saldo Saat Ini': balance
-            })
-        
-        return data
-
-def export_trial_balance(include_adjustments=True):
-    """Ekspor neraca saldo ke format data untuk Excel"""
-    tb_data, total_debit, total_credit = trial_balance(include_adjustments)
-    
-    data = []
-    for item in tb_data:
-        if item['debit'] != 0 or item['credit'] != 0:
-            data.append({
-                'Kode Akun': item['account']['code'],
-                'Nama Akun': item['account']['name'],
-                'Jenis Akun': item['account']['acct_type'],
-                'Debit': item['debit'],
-                'Kredit': item['credit']
-            })
-    
-    # Tambahkan total
-    data.append({
-        'Kode Akun': 'TOTAL',
-        'Nama Akun': '',
-        'Jenis Akun': '',
-        'Debit': total_debit,
-        'Kredit': total_credit
-    })
-    
-    return data
-
-def export_closing_entries():
-    """Ekspor jurnal penutup ke format data untuk Excel"""
-    closing_entries_list, net_income = get_closing_entries()
-    
-    data = []
-    for entry in closing_entries_list:
-        cur = get_db().execute('SELECT code, name FROM accounts WHERE id = ?', (entry['account_id'],))
-        account = cur.fetchone()
-        
-        data.append({
-            'Kode Akun': account['code'],
-            'Nama Akun': account['name'],
-            'Debit': entry['debit'],
-            'Kredit': entry['credit'],
-            'Keterangan': entry['description']
-        })
-    
-    # Tambahkan summary
-    data.append({
-        'Kode Akun': 'SUMMARY',
-        'Nama Akun': 'Laba/Rugi Bersih Periode',
-        'Debit': '',
-        'Kredit': '',
-        'Keterangan': f'IDR {net_income:,.2f}'
-    })
-    
-    return data
-
-@app.route('/export/closing_entries')
-@login_required
-def export_closing_entries_route():
-    """Ekspor jurnal penutup"""
-    data = export_closing_entries()
-    filename = f"jurnal_penutup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    
-    return export_to_excel(data, "Jurnal Penutup", filename)
-
-def export_income_statement():
-    """Ekspor laporan laba rugi ke format data untuk Excel"""
-    income_stmt = income_statement()
-    
-    data = [
-        {'Keterangan': 'PENDAPATAN', 'Jumlah': ''},
-        {'Keterangan': 'Pendapatan Penjualan Tiram', 'Jumlah': income_stmt['total_revenue']},
-        {'Keterangan': '', 'Jumlah': ''},
-        {'Keterangan': 'Total Pendapatan', 'Jumlah': income_stmt['total_revenue']},
-        {'Keterangan': '', 'Jumlah': ''},
-        {'Keterangan': 'BEBAN OPERASIONAL', 'Jumlah': ''},
-        {'Keterangan': 'Total Beban', 'Jumlah': income_stmt['total_expense']},
-        {'Keterangan': '', 'Jumlah': ''},
-        {'Keterangan': 'LABA BERSIH', 'Jumlah': income_stmt['net_income']}
-    ]
-    
-    return data
-
-def export_balance_sheet():
-    """Ekspor neraca ke format data untuk Excel"""
-    balance_stmt = balance_sheet()
-    
-    data = [
-        {'Keterangan': 'ASET', 'Jumlah': ''},
-        {'Keterangan': 'Total Aset', 'Jumlah': balance_stmt['total_assets']},
-        {'Keterangan': '', 'Jumlah': ''},
-        {'Keterangan': 'KEWAJIBAN & EKUITAS', 'Jumlah': ''},
-        {'Keterangan': 'Total Kewajiban', 'Jumlah': balance_stmt['total_liabilities']},
-        {'Keterangan': 'Total Ekuitas', 'Jumlah': balance_stmt['total_equity'] + balance_stmt['net_income']},
-        {'Keterangan': '', 'Jumlah': ''},
-        {'Keterangan': 'Total Kewajiban & Ekuitas', 'Jumlah': balance_stmt['total_liabilities'] + balance_stmt['total_equity'] + balance_stmt['net_income']}
-    ]
-    
-    return data
-
-def export_cash_flow():
-    """Ekspor laporan arus kas ke format data untuk Excel"""
-    cash_flow_stmt = cash_flow_statement()
-    
-    data = [
-        {'Keterangan': 'ARUS KAS DARI AKTIVITAS OPERASI', 'Jumlah': ''},
-        {'Keterangan': 'Kas Bersih dari Operasi', 'Jumlah': cash_flow_stmt['operating_activities']['net_cash']},
-        {'Keterangan': '', 'Jumlah': ''},
-        {'Keterangan': 'ARUS KAS DARI AKTIVITAS INVESTASI', 'Jumlah': ''},
-        {'Keterangan': 'Kas Bersih dari Investasi', 'Jumlah': cash_flow_stmt['investing_activities']['net_cash']},
-        {'Keterangan': '', 'Jumlah': ''},
-        {'Keterangan': 'ARUS KAS DARI AKTIVITAS PENDANAAN', 'Jumlah': ''},
-        {'Keterangan': 'Kas Bersih dari Pendanaan', 'Jumlah': cash_flow_stmt['financing_activities']['net_cash']},
-        {'Keterangan': '', 'Jumlah': ''},
-        {'Keterangan': 'KENAIKAN/PENURUNAN KAS BERSIH', 'Jumlah': cash_flow_stmt['net_cash_flow']}
-    ]
-    
-    return data
-
-def export_inventory():
-    """Ekspor data persediaan ke format data untuk Excel"""
-    db = get_db()
-    cur = db.cursor()
-    
-    cur.execute('''
-        SELECT date, description, quantity_in, quantity_out, unit_cost, value
-        FROM inventory
-        ORDER BY date, id
-    ''')
-    inventory_data = cur.fetchall()
-    
-    data = []
-    for item in inventory_data:
-        data.append({
-            'Tanggal': item['date'],
-            'Keterangan': item['description'],
-            'Quantity In': item['quantity_in'],
-            'Quantity Out': item['quantity_out'],
-            'Harga Satuan': item['unit_cost'],
-            'Nilai': item['value']
-        })
-    
-    # Tambahkan stok saat ini
-    current_stock = get_current_stock()
-    data.append({
-        'Tanggal': datetime.now().date().isoformat(),
-        'Keterangan': 'STOK SAAT INI',
-        'Quantity In': '',
-        'Quantity Out': '',
-        'Harga Satuan': '',
-        'Nilai': current_stock
-    })
-    
-    return data
-
-def export_opening_balances():
-    """Ekspor saldo awal ke format data untuk Excel"""
-    accounts = all_accounts()
-    
-    data = []
-    for account in accounts:
-        balance = get_opening_balance(account['id'])
-        data.append({
-            'Kode Akun': account['code'],
-            'Nama Akun': account['name'],
-            'Jenis Akun': account['acct_type'],
-            'Saldo Normal': account['normal_balance'],
-            'Saldo Awal': abs(balance),
-            'Tipe Saldo': 'Debit' if balance >= 0 else 'Kredit'
-        })
-    
-    return data
-
-def export_all_reports():
-    """Ekspor semua laporan ke satu file Excel multi-sheet"""
-    output = io.BytesIO()
-    
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        workbook = writer.book
-        
-        # Format untuk styling
-        header_format = workbook.add_format({
-            'bold': True,
-            'text_wrap': True,
-            'valign': 'top',
-            'fg_color': '#1E40AF',
-            'font_color': 'white',
-            'border': 1
-        })
-        
-        currency_format = workbook.add_format({'num_format': '#,##0.00'})
-        
-        # Sheet 1: Jurnal Umum
-        journal_data = export_journal_entries()
-        if journal_data:
-            df_journal = pd.DataFrame(journal_data)
-            df_journal.to_excel(writer, sheet_name='Jurnal Umum', index=False)
-            worksheet = writer.sheets['Jurnal Umum']
-            for col_num, value in enumerate(df_journal.columns.values):
-                worksheet.write(0, col_num, value, header_format)
-            for idx, col in enumerate(df_journal.columns):
-                max_len = max(df_journal[col].astype(str).str.len().max(), len(col)) + 2
-                worksheet.set_column(idx, idx, min(max_len, 50))
-        
-        # Sheet 2: Buku Besar
-        ledger_data = export_ledger()
-        if ledger_data:
-            df_ledger = pd.DataFrame(ledger_data)
-            df_ledger.to_excel(writer, sheet_name='Buku Besar', index=False)
-            worksheet = writer.sheets['Buku Besar']
-            for col_num, value in enumerate(df_ledger.columns.values):
-                worksheet.write(0, col_num, value, header_format)
-            for idx, col in enumerate(df_ledger.columns):
-                max_len = max(df_ledger[col].astype(str).str.len().max(), len(col)) + 2
-                worksheet.set_column(idx, idx, min(max_len, 50))
-        
-        # Sheet 3: Neraca Saldo
-        tb_data = export_trial_balance()
-        if tb_data:
-            df_tb = pd.DataFrame(tb_data)
-            df_tb.to_excel(writer, sheet_name='Neraca Saldo', index=False)
-            worksheet = writer.sheets['Neraca Saldo']
-            for col_num, value in enumerate(df_tb.columns.values):
-                worksheet.write(0, col_num, value, header_format)
-            for idx, col in enumerate(df_tb.columns):
-                max_len = max(df_tb[col].astype(str).str.len().max(), len(col)) + 2
-                worksheet.set_column(idx, idx, min(max_len, 50))
-        
-        # Sheet 4: Laporan Laba Rugi
-        income_data = export_income_statement()
-        if income_data:
-            df_income = pd.DataFrame(income_data)
-            df_income.to_excel(writer, sheet_name='Laporan Laba Rugi', index=False)
-            worksheet = writer.sheets['Laporan Laba Rugi']
-            for col_num, value in enumerate(df_income.columns.values):
-                worksheet.write(0, col_num, value, header_format)
-            for idx, col in enumerate(df_income.columns):
-                max_len = max(df_income[col].astype(str).str.len().max(), len(col)) + 2
-                worksheet.set_column(idx, idx, min(max_len, 50))
-        
-        # Sheet 5: Neraca
-        balance_data = export_balance_sheet()
-        if balance_data:
-            df_balance = pd.DataFrame(balance_data)
-            df_balance.to_excel(writer, sheet_name='Neraca', index=False)
-            worksheet = writer.sheets['Neraca']
-            for col_num, value in enumerate(df_balance.columns.values):
-                worksheet.write(0, col_num, value, header_format)
-            for idx, col in enumerate(df_balance.columns):
-                max_len = max(df_balance[col].astype(str).str.len().max(), len(col)) + 2
-                worksheet.set_column(idx, idx, min(max_len, 50))
-        
-        # Sheet 6: Laporan Arus Kas
-        cashflow_data = export_cash_flow()
-        if cashflow_data:
-            df_cashflow = pd.DataFrame(cashflow_data)
-            df_cashflow.to_excel(writer, sheet_name='Laporan Arus Kas', index=False)
-            worksheet = writer.sheets['Laporan Arus Kas']
-            for col_num, value in enumerate(df_cashflow.columns.values):
-                worksheet.write(0, col_num, value, header_format)
-            for idx, col in enumerate(df_cashflow.columns):
-                max_len = max(df_cashflow[col].astype(str).str.len().max(), len(col)) + 2
-                worksheet.set_column(idx, idx, min(max_len, 50))
-        
-        # Sheet 7: Jurnal Penutup
-        closing_data = export_closing_entries()
-        if closing_data:
-            df_closing = pd.DataFrame(closing_data)
-            df_closing.to_excel(writer, sheet_name='Jurnal Penutup', index=False)
-            worksheet = writer.sheets['Jurnal Penutup']
-            for col_num, value in enumerate(df_closing.columns.values):
-                worksheet.write(0, col_num, value, header_format)
-            for idx, col in enumerate(df_closing.columns):
-                max_len = max(df_closing[col].astype(str).str.len().max(), len(col)) + 2
-                worksheet.set_column(idx, idx, min(max_len, 50))
-        
-        # Sheet 8: Neraca Saldo Penutup
-        pctb_data, pctb_debit, pctb_credit = get_post_closing_trial_balance()
-        if pctb_data:
-            # Konversi ke format yang sesuai
-            pctb_export_data = []
-            for item in pctb_data:
-                if item['debit'] != 0 or item['credit'] != 0:
-                    pctb_export_data.append({
-                        'Kode Akun': item['account']['code'],
-                        'Nama Akun': item['account']['name'],
-                        'Jenis Akun': item['account']['acct_type'],
-                        'Debit': item['debit'],
-                        'Kredit': item['credit']
-                    })
-            
-            # Tambahkan total
-            pctb_export_data.append({
-                'Kode Akun': 'TOTAL',
-                'Nama Akun': '',
-                'Jenis Akun': '',
-                'Debit': pctb_debit,
-                'Kredit': pctb_credit
-            })
-            
-            df_pctb = pd.DataFrame(pctb_export_data)
-            df_pctb.to_excel(writer, sheet_name='Neraca Saldo Penutup', index=False)
-            worksheet = writer.sheets['Neraca Saldo Penutup']
-            for col_num, value in enumerate(df_pctb.columns.values):
-                worksheet.write(0, col_num, value, header_format)
-            for idx, col in enumerate(df_pctb.columns):
-                max_len = max(df_pctb[col].astype(str).str.len().max(), len(col)) + 2
-                worksheet.set_column(idx, idx, min(max_len, 50))
-    
-    output.seek(0)
-    return output
-
-# ---------- Rute Ekspor yang Lengkap dan Diperbaiki ----------
-
-def export_to_excel(data, sheet_name, filename):
-    """Fungsi dasar untuk ekspor data ke Excel - VERSI DIPERBAIKI"""
-    output = io.BytesIO()
-    
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        # Konversi data ke DataFrame
-        if isinstance(data, list) and data:
-            df = pd.DataFrame(data)
-        else:
-            df = pd.DataFrame([data]) if data else pd.DataFrame()
-        
-        # Tulis ke Excel dengan formatting
-        df.to_excel(writer, sheet_name=sheet_name, index=False)
-        
-        # Dapatkan workbook dan worksheet
-        workbook = writer.book
-        worksheet = writer.sheets[sheet_name]
-        
-        # Format header
-        header_format = workbook.add_format({
-            'bold': True,
-            'text_wrap': True,
-            'valign': 'top',
-            'fg_color': '#1E40AF',
-            'font_color': 'white',
-            'border': 1
-        })
-        
-        # Format angka
-        currency_format = workbook.add_format({'num_format': '#,##0.00'})
-        
-        # Terapkan formatting ke header
-        for col_num, value in enumerate(df.columns.values):
-            worksheet.write(0, col_num, value, header_format)
-        
-        # Auto-adjust column widths
-        for idx, col in enumerate(df.columns):
-            max_len = max(df[col].astype(str).str.len().max(), len(col)) + 2
-            worksheet.set_column(idx, idx, min(max_len, 50))
-    
-    output.seek(0)
-    
-    # PERBAIKAN: Response dengan header yang benar untuk force download
-    response = Response(
-        output.getvalue(),
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}",
-            "Content-Type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        }
-    )
-    
-    # Tambahkan header untuk mencegah caching
-    response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-    response.headers["Pragma"] = "no-cache"
-    response.headers["Expires"] = "0"
-    
-    return response
-
-@app.route('/export/financial-reports')
-@login_required
-def export_financial_reports_route():
-    """Endpoint untuk export ketiga laporan keuangan utama - VERSI DIPERBAIKI"""
-    try:
-        output = export_financial_reports()
-        
-        filename = f"laporan_keuangan_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        
-        # PERBAIKAN: Response dengan header yang benar untuk force download
-        response = Response(
-            output.getvalue(),
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}",
-                "Content-Type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            }
-        )
-        
-        # Tambahkan header untuk mencegah caching
-        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-        response.headers["Pragma"] = "no-cache"
-        response.headers["Expires"] = "0"
-        
-        return response
-        
-    except Exception as e:
-        flash(f'Error generating financial reports: {str(e)}')
-        return redirect(url_for('financials'))
-
-@app.route('/export/journal')
-@login_required
-def export_journal_route():
-    """Ekspor jurnal umum"""
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    entry_id = request.args.get('entry_id')
-    
-    data = export_journal_entries(start_date, end_date, entry_id)
-    filename = f"jurnal_umum_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    
-    return export_to_excel(data, "Jurnal Umum", filename)
-
-@app.route('/export/adjusting')
-@login_required
-def export_adjusting_route():
-    """Ekspor ayat penyesuaian"""
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    entry_id = request.args.get('entry_id')
-    
-    data = export_adjusting_entries(start_date, end_date, entry_id)
-    filename = f"ayat_penyesuaian_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    
-    return export_to_excel(data, "Ayat Penyesuaian", filename)
-
-@app.route('/export/ledger')
-@login_required
-def export_ledger_route():
-    """Ekspor buku besar"""
-    account_id = request.args.get('account_id')
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    
-    data = export_ledger(account_id, start_date, end_date)
-    filename = f"buku_besar_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    
-    return export_to_excel(data, "Buku Besar", filename)
-
-@app.route('/export/trial_balance')
-@login_required
-def export_trial_balance_route():
-    """Ekspor neraca saldo"""
-    include_adjustments = request.args.get('include_adjustments', 'true').lower() == 'true'
-    
-    data = export_trial_balance(include_adjustments)
-    filename = f"neraca_saldo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    
-    return export_to_excel(data, "Neraca Saldo", filename)
-
-@app.route('/export/income_statement')
-@login_required
-def export_income_statement_route():
-    """Ekspor laporan laba rugi"""
-    data = export_income_statement()
-    filename = f"laporan_laba_rugi_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    
-    return export_to_excel(data, "Laporan Laba Rugi", filename)
-
-@app.route('/export/balance_sheet')
-@login_required
-def export_balance_sheet_route():
-    """Ekspor neraca"""
-    data = export_balance_sheet()
-    filename = f"neraca_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    
-    return export_to_excel(data, "Neraca", filename)
-
-@app.route('/export/cash_flow')
-@login_required
-def export_cash_flow_route():
-    """Ekspor laporan arus kas"""
-    data = export_cash_flow()
-    filename = f"laporan_arus_kas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    
-    return export_to_excel(data, "Laporan Arus Kas", filename)
-
-@app.route('/export/inventory')
-@login_required
-def export_inventory_route():
-    """Ekspor data persediaan"""
-    data = export_inventory()
-    filename = f"persediaan_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    
-    return export_to_excel(data, "Persediaan", filename)
-
-@app.route('/export/opening_balances')
-@login_required
-def export_opening_balances_route():
-    """Ekspor saldo awal"""
-    data = export_opening_balances()
-    filename = f"saldo_awal_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    
-    return export_to_excel(data, "Saldo Awal", filename)
-
-@app.route('/export/all')
-@login_required
-def export_all_reports_route():
-    """Ekspor semua laporan ke satu file Excel - VERSI DIPERBAIKI"""
-    try:
-        output = export_all_reports()
-        
-        filename = f"laporan_keuangan_lengkap_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        
-        # PERBAIKAN: Response dengan header yang benar untuk force download
-        response = Response(
-            output.getvalue(),
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}",
-                "Content-Type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            }
-        )
-        
-        # Tambahkan header untuk mencegah caching
-        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-        response.headers["Pragma"] = "no-cache"
-        response.headers["Expires"] = "0"
-        
-        return response
-        
-    except Exception as e:
-        flash(f'Error generating all reports: {str(e)}')
-        return redirect(url_for('dashboard'))
-
-@app.route('/export')
-@login_required
-def export_management():
-    """Halaman manajemen ekspor yang komprehensif"""
-    
-    body = """
-    <div class="page-header">
-        <h1 class="page-title">Manajemen Ekspor Excel</h1>
-        <p class="page-subtitle">Ekspor data akuntansi ke format Excel untuk analisis dan audit</p>
-    </div>
-    
-    <div class="row">
-        <!-- Ekspor Individual -->
-        <div class="col-lg-6 mb-4">
-            <div class="card h-100">
-                <div class="card-header bg-primary text-white">
-                    <h5 class="mb-0"><i class="fas fa-file-export me-2"></i>Ekspor Per Laporan</h5>
-                </div>
-                <div class="card-body">
-                    <div class="list-group">
-                        <a href="/export/journal" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
-                            <div>
-                                <i class="fas fa-book me-2 text-primary"></i>
-                                <strong>Jurnal Umum</strong>
-                                <small class="d-block text-muted">Semua entri jurnal transaksi</small>
-                            </div>
-                            <i class="fas fa-download text-muted"></i>
-                        </a>
-                        
-                        <a href="/export/adjusting" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
-                            <div>
-                                <i class="fas fa-adjust me-2 text-warning"></i>
-                                <strong>Ayat Penyesuaian</strong>
-                                <small class="d-block text-muted">Entri penyesuaian periode</small>
-                            </div>
-                            <i class="fas fa-download text-muted"></i>
-                        </a>
-                        
-                        <a href="/export/ledger" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
-                            <div>
-                                <i class="fas fa-file-invoice-dollar me-2 text-success"></i>
-                                <strong>Buku Besar</strong>
-                                <small class="d-block text-muted">Riwayat semua akun</small>
-                            </div>
-                            <i class="fas fa-download text-muted"></i>
-                        </a>
-                        
-                        <a href="/export/trial_balance" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
-                            <div>
-                                <i class="fas fa-balance-scale me-2 text-info"></i>
-                                <strong>Neraca Saldo</strong>
-                                <small class="d-block text-muted">Saldo sebelum & setelah penyesuaian</small>
-                            </div>
-                            <i class="fas fa-download text-muted"></i>
-                        </a>
-
-                        <!-- Tambahkan di bagian Ekspor Individual -->
-                        <a href="/export/closing_entries" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
-                            <div>
-                                <i class="fas fa-lock me-2 text-danger"></i>
-                                <strong>Jurnal Penutup</strong>
-                                <small class="d-block text-muted">Entri penutupan periode</small>
-                            </div>
-                            <i class="fas fa-download text-muted"></i>
-                        </a>
-
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Ekspor Laporan Keuangan -->
-        <div class="col-lg-6 mb-4">
-            <div class="card h-100">
-                <div class="card-header bg-success text-white">
-                    <h5 class="mb-0"><i class="fas fa-chart-line me-2"></i>Laporan Keuangan</h5>
-                </div>
-                <div class="card-body">
-                    <div class="list-group">
-                        <a href="/export/income_statement" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
-                            <div>
-                                <i class="fas fa-chart-bar me-2 text-success"></i>
-                                <strong>Laporan Laba Rugi</strong>
-                                <small class="d-block text-muted">Pendapatan, beban, dan laba bersih</small>
-                            </div>
-                            <i class="fas fa-download text-muted"></i>
-                        </a>
-                        
-                        <a href="/export/balance_sheet" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
-                            <div>
-                                <i class="fas fa-balance-scale-left me-2 text-primary"></i>
-                                <strong>Neraca</strong>
-                                <small class="d-block text-muted">Posisi keuangan perusahaan</small>
-                            </div>
-                            <i class="fas fa-download text-muted"></i>
-                        </a>
-                        
-                        <a href="/export/cash_flow" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
-                            <div>
-                                <i class="fas fa-money-bill-wave me-2 text-info"></i>
-                                <strong>Laporan Arus Kas</strong>
-                                <small class="d-block text-muted">Arus kas operasi, investasi, pendanaan</small>
-                            </div>
-                            <i class="fas fa-download text-muted"></i>
-                        </a>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Ekspor Data Master -->
-        <div class="col-lg-6 mb-4">
-            <div class="card h-100">
-                <div class="card-header bg-info text-white">
-                    <h5 class="mb-0"><i class="fas fa-database me-2"></i>Data Master</h5>
-                </div>
-                <div class="card-body">
-                    <div class="list-group">
-                        <a href="/export/inventory" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
-                            <div>
-                                <i class="fas fa-water me-2 text-info"></i>
-                                <strong>Persediaan Tiram</strong>
-                                <small class="d-block text-muted">Riwayat stok dan nilai persediaan</small>
-                            </div>
-                            <i class="fas fa-download text-muted"></i>
-                        </a>
-                        
-                        <a href="/export/opening_balances" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
-                            <div>
-                                <i class="fas fa-play-circle me-2 text-warning"></i>
-                                <strong>Saldo Awal</strong>
-                                <small class="d-block text-muted">Saldo awal semua akun</small>
-                            </div>
-                            <i class="fas fa-download text-muted"></i>
-                        </a>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Ekspor Komprehensif -->
-        <div class="col-lg-6 mb-4">
-            <div class="card h-100">
-                <div class="card-header bg-warning text-dark">
-                    <h5 class="mb-0"><i class="fas fa-file-archive me-2"></i>Ekspor Lengkap</h5>
-                </div>
-                <div class="card-body text-center py-5">
-                    <i class="fas fa-file-excel fa-4x text-success mb-3"></i>
-                    <h4 class="text-dark mb-3">Export Semua Laporan</h4>
-                    <p class="text-muted mb-4">
-                        Download semua laporan keuangan dalam satu file Excel multi-sheet. 
-                        Siap untuk analisis, audit, dan presentasi.
-                    </p>
-                    <a href="/export/all" class="btn btn-success btn-lg">
-                        <i class="fas fa-download me-2"></i>Download Full Report
-                    </a>
-                    <small class="d-block text-muted mt-2">
-                        Includes all 9 reports in separate sheets
-                    </small>
-                </div>
-            </div>
-        </div>
-    </div>
-    
-    <!-- Info Section -->
-    <div class="row mt-4">
-        <div class="col-12">
-            <div class="card bg-light">
-                <div class="card-body">
-                    <h6><i class="fas fa-info-circle me-2 text-primary"></i>Informasi Ekspor</h6>
-                    <div class="row">
-                        <div class="col-md-4">
-                            <strong>Format File:</strong> Excel (.xlsx)
-                        </div>
-                        <div class="col-md-4">
-                            <strong>Encoding:</strong> UTF-8
-                        </div>
-                        <div class="col-md-4">
-                            <strong>Mata Uang:</strong> IDR
-                        </div>
-                    </div>
-                    <div class="row mt-2">
-                        <div class="col-12">
-                            <strong>Fitur:</strong> Formatting profesional, multi-sheet, siap print, 
-                            compatible dengan Excel 2010+, filter data, formulas siap pakai.
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    """
-    
-    return render_template_string(BASE_TEMPLATE, title='Manajemen Ekspor', body=body, user=current_user())
-
-# Pastikan semua fungsi helper export sudah didefinisikan
-def export_to_excel(data, sheet_name, filename):
-    """Fungsi dasar untuk ekspor data ke Excel"""
-    output = io.BytesIO()
-    
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        # Konversi data ke DataFrame
-        if isinstance(data, list) and data:
-            df = pd.DataFrame(data)
-        else:
-            df = pd.DataFrame([data]) if data else pd.DataFrame()
-        
-        # Tulis ke Excel dengan formatting
-        df.to_excel(writer, sheet_name=sheet_name, index=False)
-        
-        # Dapatkan workbook dan worksheet
-        workbook = writer.book
-        worksheet = writer.sheets[sheet_name]
-        
-        # Format header
-        header_format = workbook.add_format({
-            'bold': True,
-            'text_wrap': True,
-            'valign': 'top',
-            'fg_color': '#1E40AF',
-            'font_color': 'white',
-            'border': 1
-        })
-        
-        # Format angka
-        currency_format = workbook.add_format({'num_format': '#,##0.00'})
-        
-        # Terapkan formatting ke header
-        for col_num, value in enumerate(df.columns.values):
-            worksheet.write(0, col_num, value, header_format)
-        
-        # Auto-adjust column widths
-        for idx, col in enumerate(df.columns):
-            max_len = max(df[col].astype(str).str.len().max(), len(col)) + 2
-            worksheet.set_column(idx, idx, min(max_len, 50))
-    
-    output.seek(0)
-    return Response(
-        output.getvalue(),
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment;filename={filename}"}
-    )
-
-@app.route('/debug')
-def debug():
-    """Route untuk debugging - HAPUS SETELAH FIX"""
-    try:
-        db = get_db()
-        cur = db.cursor()
-        
-        # Cek users
-        cur.execute('SELECT * FROM users')
-        users = cur.fetchall()
-        
-        # Cek session
-        session_info = {
-            'user_id': session.get('user_id'),
-            'session_keys': list(session.keys())
-        }
-        
-        debug_info = f"""
-        <div class="container mt-4">
-            <h2>Debug Info</h2>
-            <div class="card">
-                <div class="card-body">
-                    <h5>Users in database:</h5>
-                    <pre>{users}</pre>
-                    <h5>Session info:</h5>
-                    <pre>{session_info}</pre>
-                    <h5>Current user:</h5>
-                    <pre>{current_user()}</pre>
-                </div>
-            </div>
-            <div class="mt-3">
-                <a href="/login" class="btn btn-primary">Ke Halaman Login</a>
-                <a href="/reset-db" class="btn btn-warning">Reset Database</a>
-            </div>
-        </div>
-        """
-        
-        return debug_info
-    except Exception as e:
-        return f"Error: {str(e)}"
-
-@app.route('/reset_opening_balances')
-@login_required
-def reset_opening_balances():
-    """Reset saldo awal ke nilai default sesuai neraca saldo awal"""
-    db = get_db()
-    
-    # Hapus semua saldo awal
-    db.execute('DELETE FROM opening_balances')
-    
-    # Set saldo awal default sesuai neraca saldo
-    default_balances = [
-        # Assets (Debit)
-        (1, 8500000, 0),   # Kas (101)
-        (2, 4500000, 0),   # Piutang Usaha (102)
-        (3, 1750000, 0),   # Persediaan Tiram Besar (103)
-        (4, 1200000, 0),   # Persediaan Tiram Kecil (103.1)
-        (5, 500000, 0),    # Peralatan (104)
-        (6, 300000, 0),    # Perlengkapan (105)
-        (7, 12000000, 0),  # Kendaraan (106)
-        
-        # Contra Asset (Credit)
-        (8, 0, 1500000),   # Akumulasi Penyusutan Kendaraan (107)
-        
-        # Liabilities (Credit)
-        (9, 0, 650000),    # Utang Usaha (201)
-        (10, 0, 100000),   # Utang Gaji (202)
-        
-        # Equity (Credit)
-        (11, 0, 22300000), # Modal Pemilik (301)
-    ]
-    
-    for account_id, debit_amount, credit_amount in default_balances:
-        db.execute('''
-            INSERT INTO opening_balances (account_id, debit_amount, credit_amount) 
-            VALUES (?, ?, ?)
-        ''', (account_id, debit_amount, credit_amount))
-    
-    db.commit()
-    flash('✅ Saldo awal berhasil direset ke nilai default!')
-    return redirect(url_for('opening_balance'))
-
-@app.route('/verify_balances')
-@login_required
-def verify_balances():
-    """Halaman untuk verifikasi saldo awal"""
-    db = get_db()
-    
-    # Hitung total debit dan credit dari opening_balances
-    result = db.execute('''
-        SELECT SUM(debit_amount) as total_debit, SUM(credit_amount) as total_credit 
-        FROM opening_balances
-    ''').fetchone()
-    
-    total_debit = result['total_debit'] or 0
-    total_credit = result['total_credit'] or 0
-    
-    # Dapatkan detail semua saldo
-    balances = db.execute('''
-        SELECT a.code, a.name, a.acct_type, a.normal_balance, 
-               ob.debit_amount, ob.credit_amount
-        FROM accounts a
-        LEFT JOIN opening_balances ob ON a.id = ob.account_id
-        WHERE ob.debit_amount != 0 OR ob.credit_amount != 0
-        ORDER BY a.code
-    ''').fetchall()
-    
-    body = f"""
-    <div class="page-header">
-        <h1 class="page-title">Verifikasi Saldo Awal</h1>
-        <p class="page-subtitle">Pastikan saldo awal sesuai dengan neraca saldo</p>
-    </div>
-    
-    <div class="card">
-        <div class="card-header">
-            <h5 class="mb-0">Summary</h5>
-        </div>
-        <div class="card-body">
-            <div class="row">
-                <div class="col-md-6">
-                    <div class="alert alert-success">
-                        <h6>Total Debit</h6>
-                        <h3>Rp {total_debit:,.2f}</h3>
-                    </div>
-                </div>
-                <div class="col-md-6">
-                    <div class="alert alert-info">
-                        <h6>Total Credit</h6>
-                        <h3>Rp {total_credit:,.2f}</h3>
-                    </div>
-                </div>
-            </div>
-            
-            <div class="alert {'alert-success' if total_debit == total_credit else 'alert-danger'}">
-                <h6><i class="fas {'fa-check-circle' if total_debit == total_credit else 'fa-exclamation-triangle'} me-2"></i>
-                Status: {'SEIMBANG' if total_debit == total_credit else 'TIDAK SEIMBANG'}</h6>
-                <p class="mb-0">Selisih: Rp {abs(total_debit - total_credit):,.2f}</p>
-            </div>
-        </div>
-    </div>
-    
-    <div class="card mt-4">
-        <div class="card-header">
-            <h5 class="mb-0">Detail Saldo Awal</h5>
-        </div>
-        <div class="card-body">
-            <div class="table-responsive">
-                <table class="table table-hover">
-                    <thead>
-                        <tr>
-                            <th>Kode</th>
-                            <th>Nama Akun</th>
-                            <th>Jenis</th>
-                            <th>Saldo Normal</th>
-                            <th class="text-end">Debit</th>
-                            <th class="text-end">Kredit</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-    """
-    
-    for balance in balances:
-        body += f"""
-                        <tr>
-                            <td><strong>{balance['code']}</strong></td>
-                            <td>{balance['name']}</td>
-                            <td><span class="badge bg-secondary">{balance['acct_type']}</span></td>
-                            <td><span class="badge bg-{'primary' if balance['normal_balance'] == 'Debit' else 'success'}">{balance['normal_balance']}</span></td>
-                            <td class="text-end {'text-success fw-bold' if balance['debit_amount'] > 0 else ''}">{balance['debit_amount']:,.2f}</td>
-                            <td class="text-end {'text-danger fw-bold' if balance['credit_amount'] > 0 else ''}">{balance['credit_amount']:,.2f}</td>
-                        </tr>
-        """
-    
-    body += """
-                    </tbody>
-                </table>
-            </div>
-        </div>
-    </div>
-    
-    <div class="mt-4">
-        <a href="/trial_balance" class="btn btn-primary">
-            <i class="fas fa-balance-scale me-2"></i>Lihat Neraca Saldo
-        </a>
-        <a href="/fix_database" class="btn btn-warning" onclick="return confirm('Reset database?')">
-            <i class="fas fa-sync me-2"></i>Reset Database
-        </a>
-    </div>
-    """
-    
-    return render_template_string(BASE_TEMPLATE, title='Verifikasi Saldo', body=body, user=current_user())
-
-# ---------- Startup Aplikasi ----------
-
-if __name__ == '__main__':
-
-    with app.app_context():
-        if not DB_PATH.exists():
-            print("Menginisialisasi Database Akuntansi Tiramine...")
-        init_db()
-        print("Database berhasil diinisialisasi!")
-        print("Transaksi contoh dibuat untuk demonstrasi")
-        print("Masuk dengan: admin / password")
-        print("🔒 Auto-save enabled: Data aman meskipun CTRL+C")  # Bisa tambah ini juga
-    
+from flask import Flask, g, render_template, request, redirect, url_for, session, flash, abort, send_file, stream_with_context
+from flask import has_app_context, has_request_context
+from jinja2 import ChoiceLoader, DictLoader
+from werkzeug.middleware.proxy_fix import ProxyFix
+import sqlite3
+from pathlib import Path
+from datetime import datetime, timedelta
+import bcrypt
+import json
+import io
+from flask import Response
+from markupsafe import escape
+import os
+import random
+import smtplib
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+import os
+
+import atexit
+import copy
+import logging
+import logging.handlers
+import threading
+import time
+import queue
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import lru_cache, wraps
+import click
+import csv
+import multiprocessing
+import gzip
+import hashlib
+import heapq
+import hmac
+import mimetypes
+import re
+import tempfile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Load environment variables from .env
+load_dotenv()
+
+# ---------- Logging ----------
+# Semua log aplikasi lewat logger 'tiramine'. Handler-nya hanya memasukkan
+# record ke antrian; penulisan ke stderr dilakukan QueueListener di thread
+# latar, jadi request tidak menunggu I/O stdout. Setiap record membawa
+# request_id (header X-Request-ID atau dibuat baru) untuk korelasi.
+# LOG_LEVEL mengatur level (default INFO), LOG_FORMAT=text untuk keluaran
+# yang lebih mudah dibaca saat pengembangan (default json).
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9._-]{1,64}')
+
+# Atribut bawaan LogRecord; atribut lain berasal dari extra={...}
+LOG_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'request_id'}
+
+class JsonLogFormatter(logging.Formatter):
+    """Satu objek JSON per baris log"""
+    
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None)
+        }
+        for key, value in vars(record).items():
+            if key not in LOG_RECORD_FIELDS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class RequestIdFilter(logging.Filter):
+    """Tambahkan request_id dari request yang sedang berjalan ke record"""
+    
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = g.get('request_id') if has_app_context() else None
+        return True
+
+class BackgroundLogHandler(logging.handlers.QueueHandler):
+    """QueueHandler yang dikuras oleh QueueListener di thread latar.
+    
+    Thread listener tidak ikut terbawa saat fork - dibuat ulang per proses.
+    """
+    
+    def __init__(self, target):
+        super().__init__(queue.SimpleQueue())
+        self.target = target
+        self._listener = None
+        self._pid = None
+        self._stopped = False
+        self._lock = threading.Lock()
+    
+    def prepare(self, record):
+        # Format pesan dan traceback di thread pemanggil, selagi args masih valid
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record):
+        if self._stopped:
+            self.target.handle(record)
+            return
+        if self._pid != os.getpid():
+            self._start()
+        self.queue.put_nowait(record)
+    
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.SimpleQueue()
+            self._listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+    
+    def stop(self):
+        """Kuras antrian lalu tulis langsung (dipanggil saat proses berhenti)"""
+        self._stopped = True
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+        self._listener = None
+
+def setup_logging():
+    """Pasang handler antrian ke logger 'tiramine'"""
+    stream = logging.StreamHandler()
+    if LOG_FORMAT == 'text':
+        stream.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(request_id)s] %(message)s'))
+    else:
+        stream.setFormatter(JsonLogFormatter())
+    
+    handler = BackgroundLogHandler(stream)
+    handler.addFilter(RequestIdFilter())
+    
+    log = logging.getLogger('tiramine')
+    log.setLevel(LOG_LEVEL)
+    log.handlers[:] = [handler]
+    log.propagate = False
+    atexit.register(handler.stop)
+    return log
+
+def mask_email(email):
+    """Samarkan alamat email untuk log: ti***@gmail.com"""
+    name, _, domain = (email or '').partition('@')
+    return f"{name[:2]}***@{domain}" if domain else '***'
+
+logger = setup_logging()
+
+DB_PATH = Path(__file__).parent / 'tiramine.db'
+SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-tiramine')
+
+app = Flask(__name__)
+app.config['SECRET_KEY'] = SECRET_KEY
+app.config['POSTGRES_HEALTHCHECK'] = os.environ.get('POSTGRES_HEALTHCHECK', '0') == '1'
+app.config['STORAGE_BACKEND'] = os.environ.get('STORAGE_BACKEND', 'sqlite')
+
+# Di belakang reverse proxy request.remote_addr adalah alamat proxy itu.
+# TRUSTED_PROXIES = jumlah proxy tepercaya di depan aplikasi; X-Forwarded-For
+# hanya dipercaya sebanyak hop itu, jadi klien tidak bisa memalsukan IP-nya.
+TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 0))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES, x_proto=TRUSTED_PROXIES)
+
+# ---------- Instrumentasi ----------
+# Setiap koneksi database dibuka dengan InstrumentedConnection, yang mencatat
+# jumlah dan durasi setiap statement ke request yang sedang berjalan (g).
+# Saat request selesai angka itu masuk ke metrik per endpoint, jadi regresi
+# N+1 langsung terlihat. Statement yang lebih lambat dari SLOW_QUERY_MS
+# dicatat ke log. Semua metrik diekspos dalam format teks Prometheus di
+# /metrics (per proses). Scraper mengirim Bearer METRICS_TOKEN; tanpa token
+# yang dikonfigurasi, /metrics hanya terbuka untuk admin yang sedang login.
+
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+EXPORT_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+class Metrics:
+    """Counter dan histogram sederhana dalam format teks Prometheus"""
+    
+    def __init__(self):
+        self._meta = {}
+        self._counters = {}
+        self._histograms = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+    
+    def counter(self, name, help_text):
+        self._meta[name] = ('counter', help_text, None)
+    
+    def histogram(self, name, help_text, buckets):
+        self._meta[name] = ('histogram', help_text, buckets)
+    
+    def collector(self, name, kind, help_text, collect):
+        """Metrik yang dibaca saat scrape: collect() -> [(labels_dict, nilai)]"""
+        self._meta[name] = (kind, help_text, None)
+        self._collectors.append((name, collect))
+    
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+    
+    def observe(self, name, value, **labels):
+        buckets = self._meta[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [[0] * len(buckets), 0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def render(self):
+        """Semua metrik dalam format eksposisi teks Prometheus 0.0.4"""
+        samples = {name: [] for name in self._meta}
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                samples[name].append((name, dict(labels), value))
+            for (name, labels), (counts, total, count) in self._histograms.items():
+                labels = dict(labels)
+                for bound, bucket_count in zip(self._meta[name][2], counts):
+                    samples[name].append((f'{name}_bucket', {**labels, 'le': repr(float(bound))}, bucket_count))
+                samples[name].append((f'{name}_bucket', {**labels, 'le': '+Inf'}, count))
+                samples[name].append((f'{name}_sum', labels, total))
+                samples[name].append((f'{name}_count', labels, count))
+        for name, collect in self._collectors:
+            samples[name].extend((name, labels, value) for labels, value in collect())
+        
+        lines = []
+        for name, (kind, help_text, _) in self._meta.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for sample_name, labels, value in samples[name]:
+                lines.append(f'{sample_name}{metric_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+def metric_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), " ")}"'
+        for key, value in sorted(labels.items())
+    )
+    return '{' + ','.join(escaped) + '}'
+
+metrics = Metrics()
+metrics.histogram('tiramine_http_request_duration_seconds', 'Latensi request per endpoint', LATENCY_BUCKETS)
+metrics.counter('tiramine_http_requests_total', 'Jumlah request per endpoint dan status')
+metrics.histogram('tiramine_db_queries_per_request', 'Jumlah statement SQL per request', QUERY_COUNT_BUCKETS)
+metrics.counter('tiramine_db_queries_total', 'Jumlah statement SQL per endpoint')
+metrics.counter('tiramine_db_query_seconds_total', 'Total waktu eksekusi SQL per endpoint')
+metrics.counter('tiramine_db_slow_queries_total', 'Statement SQL di atas SLOW_QUERY_MS per endpoint')
+metrics.histogram('tiramine_write_batch_size', 'Jumlah job per group commit WriteQueue', BATCH_BUCKETS)
+metrics.histogram('tiramine_export_duration_seconds', 'Durasi pekerjaan ekspor per jenis dan status', EXPORT_BUCKETS)
+metrics.counter('tiramine_export_cache_hits_total', 'Permintaan ekspor yang dilayani dari cache file')
+
+def metrics_endpoint():
+    """Label endpoint untuk konteks saat ini ('background' di luar request)"""
+    if has_request_context():
+        return request.endpoint or 'unmatched'
+    return 'background'
+
+def record_query(sql, elapsed):
+    """Catat satu statement ke statistik request (atau langsung untuk thread latar)"""
+    stats = g.get('_sql_stats') if has_app_context() else None
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += elapsed
+    else:
+        endpoint = metrics_endpoint()
+        metrics.inc('tiramine_db_queries_total', endpoint=endpoint)
+        metrics.inc('tiramine_db_query_seconds_total', elapsed, endpoint=endpoint)
+    
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        endpoint = metrics_endpoint()
+        metrics.inc('tiramine_db_slow_queries_total', endpoint=endpoint)
+        logger.warning("🐢 Slow query (%.0f ms, %s): %s", elapsed * 1000, endpoint, ' '.join(sql.split())[:300],
+                       extra={'endpoint': endpoint, 'duration_ms': round(elapsed * 1000, 1)})
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor yang mengukur setiap execute"""
+    
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            record_query(sql, time.perf_counter() - start)
+    
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            record_query(sql, time.perf_counter() - start)
+    
+    def executescript(self, sql_script):
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            record_query(sql_script, time.perf_counter() - start)
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Koneksi yang semua cursor-nya InstrumentedCursor"""
+    
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+    
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+    
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+@app.before_request
+def assign_request_id():
+    incoming = request.headers.get('X-Request-ID', '')
+    g.request_id = incoming if REQUEST_ID_PATTERN.fullmatch(incoming) else uuid.uuid4().hex
+
+@app.after_request
+def send_request_id(response):
+    if g.get('request_id'):
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
+@app.before_request
+def start_request_metrics():
+    g._request_started = time.perf_counter()
+    g._sql_stats = [0, 0.0]
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('_request_started')
+    if started is not None:
+        endpoint = metrics_endpoint()
+        metrics.observe('tiramine_http_request_duration_seconds', time.perf_counter() - started,
+                        endpoint=endpoint, method=request.method)
+        metrics.inc('tiramine_http_requests_total', endpoint=endpoint, method=request.method,
+                    status=response.status_code)
+    return response
+
+@app.teardown_request
+def record_query_metrics(exception):
+    # Dicatat saat teardown agar query dari respons streaming ikut terhitung
+    stats = g.pop('_sql_stats', None)
+    if stats is None:
+        return
+    endpoint = metrics_endpoint()
+    metrics.observe('tiramine_db_queries_per_request', stats[0], endpoint=endpoint)
+    metrics.inc('tiramine_db_queries_total', stats[0], endpoint=endpoint)
+    metrics.inc('tiramine_db_query_seconds_total', stats[1], endpoint=endpoint)
+
+@app.route('/metrics')
+def metrics_view():
+    """Metrik Prometheus proses ini"""
+    if METRICS_TOKEN:
+        authorization = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(authorization.encode(), f'Bearer {METRICS_TOKEN}'.encode()):
+            abort(401)
+    else:
+        user = current_user()
+        if not user or user['role'] != 'admin':
+            abort(401)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# ---------- Helper Database ----------
+# get_db() meminjam koneksi dari backend penyimpanan (db_pool). Backend bawaan
+# adalah SQLite; STORAGE_BACKEND=postgres memakai PostgreSQL lewat
+# ThreadedConnectionPool psycopg2. Koneksi kedua backend berperilaku seperti
+# sqlite3.Connection (placeholder '?', kolom per nama, in_transaction,
+# transaksi implisit sebelum INSERT/UPDATE/DELETE), jadi query aplikasi tidak
+# perlu tahu backend mana yang dipakai. Query ditulis dalam SQL yang berlaku
+# di keduanya; perbedaan dialek (DDL migrasi, kolom tabel, pemesanan id,
+# pengamat cache_coherence) ada di hook StorageBackend.
+
+PG_POOL_MAX = int(os.environ.get('PG_POOL_MAX', 20))
+PG_BATCH_SIZE = 500
+# Kunci advisory PostgreSQL yang dipegang transaksi begin_write()
+PG_WRITE_LOCK_ID = 7450101
+
+# Terjemahan DDL SQLite di migrasi ke PostgreSQL. Flag tetap integer 0/1
+# (query memakai used = 1), waktu default UTC tanpa pecahan detik seperti
+# CURRENT_TIMESTAMP SQLite.
+PG_SCHEMA_TYPES = (
+    ('INTEGER PRIMARY KEY AUTOINCREMENT', 'SERIAL PRIMARY KEY'),
+    ('BOOLEAN DEFAULT 0', 'SMALLINT DEFAULT 0'),
+    ('DEFAULT CURRENT_TIMESTAMP', "DEFAULT date_trunc('second', now() AT TIME ZONE 'UTC')"),
+)
+
+class StorageBackend:
+    """Antarmuka backend penyimpanan di balik get_db()"""
+    
+    name = None
+    errors = Exception
+    # True jika change_marker() murah dan berubah pada setiap commit
+    has_change_marker = False
+    
+    def acquire(self):
+        """Pinjam koneksi dari pool untuk satu unit kerja"""
+        raise NotImplementedError
+    
+    def release(self, conn):
+        """Kembalikan koneksi ke pool; transaksi yang masih terbuka dibatalkan"""
+        raise NotImplementedError
+    
+    def connect(self):
+        """Buka koneksi baru di luar pool (mis. untuk thread penulis)"""
+        raise NotImplementedError
+    
+    def close_all(self):
+        pass
+    
+    def key(self):
+        """Identitas database yang dituju (kunci status startup dan cache ekspor)"""
+        raise NotImplementedError
+    
+    def begin_write(self, conn):
+        """Mulai transaksi tulis eksplisit"""
+        conn.execute('BEGIN')
+    
+    def begin_read_snapshot(self, conn):
+        """Mulai transaksi baca yang melihat satu snapshot data"""
+        conn.execute('BEGIN')
+    
+    # Dialek: migrasi ditulis dengan DDL SQLite, backend lain menerjemahkannya
+    
+    def schema_sql(self, sql):
+        """DDL migrasi untuk backend ini"""
+        return sql
+    
+    def table_columns(self, cur, table):
+        """Nama kolom tabel (migrasi ALTER TABLE ADD COLUMN)"""
+        cur.execute(f'SELECT * FROM {table} LIMIT 0')
+        return {column[0] for column in cur.description}
+    
+    def reserve_ids(self, cur, table, count):
+        """Pesan count id berurutan untuk INSERT dengan id eksplisit; kembalikan id pertama.
+
+        Panggil di dalam transaksi begin_write().
+        """
+        raise NotImplementedError
+    
+    # Pengamat cache_coherence
+    
+    def open_watcher(self):
+        """Koneksi pengamat commit (satu per proses)"""
+        return self.connect()
+    
+    def change_marker(self, conn):
+        """Nilai yang berubah setiap koneksi lain commit (lihat has_change_marker)"""
+        return None
+    
+    def schema_marker(self, conn):
+        """Nilai yang berubah saat tabel dibuat ulang (init-db)"""
+        return None
+
+class SqliteBackend(StorageBackend):
+    """Pool kecil koneksi SQLite yang dipakai ulang antar request.
+
+    PRAGMA diterapkan sekali saat koneksi dibuka, bukan setiap get_db().
+    Setelah fork (worker gunicorn) pool dikosongkan agar koneksi milik proses
+    induk tidak ikut dipakai. Dengan readonly=True koneksi dibuka dengan
+    mode=ro (dipakai proses pembangun laporan).
+    """
+    
+    name = 'sqlite'
+    errors = sqlite3.Error
+    has_change_marker = True
+    
+    def __init__(self, db_path, max_idle=8, readonly=False):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self.readonly = readonly
+        self._idle = queue.LifoQueue(maxsize=max_idle)
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+    
+    def connect(self):
+        """Buka koneksi baru dengan PRAGMA standar (di luar pool)"""
+        if self.readonly:
+            conn = sqlite3.connect(f'{Path(self.db_path).resolve().as_uri()}?mode=ro', uri=True,
+                                   timeout=10, check_same_thread=False, factory=InstrumentedConnection)
+            conn.row_factory = sqlite3.Row
+            return conn
+        conn = sqlite3.connect(str(self.db_path), timeout=10, check_same_thread=False,
+                               factory=InstrumentedConnection)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+    
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._idle = queue.LifoQueue(maxsize=self.max_idle)
+                    self._pid = os.getpid()
+    
+    def acquire(self):
+        self._check_fork()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self.connect()
+    
+    def release(self, conn):
+        """Kembalikan koneksi ke pool; transaksi yang masih terbuka dibatalkan"""
+        self._check_fork()
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put_nowait(conn)
+        except (sqlite3.Error, queue.Full):
+            conn.close()
+    
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+    
+    def key(self):
+        return ('sqlite', str(Path(self.db_path).resolve()))
+    
+    def begin_write(self, conn):
+        # IMMEDIATE mengambil kunci tulis di awal, bukan saat statement tulis pertama
+        conn.execute('BEGIN IMMEDIATE')
+    
+    def reserve_ids(self, cur, table, count):
+        # Kunci tulis sudah dipegang, jadi id berikutnya bisa dipesan di muka.
+        # INSERT dengan id eksplisit ikut memajukan sqlite_sequence.
+        cur.execute(f'''
+            SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = ?), 0),
+                       COALESCE((SELECT MAX(id) FROM {table}), 0))
+        ''', (table,))
+        return cur.fetchone()[0] + 1
+    
+    def open_watcher(self):
+        # Koneksi polos: polling tidak ikut metrik query dan tidak butuh PRAGMA
+        return sqlite3.connect(str(self.db_path), check_same_thread=False)
+    
+    def change_marker(self, conn):
+        return conn.execute('PRAGMA data_version').fetchone()[0]
+    
+    def schema_marker(self, conn):
+        return conn.execute('PRAGMA schema_version').fetchone()[0]
+
+class PostgresBackend(StorageBackend):
+    """Pool koneksi PostgreSQL (psycopg2 ThreadedConnectionPool) per proses.
+
+    psycopg2 hanya diimpor saat koneksi pertama dibuka. Pool melempar
+    PoolError jika lebih dari maxconn koneksi dipinjam bersamaan, jadi
+    PG_POOL_MAX harus >= jumlah thread per worker.
+    """
+    
+    name = 'postgres'
+    
+    def __init__(self, connect_params, minconn=1, maxconn=PG_POOL_MAX, readonly=False):
+        self.connect_params = dict(connect_params)
+        if readonly:
+            self.connect_params['options'] = '-c default_transaction_read_only=on'
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self._pool = None
+        self._pid = None
+        self._inherited = []
+        self._lock = threading.Lock()
+    
+    @property
+    def errors(self):
+        import psycopg2
+        return psycopg2.Error
+    
+    def _threaded_pool(self):
+        if self._pool is None or self._pid != os.getpid():
+            with self._lock:
+                if self._pool is None or self._pid != os.getpid():
+                    from psycopg2.pool import ThreadedConnectionPool
+                    # Pool milik proses induk tidak ditutup: socket-nya masih
+                    # dipakai induk. Simpan referensinya agar tidak di-GC.
+                    if self._pool is not None:
+                        self._inherited.append(self._pool)
+                    register_pg_types()
+                    self._pool = ThreadedConnectionPool(self.minconn, self.maxconn, **self.connect_params)
+                    self._pid = os.getpid()
+        return self._pool
+    
+    def acquire(self):
+        return PgConnection(self._threaded_pool().getconn())
+    
+    def release(self, conn):
+        broken = bool(conn.raw.closed)
+        if not broken:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except self.errors:
+                broken = True
+        self._threaded_pool().putconn(conn.raw, close=broken)
+    
+    def connect(self):
+        import psycopg2
+        register_pg_types()
+        return PgConnection(psycopg2.connect(**self.connect_params))
+    
+    def close_all(self):
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.closeall()
+            self._pool = None
+    
+    def key(self):
+        # Berisi kredensial - hanya untuk dibandingkan/di-hash, jangan di-log
+        params = {k: v for k, v in self.connect_params.items() if k != 'options'}
+        return ('postgres', tuple(sorted(params.items())))
+    
+    def begin_write(self, conn):
+        # Setara BEGIN IMMEDIATE: satu transaksi tulis sekaligus lintas worker
+        conn.execute('BEGIN')
+        conn.execute('SELECT pg_advisory_xact_lock(?)', (PG_WRITE_LOCK_ID,))
+    
+    def begin_read_snapshot(self, conn):
+        # READ COMMITTED mengambil snapshot baru per statement
+        conn.execute('BEGIN ISOLATION LEVEL REPEATABLE READ')
+    
+    def schema_sql(self, sql):
+        for sqlite_sql, pg_sql in PG_SCHEMA_TYPES:
+            sql = sql.replace(sqlite_sql, pg_sql)
+        return sql
+    
+    def reserve_ids(self, cur, table, count):
+        # EXCLUSIVE menahan INSERT sesi lain sampai commit, jadi tidak ada yang
+        # mengambil nextval di antara nextval dan setval
+        cur.execute(f'LOCK TABLE {table} IN EXCLUSIVE MODE')
+        cur.execute("SELECT nextval(pg_get_serial_sequence(?, 'id'))", (table,))
+        first_id = cur.fetchone()[0]
+        if count > 1:
+            cur.execute("SELECT setval(pg_get_serial_sequence(?, 'id'), ?)", (table, first_id + count - 1))
+        return first_id
+    
+    def schema_marker(self, conn):
+        # init-db membuat ulang settings dengan oid baru
+        return conn.execute("SELECT CAST(to_regclass('settings') AS oid)").fetchone()[0]
+
+_SQL_TOKEN_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|\?|%")
+_IMPLICIT_BEGIN_RE = re.compile(r'\s*(INSERT|UPDATE|DELETE|REPLACE)\b', re.IGNORECASE)
+
+def _translate_token(match):
+    token = match.group(0)
+    if token == '?':
+        return '%s'
+    return token.replace('%', '%%')
+
+@lru_cache(maxsize=1024)
+def translate_placeholders(sql):
+    """Ubah placeholder '?' (sqlite3) menjadi '%s' (psycopg2).
+
+    '?' di dalam string literal, identifier bertanda kutip dan komentar
+    dibiarkan. Setiap '%' literal digandakan karena psycopg2 memformat
+    seluruh statement bila ada parameter.
+    """
+    return _SQL_TOKEN_RE.sub(_translate_token, sql)
+
+class PgRow(tuple):
+    """Baris hasil query yang bisa diakses per indeks atau nama kolom (seperti sqlite3.Row)"""
+    
+    def __new__(cls, values, columns):
+        row = super().__new__(cls, values)
+        row._columns = columns
+        return row
+    
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                key = self._columns[key]
+            except KeyError:
+                raise IndexError(f'No item with that key: {key}') from None
+        return super().__getitem__(key)
+    
+    def keys(self):
+        return list(self._columns)
+
+class PgCursor:
+    """Cursor psycopg2 dengan antarmuka sqlite3.Cursor"""
+    
+    def __init__(self, connection):
+        self.connection = connection
+        self._cursor = connection.raw.cursor()
+        self._columns = None
+        self._inserted = False
+        self._lastrowid = None
+    
+    def _prepare(self, sql):
+        # Samakan dengan sqlite3: transaksi dibuka otomatis sebelum statement tulis
+        match = _IMPLICIT_BEGIN_RE.match(sql)
+        if match and not self.connection.in_transaction:
+            self._cursor.execute('BEGIN')
+        self._columns = None
+        self._inserted = bool(match) and match.group(1).upper() == 'INSERT'
+        self._lastrowid = None
+    
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            self._prepare(sql)
+            if parameters:
+                self._cursor.execute(translate_placeholders(sql), parameters)
+            else:
+                self._cursor.execute(sql)
+        finally:
+            record_query(sql, time.perf_counter() - start)
+        return self
+    
+    def executemany(self, sql, seq_of_parameters):
+        # execute_batch mengirim banyak statement per round trip; executemany
+        # psycopg2 satu per baris (impor jurnal ribuan baris)
+        from psycopg2.extras import execute_batch
+        start = time.perf_counter()
+        try:
+            self._prepare(sql)
+            execute_batch(self._cursor, translate_placeholders(sql), seq_of_parameters, page_size=PG_BATCH_SIZE)
+        finally:
+            record_query(sql, time.perf_counter() - start)
+        return self
+    
+    def executescript(self, sql_script):
+        # sqlite3 meng-commit transaksi yang terbuka sebelum menjalankan skrip
+        if self.connection.in_transaction:
+            self.connection.commit()
+        start = time.perf_counter()
+        try:
+            self._cursor.execute(sql_script)
+        finally:
+            record_query(sql_script, time.perf_counter() - start)
+        return self
+    
+    def _row(self, values):
+        if values is None:
+            return None
+        if self._columns is None:
+            self._columns = {column.name: i for i, column in enumerate(self._cursor.description)}
+        return PgRow(values, self._columns)
+    
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+    
+    def fetchmany(self, size=None):
+        return [self._row(values) for values in self._cursor.fetchmany(size or self._cursor.arraysize)]
+    
+    def fetchall(self):
+        return [self._row(values) for values in self._cursor.fetchall()]
+    
+    def __iter__(self):
+        return iter(self.fetchone, None)
+    
+    @property
+    def description(self):
+        return self._cursor.description
+    
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+    
+    @property
+    def lastrowid(self):
+        """id baris dari INSERT terakhir (kolom id harus SERIAL/IDENTITY)"""
+        if self._inserted and self._lastrowid is None:
+            cursor = self.connection.raw.cursor()
+            cursor.execute('SELECT lastval()')
+            self._lastrowid = cursor.fetchone()[0]
+        return self._lastrowid
+    
+    def close(self):
+        self._cursor.close()
+
+class PgConnection:
+    """Koneksi psycopg2 dengan antarmuka sqlite3.Connection.
+
+    Koneksi berjalan dalam autocommit; transaksi dibuka eksplisit (BEGIN atau
+    otomatis sebelum statement tulis) sehingga in_transaction, commit dan
+    rollback berperilaku seperti di sqlite3.
+    """
+    
+    def __init__(self, raw):
+        self.raw = raw
+        if not raw.autocommit:
+            raw.autocommit = True
+    
+    @property
+    def in_transaction(self):
+        import psycopg2.extensions
+        return self.raw.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+    
+    def cursor(self):
+        return PgCursor(self)
+    
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+    
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+    
+    def commit(self):
+        if self.in_transaction:
+            with self.raw.cursor() as cursor:
+                cursor.execute('COMMIT')
+            cache_coherence.expect_changes()
+    
+    def rollback(self):
+        if self.in_transaction:
+            with self.raw.cursor() as cursor:
+                cursor.execute('ROLLBACK')
+    
+    def close(self):
+        self.raw.close()
+
+@lru_cache(maxsize=1)
+def register_pg_types():
+    """Samakan tipe hasil dengan sqlite3: NUMERIC sebagai float, DATE/TIMESTAMP sebagai teks"""
+    from psycopg2 import extensions
+    extensions.register_type(extensions.new_type(
+        extensions.DECIMAL.values, 'TIRAMINE_NUMERIC',
+        lambda value, cursor: None if value is None else float(value)))
+    extensions.register_type(extensions.new_type(
+        extensions.DATE.values + extensions.PYDATETIME.values, 'TIRAMINE_DATETIME',
+        lambda value, cursor: value))
+
+def postgres_connect_params():
+    """Parameter koneksi PostgreSQL: variabel user/password/host/port/dbname, atau DATABASE_URL"""
+    if os.getenv("host"):
+        return {key: os.getenv(key) for key in ('user', 'password', 'host', 'port', 'dbname')}
+    return {'dsn': os.getenv("DATABASE_URL")}
+
+def create_storage_backend(name, readonly=False):
+    """Backend penyimpanan untuk nilai STORAGE_BACKEND ('sqlite' atau 'postgres')"""
+    if name == 'sqlite':
+        return SqliteBackend(DB_PATH, readonly=readonly)
+    if name == 'postgres':
+        return PostgresBackend(postgres_connect_params(), readonly=readonly)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {name!r}")
+
+db_pool = SqliteBackend(DB_PATH)
+
+def get_db():
+    """Koneksi unit kerja request ini (dipinjam dari pool sekali per request)"""
+    db = getattr(g, '_db', None)
+    if db is None:
+        db = g._db = db_pool.acquire()
+    return db
+
+@app.teardown_appcontext
+def close_db(exception):
+    """Commit hanya jika request menulis, lalu kembalikan koneksi ke pool"""
+    db = g.pop('_db', None)
+    if db is None:
+        return
+    try:
+        if db.in_transaction:
+            if exception is None:
+                db.commit()
+            else:
+                db.rollback()
+    except db_pool.errors as e:
+        logger.error("❌ Commit error on close: %s", e)
+    finally:
+        db_pool.release(db)
+
+_startup_lock = threading.Lock()
+_started_databases = set()
+
+def ensure_startup():
+    """Jalankan startup_tasks sekali per proses untuk setiap database yang dipakai
+    (create_app, CLI, atau request pertama)"""
+    key = db_pool.key()
+    if key in _started_databases:
+        return
+    with _startup_lock:
+        if key not in _started_databases:
+            startup_tasks()
+            _started_databases.add(key)
+
+@app.before_request
+def startup_before_first_request():
+    ensure_startup()
+
+def use_storage_backend(backend):
+    """Pindahkan get_db(), thread penulis, pembangun ekspor dan cache proses ke backend lain"""
+    global db_pool
+    # Job yang sudah antri masih milik database lama: selesaikan dulu. Thread
+    # penulis dan pool ekspor dibuat ulang dengan backend baru saat dipakai lagi.
+    write_queue.stop()
+    export_jobs.shutdown()
+    previous, db_pool = db_pool, backend
+    previous.close_all()
+    cache_coherence.reopen(backend)
+    report_cache.clear()
+    chart_of_accounts.invalidate()
+    auth_versions.invalidate()
+
+def configure_database(path):
+    """Arahkan pool koneksi, thread penulis dan pengamat cache ke file database lain"""
+    global DB_PATH
+    DB_PATH = Path(path)
+    use_storage_backend(SqliteBackend(DB_PATH))
+
+def configure_storage(name):
+    """Ganti backend penyimpanan get_db() ('sqlite' atau 'postgres')"""
+    use_storage_backend(create_storage_backend(name))
+
+def init_db():
+    """Reset total database: hapus semua tabel lalu jalankan ulang semua migrasi"""
+    logger.info("🚀 Starting database initialization...")
+    
+    # Use app context to ensure database connection stays open
+    with app.app_context():
+        db = get_db()
+        cur = db.cursor()
+        
+        logger.info("🗑️  Cleaning up existing tables...")
+        # HAPUS SEMUA TABEL - skema dibangun ulang oleh migrasi
+        cur.executescript('''
+            DROP TABLE IF EXISTS transaction_templates;
+            DROP TABLE IF EXISTS account_balances;
+            DROP TABLE IF EXISTS opening_balances;
+            DROP TABLE IF EXISTS adjusting_lines;
+            DROP TABLE IF EXISTS adjusting_entries;
+            DROP TABLE IF EXISTS journal_lines;
+            DROP TABLE IF EXISTS journal_entries;
+            DROP TABLE IF EXISTS inventory;
+            DROP TABLE IF EXISTS accounts;
+            DROP TABLE IF EXISTS users;
+            DROP TABLE IF EXISTS settings;
+            DROP TABLE IF EXISTS otp_verification;
+        ''')
+        
+        migrate_db()
+        report_cache.clear()
+        chart_of_accounts.invalidate()
+        logger.info("🎉 Database initialization completed successfully!")
+
+# ---------- Thread Latar ----------
+# Thread tidak ikut ter-fork: worker gunicorn yang di-fork setelah import
+# mewarisi objek thread yang sudah mati. Karena itu setiap thread latar
+# dijalankan malas per proses (dicek lewat pid) dan state yang terikat ke
+# thread lama (antrian, koneksi) dibuat ulang saat thread dimulai.
+
+class BackgroundWorker:
+    """Dasar thread latar tunggal per proses.
+
+    Subclass mengisi thread_name, _run(), _request_stop() (kirim sinyal
+    berhenti; False bila sinyal tidak bisa dikirim) dan bila perlu _reset()
+    untuk membuat ulang state sebelum thread baru dimulai.
+    """
+    
+    thread_name = 'tiramine-worker'
+    
+    def __init__(self):
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+    
+    def running(self):
+        """True bila thread milik proses ini masih berjalan"""
+        thread = self._thread
+        return thread is not None and self._pid == os.getpid() and thread.is_alive()
+    
+    def ensure_started(self):
+        if self.running():
+            return
+        with self._lock:
+            if not self.running():
+                self._reset()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+                self._thread.start()
+    
+    def stop(self, timeout=5):
+        """Minta thread berhenti dan tunggu sampai selesai"""
+        thread = self._thread
+        if not self.running():
+            return
+        if self._request_stop(timeout) is not False:
+            thread.join(timeout)
+    
+    def _reset(self):
+        pass
+    
+    def _request_stop(self, timeout):
+        raise NotImplementedError
+    
+    def _run(self):
+        raise NotImplementedError
+
+# ---------- Antrian Penulisan ----------
+# Posting jurnal/penyesuaian/penutup tidak di-commit oleh request masing-masing.
+# Semua dikirim ke satu thread penulis per proses yang mengumpulkan job yang
+# datang berdekatan (paling lama WRITE_BATCH_WINDOW detik) dan meng-commit-nya
+# dalam satu transaksi: satu fsync per batch dan tidak ada perebutan kunci
+# tulis (SQLITE_BUSY) antar request. Tiap job berjalan di SAVEPOINT sendiri
+# sehingga job yang gagal tidak membatalkan job lain di batch yang sama.
+
+WRITE_BATCH_WINDOW = 0.005
+WRITE_BATCH_MAX = 32
+WRITE_TIMEOUT = 30
+
+class WriteTimeout(TimeoutError):
+    """Job penulisan dibatalkan sebelum berjalan: tidak ada yang disimpan, aman diulang"""
+
+class WriteQueue(BackgroundWorker):
+    """Thread penulis tunggal dengan group commit; pemanggil menerima Future.
+
+    Job dijalankan di app context milik thread penulis dengan get_db()
+    menunjuk ke koneksi penulis, jadi fungsi job cukup memakai get_db()
+    seperti biasa dan tidak boleh commit/rollback sendiri.
+    """
+    
+    thread_name = 'tiramine-writer'
+    
+    def __init__(self, max_batch=WRITE_BATCH_MAX, window=WRITE_BATCH_WINDOW):
+        super().__init__()
+        self.max_batch = max_batch
+        self.window = window
+        self._queue = queue.Queue()
+    
+    def _reset(self):
+        self._queue = queue.Queue()
+    
+    def submit(self, fn, *args, **kwargs):
+        """Antrikan job; kembalikan Future berisi hasil fn setelah di-commit"""
+        self.ensure_started()
+        future = Future()
+        self._queue.put((fn, args, kwargs, future))
+        return future
+    
+    def run(self, fn, *args, **kwargs):
+        """Antrikan job dan tunggu sampai batch-nya ter-commit.
+
+        Jika job belum berjalan setelah WRITE_TIMEOUT detik, job dibatalkan dan
+        WriteTimeout dilempar. Job yang sudah berjalan tidak bisa dibatalkan,
+        jadi hasilnya ditunggu sampai selesai: melaporkannya gagal membuat
+        pengguna mengulang posting yang ternyata ter-commit.
+        """
+        if threading.current_thread() is self._thread:
+            # Dipanggil dari job lain: sudah di dalam transaksi penulis
+            return fn(*args, **kwargs)
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            result = future.result(timeout=WRITE_TIMEOUT)
+        except FutureTimeoutError:
+            if future.cancel():
+                raise WriteTimeout(
+                    f"Antrian penulisan sibuk lebih dari {WRITE_TIMEOUT} detik; "
+                    "data tidak disimpan, silakan coba lagi") from None
+            logger.warning("⏳ Job penulisan %s melewati %ss, menunggu commit", fn.__name__, WRITE_TIMEOUT)
+            result = future.result()
+        cache_coherence.expect_changes()
+        return result
+    
+    def _request_stop(self, timeout):
+        # Job yang sudah antri tetap di-commit sebelum sinyal ini terbaca
+        self._queue.put(None)
+    
+    def _next_batch(self):
+        job = self._queue.get()
+        if job is None:
+            return None
+        batch = [job]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job is None:
+                self._queue.put(None)
+                break
+            batch.append(job)
+        return batch
+    
+    def _run(self):
+        conn = db_pool.connect()
+        with app.app_context():
+            g._db = conn
+            try:
+                while True:
+                    batch = self._next_batch()
+                    if batch is None:
+                        break
+                    self._commit_batch(conn, batch)
+            finally:
+                g.pop('_db', None)
+                conn.close()
+    
+    def _commit_batch(self, conn, batch):
+        done = []
+        try:
+            db_pool.begin_write(conn)
+            for fn, args, kwargs, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute('SAVEPOINT write_job')
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as e:
+                    conn.execute('ROLLBACK TO write_job')
+                    conn.execute('RELEASE write_job')
+                    future.set_exception(e)
+                else:
+                    conn.execute('RELEASE write_job')
+                    done.append((future, result))
+            conn.commit()
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            logger.error("❌ Group commit gagal (%d job): %s", len(batch), e)
+            for fn, args, kwargs, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        metrics.observe('tiramine_write_batch_size', len(batch))
+        for future, result in done:
+            future.set_result(result)
+
+write_queue = WriteQueue()
+atexit.register(write_queue.stop)
+
+# ---------- Migrasi Skema ----------
+# Migrasi hanya maju (forward-only) dan idempoten. Versi skema disimpan di
+# settings['schema_version']; tambahkan migrasi baru di akhir MIGRATIONS,
+# jangan ubah migrasi yang sudah dirilis.
+
+def create_base_schema(cur):
+    """Buat semua tabel dasar jika belum ada"""
+    # Buat tabel users
+    cur.execute(db_pool.schema_sql('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    '''))
+
+    # Buat tabel accounts (Chart of Accounts) - SESUAI NERACA SALDO AWAL
+    cur.execute(db_pool.schema_sql('''
+        CREATE TABLE IF NOT EXISTS accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            code TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            acct_type TEXT NOT NULL,
+            normal_balance TEXT NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    '''))
+
+    # Buat tabel journal_entries
+    cur.execute(db_pool.schema_sql('''
+        CREATE TABLE IF NOT EXISTS journal_entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date DATE NOT NULL,
+            description TEXT NOT NULL,
+            reference TEXT,
+            transaction_type TEXT DEFAULT 'General',
+            posted BOOLEAN DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    '''))
+
+    # Buat tabel journal_lines
+    cur.execute(db_pool.schema_sql('''
+        CREATE TABLE IF NOT EXISTS journal_lines (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entry_id INTEGER NOT NULL,
+            account_id INTEGER NOT NULL,
+            debit DECIMAL(15,2) DEFAULT 0,
+            credit DECIMAL(15,2) DEFAULT 0,
+            description TEXT,
+            FOREIGN KEY (entry_id) REFERENCES journal_entries (id),
+            FOREIGN KEY (account_id) REFERENCES accounts (id)
+        )
+    '''))
+
+    # Buat tabel adjusting_entries
+    cur.execute(db_pool.schema_sql('''
+        CREATE TABLE IF NOT EXISTS adjusting_entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date DATE NOT NULL,
+            description TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    '''))
+
+    # Buat tabel adjusting_lines
+    cur.execute(db_pool.schema_sql('''
+        CREATE TABLE IF NOT EXISTS adjusting_lines (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            adj_id INTEGER NOT NULL,
+            account_id INTEGER NOT NULL,
+            debit DECIMAL(15,2) DEFAULT 0,
+            credit DECIMAL(15,2) DEFAULT 0,
+            description TEXT,
+            FOREIGN KEY (adj_id) REFERENCES adjusting_entries (id),
+            FOREIGN KEY (account_id) REFERENCES accounts (id)
+        )
+    '''))
+
+    # Buat tabel inventory
+    cur.execute(db_pool.schema_sql('''
+        CREATE TABLE IF NOT EXISTS inventory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date DATE NOT NULL,
+            description TEXT NOT NULL,
+            quantity_in INTEGER DEFAULT 0,
+            quantity_out INTEGER DEFAULT 0,
+            unit_cost DECIMAL(15,2) DEFAULT 0,
+            value DECIMAL(15,2) DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    '''))
+
+    # Buat tabel settings
+    cur.execute(db_pool.schema_sql('''
+        CREATE TABLE IF NOT EXISTS settings (
+            k TEXT PRIMARY KEY,
+            v TEXT NOT NULL
+        )
+    '''))
+
+    # Buat tabel opening_balances dengan struktur yang BENAR
+    cur.execute(db_pool.schema_sql('''
+        CREATE TABLE IF NOT EXISTS opening_balances (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account_id INTEGER UNIQUE NOT NULL,
+            debit_amount DECIMAL(15,2) DEFAULT 0,
+            credit_amount DECIMAL(15,2) DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (account_id) REFERENCES accounts (id)
+        )
+    '''))
+
+    # Buat tabel untuk OTP verification
+    cur.execute(db_pool.schema_sql('''
+        CREATE TABLE IF NOT EXISTS otp_verification (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL,
+            otp_code TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP NOT NULL,
+            used BOOLEAN DEFAULT 0
+        )
+    '''))
+
+    # Buat tabel transaction_templates
+    cur.execute(db_pool.schema_sql('''
+        CREATE TABLE IF NOT EXISTS transaction_templates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            template_key TEXT UNIQUE NOT NULL,
+            label TEXT NOT NULL,
+            description TEXT,
+            lines_json TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    '''))
+
+def seed_default_data(cur):
+    """Isi data awal: pengaturan, bagan akun, saldo awal, admin dan template"""
+    # Insert default settings
+    cur.execute('''
+        INSERT INTO settings (k, v) VALUES 
+        ('company_name', 'Peternakan Tiram Tiramine'),
+        ('company_description', 'Sistem Akuntansi Peternakan Tiram Modern'),
+        ('company_location', 'Indonesia'),
+        ('current_stock_large', '0'),
+        ('current_stock_small', '0')
+        ON CONFLICT(k) DO NOTHING
+    ''')
+
+    logger.info("👤 Creating default accounts...")
+    # DATA DEFAULT - BUAT SEMUA AKUN SESUAI NERACA SALDO AWAL ANDA
+    accounts = [
+        # ===== ASET =====
+        ('101', 'Kas', 'Asset', 'Debit', 'Kas perusahaan'),
+        ('102', 'Piutang Usaha', 'Asset', 'Debit', 'Piutang dari pelanggan'),
+        ('103', 'Peralatan Tambak', 'Asset', 'Debit', 'Peralatan untuk tambak tiram'),
+        ('104', 'Perlengkapan', 'Asset', 'Debit', 'Perlengkapan operasional'),
+        ('105', 'Persediaan - Tiram Kecil', 'Asset', 'Debit', 'Persediaan tiram kecil'),
+        ('106', 'Persediaan - Tiram Besar', 'Asset', 'Debit', 'Persediaan tiram besar'),
+        ('107', 'Persediaan Benih Kecil', 'Asset', 'Debit', 'Persediaan benih tiram kecil'),
+        ('108', 'Persediaan Benih Besar', 'Asset', 'Debit', 'Persediaan benih tiram besar'),
+        ('109', 'Kendaraan', 'Asset', 'Debit', 'Kendaraan operasional'),
+        ('110', 'Akumulasi Penyusutan Kendaraan', 'Contra Asset', 'Credit', 'Akumulasi penyusutan kendaraan'),
+
+        # ===== KEWAJIBAN =====
+        ('201', 'Utang Usaha', 'Liability', 'Credit', 'Utang kepada supplier'),
+        ('202', 'Utang Gaji', 'Liability', 'Credit', 'Utang gaji karyawan'),
+
+        # ===== EKUITAS =====
+        ('301', 'Modal Pemilik (Tiramine Capital)', 'Equity', 'Credit', 'Modal pemilik perusahaan'),
+        ('302', 'Ikhtisar Laba Rugi', 'Equity', 'Credit', 'Ikhtisar laba rugi'),
+        ('303', 'Laba Ditahan', 'Equity', 'Credit', 'Laba yang ditahan'),
+
+        # ===== PENDAPATAN =====
+        ('401', 'Penjualan - Tiram Besar', 'Revenue', 'Credit', 'Pendapatan penjualan tiram besar'),
+        ('402', 'Penjualan - Tiram Kecil', 'Revenue', 'Credit', 'Pendapatan penjualan tiram kecil'),
+
+        # ===== BEBAN =====
+        ('501', 'HPP - Tiram Kecil', 'Expense', 'Debit', 'Harga pokok penjualan tiram kecil'),
+        ('502', 'HPP - Tiram Besar', 'Expense', 'Debit', 'Harga pokok penjualan tiram besar'),
+        ('503', 'Beban Gaji', 'Expense', 'Debit', 'Beban gaji karyawan'),
+        ('504', 'Beban Penyusutan Kendaraan', 'Expense', 'Debit', 'Beban Penyusutan Kendaraan')
+    ]
+
+    for code, name, atype, normal, desc in accounts:
+        cur.execute('INSERT INTO accounts (code, name, acct_type, normal_balance, description) VALUES (?,?,?,?,?)', 
+                    (code, name, atype, normal, desc))
+        logger.debug("✅ Created account: %s - %s", code, name)
+
+    # INSERT SALDO AWAL DEFAULT SESUAI NERACA SALDO AWAL ANDA
+    logger.info("🔧 Setting up default opening balances...")
+    opening_balances = [
+        # Assets (Debit)
+        (1, 8500000, 0),    # Kas (101)
+        (2, 4500000, 0),    # Piutang Usaha (102)
+        (3, 500000, 0),     # Peralatan Tambak (103)
+        (4, 300000, 0),     # Perlengkapan (104)
+        (5, 1200000, 0),    # Persediaan - Tiram Kecil (105)
+        (6, 1750000, 0),    # Persediaan - Tiram Besar (106)
+        (7, 12000000, 0),   # Kendaraan (107)
+
+        # Contra Asset (Credit)
+        (8, 0, 1500000),    # Akumulasi Penyusutan Kendaraan (108)
+
+        # Liabilities (Credit)
+        (9, 0, 650000),     # Utang Usaha (201)
+        (10, 0, 100000),    # Utang Gaji (202)
+
+        # Equity (Credit)
+        (11, 0, 22300000),  # Modal Pemilik (301)
+
+        # Revenue (Credit) - dari penjualan
+        (12, 0, 4000000),   # Penjualan - Tiram Besar (401)
+        (13, 0, 3000000),   # Penjualan - Tiram Kecil (402)
+
+        # Expenses (Debit) - dari HPP dan beban
+        (14, 1000000, 0),   # HPP - Tiram Kecil (501)
+        (15, 1500000, 0),   # HPP - Tiram Besar (502)
+        (16, 300000, 0),    # Beban Gaji (503)
+    ]
+
+    for account_id, debit_amount, credit_amount in opening_balances:
+        cur.execute('''
+            INSERT INTO opening_balances (account_id, debit_amount, credit_amount) 
+            VALUES (?, ?, ?)
+        ''', (account_id, debit_amount, credit_amount))
+        logger.debug("✅ Set opening balance for account %s: Debit=%s, Credit=%s", account_id, f"{debit_amount:,}", f"{credit_amount:,}")
+
+    # Hitung total untuk verifikasi
+    total_debit = sum(balance[1] for balance in opening_balances)
+    total_credit = sum(balance[2] for balance in opening_balances)
+    logger.info("📊 Saldo awal: debit %s, kredit %s, balanced=%s", f"{total_debit:,}", f"{total_credit:,}",
+                total_debit == total_credit)
+
+    # BUAT USER ADMIN
+    password_hash = hash_password(b'password')
+    cur.execute(
+        'INSERT INTO users (username, password_hash, email) VALUES (?, ?, ?)',
+        ('admin', password_hash, 'tiramine@gmail.com')
+    )
+    logger.info("✅ User admin created")
+
+    # Insert sample inventory data
+    cur.execute('''
+        INSERT INTO inventory (date, description, quantity_in, unit_cost, value)
+        VALUES 
+        ('2024-01-01', 'Stok awal tiram besar', 0, 55000, 0),
+        ('2024-01-01', 'Stok awal tiram kecil', 0, 30000, 0)
+    ''')
+    logger.info("✅ Sample inventory data created!")
+
+    # Insert default templates berdasarkan contoh transaksi
+    templates = [
+        {
+            'template_key': 'penjualan_tunai_besar',
+            'label': 'Penjualan Tunai (Tiram Besar)',
+            'description': 'Penjualan tiram besar secara tunai',
+            'lines_json': json.dumps([
+                {"account_code": "101", "side": "debit", "editable": False, "description": "Kas", "auto_calculate": False},
+                {"account_code": "401", "side": "credit", "editable": False, "description": "Penjualan - Tiram Besar", "auto_calculate": False}
+            ])
+        },
+        {
+            'template_key': 'penjualan_tunai_kecil', 
+            'label': 'Penjualan Tunai (Tiram Kecil)',
+            'description': 'Penjualan tiram kecil secara tunai',
+            'lines_json': json.dumps([
+                {"account_code": "101", "side": "debit", "editable": False, "description": "Kas", "auto_calculate": False},
+                {"account_code": "402", "side": "credit", "editable": False, "description": "Penjualan - Tiram Kecil", "auto_calculate": False}
+            ])
+        },
+        {
+            'template_key': 'penjualan_kredit_besar',
+            'label': 'Penjualan Kredit (Tiram Besar)',
+            'description': 'Penjualan tiram besar secara kredit',
+            'lines_json': json.dumps([
+                {"account_code": "102", "side": "debit", "editable": False, "description": "Piutang Usaha", "auto_calculate": False},
+                {"account_code": "401", "side": "credit", "editable": False, "description": "Penjualan - Tiram Besar", "auto_calculate": False}
+            ])
+        },
+        {
+            'template_key': 'pembayaran_gaji',
+            'label': 'Pembayaran Gaji Karyawan',
+            'description': 'Pembayaran gaji dan upah karyawan',
+            'lines_json': json.dumps([
+                {"account_code": "503", "side": "debit", "editable": False, "description": "Beban Gaji", "auto_calculate": False},
+                {"account_code": "101", "side": "credit", "editable": False, "description": "Kas", "auto_calculate": False}
+            ])
+        },
+        {
+            'template_key': 'pembelian_peralatan',
+            'label': 'Pembelian Peralatan',
+            'description': 'Pembelian peralatan tambak secara tunai',
+            'lines_json': json.dumps([
+                {"account_code": "103", "side": "debit", "editable": False, "description": "Peralatan Tambak", "auto_calculate": False},
+                {"account_code": "101", "side": "credit", "editable": False, "description": "Kas", "auto_calculate": False}
+            ])
+        },
+        {
+            'template_key': 'pelunasan_piutang',
+            'label': 'Pelunasan Piutang',
+            'description': 'Penerimaan pelunasan piutang usaha',
+            'lines_json': json.dumps([
+                {"account_code": "101", "side": "debit", "editable": False, "description": "Kas", "auto_calculate": False},
+                {"account_code": "102", "side": "credit", "editable": False, "description": "Piutang Usaha", "auto_calculate": False}
+            ])
+        },
+        {
+            'template_key': 'pembayaran_utang',
+            'label': 'Pembayaran Utang Usaha',
+            'description': 'Pembayaran utang kepada supplier',
+            'lines_json': json.dumps([
+                {"account_code": "201", "side": "debit", "editable": False, "description": "Utang Usaha", "auto_calculate": False},
+                {"account_code": "101", "side": "credit", "editable": False, "description": "Kas", "auto_calculate": False}
+            ])
+        },
+        {
+            'template_key': 'penyesuaian_persediaan',
+            'label': 'Penyesuaian Persediaan',
+            'description': 'Penyesuaian nilai persediaan tiram',
+            'lines_json': json.dumps([
+                {"account_code": "501", "side": "debit", "editable": True, "description": "HPP - Tiram Kecil", "auto_calculate": False},
+                {"account_code": "502", "side": "debit", "editable": True, "description": "HPP - Tiram Besar", "auto_calculate": False},
+                {"account_code": "105", "side": "credit", "editable": True, "description": "Persediaan - Tiram Kecil", "auto_calculate": False},
+                {"account_code": "106", "side": "credit", "editable": True, "description": "Persediaan - Tiram Besar", "auto_calculate": False}
+            ])
+        }
+    ]
+
+    for template in templates:
+        cur.execute('''
+            INSERT INTO transaction_templates (template_key, label, description, lines_json)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(template_key) DO UPDATE SET
+                label = excluded.label, description = excluded.description, lines_json = excluded.lines_json
+        ''', (template['template_key'], template['label'], template['description'], template['lines_json']))
+    
+    bump_coa_version(cur)
+
+def migration_001_baseline(cur):
+    """Skema dasar; data awal hanya diisi untuk database kosong"""
+    create_base_schema(cur)
+    cur.execute('SELECT COUNT(*) as count FROM accounts')
+    if cur.fetchone()['count'] == 0:
+        seed_default_data(cur)
+
+def migration_002_hot_path_indexes(cur):
+    """Index untuk pola join/filter ledger, jurnal, ekspor, agregat saldo dan OTP"""
+    # Ledger per akun & agregat GROUP BY account_id (covering: tanpa baca tabel)
+    cur.execute('''
+        CREATE INDEX IF NOT EXISTS idx_journal_lines_account
+        ON journal_lines (account_id, entry_id, debit, credit)
+    ''')
+    cur.execute('''
+        CREATE INDEX IF NOT EXISTS idx_adjusting_lines_account
+        ON adjusting_lines (account_id, adj_id, debit, credit)
+    ''')
+    # Baris per entri (halaman jurnal, detail entri, ekspor)
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_journal_lines_entry ON journal_lines (entry_id)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_adjusting_lines_adj ON adjusting_lines (adj_id)')
+    # Urutan/filter tanggal
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_journal_entries_date ON journal_entries (date, id)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_adjusting_entries_date ON adjusting_entries (date, id)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_inventory_date ON inventory (date, id)')
+    # verify_otp_code
+    cur.execute('''
+        CREATE INDEX IF NOT EXISTS idx_otp_verification_email
+        ON otp_verification (email, otp_code, used)
+    ''')
+
+def migration_003_account_balances(cur):
+    """Tabel ringkasan saldo per akun, diisi dari baris yang sudah ada"""
+    cur.execute(db_pool.schema_sql(ACCOUNT_BALANCES_TABLE_SQL))
+    rebuild_account_balances(cur)
+
+def migration_004_journal_type_index(cur):
+    """Index untuk filter jenis transaksi di halaman jurnal"""
+    cur.execute('''
+        CREATE INDEX IF NOT EXISTS idx_journal_entries_type_date
+        ON journal_entries (transaction_type, date, id)
+    ''')
+
+def migration_005_otp_delivery_status(cur):
+    """Status pengiriman email OTP (diisi thread pengirim email)"""
+    columns = db_pool.table_columns(cur, 'otp_verification')
+    for column, definition in [
+        ('delivery_status', "TEXT NOT NULL DEFAULT 'pending'"),
+        ('delivery_attempts', 'INTEGER NOT NULL DEFAULT 0'),
+        ('delivery_error', 'TEXT'),
+        ('delivered_at', 'TIMESTAMP'),
+    ]:
+        if column not in columns:
+            cur.execute(f'ALTER TABLE otp_verification ADD COLUMN {column} {definition}')
+
+def migration_006_otp_sweep_indexes(cur):
+    """Index untuk pembersihan OTP kedaluwarsa/terpakai (delete_stale_otps)"""
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_otp_verification_expires ON otp_verification (expires_at)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_otp_verification_used ON otp_verification (id) WHERE used = 1')
+
+def migration_007_user_session_fields(cur):
+    """Role dan auth_version user untuk sesi yang bisa dicabut (lihat Sesi Pengguna)"""
+    columns = db_pool.table_columns(cur, 'users')
+    if 'role' not in columns:
+        # User yang sudah ada tetap admin; akun baru default non-admin
+        cur.execute("ALTER TABLE users ADD COLUMN role TEXT NOT NULL DEFAULT 'user'")
+        cur.execute("UPDATE users SET role = 'admin'")
+    if 'auth_version' not in columns:
+        cur.execute('ALTER TABLE users ADD COLUMN auth_version INTEGER NOT NULL DEFAULT 1')
+    bump_cache_version(cur, 'auth')
+
+MIGRATIONS = [
+    (1, 'Skema dasar dan data awal', migration_001_baseline),
+    (2, 'Index untuk query utama', migration_002_hot_path_indexes),
+    (3, 'Ringkasan saldo akun', migration_003_account_balances),
+    (4, 'Index filter jenis transaksi', migration_004_journal_type_index),
+    (5, 'Status pengiriman email OTP', migration_005_otp_delivery_status),
+    (6, 'Index pembersihan OTP', migration_006_otp_sweep_indexes),
+    (7, 'Role dan versi autentikasi user', migration_007_user_session_fields),
+]
+
+def get_schema_version(db):
+    """Versi skema saat ini (0 untuk database lama tanpa versi)"""
+    row = db.execute("SELECT v FROM settings WHERE k = 'schema_version'").fetchone()
+    return int(row['v']) if row else 0
+
+def migrate_db():
+    """Jalankan migrasi yang belum diterapkan. Aman dipanggil berulang kali."""
+    db = get_db()
+    db.execute('CREATE TABLE IF NOT EXISTS settings (k TEXT PRIMARY KEY, v TEXT NOT NULL)')
+    db.commit()
+    
+    latest = MIGRATIONS[-1][0]
+    if get_schema_version(db) >= latest:
+        return latest
+    
+    # BEGIN IMMEDIATE mengunci penulisan sehingga worker lain yang start
+    # bersamaan menunggu, lalu membaca ulang versi dan tidak mengulang migrasi
+    db_pool.begin_write(db)
+    try:
+        current = get_schema_version(db)
+        cur = db.cursor()
+        for version, description, migration in MIGRATIONS:
+            if version <= current:
+                continue
+            logger.info("🧱 Applying migration %s: %s", version, description)
+            migration(cur)
+            cur.execute('''
+                INSERT INTO settings (k, v) VALUES ('schema_version', ?)
+                ON CONFLICT(k) DO UPDATE SET v = excluded.v
+            ''', (str(version),))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.exception("❌ Database migration failed: %s", e)
+        raise
+    return latest
+
+# ---------- Helper Autentikasi ----------
+
+def current_user():
+    """User yang login ({'id', 'username', 'role'}), di-resolve sekali per request"""
+    if '_current_user' not in g:
+        g._current_user = load_session_user()
+    return g._current_user
+
+def login_required(f):
+    from functools import wraps
+    @wraps(f)
+    def wrapped(*args, **kwargs):
+        if not current_user():
+            return redirect(url_for('login'))
+        return f(*args, **kwargs)
+    return wrapped
+
+def normalize_email(email: str) -> str:
+    return (email or '').strip().lower()
+
+def hash_password(password: bytes) -> str:
+    """Hash bcrypt sebagai teks (kolom password_hash bertipe TEXT di semua backend)"""
+    return bcrypt.hashpw(password, bcrypt.gensalt()).decode('ascii')
+
+def check_password(password: bytes, password_hash) -> bool:
+    # Baris lama di SQLite menyimpan hash sebagai bytes
+    if isinstance(password_hash, str):
+        password_hash = password_hash.encode('ascii')
+    return bcrypt.checkpw(password, password_hash)
+
+# ---------- Pengiriman Email ----------
+# Email (OTP) tidak dikirim di thread request. Request hanya memasukkan email
+# ke antrian terbatas; satu thread pengirim per proses memakai ulang koneksi
+# SMTP yang sudah login dan menyambung ulang bila koneksi diputus server.
+# Kegagalan sementara dicoba ulang dengan jeda eksponensial (MAIL_RETRY_DELAY,
+# 2x, 4x, ...), lalu status akhirnya dicatat di baris otp_verification.
+# SMTP_STARTTLS=0 dan SMTP_USERNAME kosong memungkinkan relay lokal tanpa
+# TLS/login (mis. aiosmtpd saat pengujian).
+
+MAIL_QUEUE_SIZE = int(os.environ.get('MAIL_QUEUE_SIZE', 100))
+MAIL_MAX_ATTEMPTS = int(os.environ.get('MAIL_MAX_ATTEMPTS', 4))
+MAIL_RETRY_DELAY = float(os.environ.get('MAIL_RETRY_DELAY', 2))
+MAIL_IDLE_TIMEOUT = 60
+SMTP_TIMEOUT = 20
+
+metrics.counter('tiramine_mail_deliveries_total', 'Hasil percobaan pengiriman email per status')
+
+def smtp_settings():
+    """Konfigurasi SMTP dari environment, atau None jika belum lengkap"""
+    server = os.environ.get('SMTP_SERVER')
+    username = os.environ.get('SMTP_USERNAME')
+    sender = os.environ.get('SMTP_FROM') or username
+    if not server or not sender:
+        return None
+    return {
+        'server': server,
+        'port': int(os.environ.get('SMTP_PORT', 587)),
+        'username': username,
+        'password': os.environ.get('SMTP_PASSWORD'),
+        'sender': sender,
+        'starttls': os.environ.get('SMTP_STARTTLS', '1') != '0'
+    }
+
+class OutgoingMail:
+    """Satu email di antrian pengirim"""
+    
+    def __init__(self, to_email, subject, body_html, otp_id=None):
+        self.to_email = to_email
+        self.subject = subject
+        self.body_html = body_html
+        self.otp_id = otp_id
+        self.attempts = 0
+
+class MailSender(BackgroundWorker):
+    """Thread pengirim email dengan antrian terbatas dan koneksi SMTP yang dipakai ulang"""
+    
+    thread_name = 'tiramine-mailer'
+    
+    def __init__(self, settings=smtp_settings, max_queue=MAIL_QUEUE_SIZE, max_attempts=MAIL_MAX_ATTEMPTS,
+                 retry_delay=MAIL_RETRY_DELAY, idle_timeout=MAIL_IDLE_TIMEOUT):
+        super().__init__()
+        self.settings = settings
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.idle_timeout = idle_timeout
+        self._queue = None
+        self._retries = []
+        self._seq = 0
+        self._smtp = None
+    
+    def configured(self):
+        return self.settings() is not None
+    
+    def submit(self, to_email, subject, body_html, otp_id=None):
+        """Antrikan email; False jika antrian penuh"""
+        self.ensure_started()
+        try:
+            self._queue.put_nowait(OutgoingMail(to_email, subject, body_html, otp_id))
+        except queue.Full:
+            metrics.inc('tiramine_mail_deliveries_total', status='rejected')
+            return False
+        return True
+    
+    def _reset(self):
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._retries = []
+        self._smtp = None
+    
+    def _request_stop(self, timeout):
+        # Email yang sudah antri tetap dikirim sebelum sinyal ini terbaca
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return False
+    
+    def _run(self):
+        while True:
+            # Percobaan ulang yang sudah jatuh tempo didahulukan
+            while self._retries and self._retries[0][0] <= time.monotonic():
+                self._deliver(heapq.heappop(self._retries)[2])
+            
+            if self._retries:
+                timeout = max(0, self._retries[0][0] - time.monotonic())
+            else:
+                timeout = self.idle_timeout
+            try:
+                mail = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                if not self._retries:
+                    # Lama tidak ada email - lepas koneksi SMTP
+                    self._disconnect()
+                continue
+            if mail is None:
+                break
+            self._deliver(mail)
+        self._disconnect()
+    
+    def _deliver(self, mail):
+        mail.attempts += 1
+        settings = self.settings()
+        if settings is None:
+            self._record(mail, 'failed', 'SMTP belum dikonfigurasi.')
+            return
+        
+        try:
+            self._send(settings, mail)
+        except Exception as e:
+            self._disconnect()
+            # Kode 5xx dan alamat tujuan ditolak tidak akan berhasil bila diulang
+            permanent = (isinstance(e, smtplib.SMTPRecipientsRefused)
+                         or (isinstance(e, smtplib.SMTPResponseException) and e.smtp_code >= 500))
+            if permanent or mail.attempts >= self.max_attempts:
+                logger.error("❌ Gagal mengirim email ke %s (percobaan %d): %s",
+                             mask_email(mail.to_email), mail.attempts, e)
+                self._record(mail, 'failed', str(e))
+            else:
+                delay = self.retry_delay * 2 ** (mail.attempts - 1)
+                logger.warning("🔁 Pengiriman email ke %s gagal (percobaan %d), diulang %.1f detik lagi: %s",
+                               mask_email(mail.to_email), mail.attempts, delay, e)
+                self._seq += 1
+                heapq.heappush(self._retries, (time.monotonic() + delay, self._seq, mail))
+                self._record(mail, 'retrying', str(e))
+        else:
+            logger.info("📧 Email terkirim ke %s", mask_email(mail.to_email))
+            self._record(mail, 'sent')
+    
+    def _send(self, settings, mail):
+        message = MIMEMultipart('alternative')
+        message['From'] = settings['sender']
+        message['To'] = mail.to_email
+        message['Subject'] = mail.subject
+        message.attach(MIMEText(mail.body_html, 'html'))
+        
+        try:
+            self._connection(settings).send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # Koneksi lama sudah ditutup server (idle timeout) - sambung ulang sekali
+            self._disconnect()
+            self._connection(settings).send_message(message)
+    
+    def _connection(self, settings):
+        if self._smtp is None:
+            smtp = smtplib.SMTP(settings['server'], settings['port'], timeout=SMTP_TIMEOUT)
+            try:
+                if settings['starttls']:
+                    smtp.starttls()
+                if settings['username'] and settings['password']:
+                    smtp.login(settings['username'], settings['password'])
+            except Exception:
+                smtp.close()
+                raise
+            self._smtp = smtp
+        return self._smtp
+    
+    def _disconnect(self):
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+    
+    def _record(self, mail, status, error=None):
+        metrics.inc('tiramine_mail_deliveries_total', status=status)
+        if mail.otp_id is not None:
+            write_queue.submit(record_mail_delivery, mail.otp_id, status, mail.attempts, error)
+
+def record_mail_delivery(otp_id, status, attempts, error=None):
+    """Job write_queue: catat status pengiriman email OTP"""
+    get_db().execute('''
+        UPDATE otp_verification
+        SET delivery_status = ?, delivery_attempts = ?, delivery_error = ?,
+            delivered_at = CASE WHEN ? = 'sent' THEN CURRENT_TIMESTAMP ELSE delivered_at END
+        WHERE id = ?
+    ''', (status, attempts, error[:500] if error else None, status, otp_id))
+
+mail_sender = MailSender()
+atexit.register(mail_sender.stop)
+
+# ---------- Pembatasan Laju ----------
+# Percobaan login dan permintaan OTP dibatasi per email/username dan per IP
+# dengan jendela geser di memori, sehingga skrip tidak bisa memicu bcrypt,
+# kiriman SMTP atau tebakan kode OTP tanpa batas. Batas berlaku per proses
+# worker; dengan N worker batas efektifnya paling banyak N kali lipat.
+# Percobaan login dicatat sebelum bcrypt lalu dihapus lagi bila berhasil,
+# jadi hanya login gagal yang mengisi jendela IP dan banyak user di balik
+# satu NAT kantor tidak saling mengunci. IP klien diambil dari
+# request.remote_addr (lihat TRUSTED_PROXIES).
+
+class SlidingWindowRateLimiter:
+    """Paling banyak `limit` kejadian per kunci dalam `window` detik terakhir"""
+    
+    def __init__(self, limit, window, max_keys=10000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._hits = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def hit(self, key):
+        """Catat satu kejadian; kembalikan 0 jika diizinkan, atau detik tunggu"""
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits.pop(key, None)
+            if hits is None:
+                hits = deque()
+            while hits and hits[0] <= now - self.window:
+                hits.popleft()
+            
+            # Kunci yang baru dipakai di akhir; yang paling lama dibuang jika penuh
+            self._hits[key] = hits
+            while len(self._hits) > self.max_keys:
+                self._hits.popitem(last=False)
+            
+            if len(hits) >= self.limit:
+                return hits[0] + self.window - now
+            hits.append(now)
+            return 0
+    
+    def forgive(self, key):
+        """Batalkan satu kejadian yang sudah dicatat (percobaan yang ternyata berhasil)"""
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits:
+                hits.pop()
+    
+    def reset(self, key):
+        with self._lock:
+            self._hits.pop(key, None)
+
+RATE_LIMITS = {
+    'login_user': SlidingWindowRateLimiter(5, 300),
+    'login_ip': SlidingWindowRateLimiter(20, 300),
+    'otp_request_email': SlidingWindowRateLimiter(3, 600),
+    'otp_request_ip': SlidingWindowRateLimiter(10, 600),
+    'otp_login_email': SlidingWindowRateLimiter(5, 600),
+    'otp_login_ip': SlidingWindowRateLimiter(20, 600),
+}
+
+metrics.counter('tiramine_rate_limited_total', 'Permintaan yang ditolak pembatas laju')
+
+def check_rate_limits(**keys):
+    """Catat percobaan di setiap limiter (nama=kunci); detik tunggu terlama atau 0"""
+    wait = 0
+    for name, key in keys.items():
+        retry_after = RATE_LIMITS[name].hit(key)
+        if retry_after:
+            metrics.inc('tiramine_rate_limited_total', limiter=name)
+            wait = max(wait, retry_after)
+    return wait
+
+def forgive_rate_limits(**keys):
+    """Batalkan percobaan yang tadi dicatat check_rate_limits (nama=kunci)"""
+    for name, key in keys.items():
+        RATE_LIMITS[name].forgive(key)
+
+def rate_limited_message(wait):
+    return f'Terlalu banyak percobaan. Silakan coba lagi dalam {int(wait) + 1} detik.'
+
+# ---------- Pembersihan OTP ----------
+# Kode OTP yang sudah dipakai atau kedaluwarsa dihapus berkala oleh thread
+# latar, per batch kecil lewat write_queue agar tabel otp_verification tidak
+# tumbuh terus dan penulisan lain tidak tertahan lama.
+
+OTP_SWEEP_INTERVAL = int(os.environ.get('OTP_SWEEP_INTERVAL', 300))
+OTP_SWEEP_BATCH = 500
+
+def delete_stale_otps(limit=OTP_SWEEP_BATCH):
+    """Job write_queue: hapus satu batch OTP terpakai/kedaluwarsa; kembalikan jumlahnya"""
+    db = get_db()
+    now = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    # Dua DELETE terpisah agar masing-masing memakai index-nya sendiri
+    deleted = db.execute('''
+        DELETE FROM otp_verification WHERE id IN (
+            SELECT id FROM otp_verification WHERE expires_at < ? LIMIT ?
+        )
+    ''', (now, limit)).rowcount
+    if deleted < limit:
+        deleted += db.execute('''
+            DELETE FROM otp_verification WHERE id IN (
+                SELECT id FROM otp_verification WHERE used = 1 LIMIT ?
+            )
+        ''', (limit - deleted,)).rowcount
+    return deleted
+
+class OtpSweeper(BackgroundWorker):
+    """Thread latar yang menjalankan delete_stale_otps setiap interval"""
+    
+    thread_name = 'tiramine-otp-sweeper'
+    
+    def __init__(self, interval=OTP_SWEEP_INTERVAL):
+        super().__init__()
+        self.interval = interval
+        self._stop = threading.Event()
+    
+    def _reset(self):
+        self._stop = threading.Event()
+    
+    def _request_stop(self, timeout):
+        self._stop.set()
+    
+    def sweep(self):
+        """Hapus semua OTP basi per batch; kembalikan total baris yang dihapus"""
+        total = 0
+        while True:
+            deleted = write_queue.run(delete_stale_otps)
+            total += deleted
+            if deleted < OTP_SWEEP_BATCH:
+                return total
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                deleted = self.sweep()
+                if deleted:
+                    logger.info("🧹 %d OTP basi dihapus", deleted)
+            except Exception as e:
+                logger.exception("❌ Pembersihan OTP gagal: %s", e)
+
+otp_sweeper = OtpSweeper()
+atexit.register(otp_sweeper.stop)
+
+@app.before_request
+def start_otp_sweeper():
+    otp_sweeper.ensure_started()
+
+def generate_otp_code(length: int = 6) -> str:
+    return ''.join(random.choice('0123456789') for _ in range(length))
+
+def create_otp_for_email(email: str, validity_minutes: int = 10):
+    code = generate_otp_code()
+    expires_at = (datetime.utcnow() + timedelta(minutes=validity_minutes)).strftime('%Y-%m-%d %H:%M:%S')
+    db = get_db()
+    cur = db.execute(
+        '''
+        INSERT INTO otp_verification (email, otp_code, expires_at, used, delivery_status)
+        VALUES (?, ?, ?, 0, 'queued')
+        ''',
+        (email, code, expires_at)
+    )
+    db.commit()
+    return code, expires_at, cur.lastrowid
+
+def verify_otp_code(email: str, otp_code: str):
+    """Validate OTP entry and mark it as used when successful."""
+    db = get_db()
+    cur = db.execute(
+        '''
+        SELECT id, expires_at FROM otp_verification
+        WHERE email = ? AND otp_code = ? AND used = 0
+        ORDER BY id DESC LIMIT 1
+        ''',
+        (email, otp_code)
+    )
+    record = cur.fetchone()
+    if not record:
+        return False, 'OTP tidak ditemukan atau sudah digunakan.'
+
+    try:
+        expires_at_dt = datetime.strptime(record['expires_at'], '%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        expires_at_dt = datetime.utcnow()
+
+    if datetime.utcnow() > expires_at_dt:
+        return False, 'OTP telah kedaluwarsa. Mohon minta kode baru.'
+
+    db.execute('UPDATE otp_verification SET used = 1 WHERE id = ?', (record['id'],))
+    db.commit()
+    return True, None
+
+# ---------- Cache Laporan ----------
+# Laporan (neraca saldo, laporan keuangan, ringkasan buku besar) disimpan di
+# memori per proses dan dikunci dengan versi per namespace (mis. 'ledger' ->
+# settings['ledger_version']). Setiap penulisan menaikkan versi namespace-nya
+# di transaksi yang sama, sehingga cache di worker lain ikut basi.
+
+def bump_cache_version(cur, namespace):
+    """Naikkan versi cache satu namespace; panggil dengan cursor transaksi penulisan"""
+    cur.execute('''
+        INSERT INTO settings (k, v) VALUES (?, '1')
+        ON CONFLICT(k) DO UPDATE SET v = CAST(CAST(settings.v AS INTEGER) + 1 AS TEXT)
+    ''', (f'{namespace}_version',))
+
+def bump_ledger_version(cur):
+    """Naikkan ledger_version (setiap posting/perubahan saldo)"""
+    bump_cache_version(cur, 'ledger')
+
+class CacheCoherence:
+    """Jaga cache per proses tetap sinkron dengan worker lain.
+
+    Memakai satu koneksi pengamat per proses. Pada SQLite PRAGMA data_version
+    koneksi itu berubah setiap kali koneksi LAIN (request di proses ini atau
+    worker gunicorn lain) melakukan commit, dan hanya saat nilainya berubah
+    baris versi di settings dibaca ulang. Backend tanpa penanda seperti itu
+    (PostgreSQL) membaca ulang baris versi sekali per app context (satu
+    request, atau sampai commit berikutnya di thread penulis); commit dari
+    konteks itu sendiri membuka lagi pembacaan berikutnya. Hanya namespace
+    yang versinya berubah yang listener-nya dipanggil untuk invalidasi.
+    """
+    
+    def __init__(self, backend):
+        self.backend = backend
+        self._conn = None
+        self._pid = None
+        self._inherited = []
+        self._data_version = None
+        self._schema_version = None
+        self._versions = {}
+        self._listeners = {}
+        self._lock = threading.Lock()
+    
+    def register(self, namespace, callback):
+        """Daftarkan callback invalidasi untuk namespace (mis. 'ledger', 'coa')"""
+        with self._lock:
+            self._listeners.setdefault(namespace, []).append(callback)
+            self._data_version = None
+    
+    def version(self, namespace):
+        return self._versions.get(namespace, 0)
+    
+    def reopen(self, backend):
+        """Amati database lain; semua namespace dianggap berubah"""
+        with self._lock:
+            self._close()
+            self.backend = backend
+            self._data_version = None
+            self._schema_version = None
+    
+    def _close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+    
+    def _connection(self):
+        # Koneksi tidak boleh dipakai lintas fork - buka ulang per proses. Milik
+        # proses induk tidak ditutup (socket PostgreSQL-nya masih dipakai induk).
+        if self._conn is None or self._pid != os.getpid():
+            if self._conn is not None:
+                self._inherited.append(self._conn)
+            self._conn = self.backend.open_watcher()
+            self._pid = os.getpid()
+            self._data_version = None
+        return self._conn
+    
+    def expect_changes(self):
+        """Konteks ini baru commit: refresh berikutnya membaca ulang versi"""
+        if has_app_context():
+            g.pop('_coherence_polled', None)
+    
+    def refresh(self):
+        """Cek perubahan dari koneksi lain; murah jika tidak ada commit baru"""
+        if not self.backend.has_change_marker and has_app_context():
+            if g.get('_coherence_polled'):
+                return
+            g._coherence_polled = True
+        with self._lock:
+            conn = self._connection()
+            try:
+                data_version = self.backend.change_marker(conn)
+                if data_version is not None and data_version == self._data_version:
+                    return
+                self._data_version = data_version
+                
+                # DROP/CREATE (init-db di worker lain) mengulang nomor versi dari
+                # awal, jadi perubahan skema membatalkan semua namespace
+                schema_version = self.backend.schema_marker(conn)
+            except self.backend.errors:
+                self._close()  # koneksi putus: buka ulang di refresh berikutnya
+                raise
+            reset = schema_version != self._schema_version
+            self._schema_version = schema_version
+            
+            namespaces = list(self._listeners)
+            try:
+                rows = conn.execute(
+                    f"SELECT k, v FROM settings WHERE k IN ({', '.join('?' * len(namespaces))})",
+                    [f'{namespace}_version' for namespace in namespaces]
+                ).fetchall()
+            except self.backend.errors:
+                rows = []  # database belum dimigrasi
+            latest = {k[:-len('_version')]: int(v) for k, v in rows}
+            changed = [ns for ns in namespaces if reset or latest.get(ns, 0) != self._versions.get(ns)]
+            for namespace in changed:
+                self._versions[namespace] = latest.get(namespace, 0)
+            callbacks = [cb for ns in changed for cb in self._listeners[ns]]
+        
+        for callback in callbacks:
+            callback()
+
+cache_coherence = CacheCoherence(db_pool)
+
+@app.before_request
+def refresh_caches_before_request():
+    """Invalidasi cache yang basi karena commit dari worker lain"""
+    if request.endpoint and 'static' in request.endpoint:
+        return
+    cache_coherence.refresh()
+
+class ReportCache:
+    """Cache LRU berukuran terbatas untuk hasil laporan per ledger_version"""
+    
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, key, version, compute):
+        with self._lock:
+            if version != self.version:
+                # Versi berubah - semua hasil lama sudah basi
+                self._entries.clear()
+                self.version = version
+            elif key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        
+        value = compute()
+        
+        with self._lock:
+            if version == self.version:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.version = None
+
+report_cache = ReportCache()
+cache_coherence.register('ledger', report_cache.clear)
+metrics.collector('tiramine_report_cache_requests_total', 'counter', 'Lookup report_cache per hasil',
+                  lambda: [({'result': 'hit'}, report_cache.hits), ({'result': 'miss'}, report_cache.misses)])
+
+class CachedSnapshot:
+    """Satu hasil _load() per proses, dibuang saat namespace cache-nya berubah.
+
+    Subclass mengisi _load(). Hasil muatan yang selesai setelah invalidate()
+    tidak disimpan, jadi pemuatan yang berjalan bersamaan dengan commit tidak
+    bisa mengembalikan data lama ke cache.
+    """
+    
+    def __init__(self, namespace):
+        self._value = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        cache_coherence.register(namespace, self.invalidate)
+    
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._value = None
+    
+    def current(self):
+        cache_coherence.refresh()
+        value = self._value
+        if value is not None:
+            return value
+        
+        generation = self._generation
+        value = self._load()
+        with self._lock:
+            # Jangan simpan hasil yang sudah basi karena invalidasi di tengah pemuatan
+            if generation == self._generation:
+                self._value = value
+        return value
+    
+    def _load(self):
+        raise NotImplementedError
+
+def cached_report(name):
+    """Decorator: simpan hasil fungsi laporan di report_cache.
+
+    Hasil yang dikembalikan dipakai bersama antar request - jangan diubah.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            compute = lambda: func(*args, **kwargs)
+            
+            snapshot = current_report_snapshot()
+            if snapshot is not None:
+                # report_cache hanya boleh dipakai jika versinya sama dengan snapshot
+                cache_coherence.refresh()
+                if cache_coherence.version('ledger') == snapshot.ledger_version:
+                    return snapshot.get_or_compute(
+                        key, lambda: report_cache.get_or_compute(key, snapshot.ledger_version, compute))
+                return snapshot.get_or_compute(key, compute)
+            
+            # Di tengah transaksi tulis data belum di-commit - jangan dicache
+            if get_db().in_transaction:
+                return compute()
+            cache_coherence.refresh()
+            return report_cache.get_or_compute(key, cache_coherence.version('ledger'), compute)
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+# ---------- Snapshot Laporan ----------
+# Laporan yang membaca banyak query (neraca, laba rugi, ekspor multi-sheet)
+# dijalankan dalam satu transaksi baca. Pada mode WAL transaksi itu melihat
+# satu snapshot database, jadi posting yang masuk di tengah pembangunan tidak
+# membuat neraca dan laba rugi saling tidak cocok. Hasil cached_report
+# (termasuk saldo semua akun yang dipakai bersama) dihitung sekali per
+# snapshot, dan report_cache hanya dipakai jika versinya sama dengan snapshot.
+
+class ReportSnapshot:
+    """Satu transaksi baca: ledger_version yang terlihat + memo hasil agregat"""
+    
+    def __init__(self, ledger_version):
+        self.ledger_version = ledger_version
+        self.memo = {}
+    
+    def get_or_compute(self, key, compute):
+        if key not in self.memo:
+            self.memo[key] = compute()
+        return self.memo[key]
+
+def current_report_snapshot():
+    """Snapshot laporan yang aktif di request/app context ini, atau None"""
+    snapshot = g.get('_report_snapshot')
+    if snapshot is None or not get_db().in_transaction:
+        return None
+    return snapshot
+
+@contextmanager
+def report_snapshot():
+    """Bangun laporan dari satu snapshot baca (bisa dipakai sebagai decorator).
+
+    Jika sudah ada snapshot atau transaksi tulis yang terbuka, konteks itu
+    dipakai apa adanya.
+    """
+    db = get_db()
+    if g.get('_report_snapshot') is not None or db.in_transaction:
+        yield current_report_snapshot()
+        return
+    
+    db_pool.begin_read_snapshot(db)
+    try:
+        # Query pertama mengunci snapshot sekaligus membaca versinya
+        row = db.execute("SELECT v FROM settings WHERE k = 'ledger_version'").fetchone()
+        g._report_snapshot = ReportSnapshot(int(row['v']) if row else 0)
+        yield g._report_snapshot
+    finally:
+        g.pop('_report_snapshot', None)
+        if db.in_transaction:
+            db.rollback()
+
+# ---------- Bagan Akun ----------
+# Bagan akun dan template transaksi jarang berubah tetapi dibaca di setiap
+# validasi dan posting. Keduanya dimuat sekali per proses ke ChartOfAccounts
+# dan diinvalidasi lewat namespace 'coa': setiap perubahan tabel accounts
+# atau transaction_templates wajib memanggil bump_coa_version(cur).
+
+def bump_coa_version(cur):
+    """Naikkan coa_version (perubahan akun atau template transaksi)"""
+    bump_cache_version(cur, 'coa')
+
+class ChartOfAccounts(CachedSnapshot):
+    """Registry akun (id <-> kode) dan template dengan lines_json yang sudah di-parse.
+
+    Baris dan dict yang dikembalikan dipakai bersama antar request - jangan diubah.
+    """
+    
+    def __init__(self):
+        super().__init__('coa')
+    
+    def _load(self):
+        db = get_db()
+        accounts = db.execute('SELECT * FROM accounts ORDER BY code').fetchall()
+        templates = OrderedDict()
+        for row in db.execute('SELECT * FROM transaction_templates ORDER BY label').fetchall():
+            templates[row['template_key']] = {
+                'template_key': row['template_key'],
+                'label': row['label'],
+                'description': row['description'],
+                'lines': json.loads(row['lines_json']),
+            }
+        return {
+            'list': accounts,
+            'by_id': {account['id']: account for account in accounts},
+            'by_code': {account['code']: account for account in accounts},
+            'templates': templates,
+        }
+    
+    def accounts(self):
+        """Semua akun urut kode"""
+        return self.current()['list']
+    
+    def accounts_by_id(self):
+        return self.current()['by_id']
+    
+    def accounts_by_code(self):
+        return self.current()['by_code']
+    
+    def account(self, account_id):
+        return self.current()['by_id'].get(account_id)
+    
+    def account_by_code(self, code):
+        return self.current()['by_code'].get(code)
+    
+    def templates(self):
+        """Semua template urut label"""
+        return list(self.current()['templates'].values())
+    
+    def template(self, template_key):
+        return self.current()['templates'].get(template_key)
+
+chart_of_accounts = ChartOfAccounts()
+
+# ---------- Sesi Pengguna ----------
+# Setelah login, id, username, role dan auth_version user disimpan di cookie
+# sesi yang ditandatangani, jadi request biasa tidak perlu membaca tabel
+# users. Sesi tetap bisa dicabut: revoke_user_sessions() menaikkan
+# auth_version user dan namespace cache 'auth', lalu setiap proses memuat
+# ulang peta id -> auth_version (satu query) dan menolak sesi dengan versi
+# lama.
+
+SESSION_USER_KEYS = ('user_id', 'username', 'role', 'auth_version')
+ROLE_LABELS = {'admin': 'Administrator', 'user': 'Pengguna'}
+
+@app.template_global('role_label')
+def role_label(role):
+    return ROLE_LABELS.get(role, (role or '').title())
+
+def revoke_user_sessions(cur, user_id):
+    """Cabut semua sesi user; panggil dengan cursor transaksi penulisan"""
+    cur.execute('UPDATE users SET auth_version = auth_version + 1 WHERE id = ?', (user_id,))
+    bump_cache_version(cur, 'auth')
+
+class AuthVersionCache(CachedSnapshot):
+    """auth_version per user id, dimuat ulang hanya saat namespace 'auth' berubah"""
+    
+    def __init__(self):
+        super().__init__('auth')
+    
+    def _load(self):
+        rows = get_db().execute('SELECT id, auth_version FROM users').fetchall()
+        return {row['id']: row['auth_version'] for row in rows}
+    
+    def get(self, user_id):
+        return self.current().get(user_id)
+
+auth_versions = AuthVersionCache()
+
+def start_user_session(user):
+    """Simpan user (baris users dengan username, role, auth_version) ke sesi"""
+    for key in SESSION_USER_KEYS:
+        session[key] = user['id'] if key == 'user_id' else user[key]
+    g.pop('_current_user', None)
+
+def end_user_session():
+    for key in SESSION_USER_KEYS:
+        session.pop(key, None)
+    g.pop('_current_user', None)
+
+def load_session_user():
+    """User dari cookie sesi; None jika belum login atau sesinya sudah dicabut"""
+    uid = session.get('user_id')
+    if not uid:
+        return None
+    try:
+        if 'auth_version' not in session:
+            # Sesi lama yang hanya berisi user_id - lengkapi sekali dari database
+            user = get_db().execute(
+                'SELECT id, username, role, auth_version FROM users WHERE id = ?', (uid,)
+            ).fetchone()
+            if user is None:
+                end_user_session()
+                return None
+            start_user_session(user)
+        elif auth_versions.get(uid) != session['auth_version']:
+            # User dihapus atau sesinya dicabut
+            end_user_session()
+            return None
+        return {'id': uid, 'username': session['username'], 'role': session['role']}
+    except Exception as e:
+        logger.exception("Error in current_user: %s", e)
+        return None
+
+# ---------- Utilitas Akuntansi ----------
+
+def all_accounts():
+    return chart_of_accounts.accounts()
+
+def get_account_id(cur, code):
+    """Mencari ID akun berdasarkan kode akun (misalnya '101', '401', dst)."""
+    cur.execute("SELECT id FROM accounts WHERE code = ?", (code,))
+    result = cur.fetchone()
+    return result["id"] if result else None
+
+def fix_opening_balances():
+    """Memperbaiki saldo awal agar sesuai dengan prinsip akuntansi"""
+    db = get_db()
+    cur = db.cursor()
+    
+    # Hapus semua saldo awal yang ada
+    cur.execute('DELETE FROM opening_balances')
+    
+    # DATA SALDO AWAL YANG BENAR - SESUAI DENGAN NERACA SALDO AWAL
+    # Total harus balance: Debit = Credit = Rp 31.550.000
+    opening_balances_corrected = [
+        # ===== ASET (DEBIT) =====
+        (1, 8500000, 0),     # Kas (101) - Debit
+        (2, 4500000, 0),     # Piutang Usaha (102) - Debit
+        (3, 500000, 0),      # Peralatan Tambak (103) - Debit
+        (4, 300000, 0),      # Perlengkapan (104) - Debit
+        (5, 1200000, 0),     # Persediaan - Tiram Kecil (105) - Debit
+        (6, 1750000, 0),     # Persediaan - Tiram Besar (106) - Debit
+        (7, 12000000, 0),    # Kendaraan (107) - Debit
+        
+        # ===== KONTRA ASET (CREDIT) =====
+        (8, 0, 1500000),     # Akumulasi Penyusutan Kendaraan (108) - Credit
+        
+        # ===== KEWAJIBAN (CREDIT) =====
+        (9, 0, 650000),      # Utang Usaha (201) - Credit
+        (10, 0, 100000),     # Utang Gaji (202) - Credit
+        
+        # ===== EKUITAS (CREDIT) =====
+        (11, 0, 22300000),   # Modal Pemilik (301) - Credit
+        
+        # ===== PENDAPATAN (CREDIT) =====
+        (12, 0, 4000000),    # Penjualan - Tiram Besar (401) - Credit
+        (13, 0, 3000000),    # Penjualan - Tiram Kecil (402) - Credit
+        
+        # ===== BEBAN (DEBIT) =====
+        (14, 1000000, 0),    # HPP - Tiram Kecil (501) - Debit
+        (15, 1500000, 0),    # HPP - Tiram Besar (502) - Debit
+        (16, 300000, 0),     # Beban Gaji (503) - Debit
+    ]
+    
+    # Insert saldo awal yang sudah dikoreksi
+    for account_id, debit_amount, credit_amount in opening_balances_corrected:
+        cur.execute('''
+            INSERT INTO opening_balances (account_id, debit_amount, credit_amount) 
+            VALUES (?, ?, ?)
+        ''', (account_id, debit_amount, credit_amount))
+    
+    # Hitung total untuk verifikasi
+    total_debit = sum(balance[1] for balance in opening_balances_corrected)
+    total_credit = sum(balance[2] for balance in opening_balances_corrected)
+    
+    logger.info("📊 Saldo awal: debit %s, kredit %s, balanced=%s", f"{total_debit:,}", f"{total_credit:,}",
+                total_debit == total_credit)
+    
+    sync_opening_balance_summary(cur)
+    db.commit()
+    return total_debit == total_credit
+
+# Ringkasan saldo per akun. Baris ini diperbarui di transaksi yang sama dengan
+# setiap posting sehingga pembacaan saldo cukup lookup primary key, bukan
+# agregasi ulang seluruh journal_lines.
+ACCOUNT_BALANCES_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS account_balances (
+        account_id INTEGER PRIMARY KEY,
+        opening_debit DECIMAL(15,2) DEFAULT 0,
+        opening_credit DECIMAL(15,2) DEFAULT 0,
+        journal_debit DECIMAL(15,2) DEFAULT 0,
+        journal_credit DECIMAL(15,2) DEFAULT 0,
+        adjusting_debit DECIMAL(15,2) DEFAULT 0,
+        adjusting_credit DECIMAL(15,2) DEFAULT 0,
+        FOREIGN KEY (account_id) REFERENCES accounts (id)
+    )
+'''
+
+BALANCE_COLUMNS = (
+    'opening_debit', 'opening_credit',
+    'journal_debit', 'journal_credit',
+    'adjusting_debit', 'adjusting_credit',
+)
+
+# Total yang dihitung langsung dari baris mentah - dipakai untuk rebuild & verifikasi
+ACCOUNT_BALANCE_TOTALS_SQL = '''
+    SELECT a.id as account_id,
+           COALESCE(ob.total_debit, 0) as opening_debit,
+           COALESCE(ob.total_credit, 0) as opening_credit,
+           COALESCE(jl.total_debit, 0) as journal_debit,
+           COALESCE(jl.total_credit, 0) as journal_credit,
+           COALESCE(al.total_debit, 0) as adjusting_debit,
+           COALESCE(al.total_credit, 0) as adjusting_credit
+    FROM accounts a
+    LEFT JOIN (
+        SELECT account_id, SUM(debit_amount) as total_debit, SUM(credit_amount) as total_credit
+        FROM opening_balances GROUP BY account_id
+    ) ob ON ob.account_id = a.id
+    LEFT JOIN (
+        SELECT account_id, SUM(debit) as total_debit, SUM(credit) as total_credit
+        FROM journal_lines GROUP BY account_id
+    ) jl ON jl.account_id = a.id
+    LEFT JOIN (
+        SELECT account_id, SUM(debit) as total_debit, SUM(credit) as total_credit
+        FROM adjusting_lines GROUP BY account_id
+    ) al ON al.account_id = a.id
+'''
+
+def apply_balance_delta(cur, lines, source, sign=1):
+    """Tambahkan (sign=1) atau kurangi (sign=-1) baris posting ke ringkasan account_balances.
+
+    source adalah 'journal' atau 'adjusting'. Harus dipanggil dengan cursor
+    yang sama dengan INSERT/DELETE barisnya agar ikut satu transaksi.
+    """
+    if source not in ('journal', 'adjusting'):
+        raise ValueError(f"Sumber saldo tidak dikenal: {source}")
+    
+    totals = {}
+    for line in lines:
+        debit, credit = totals.get(line['account_id'], (0, 0))
+        totals[line['account_id']] = (debit + (line.get('debit', 0) or 0), credit + (line.get('credit', 0) or 0))
+    
+    if totals:
+        bump_ledger_version(cur)
+        cur.executemany(f'''
+            INSERT INTO account_balances (account_id, {source}_debit, {source}_credit)
+            VALUES (?, ?, ?)
+            ON CONFLICT(account_id) DO UPDATE SET
+                {source}_debit = account_balances.{source}_debit + excluded.{source}_debit,
+                {source}_credit = account_balances.{source}_credit + excluded.{source}_credit
+        ''', [(account_id, sign * debit, sign * credit) for account_id, (debit, credit) in totals.items()])
+
+def sync_opening_balance_summary(cur):
+    """Salin ulang kolom saldo awal di account_balances dari tabel opening_balances"""
+    bump_ledger_version(cur)
+    cur.execute('''
+        INSERT INTO account_balances (account_id)
+        SELECT id FROM accounts WHERE true
+        ON CONFLICT(account_id) DO NOTHING
+    ''')
+    cur.execute('''
+        UPDATE account_balances SET
+            opening_debit = COALESCE((SELECT SUM(debit_amount) FROM opening_balances ob
+                                      WHERE ob.account_id = account_balances.account_id), 0),
+            opening_credit = COALESCE((SELECT SUM(credit_amount) FROM opening_balances ob
+                                       WHERE ob.account_id = account_balances.account_id), 0)
+    ''')
+
+def rebuild_account_balances(cur):
+    """Bangun ulang seluruh ringkasan account_balances dari baris mentah"""
+    bump_ledger_version(cur)
+    cur.execute('DELETE FROM account_balances')
+    cur.execute(f'''
+        INSERT INTO account_balances (account_id, {', '.join(BALANCE_COLUMNS)})
+        {ACCOUNT_BALANCE_TOTALS_SQL}
+    ''')
+
+def verify_account_balances():
+    """Bandingkan ringkasan account_balances dengan total dari baris mentah.
+
+    Mengembalikan list selisih; list kosong berarti ringkasan sudah benar.
+    """
+    db = get_db()
+    stored = {
+        row['account_id']: row
+        for row in db.execute('SELECT * FROM account_balances')
+    }
+    mismatches = []
+    for expected in db.execute(ACCOUNT_BALANCE_TOTALS_SQL):
+        row = stored.get(expected['account_id'])
+        for column in BALANCE_COLUMNS:
+            actual = (row[column] or 0) if row else 0
+            if abs(actual - expected[column]) > 0.005:
+                mismatches.append({
+                    'account_id': expected['account_id'],
+                    'column': column,
+                    'stored': actual,
+                    'expected': expected[column],
+                })
+    return mismatches
+
+def normal_side_amount(account, debit, credit):
+    """Selisih debit/kredit sesuai saldo normal akun"""
+    if account['normal_balance'] == 'Debit':
+        return (debit or 0) - (credit or 0)
+    return (credit or 0) - (debit or 0)
+
+def account_balance_info(account):
+    """Susun info saldo dari baris accounts JOIN account_balances"""
+    info = {'account': account}
+    for column in BALANCE_COLUMNS:
+        info[column] = account[column] or 0
+    info['opening_balance'] = normal_side_amount(account, info['opening_debit'], info['opening_credit'])
+    info['unadjusted_balance'] = info['opening_balance'] + normal_side_amount(
+        account, info['journal_debit'], info['journal_credit'])
+    info['balance'] = info['unadjusted_balance'] + normal_side_amount(
+        account, info['adjusting_debit'], info['adjusting_credit'])
+    return info
+
+ACCOUNT_WITH_BALANCE_SQL = f'''
+    SELECT a.*, {', '.join('ab.' + column for column in BALANCE_COLUMNS)}
+    FROM accounts a
+    LEFT JOIN account_balances ab ON ab.account_id = a.id
+'''
+
+def get_account_balance(account_id, include_adjustments=True):
+    """Mendapatkan saldo akun dari ringkasan account_balances (lookup primary key)"""
+    account = get_db().execute(
+        ACCOUNT_WITH_BALANCE_SQL + ' WHERE a.id = ?', (account_id,)
+    ).fetchone()
+    if not account:
+        return 0
+    
+    info = account_balance_info(account)
+    return info['balance'] if include_adjustments else info['unadjusted_balance']
+
+@cached_report('account_balances')
+def get_all_account_balances():
+    """Hitung saldo SEMUA akun sekaligus.
+
+    Satu query ke ringkasan account_balances (JOIN per primary key), jadi
+    tidak ada agregasi ulang journal_lines. Hasil berupa dict {account_id: info}
+    berurutan sesuai kode akun, dengan 'balance' (termasuk penyesuaian) dan
+    'unadjusted_balance'.
+    """
+    accounts = get_db().execute(ACCOUNT_WITH_BALANCE_SQL + ' ORDER BY a.code').fetchall()
+    return {account['id']: account_balance_info(account) for account in accounts}
+
+LEDGER_PAGE_SIZE = 100
+
+# Semua baris jurnal & penyesuaian satu akun. 'movement' adalah mutasi sesuai
+# saldo normal akun (parameter pertama tiap SELECT: 1 untuk Debit, -1 untuk Credit).
+LEDGER_LINES_SQL = '''
+    SELECT je.date, 0 as src, je.id as entry_id, jl.id as line_id,
+           je.description, jl.debit, jl.credit, jl.description as line_desc,
+           ? * (COALESCE(jl.debit, 0) - COALESCE(jl.credit, 0)) as movement
+    FROM journal_lines jl
+    JOIN journal_entries je ON jl.entry_id = je.id
+    WHERE jl.account_id = ?
+    UNION ALL
+    SELECT ae.date, 1 as src, ae.id as entry_id, al.id as line_id,
+           ae.description || ' (Penyesuaian)', al.debit, al.credit, al.description,
+           ? * (COALESCE(al.debit, 0) - COALESCE(al.credit, 0))
+    FROM adjusting_lines al
+    JOIN adjusting_entries ae ON al.adj_id = ae.id
+    WHERE al.account_id = ?
+'''
+
+# Urutan kronologis buku besar; pada tanggal yang sama jurnal sebelum penyesuaian
+LEDGER_KEY = 'date, src, entry_id, line_id'
+LEDGER_KEY_DESC = 'date DESC, src DESC, entry_id DESC, line_id DESC'
+
+def ledger_cursor(row):
+    """Cursor buku besar 'date|src|entry_id|line_id' untuk satu baris"""
+    return f"{row['date']}|{row['src']}|{row['entry_id']}|{row['line_id']}"
+
+def parse_ledger_cursor(value):
+    """Kebalikan ledger_cursor; None jika cursor kosong/tidak valid"""
+    try:
+        date, src, entry_id, line_id = (value or '').rsplit('|', 3)
+        return date, int(src), int(entry_id), int(line_id)
+    except ValueError:
+        return None
+
+def fetch_ledger_page(account_id, after=None, before=None, from_start=False, limit=LEDGER_PAGE_SIZE):
+    """Ambil satu halaman buku besar dengan saldo berjalan dihitung di SQL.
+
+    Saldo berjalan memakai window function atas UNION ALL baris jurnal dan
+    penyesuaian, diawali saldo yang dibawa dari halaman sebelumnya:
+    - maju (after / from_start): saldo awal + mutasi s.d. cursor, lalu SUM() OVER
+    - mundur (before / default halaman terbaru): saldo akhir dikurangi mutasi
+      setelah cursor, lalu dikurangi SUM() OVER baris yang lebih baru di halaman.
+    Halaman terbaru dan halaman pertama tidak perlu agregasi tambahan sama
+    sekali karena saldo akhir/awal dibaca dari ringkasan account_balances.
+    """
+    db = get_db()
+    account = db.execute(ACCOUNT_WITH_BALANCE_SQL + ' WHERE a.id = ?', (account_id,)).fetchone()
+    if not account:
+        return None
+    info = account_balance_info(account)
+    sign = 1 if account['normal_balance'] == 'Debit' else -1
+    lines_params = [sign, account_id, sign, account_id]
+    
+    def movement_until(cursor, operator):
+        row = db.execute(f'''
+            SELECT COALESCE(SUM(movement), 0) as total
+            FROM ({LEDGER_LINES_SQL})
+            WHERE ({LEDGER_KEY}) {operator} (?, ?, ?, ?)
+        ''', lines_params + list(cursor)).fetchone()
+        return row['total']
+    
+    forward = bool(after) or from_start
+    if forward:
+        seed = info['opening_balance'] + (movement_until(after, '<=') if after else 0)
+        where, params = (f'WHERE ({LEDGER_KEY}) > (?, ?, ?, ?)', list(after)) if after else ('', [])
+        order, running = LEDGER_KEY, f'''
+            ? + SUM(movement) OVER (ORDER BY {LEDGER_KEY} ROWS UNBOUNDED PRECEDING)'''
+    else:
+        seed = (info['opening_balance'] + movement_until(before, '<')) if before else info['balance']
+        where, params = (f'WHERE ({LEDGER_KEY}) < (?, ?, ?, ?)', list(before)) if before else ('', [])
+        order, running = LEDGER_KEY_DESC, f'''
+            ? - COALESCE(SUM(movement) OVER (
+                ORDER BY {LEDGER_KEY_DESC} ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING), 0)'''
+    
+    # limit + 1 untuk mendeteksi halaman berikutnya; baris ekstra selalu berada
+    # di ujung yang tidak memengaruhi saldo baris lain
+    rows = db.execute(f'''
+        WITH page AS (
+            SELECT * FROM ({LEDGER_LINES_SQL})
+            {where}
+            ORDER BY {order}
+            LIMIT ?
+        )
+        SELECT page.*, {running} as balance
+        FROM page
+        ORDER BY {LEDGER_KEY}
+    ''', lines_params + params + [limit + 1, seed]).fetchall()
+    
+    has_more = len(rows) > limit
+    if forward:
+        rows = rows[:limit]
+        has_older, has_newer = bool(after), has_more
+    else:
+        rows = rows[1:] if has_more else rows
+        has_older, has_newer = has_more, bool(before)
+    
+    return {
+        'account': account,
+        'info': info,
+        'rows': rows,
+        'at_start': not has_older,
+        'older_cursor': ledger_cursor(rows[0]) if rows and has_older else None,
+        'newer_cursor': ledger_cursor(rows[-1]) if rows and has_newer else None,
+    }
+
+ENTRY_PAGE_SIZE = 50
+
+# Konfigurasi daftar entri: (tabel entri, tabel baris, kolom FK baris, kolom tambahan)
+ENTRY_SOURCES = {
+    'journal': ('journal_entries', 'journal_lines', 'entry_id',
+                "e.reference, COALESCE(e.transaction_type, 'General') as transaction_type"),
+    'adjusting': ('adjusting_entries', 'adjusting_lines', 'adj_id', "'Penyesuaian' as transaction_type"),
+}
+
+def parse_entry_cursor(value):
+    """Ubah cursor 'YYYY-MM-DD|id' dari query string menjadi (date, id)"""
+    try:
+        date, entry_id = (value or '').rsplit('|', 1)
+        return date, int(entry_id)
+    except ValueError:
+        return None
+
+def fetch_entry_page(source, start_date=None, end_date=None, transaction_type=None,
+                     cursor=None, limit=ENTRY_PAGE_SIZE):
+    """Ambil satu halaman entri (terbaru dulu) beserta baris-barisnya.
+
+    Keyset pagination atas (date, id): cursor adalah (date, id) entri terakhir
+    di halaman sebelumnya. Entri dan barisnya diambil dengan satu query JOIN
+    lalu dikelompokkan di Python. Mengembalikan (entries, next_cursor) dengan
+    entries berupa list {'entry': dict, 'lines': [dict]}.
+    """
+    entries_table, lines_table, fk_column, extra_columns = ENTRY_SOURCES[source]
+    
+    conditions, params = [], []
+    if start_date:
+        conditions.append('e.date >= ?')
+        params.append(start_date)
+    if end_date:
+        conditions.append('e.date <= ?')
+        params.append(end_date)
+    if transaction_type and source == 'journal':
+        conditions.append('e.transaction_type = ?')
+        params.append(transaction_type)
+    if cursor:
+        conditions.append('(e.date, e.id) < (?, ?)')
+        params.extend(cursor)
+    where = ('WHERE ' + ' AND '.join(conditions)) if conditions else ''
+    
+    # Ambil limit + 1 entri untuk tahu apakah masih ada halaman berikutnya
+    rows = get_db().execute(f'''
+        WITH page AS (
+            SELECT e.id, e.date, e.description, e.created_at, {extra_columns}
+            FROM {entries_table} e
+            {where}
+            ORDER BY e.date DESC, e.id DESC
+            LIMIT ?
+        )
+        SELECT page.*, l.id as line_id, l.account_id, l.debit, l.credit,
+               l.description as line_description, a.code, a.name, a.acct_type
+        FROM page
+        LEFT JOIN {lines_table} l ON l.{fk_column} = page.id
+        LEFT JOIN accounts a ON a.id = l.account_id
+        ORDER BY page.date DESC, page.id DESC, l.debit DESC, l.id
+    ''', params + [limit + 1]).fetchall()
+    
+    entries = []
+    for row in rows:
+        if not entries or entries[-1]['entry']['id'] != row['id']:
+            entries.append({
+                'entry': {key: row[key] for key in row.keys()
+                          if key not in ('line_id', 'account_id', 'debit', 'credit',
+                                         'line_description', 'code', 'name', 'acct_type')},
+                'lines': [],
+            })
+        if row['line_id'] is not None:
+            entries[-1]['lines'].append({
+                'id': row['line_id'],
+                'account_id': row['account_id'],
+                'debit': row['debit'] or 0,
+                'credit': row['credit'] or 0,
+                'description': row['line_description'] or '',
+                'code': row['code'],
+                'name': row['name'],
+                'acct_type': row['acct_type'],
+            })
+    
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        last = entries[-1]['entry']
+        next_cursor = f"{last['date']}|{last['id']}"
+    return entries, next_cursor
+
+def post_journal_entry(date, description, lines, reference="", transaction_type="General", template_key=None):
+    """Posting entri jurnal dengan validasi yang diperbaiki (lewat antrian penulisan)"""
+    return write_queue.run(write_journal_entry, date, description, lines, reference, transaction_type, template_key)
+
+def write_journal_entry(date, description, lines, reference="", transaction_type="General", template_key=None):
+    """Tulis entri jurnal di transaksi penulis (dijalankan oleh write_queue, tanpa commit)"""
+    db = get_db()
+    cur = db.cursor()
+    
+    # 1. VALIDASI SERVER-SIDE SEBELUM POSTING (dengan validasi yang diperbaiki)
+    validation_errors = validate_journal_entry(lines, template_key)
+    if validation_errors:
+        raise ValueError("; ".join(validation_errors))
+    
+    # 2. Buat entri jurnal
+    cur.execute('''
+        INSERT INTO journal_entries (date, description, reference, transaction_type, posted) 
+        VALUES (?, ?, ?, ?, 1)
+    ''', (date, description, reference, transaction_type))
+    entry_id = cur.lastrowid
+    
+    # 3. Tambahkan baris jurnal
+    cur.executemany('''
+        INSERT INTO journal_lines (entry_id, account_id, debit, credit, description) 
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(entry_id, line['account_id'], line.get('debit', 0), line.get('credit', 0), line.get('description', ''))
+          for line in lines])
+    apply_balance_delta(cur, lines, 'journal')
+    
+    # 4. Update inventory (panen / penjualan) berdasarkan akun yang dipakai
+    inventory_rows, stock_ops = journal_inventory_effects(date, description, lines)
+    apply_inventory_effects(cur, inventory_rows, stock_ops)
+    
+    return entry_id
+    
+def validate_journal_entry(lines, template_key=None):
+    """Validasi entri jurnal dengan aturan yang lebih realistis (tanpa query, memakai chart_of_accounts)"""
+    errors = []
+    
+    # 1. Validasi jumlah baris minimum
+    if len(lines) < 2:
+        errors.append("Entri jurnal harus memiliki setidaknya dua baris")
+        return errors
+    
+    # 2. Validasi balance - TOTAL DEBIT HARUS SAMA DENGAN TOTAL KREDIT
+    total_debit = sum(line.get('debit', 0) for line in lines)
+    total_credit = sum(line.get('credit', 0) for line in lines)
+    
+    if abs(total_debit - total_credit) > 0.01:
+        errors.append(f"Total debit ({total_debit:,.2f}) tidak sama dengan total kredit ({total_credit:,.2f})")
+    
+    accounts = chart_of_accounts.accounts_by_id()
+    
+    # 3. Validasi duplicate accounts - MENCEGAH AKUN YANG SAMA DI DUA BARIS
+    account_ids = [line['account_id'] for line in lines]
+    if len(account_ids) != len(set(account_ids)):
+        errors.append("Terdapat akun yang duplikat dalam entri yang sama")
+    
+    # 4. Validasi setiap baris individual - PERBAIKAN: lebih fleksibel
+    for i, line in enumerate(lines):
+        account_id = line['account_id']
+        debit = line.get('debit', 0)
+        credit = line.get('credit', 0)
+        
+        # Dapatkan informasi akun dari bagan akun
+        account = accounts.get(account_id)
+        
+        if not account:
+            errors.append(f"Baris {i+1}: Akun ID {account_id} tidak ditemukan")
+            continue
+        
+        # 4.1 Validasi hanya satu sisi yang terisi (tidak boleh debit dan kredit sekaligus)
+        if debit > 0 and credit > 0:
+            errors.append(f"Baris {i+1} ({account['name']}): Tidak boleh mengisi debit dan kredit sekaligus")
+        
+        # 4.2 Validasi jumlah harus positif
+        if debit < 0 or credit < 0:
+            errors.append(f"Baris {i+1} ({account['name']}): Jumlah harus positif")
+        
+        # 4.3 PERBAIKAN: HAPUS validasi normal balance yang terlalu ketat
+        # Dalam akuntansi, akun bisa diisi di sisi berlawanan dengan saldo normal
+        # Contoh: Kas (debit normal) bisa di kredit saat pembayaran
+        # Jadi kita HAPUS validasi ini:
+        # if debit > 0 and account['normal_balance'] == 'Credit':
+        #     errors.append(f"Baris {i+1} ({account['name']}): Akun ini normalnya kredit, tidak boleh diisi di debit")
+        # elif credit > 0 and account['normal_balance'] == 'Debit':
+        #     errors.append(f"Baris {i+1} ({account['name']}): Akun ini normalnya debit, tidak boleh diisi di kredit")
+        
+        # 4.4 Validasi sisi yang konsisten dengan input (jika ada informasi sisi)
+        if 'side' in line:
+            if line['side'] == 'debit' and credit > 0:
+                errors.append(f"Baris {i+1} ({account['name']}): Ditetapkan sebagai debit tetapi memiliki nilai kredit")
+            elif line['side'] == 'credit' and debit > 0:
+                errors.append(f"Baris {i+1} ({account['name']}): Ditetapkan sebagai kredit tetapi memiliki nilai debit")
+    
+    # 5. Validasi template compliance jika menggunakan template
+    if template_key:
+        template_errors = validate_template_compliance(lines, template_key)
+        errors.extend(template_errors)
+    
+    return errors
+
+def validate_template_compliance(lines, template_key):
+    """Validasi compliance dengan template yang dipilih"""
+    errors = []
+    
+    template = chart_of_accounts.template(template_key)
+    if template is None:
+        errors.append("Template tidak ditemukan")
+        return errors
+    
+    # Kode akun setiap baris cukup dicari sekali, bukan per baris template
+    line_codes = [(line, get_account_code_from_id(line['account_id'])) for line in lines]
+    
+    # Validasi setiap baris template yang non-editable
+    for tpl_line in template['lines']:
+        if not tpl_line.get('editable', True):
+            # Cari baris yang sesuai di submitted lines berdasarkan account_code
+            matching_line = next((line for line, code in line_codes if code == tpl_line['account_code']), None)
+            
+            if not matching_line:
+                errors.append(f"Baris template untuk akun {tpl_line['account_code']} tidak ditemukan dalam entri")
+                continue
+            
+            # Validasi sisi tidak berubah untuk non-editable lines
+            if 'side' in matching_line and matching_line['side'] != tpl_line['side']:
+                errors.append(f"Akun {tpl_line['account_code']} harus di sisi {tpl_line['side']} sesuai template")
+            
+            # Validasi account_id tidak berubah untuk non-editable lines
+            account = chart_of_accounts.account(matching_line['account_id'])
+            if account and account['code'] != tpl_line['account_code']:
+                errors.append(f"Akun untuk baris template {tpl_line['account_code']} tidak boleh diubah")
+    
+    return errors
+
+# Fungsi helper untuk mendapatkan account_id dari account_code
+def get_account_id_from_code(account_code):
+    """Mendapatkan account_id dari account_code"""
+    account = chart_of_accounts.account_by_code(account_code)
+    return account['id'] if account else None
+
+# Fungsi helper untuk mendapatkan account_code dari account_id  
+def get_account_code_from_id(account_id):
+    """Mendapatkan account_code dari account_id"""
+    account = chart_of_accounts.account(account_id)
+    return account['code'] if account else None
+
+def post_adjusting_entry(date, description, lines):
+    """Posting entri penyesuaian (lewat antrian penulisan)"""
+    return write_queue.run(write_adjusting_entry, date, description, lines)
+
+def write_adjusting_entry(date, description, lines):
+    """Tulis entri penyesuaian di transaksi penulis (tanpa commit)"""
+    db = get_db()
+    cur = db.cursor()
+    
+    cur.execute('INSERT INTO adjusting_entries (date, description) VALUES (?, ?)', (date, description))
+    adj_id = cur.lastrowid
+    
+    for line in lines:
+        cur.execute('''
+            INSERT INTO adjusting_lines (adj_id, account_id, debit, credit, description) 
+            VALUES (?, ?, ?, ?, ?)
+        ''', (adj_id, line['account_id'], line.get('debit', 0), line.get('credit', 0), line.get('description', '')))
+    apply_balance_delta(cur, lines, 'adjusting')
+    
+    return adj_id
+
+# Akun persediaan panen: kode -> (kunci stok, harga per kg, sisi, label, masuk?)
+HARVEST_INVENTORY_ACCOUNTS = {
+    '105': ('current_stock_small', 20000, 'debit', 'Panen tiram kecil', True),
+    '106': ('current_stock_large', 35000, 'debit', 'Panen tiram besar', True),
+    '107': ('current_seed_small', 20000, 'credit', 'Penggunaan benih kecil', False),
+    '108': ('current_seed_large', 35000, 'credit', 'Penggunaan benih besar', False),
+}
+
+# Akun persediaan penjualan: kode -> (kunci stok, harga per kg, label)
+SALES_INVENTORY_ACCOUNTS = {
+    '103': ('current_stock_large', 55000, 'Tiram Besar'),
+    '103.1': ('current_stock_small', 30000, 'Tiram Kecil'),
+}
+
+def journal_inventory_effects(date, description, lines):
+    """Hitung efek persediaan satu entri jurnal tanpa menulis ke database.
+
+    Mengembalikan (inventory_rows, stock_ops): baris untuk tabel inventory dan
+    operasi stok berurutan (kunci, selisih, clamp). clamp=True berarti stok
+    tidak boleh turun di bawah nol (penjualan).
+    """
+    accounts = chart_of_accounts.accounts_by_id()
+    codes = [accounts[line['account_id']]['code'] if line['account_id'] in accounts else None
+             for line in lines]
+    
+    # Hanya entri yang menyentuh akun persediaan tiram/benih yang mengubah stok
+    if not any(code in HARVEST_INVENTORY_ACCOUNTS for code in codes):
+        return [], []
+    
+    inventory_rows = []
+    stock_ops = []
+    
+    # Debit ke persediaan tiram (105/106) berarti transaksi panen
+    is_harvest = any(code in ('105', '106') and (line.get('debit', 0) or 0) > 0
+                     for line, code in zip(lines, codes))
+    if is_harvest:
+        for line, code in zip(lines, codes):
+            if code not in HARVEST_INVENTORY_ACCOUNTS:
+                continue
+            stock_key, unit_cost, side, label, incoming = HARVEST_INVENTORY_ACCOUNTS[code]
+            amount = line.get(side, 0) or 0
+            quantity = amount / unit_cost
+            if quantity > 0:
+                stock_ops.append((stock_key, quantity if incoming else -quantity, False))
+                inventory_rows.append((date, f'{label}: {description}',
+                                       quantity if incoming else 0, 0 if incoming else quantity,
+                                       unit_cost, amount))
+        return inventory_rows, stock_ops
+    
+    # Penjualan biasa: persediaan (103/103.1) dan pendapatan penjualan (401/401.1)
+    if not (any(code in SALES_INVENTORY_ACCOUNTS for code in codes)
+            and any(code in ('401', '401.1') for code in codes)):
+        return [], []
+    for line, code in zip(lines, codes):
+        if code not in SALES_INVENTORY_ACCOUNTS:
+            continue
+        stock_key, unit_cost, label = SALES_INVENTORY_ACCOUNTS[code]
+        credit = float(line.get('credit', 0) or 0)
+        quantity_sold = credit / unit_cost
+        if quantity_sold > 0:
+            stock_ops.append((stock_key, -quantity_sold, True))
+            inventory_rows.append((date, f'Penjualan {label}: {description}', 0, quantity_sold, unit_cost, credit))
+    return inventory_rows, stock_ops
+
+def apply_inventory_effects(cur, inventory_rows, stock_ops):
+    """Tulis hasil journal_inventory_effects (satu atau banyak entri sekaligus)"""
+    if inventory_rows:
+        cur.executemany('''
+            INSERT INTO inventory (date, description, quantity_in, quantity_out, unit_cost, value)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', inventory_rows)
+    if not stock_ops:
+        return
+    
+    keys = sorted({key for key, _, _ in stock_ops})
+    cur.execute(f"SELECT k, v FROM settings WHERE k IN ({', '.join('?' * len(keys))})", keys)
+    stock = {row['k']: float(row['v']) if row['v'] else 0 for row in cur.fetchall()}
+    
+    # Terapkan berurutan agar batas nol penjualan sama dengan posting satu per satu
+    for key, delta, clamp in stock_ops:
+        if key not in stock:
+            continue
+        value = stock[key] + delta
+        stock[key] = max(0, value) if clamp else value
+    
+    cur.executemany('UPDATE settings SET v = ? WHERE k = ?',
+                    [(str(value), key) for key, value in stock.items()])
+
+def get_current_stock(stock_type='all'):
+    """Dapatkan stok tiram saat ini"""
+    db = get_db()
+    cur = db.cursor()
+    
+    if stock_type == 'large':
+        cur.execute("SELECT v FROM settings WHERE k = 'current_stock_large'")
+        result = cur.fetchone()
+        return int(result['v']) if result and result['v'] else 0
+    elif stock_type == 'small':
+        cur.execute("SELECT v FROM settings WHERE k = 'current_stock_small'")
+        result = cur.fetchone()
+        return int(result['v']) if result and result['v'] else 0
+    else:
+        # Return dictionary dengan kedua stok
+        cur.execute("SELECT v FROM settings WHERE k = 'current_stock_large'")
+        large_result = cur.fetchone()
+        large = int(large_result['v']) if large_result and large_result['v'] else 0
+        
+        cur.execute("SELECT v FROM settings WHERE k = 'current_stock_small'")
+        small_result = cur.fetchone()
+        small = int(small_result['v']) if small_result and small_result['v'] else 0
+        
+        return {
+            'large': large,
+            'small': small,
+            'total': large + small
+        }
+    
+
+def set_opening_balance(account_id, amount, balance_type):
+    """Menyimpan saldo awal dengan benar (di-commit bersama unit kerja request)"""
+    db = get_db()
+    
+    # Hapus saldo lama jika ada
+    db.execute('DELETE FROM opening_balances WHERE account_id = ?', (account_id,))
+    
+    # Insert saldo baru
+    if amount > 0:
+        if balance_type == 'Debit':
+            db.execute('''
+                INSERT INTO opening_balances (account_id, debit_amount, credit_amount)
+                VALUES (?, ?, 0)
+            ''', (account_id, amount))
+        else:
+            db.execute('''
+                INSERT INTO opening_balances (account_id, debit_amount, credit_amount)
+                VALUES (?, 0, ?)
+            ''', (account_id, amount))
+    
+    sync_opening_balance_summary(db.cursor())
+
+def get_company_info():
+    """Dapatkan informasi perusahaan dari pengaturan"""
+    cur = get_db().execute("SELECT k, v FROM settings WHERE k IN ('company_name', 'company_description', 'company_location')")
+    info = {row['k']: row['v'] for row in cur.fetchall()}
+    return info
+
+def recover_possible_data():
+    """Attempt to recover any unsaved data"""
+    try:
+        db = get_db()
+        # Check if there are any uncommitted journal entries
+        cur = db.execute('''
+            SELECT COUNT(*) as count FROM journal_entries 
+            WHERE id NOT IN (SELECT DISTINCT entry_id FROM journal_lines)
+        ''')
+        orphaned_entries = cur.fetchone()['count']
+        
+        if orphaned_entries > 0:
+            logger.warning("🔄 Found %d orphaned entries, attempting recovery...", orphaned_entries)
+            # Delete orphaned entries
+            db.execute('DELETE FROM journal_entries WHERE id NOT IN (SELECT DISTINCT entry_id FROM journal_lines)')
+            db.commit()
+            logger.info("✅ Orphaned entries cleaned up")
+            
+        return True
+    except Exception as e:
+        logger.exception("❌ Recovery failed: %s", e)
+        return False
+
+def startup_tasks():
+    """Run recovery tasks on startup (lihat ensure_startup)"""
+    logger.info("🔧 Running startup recovery tasks...")
+    try:
+        with app.app_context():
+            migrate_db()
+            recover_possible_data()
+        logger.info("✅ Startup tasks completed")
+    except Exception as e:
+        logger.exception("❌ Startup tasks failed: %s", e)
+
+
+# ---------- Impor Jurnal Massal ----------
+# Satu baris file = satu baris jurnal. Kolom: entry (opsional, pengelompok
+# baris menjadi satu entri), date, description, reference, transaction_type,
+# template_key, account_code (atau account_id), debit, credit,
+# line_description. Tanpa kolom entry, baris dengan date+description+reference
+# yang sama dianggap satu entri. JSON Lines boleh juga berisi satu entri per
+# baris dengan daftar "lines". Semua entri divalidasi dulu di memori
+# (chart_of_accounts); jika ada satu saja kesalahan, tidak ada yang diposting.
+
+IMPORT_EXTENSIONS = ('.csv', '.jsonl', '.ndjson', '.xlsx', '.xls')
+
+def read_journal_import(data, filename):
+    """Baca isi file impor (bytes) menjadi daftar (nomor_baris, dict kolom)"""
+    ext = os.path.splitext(filename or '')[1].lower()
+    if ext in ('.jsonl', '.ndjson'):
+        return read_jsonl_import(data)
+    import pandas as pd  # berat - dimuat saat impor pertama saja
+    if ext == '.csv':
+        frame = pd.read_csv(io.BytesIO(data), dtype=str, keep_default_na=False)
+    elif ext in ('.xlsx', '.xls'):
+        frame = pd.read_excel(io.BytesIO(data), dtype=str).fillna('')
+    else:
+        raise ValueError(f"Format file tidak didukung (gunakan {', '.join(IMPORT_EXTENSIONS)})")
+    
+    frame.columns = [str(column).strip().lower() for column in frame.columns]
+    # Baris 1 adalah header, jadi data dimulai dari baris 2
+    return [(index + 2, row) for index, row in enumerate(frame.to_dict('records'))]
+
+def read_jsonl_import(data):
+    """Baca JSON Lines; objek dengan "lines" dipecah menjadi baris-baris jurnal"""
+    rows = []
+    for number, text in enumerate(data.decode('utf-8-sig').splitlines(), start=1):
+        if not text.strip():
+            continue
+        try:
+            item = json.loads(text)
+        except ValueError as e:
+            rows.append((number, {'_error': f"JSON tidak valid: {e}"}))
+            continue
+        if not isinstance(item, dict):
+            rows.append((number, {'_error': "Setiap baris harus berupa objek JSON"}))
+            continue
+        
+        item = {str(key).lower(): value for key, value in item.items()}
+        if 'lines' not in item:
+            rows.append((number, item))
+            continue
+        header = {key: value for key, value in item.items() if key != 'lines'}
+        header.setdefault('entry', f'jsonl-{number}')
+        for line in item['lines'] or []:
+            rows.append((number, {**header, **{str(key).lower(): value for key, value in line.items()}}))
+    return rows
+
+def import_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value != value:  # NaN dari pandas
+        return ''
+    return str(value).strip()
+
+def import_amount(value):
+    text = import_text(value)
+    return float(text) if text else 0.0
+
+def import_date(value):
+    """Normalisasi tanggal impor ke YYYY-MM-DD (Excel memberi '2025-01-05 00:00:00')"""
+    text = import_text(value)[:10]
+    if len(text) != 10:
+        raise ValueError(text)
+    datetime.fromisoformat(text)
+    return text
+
+def group_import_rows(rows):
+    """Kelompokkan baris impor menjadi entri, urut sesuai kemunculan pertama"""
+    entries = OrderedDict()
+    for row_number, row in rows:
+        if '_error' in row:
+            entries[('_error', row_number)] = [(row_number, row)]
+            continue
+        key = import_text(row.get('entry')) or (
+            import_text(row.get('date')), import_text(row.get('description')), import_text(row.get('reference')))
+        entries.setdefault(key, []).append((row_number, row))
+    return list(entries.values())
+
+def build_import_entry(rows, accounts_by_code, accounts_by_id):
+    """Ubah baris impor satu entri menjadi dict posting; kembalikan (entri, kesalahan)"""
+    first_row, header = rows[0]
+    if '_error' in header:
+        return None, [(first_row, header['_error'])]
+    
+    errors = []
+    try:
+        date = import_date(header.get('date'))
+    except ValueError:
+        errors.append((first_row, f"Tanggal tidak valid: '{import_text(header.get('date'))}' (format YYYY-MM-DD)"))
+        date = None
+    description = import_text(header.get('description'))
+    if not description:
+        errors.append((first_row, "Keterangan (description) wajib diisi"))
+    
+    lines = []
+    for row_number, row in rows:
+        code = import_text(row.get('account_code'))
+        raw_id = import_text(row.get('account_id'))
+        if code:
+            account = accounts_by_code.get(code)
+        elif raw_id:
+            account = accounts_by_id.get(int(raw_id)) if raw_id.isdigit() else None
+        else:
+            errors.append((row_number, "account_code atau account_id wajib diisi"))
+            continue
+        if account is None:
+            errors.append((row_number, f"Akun '{code or raw_id}' tidak ditemukan"))
+            continue
+        
+        try:
+            debit = import_amount(row.get('debit'))
+            credit = import_amount(row.get('credit'))
+        except ValueError:
+            errors.append((row_number, f"Jumlah tidak valid: debit='{import_text(row.get('debit'))}', "
+                                       f"kredit='{import_text(row.get('credit'))}'"))
+            continue
+        
+        lines.append({
+            'account_id': account['id'],
+            'debit': debit,
+            'credit': credit,
+            'description': import_text(row.get('line_description')),
+        })
+    
+    if errors:
+        return None, errors
+    
+    template_key = import_text(header.get('template_key')) or None
+    for message in validate_journal_entry(lines, template_key):
+        errors.append((first_row, message))
+    if errors:
+        return None, errors
+    
+    return {
+        'date': date,
+        'description': description,
+        'reference': import_text(header.get('reference')),
+        'transaction_type': import_text(header.get('transaction_type')) or 'General',
+        'lines': lines,
+    }, []
+
+def write_journal_import(entries):
+    """Tulis banyak entri jurnal sekaligus di transaksi penulis (executemany)"""
+    cur = get_db().cursor()
+    
+    # Penulis memegang kunci tulis, jadi id berikutnya bisa dipesan di muka
+    first_id = db_pool.reserve_ids(cur, 'journal_entries', len(entries))
+    
+    entry_rows = []
+    line_rows = []
+    all_lines = []
+    inventory_rows = []
+    stock_ops = []
+    for entry_id, entry in enumerate(entries, start=first_id):
+        entry_rows.append((entry_id, entry['date'], entry['description'], entry['reference'], entry['transaction_type']))
+        for line in entry['lines']:
+            line_rows.append((entry_id, line['account_id'], line['debit'], line['credit'], line['description']))
+        all_lines.extend(entry['lines'])
+        rows, ops = journal_inventory_effects(entry['date'], entry['description'], entry['lines'])
+        inventory_rows.extend(rows)
+        stock_ops.extend(ops)
+    
+    cur.executemany('''
+        INSERT INTO journal_entries (id, date, description, reference, transaction_type, posted)
+        VALUES (?, ?, ?, ?, ?, 1)
+    ''', entry_rows)
+    cur.executemany('''
+        INSERT INTO journal_lines (entry_id, account_id, debit, credit, description)
+        VALUES (?, ?, ?, ?, ?)
+    ''', line_rows)
+    apply_balance_delta(cur, all_lines, 'journal')
+    apply_inventory_effects(cur, inventory_rows, stock_ops)
+    return first_id, first_id + len(entries) - 1
+
+def import_journal_entries(rows, dry_run=False):
+    """Validasi lalu posting semua entri impor dalam satu transaksi.
+
+    Mengembalikan dict ringkasan: entries, lines, errors [(baris, pesan)],
+    first_id/last_id (None jika tidak ada yang diposting).
+    """
+    accounts_by_code = chart_of_accounts.accounts_by_code()
+    accounts_by_id = chart_of_accounts.accounts_by_id()
+    
+    entries = []
+    errors = []
+    for entry_rows in group_import_rows(rows):
+        entry, entry_errors = build_import_entry(entry_rows, accounts_by_code, accounts_by_id)
+        if entry_errors:
+            errors.extend(entry_errors)
+        else:
+            entries.append(entry)
+    
+    result = {
+        'entries': len(entries),
+        'lines': sum(len(entry['lines']) for entry in entries),
+        'errors': sorted(errors),
+        'first_id': None,
+        'last_id': None,
+    }
+    if entries and not errors and not dry_run:
+        result['first_id'], result['last_id'] = write_queue.run(write_journal_import, entries)
+    return result
+
+# ---------- Pelaporan Keuangan ----------
+
+@cached_report('trial_balance')
+def trial_balance(include_adjustments=False):
+    """Menghasilkan neraca saldo dengan format yang benar - VERSI DIPERBAIKI"""
+    balances = get_all_account_balances()
+    trial_balance_data = []
+    total_debit = 0
+    total_credit = 0
+    
+    for info in balances.values():
+        account = info['account']
+        # Dapatkan saldo akun
+        balance = info['balance'] if include_adjustments else info['unadjusted_balance']
+        
+        # Tentukan apakah saldo normalnya Debit atau Kredit
+        if account['normal_balance'] == 'Debit':
+            # Untuk akun dengan saldo normal Debit (Asset, Expense)
+            if balance >= 0:
+                debit = balance
+                credit = 0
+            else:
+                debit = 0
+                credit = abs(balance)
+        else:
+            # Untuk akun dengan saldo normal Kredit (Liability, Equity, Revenue)
+            if balance >= 0:
+                debit = 0
+                credit = balance
+            else:
+                debit = abs(balance)
+                credit = 0
+        
+        # Hanya tampilkan akun yang memiliki saldo
+        if debit != 0 or credit != 0:
+            trial_balance_data.append({
+                'account': account,
+                'debit': debit,
+                'credit': credit
+            })
+            total_debit += debit
+            total_credit += credit
+    
+    return trial_balance_data, total_debit, total_credit
+
+def statement_line(info, amount):
+    """Baris detail laporan keuangan untuk satu akun"""
+    account = info['account']
+    return {
+        'account_id': account['id'],
+        'code': account['code'],
+        'name': account['name'],
+        'amount': amount,
+    }
+
+def find_statement_account(balances, code, name_fragment):
+    """Cari akun berdasarkan kode atau potongan nama (akun dengan id terkecil)"""
+    for info in sorted(balances.values(), key=lambda info: info['account']['id']):
+        account = info['account']
+        if account['code'] == code or name_fragment.lower() in account['name'].lower():
+            return info
+    return None
+
+@cached_report('financial_statements')
+def financial_statements(include_adjustments=True):
+    """Hitung semua laporan keuangan dalam satu kali jalan.
+
+    Saldo per akun dibaca sekali (get_all_account_balances) lalu laba rugi,
+    neraca, perubahan modal dan arus kas disusun dari hasil di memori.
+    Mengembalikan dict dengan kunci 'income', 'balance', 'equity', 'cash_flow'.
+    """
+    balances = get_all_account_balances()
+    
+    # Mutasi jurnal (+ penyesuaian) per kelompok kode akun, tanpa saldo awal
+    groups = {prefix: {'lines': [], 'total': 0} for prefix in ('1', '2', '3', '4', '5')}
+    cash_journal = {}
+    for info in balances.values():
+        account = info['account']
+        debit = info['journal_debit'] + (info['adjusting_debit'] if include_adjustments else 0)
+        credit = info['journal_credit'] + (info['adjusting_credit'] if include_adjustments else 0)
+        cash_journal[account['code']] = (info['journal_debit'], info['journal_credit'])
+        
+        group = groups.get(account['code'][:1])
+        if group is None:
+            continue
+        # Aset & beban bertambah di debit, selain itu di kredit
+        amount = debit - credit if account['code'][:1] in ('1', '5') else credit - debit
+        group['total'] += amount
+        if amount:
+            group['lines'].append(statement_line(info, amount))
+    
+    # Laporan laba rugi
+    total_revenue = groups['4']['total']
+    total_expense = groups['5']['total']
+    net_income = total_revenue - total_expense
+    income = {
+        'revenues': groups['4']['lines'],
+        'expenses': groups['5']['lines'],
+        'total_revenue': total_revenue,
+        'total_expense': total_expense,
+        'net_income': net_income
+    }
+    
+    # Neraca - laba bersih ditambahkan ke ekuitas
+    balance = {
+        'assets': groups['1']['lines'],
+        'liabilities': groups['2']['lines'],
+        'equity': groups['3']['lines'],
+        'total_assets': groups['1']['total'],
+        'total_liabilities': groups['2']['total'],
+        'total_equity': groups['3']['total'] + net_income,
+        'net_income': net_income
+    }
+    
+    # Laporan perubahan modal
+    capital_account = find_statement_account(balances, '301', 'Modal Pemilik')
+    drawing_account = find_statement_account(balances, '302', 'Prive')
+    balance_key = 'balance' if include_adjustments else 'unadjusted_balance'
+    beginning_capital = capital_account[balance_key] if capital_account else 0
+    drawings = abs(drawing_account[balance_key]) if drawing_account else 0
+    equity = {
+        'beginning_capital': beginning_capital,
+        'net_income': net_income,
+        'drawings': drawings,
+        'ending_capital': beginning_capital + net_income - drawings
+    }
+    
+    # Laporan arus kas - hanya mutasi jurnal (tanpa penyesuaian)
+    def journal_side(code, side):
+        debit, credit = cash_journal.get(code, (0, 0))
+        return debit if side == 'debit' else credit
+    
+    net_revenue = sum(credit - debit for code, (debit, credit) in cash_journal.items() if code.startswith('4'))
+    net_expenses = sum(debit - credit for code, (debit, credit) in cash_journal.items() if code.startswith('5'))
+    net_cash_operating = net_revenue - net_expenses
+    
+    equipment_purchase = journal_side('104', 'debit')
+    equipment_sale = journal_side('104', 'credit')
+    net_cash_investing = equipment_sale - equipment_purchase
+    
+    capital_contribution = journal_side('301', 'credit')
+    cash_drawings = journal_side('302', 'debit')
+    loans_received = journal_side('202', 'credit')
+    loans_paid = journal_side('202', 'debit')
+    net_cash_financing = capital_contribution - cash_drawings + loans_received - loans_paid
+    
+    cash_flow = {
+        'operating_activities': {
+            'net_cash': net_cash_operating,
+            'revenue': net_revenue,
+            'expenses': net_expenses
+        },
+        'investing_activities': {
+            'net_cash': net_cash_investing,
+            'equipment_purchase': equipment_purchase,
+            'equipment_sale': equipment_sale
+        },
+        'financing_activities': {
+            'net_cash': net_cash_financing,
+            'capital_contribution': capital_contribution,
+            'drawings': cash_drawings,
+            'loans_received': loans_received,
+            'loans_paid': loans_paid
+        },
+        'net_cash_flow': net_cash_operating + net_cash_investing + net_cash_financing
+    }
+    
+    return {
+        'income': income,
+        'balance': balance,
+        'equity': equity,
+        'cash_flow': cash_flow,
+    }
+
+def equity_statement(include_adjustments=True):
+    """Hasilkan laporan perubahan modal"""
+    return financial_statements(include_adjustments)['equity']
+
+def income_statement(include_adjustments=True):
+    """Hasilkan laporan laba rugi - VERSI YANG DIPERBAIKI"""
+    return financial_statements(include_adjustments)['income']
+
+def balance_sheet(include_adjustments=True):
+    """Hasilkan neraca - VERSI YANG DIPERBAIKI"""
+    return financial_statements(include_adjustments)['balance']
+
+def cash_flow_statement():
+    """Hasilkan laporan arus kas yang lebih akurat"""
+    return financial_statements()['cash_flow']
+
+@cached_report('closing_entries')
+def get_closing_entries():
+    """Buat entri jurnal penutup untuk menutup akun nominal (pendapatan dan beban)"""
+    db = get_db()
+    cur = db.cursor()
+    
+    # Hitung total pendapatan dan beban
+    cur.execute('''
+        SELECT 
+            SUM(CASE WHEN a.code LIKE '4%' THEN jl.credit - jl.debit ELSE 0 END) as net_revenue,
+            SUM(CASE WHEN a.code LIKE '5%' THEN jl.debit - jl.credit ELSE 0 END) as net_expense
+        FROM journal_lines jl
+        JOIN accounts a ON jl.account_id = a.id
+    ''')
+    result = cur.fetchone()
+    
+    net_revenue = result['net_revenue'] or 0
+    net_expense = result['net_expense'] or 0
+    net_income = net_revenue - net_expense
+    
+    closing_entries = []
+    
+    balances = get_all_account_balances()
+    
+    # 1. Tutup akun pendapatan ke Ikhtisar Laba Rugi
+    if net_revenue > 0:
+        revenue_accounts = [info['account'] for info in balances.values()
+                            if info['account']['code'].startswith('4') and info['account']['acct_type'] == 'Revenue']
+        
+        for account in revenue_accounts:
+            account_balance = balances[account['id']]['balance']
+            if account_balance > 0:
+                closing_entries.append({
+                    'account_id': account['id'],
+                    'debit': 0,
+                    'credit': account_balance,
+                    'description': f'Penutupan pendapatan'
+                })
+    
+    # 2. Tutup akun beban ke Ikhtisar Laba Rugi
+    if net_expense > 0:
+        expense_accounts = [info['account'] for info in balances.values()
+                            if info['account']['code'].startswith('5') and info['account']['acct_type'] == 'Expense']
+        
+        for account in expense_accounts:
+            account_balance = balances[account['id']]['balance']
+            if account_balance > 0:
+                closing_entries.append({
+                    'account_id': account['id'],
+                    'debit': account_balance,
+                    'credit': 0,
+                    'description': f'Penutupan beban'
+                })
+    
+    # 3. Tutup Ikhtisar Laba Rugi ke Laba Ditahan
+    if net_income != 0:
+        # Cari akun Ikhtisar Laba Rugi atau Laba Ditahan
+        cur.execute("SELECT id FROM accounts WHERE code = '303' OR name LIKE '%Laba Ditahan%'")
+        retained_earnings = cur.fetchone()
+        
+        if retained_earnings:
+            if net_income > 0:
+                # Laba bersih - tambah ke Laba Ditahan
+                closing_entries.append({
+                    'account_id': retained_earnings['id'],
+                    'debit': 0,
+                    'credit': net_income,
+                    'description': f'Laba bersih periode berjalan'
+                })
+            else:
+                # Rugi bersih - kurangi dari Laba Ditahan
+                closing_entries.append({
+                    'account_id': retained_earnings['id'],
+                    'debit': abs(net_income),
+                    'credit': 0,
+                    'description': f'Rugi bersih periode berjalan'
+                })
+    
+    return closing_entries, net_income
+
+@cached_report('post_closing_trial_balance')
+def get_post_closing_trial_balance():
+    """Hasilkan neraca saldo setelah penutupan (hanya akun riil)"""
+    balances = get_all_account_balances()
+    pctb_data = []
+    total_debit = 0
+    total_credit = 0
+    
+    for info in balances.values():
+        account = info['account']
+        # Hanya akun riil (Asset, Liability, Equity) yang ada di neraca saldo penutup
+        if account['acct_type'] in ('Asset', 'Liability', 'Equity'):
+            balance = info['balance']
+            
+            if account['normal_balance'] == 'Debit':
+                debit = balance if balance > 0 else 0
+                credit = -balance if balance < 0 else 0
+            else:
+                debit = -balance if balance < 0 else 0
+                credit = balance if balance > 0 else 0
+            
+            pctb_data.append({
+                'account': account,
+                'debit': debit,
+                'credit': credit
+            })
+            
+            total_debit += debit
+            total_credit += credit
+    
+    return pctb_data, total_debit, total_credit
+
+def post_closing_entries():
+    """Posting entri jurnal penutup (lewat antrian penulisan)"""
+    return write_queue.run(write_closing_entries)
+
+def write_closing_entries():
+    """Tulis jurnal penutup di transaksi penulis; saldo dihitung di transaksi yang sama"""
+    closing_entries, net_income = get_closing_entries()
+    
+    if not closing_entries:
+        return None, 0
+    
+    db = get_db()
+    cur = db.cursor()
+    
+    # Buat entri jurnal penutup
+    cur.execute('''
+        INSERT INTO journal_entries (date, description, reference, transaction_type, posted) 
+        VALUES (?, ?, ?, ?, 1)
+    ''', (datetime.now().date().isoformat(), 'Jurnal Penutup - Akhir Periode', 'CLOSING', 'Closing Entry'))
+    entry_id = cur.lastrowid
+    
+    # Tambahkan baris jurnal penutup
+    for entry in closing_entries:
+        cur.execute('''
+            INSERT INTO journal_lines (entry_id, account_id, debit, credit, description) 
+            VALUES (?, ?, ?, ?, ?)
+        ''', (entry_id, entry['account_id'], entry.get('debit', 0), entry.get('credit', 0), entry.get('description', '')))
+    apply_balance_delta(cur, closing_entries, 'journal')
+
+    return entry_id, net_income
+    
+# ---------- Template HTML ----------
+
+BASE_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="id">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Tiramine - {{title}}</title>
+    <link href="{{ asset_url('vendor/bootstrap/css/bootstrap.min.css') }}" rel="stylesheet">
+    <link href="{{ asset_url('vendor/fontawesome/css/all.min.css') }}" rel="stylesheet">
+    <link href="{{ asset_url('css/tiramine.css') }}" rel="stylesheet">
+</head>
+<body>
+    <!-- Enhanced Background Waves -->
+    <div class="bg-waves">
+        <div class="wave"></div>*
+        <div class="wave"></div>
+        <div class="wave"></div>
+    </div>
+
+    {% if user and request.endpoint != 'login' %}
+    <div class="container-fluid p-0">
+        <!-- Sidebar -->
+        <div class="sidebar">
+            <div class="logo">
+                <i class="fas fa-water"></i>
+                <div class="logo-text">Tiramine</div>
+            </div>
+            <nav class="nav-links">
+                <div class="nav-item">
+                    <a class="nav-link {{ 'active' if request.endpoint == 'dashboard' }}" href="/dashboard">
+                        <i class="fas fa-home"></i>
+                        <span>Dashboard</span>
+                    </a>
+                </div>
+                <div class="nav-item">
+                    <a class="nav-link {{ 'active' if 'inventory' in request.endpoint }}" href="/inventory">
+                        <i class="fas fa-boxes"></i>
+                        <span>Monitoring Stok</span>
+                    </a>
+                </div>
+                <div class="nav-item">
+                    <a class="nav-link {{ 'active' if 'journal' in request.endpoint }}" href="/journal">
+                        <i class="fas fa-book"></i>
+                        <span>Jurnal</span>
+                    </a>
+                </div>
+                <div class="nav-item">
+                    <a class="nav-link {{ 'active' if 'ledger' in request.endpoint }}" href="/ledger">
+                        <i class="fas fa-file-invoice-dollar"></i>
+                        <span>Buku Besar</span>
+                    </a>
+                </div>
+                <div class="nav-item">
+                    <a class="nav-link {{ 'active' if 'trial_balance' in request.endpoint }}" href="/trial_balance">
+                        <i class="fas fa-balance-scale"></i>
+                        <span>Neraca Saldo</span>
+                    </a>
+                </div>
+                <div class="nav-item">
+                    <a class="nav-link {{ 'active' if 'adjusting' in request.endpoint }}" href="/adjusting">
+                        <i class="fas fa-adjust"></i>
+                        <span>Ayat Penyesuaian</span>
+                    </a>
+                </div>
+                    <div class="nav-item">
+                    <a class="nav-link {{ 'active' if 'closing' in request.endpoint }}" href="/closing">
+                        <i class="fas fa-lock"></i>
+                        <span>Jurnal Penutup</span>
+                    </a>
+                </div>
+                <div class="nav-item">
+                    <a class="nav-link {{ 'active' if 'financials' in request.endpoint }}" href="/financials">
+                        <i class="fas fa-chart-line"></i>
+                        <span>Laporan Keuangan</span>
+                    </a>
+                </div>
+                <div class="nav-item">
+                    <a class="nav-link {{ 'active' if 'opening_balance' in request.endpoint }}" href="/opening_balance">
+                        <i class="fas fa-play-circle"></i>
+                        <span>Saldo Awal</span>
+                    </a>
+                </div>
+                <div class="nav-item">
+                    <a class="nav-link reset-link {{ 'active' if 'reset' in request.endpoint }}" href="/reset">
+                        <i class="fas fa-broom"></i>
+                        <span>Reset Data</span>
+                    </a>
+                </div>
+            </nav>
+        </div>
+        
+        <!-- Main Content -->
+        <div class="main-content">
+            <nav class="navbar">
+                <div class="navbar-content">
+                    <div class="page-header-content">
+                        <h1 class="page-title">{{ title }}</h1>
+                        {% if request.endpoint == 'dashboard' %}
+                        <p class="page-subtitle">Ringkasan keuangan dan statistik bisnis peternakan tiram</p>
+                        {% endif %}
+                    </div>
+                    <div class="user-menu">
+                        <div class="user-avatar">
+                            {{ user.username[0].upper() }}
+                        </div>
+                        <div class="user-info">
+                            <div class="user-name">{{ user.username }}</div>
+                            <div class="user-role">{{ role_label(user.role) }}</div>
+                        </div>
+                        <a href="/logout" class="btn btn-outline-primary btn-sm">
+                            <i class="fas fa-sign-out-alt me-1"></i>Keluar
+                        </a>
+                    </div>
+                </div>
+            </nav>
+            
+            <div class="content-container">
+                {% with messages = get_flashed_messages() %}
+                    {% if messages %}
+                        <div class="alert alert-info alert-dismissible fade show">
+                            <i class="fas fa-info-circle me-2"></i>
+                            {{ messages[0] }}
+                            <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+                        </div>
+                    {% endif %}
+                {% endwith %}
+                
+                {% block content %}{{ body|safe }}{% endblock %}
+            </div>
+        </div>
+    </div>
+    {% else %}
+        {% with messages = get_flashed_messages() %}
+            {% if messages %}
+                <div class="container mt-3" style="max-width: 640px;">
+                    <div class="alert alert-info alert-dismissible fade show">
+                        <i class="fas fa-info-circle me-2"></i>
+                        {{ messages[0] }}
+                        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+                    </div>
+                </div>
+            {% endif %}
+        {% endwith %}
+        {{ self.content() }}
+    {% endif %}
+    
+    <script src="{{ asset_url('vendor/bootstrap/js/bootstrap.bundle.min.js') }}"></script>
+    <script src="{{ asset_url('js/tiramine.js') }}"></script>
+</body>
+</html>
+"""
+
+# ---------- Template Halaman ----------
+# Halaman dengan tabel besar dirender lewat template Jinja yang mewarisi
+# layout (BASE_TEMPLATE). Semua template didaftarkan sekali di DictLoader
+# sehingga dikompilasi satu kali dan disimpan di cache Jinja, bukan diparse
+# ulang setiap request seperti render_template_string.
+
+ENTRY_FILTERS_TEMPLATE = """
+<form method="get" action="{{ url_for(endpoint) }}" class="row g-2 align-items-end mb-4">
+    <div class="col-md-3">
+        <label class="form-label small text-muted">Dari Tanggal</label>
+        <input type="date" name="start_date" value="{{ start_date }}" class="form-control form-control-sm">
+    </div>
+    <div class="col-md-3">
+        <label class="form-label small text-muted">Sampai Tanggal</label>
+        <input type="date" name="end_date" value="{{ end_date }}" class="form-control form-control-sm">
+    </div>
+    {% if transaction_types is defined %}
+    <div class="col-md-3">
+        <label class="form-label small text-muted">Jenis Transaksi</label>
+        <select name="transaction_type" class="form-select form-select-sm">
+            <option value="">Semua</option>
+            {% for t in transaction_types %}
+            <option value="{{ t }}" {{ 'selected' if t == transaction_type }}>{{ t }}</option>
+            {% endfor %}
+        </select>
+    </div>
+    {% endif %}
+    <div class="col-md-3">
+        <button type="submit" class="btn btn-sm btn-primary"><i class="fas fa-filter me-1"></i>Filter</button>
+        <a href="{{ url_for(endpoint) }}" class="btn btn-sm btn-outline-secondary">Reset</a>
+    </div>
+</form>
+"""
+
+ENTRY_PAGINATION_TEMPLATE = """
+{% if cursor or next_cursor %}
+<div class="d-flex justify-content-end gap-2 mt-3">
+    {% if cursor %}
+    <a href="{{ url_for(endpoint, **filters) }}" class="btn btn-sm btn-outline-secondary">
+        <i class="fas fa-angle-double-left me-1"></i>Terbaru
+    </a>
+    {% endif %}
+    {% if next_cursor %}
+    <a href="{{ url_for(endpoint, cursor=next_cursor, **filters) }}" class="btn btn-sm btn-outline-primary">
+        Lebih Lama<i class="fas fa-angle-right ms-1"></i>
+    </a>
+    {% endif %}
+</div>
+{% endif %}
+"""
+
+# Kartu satu entri beserta baris-barisnya (jurnal umum / ayat penyesuaian)
+ENTRY_CARD_MACROS = """
+{% macro entry_card(item, kind) %}
+    {% set entry = item.entry %}
+    {% set total_debit = item.lines|sum(attribute='debit') %}
+    {% set total_credit = item.lines|sum(attribute='credit') %}
+    {% set is_balanced = (total_debit - total_credit)|abs < 0.01 %}
+    <div class="card {{ kind }}-entry-card mb-4">
+        <div class="card-header {{ 'bg-light' if kind == 'journal' else 'bg-warning bg-opacity-10' }} d-flex justify-content-between align-items-center">
+            <div>
+                <strong>{{ entry.date }}</strong>
+                {% if kind == 'journal' %}
+                <span class="badge bg-secondary ms-2">{{ entry.transaction_type }}</span>
+                {% else %}
+                <span class="badge bg-warning text-dark ms-2">Penyesuaian</span>
+                {% endif %}
+                {% if not is_balanced %}<span class="badge bg-danger ms-1">Tidak Balance</span>{% endif %}
+            </div>
+            <div>
+                <small class="text-muted me-3">#{{ entry.id }}</small>
+                {% if kind == 'journal' %}
+                <a href="/journal/{{ entry.id }}" class="btn btn-sm btn-outline-primary me-1">
+                    <i class="fas fa-eye"></i>
+                </a>
+                <a href="/journal/{{ entry.id }}/delete" class="btn btn-sm btn-outline-danger"
+                   onclick="return confirm('Hapus entri jurnal #{{ entry.id }}?')">
+                    <i class="fas fa-trash"></i>
+                </a>
+                {% else %}
+                <a href="/adjusting/{{ entry.id }}" class="btn btn-sm btn-outline-primary">
+                    <i class="fas fa-eye"></i> Detail
+                </a>
+                {% endif %}
+            </div>
+        </div>
+        <div class="card-body">
+            <h6 class="card-title mb-3">{{ entry.description }}</h6>
+            
+            <div class="table-responsive">
+                <table class="table table-sm {{ kind }}-lines-table">
+                    <thead>
+                        <tr>
+                            <th width="60%">Akun</th>
+                            <th width="20%" class="text-end">Debit</th>
+                            <th width="20%" class="text-end">Kredit</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {% for line in item.lines %}
+                        <tr>
+                            <td>
+                                <div><strong>{{ line.code }}</strong> - {{ line.name }}</div>
+                                <small class="text-muted">{{ line.description }}</small>
+                            </td>
+                            <td class="text-end text-success fw-bold">{{ line.debit|rupiah if line.debit > 0 }}</td>
+                            <td class="text-end text-danger fw-bold">{{ line.credit|rupiah if line.credit > 0 }}</td>
+                        </tr>
+                        {% endfor %}
+                    </tbody>
+                    <tfoot class="table-active">
+                        <tr>
+                            <td class="text-end"><strong>Total:</strong></td>
+                            <td class="text-end text-success border-top fw-bold">{{ total_debit|rupiah }}</td>
+                            <td class="text-end text-danger border-top fw-bold">{{ total_credit|rupiah }}</td>
+                        </tr>
+                    </tfoot>
+                </table>
+            </div>
+            
+            <div class="mt-3">
+                <div class="alert {{ 'alert-success' if is_balanced else 'alert-warning' }} py-2 mb-0">
+                    <i class="fas {{ 'fa-check-circle' if is_balanced else 'fa-exclamation-triangle' }} me-2"></i>
+                    {% if is_balanced %}{{ 'Entri jurnal seimbang' if kind == 'journal' else 'Ayat penyesuaian seimbang' }}{% else %}Tidak seimbang! Selisih: {{ (total_debit - total_credit)|abs|rupiah }}{% endif %}
+                </div>
+            </div>
+        </div>
+    </div>
+{% endmacro %}
+
+{% macro entry_list_styles(kind, color) %}
+<style>
+.{{ kind }}-entry-card {
+    border-left: 4px solid {{ color }};
+    transition: all 0.3s ease;
+}
+
+.{{ kind }}-entry-card:hover {
+    transform: translateY(-2px);
+    box-shadow: 0 4px 15px rgba(0,0,0,0.1);
+}
+
+.{{ kind }}-lines-table {
+    font-size: 0.9rem;
+}
+
+.{{ kind }}-lines-table td {
+    padding: 0.5rem 0.75rem;
+    vertical-align: middle;
+}
+
+.{{ kind }}-container {
+    max-height: 70vh;
+    overflow-y: auto;
+    padding-right: 10px;
+}
+
+/* Custom scrollbar */
+.{{ kind }}-container::-webkit-scrollbar {
+    width: 6px;
+}
+
+.{{ kind }}-container::-webkit-scrollbar-track {
+    background: #f1f1f1;
+    border-radius: 10px;
+}
+
+.{{ kind }}-container::-webkit-scrollbar-thumb {
+    background: #c1c1c1;
+    border-radius: 10px;
+}
+
+.{{ kind }}-container::-webkit-scrollbar-thumb:hover {
+    background: #a8a8a8;
+}
+</style>
+{% endmacro %}
+"""
+
+JOURNAL_TEMPLATE = """
+{% extends 'layout.html' %}
+{% from 'partials/entry_card.html' import entry_card, entry_list_styles %}
+{% block content %}
+<div class="page-header">
+    <h1 class="page-title">Jurnal Umum</h1>
+    <p class="page-subtitle">Buku Jurnal Transaksi Keuangan</p>
+</div>
+
+<div class="card">
+    <div class="card-body">
+        <div class="d-flex justify-content-between align-items-center mb-4">
+            <h5 class="section-title mb-0">Daftar Entri Jurnal</h5>
+            <div>
+                <a href="/journal/import" class="btn btn-outline-primary me-2">
+                    <i class="fas fa-file-import me-2"></i>Impor
+                </a>
+                <a href="/journal/new" class="btn btn-primary">
+                    <i class="fas fa-plus me-2"></i>Entri Baru
+                </a>
+            </div>
+        </div>
+        
+        <!-- Summary Stats -->
+        <div class="row mb-4">
+            <div class="col-md-3">
+                <div class="stat-card-compact bg-light">
+                    <div class="stat-icon-compact bg-primary text-white">
+                        <i class="fas fa-file-invoice"></i>
+                    </div>
+                    <div class="stat-number-compact text-primary">{{ entries|length }}</div>
+                    <div class="stat-label-compact">Entri di Halaman Ini</div>
+                </div>
+            </div>
+            <div class="col-md-9">
+                <div class="alert alert-info">
+                    <i class="fas fa-info-circle me-2"></i>
+                    <strong>Urutan Kronologis:</strong> Transaksi terbaru ditampilkan di atas, transaksi lama di bawah.
+                </div>
+            </div>
+        </div>
+        
+        {% include 'partials/entry_filters.html' %}
+        
+        <div class="journal-container">
+            {% for item in entries %}
+                {{ entry_card(item, 'journal') }}
+            {% else %}
+            <div class="text-center py-5">
+                <i class="fas fa-book fa-3x text-muted mb-3"></i>
+                <h5 class="text-muted">Belum Ada Entri Jurnal</h5>
+                <p class="text-muted">Mulai dengan membuat entri jurnal pertama Anda.</p>
+                <a href="/journal/new" class="btn btn-primary">
+                    <i class="fas fa-plus me-2"></i>Buat Entri Jurnal
+                </a>
+            </div>
+            {% endfor %}
+        </div>
+        {% include 'partials/entry_pagination.html' %}
+    </div>
+</div>
+
+{{ entry_list_styles('journal', '#007bff') }}
+{% endblock %}
+"""
+
+ADJUSTING_TEMPLATE = """
+{% extends 'layout.html' %}
+{% from 'partials/entry_card.html' import entry_card, entry_list_styles %}
+{% block content %}
+<div class="page-header">
+    <h1 class="page-title">Ayat Penyesuaian</h1>
+    <p class="page-subtitle">Entri penyesuaian untuk penutupan periode akuntansi</p>
+</div>
+
+<div class="card">
+    <div class="card-body">
+        <div class="d-flex justify-content-between align-items-center mb-4">
+            <h5 class="section-title mb-0">Daftar Ayat Penyesuaian</h5>
+            <a href="/adjusting/new" class="btn btn-primary">
+                <i class="fas fa-plus me-2"></i>Ayat Penyesuaian Baru
+            </a>
+        </div>
+        
+        <!-- Info Panel -->
+        <div class="alert alert-warning mb-4">
+            <i class="fas fa-info-circle me-2"></i>
+            <strong>Fungsi Ayat Penyesuaian:</strong> Untuk menyesuaikan saldo akun sebelum penyusunan laporan keuangan (akrual, deferral, penyusutan, dll).
+        </div>
+        
+        {% include 'partials/entry_filters.html' %}
+        
+        <div class="adjusting-container">
+            {% for item in entries %}
+                {{ entry_card(item, 'adjusting') }}
+            {% else %}
+            <div class="text-center py-5">
+                <i class="fas fa-adjust fa-3x text-muted mb-3"></i>
+                <h5 class="text-muted">Belum Ada Ayat Penyesuaian</h5>
+                <p class="text-muted">Ayat penyesuaian digunakan untuk menyesuaikan saldo akun sebelum laporan keuangan.</p>
+                <a href="/adjusting/new" class="btn btn-primary">
+                    <i class="fas fa-plus me-2"></i>Buat Ayat Penyesuaian
+                </a>
+            </div>
+            {% endfor %}
+        </div>
+        {% include 'partials/entry_pagination.html' %}
+    </div>
+</div>
+
+{{ entry_list_styles('adjusting', '#ffc107') }}
+{% endblock %}
+"""
+
+LEDGER_ACCOUNT_TEMPLATE = """
+{% extends 'layout.html' %}
+{% block content %}
+<div class="page-header">
+    <h1 class="page-title">Buku Besar: {{ account.code }} - {{ account.name }}</h1>
+    <p class="page-subtitle">Riwayat transaksi untuk akun ini</p>
+</div>
+
+<div class="card">
+    <div class="card-body">
+        <div class="row mb-4">
+            <div class="col-md-6">
+                <div class="card bg-light">
+                    <div class="card-body">
+                        <h6><i class="fas fa-info-circle me-2"></i>Informasi Akun</h6>
+                        <p><strong>Saldo Saat Ini:</strong> 
+                            <span class="{{ 'text-success' if current_balance >= 0 else 'text-danger' }} fw-bold">
+                                {{ current_balance|rupiah }}
+                            </span>
+                        </p>
+                        <p><strong>Saldo Normal:</strong> {{ account.normal_balance }}</p>
+                        <p><strong>Deskripsi:</strong> {{ account.description or 'Tidak ada deskripsi' }}</p>
+                    </div>
+                </div>
+            </div>
+        </div>
+        
+        <h6><i class="fas fa-history me-2"></i>Riwayat Transaksi</h6>
+        <div class="table-responsive">
+            <table class="table accounting-table">
+                <thead>
+                    <tr>
+                        <th>Tanggal</th>
+                        <th>Keterangan</th>
+                        <th class="text-end">Debit</th>
+                        <th class="text-end">Kredit</th>
+                        <th class="text-end">Saldo</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {% if page.at_start %}
+                    <tr class="table-light">
+                        <td></td>
+                        <td><strong>Saldo Awal</strong></td>
+                        <td></td>
+                        <td></td>
+                        <td class="text-end fw-bold">{{ page.info.opening_balance|rupiah }}</td>
+                    </tr>
+                    {% endif %}
+                    {% for entry in page.rows %}
+                    <tr class="{{ 'table-warning' if entry.src == 1 }}">
+                        <td>{{ entry.date }}</td>
+                        <td>
+                            {{ entry.description }}
+                            {% if entry.line_desc %}<br><small class='text-muted'>{{ entry.line_desc }}</small>{% endif %}
+                        </td>
+                        <td class="text-end text-success">{{ entry.debit|rupiah if entry.debit > 0 }}</td>
+                        <td class="text-end text-danger">{{ entry.credit|rupiah if entry.credit > 0 }}</td>
+                        <td class="text-end fw-bold">{{ entry.balance|rupiah }}</td>
+                    </tr>
+                    {% endfor %}
+                </tbody>
+            </table>
+        </div>
+        
+        <div class="mt-3">
+            <small class="text-muted">
+                <i class="fas fa-info-circle me-1"></i>
+                Baris kuning menunjukkan entri penyesuaian
+            </small>
+        </div>
+        <div class="d-flex justify-content-end gap-2 mt-3">
+            {% if not page.at_start %}
+            <a href="{{ url_for('ledger_account', account_id=account.id, start=1) }}" class="btn btn-sm btn-outline-secondary">
+                <i class="fas fa-angle-double-left me-1"></i>Awal
+            </a>
+            <a href="{{ url_for('ledger_account', account_id=account.id, before=page.older_cursor) }}" class="btn btn-sm btn-outline-primary">
+                <i class="fas fa-angle-left me-1"></i>Lebih Lama
+            </a>
+            {% endif %}
+            {% if page.newer_cursor %}
+            <a href="{{ url_for('ledger_account', account_id=account.id, after=page.newer_cursor) }}" class="btn btn-sm btn-outline-primary">
+                Lebih Baru<i class="fas fa-angle-right ms-1"></i>
+            </a>
+            <a href="{{ url_for('ledger_account', account_id=account.id) }}" class="btn btn-sm btn-outline-secondary">
+                Terbaru<i class="fas fa-angle-double-right ms-1"></i>
+            </a>
+            {% endif %}
+        </div>
+    </div>
+</div>
+{% endblock %}
+"""
+
+JOURNAL_IMPORT_TEMPLATE = """
+{% extends 'layout.html' %}
+{% block content %}
+<div class="page-header">
+    <h1 class="page-title">Impor Jurnal</h1>
+    <p class="page-subtitle">Posting banyak entri jurnal sekaligus dari CSV, JSON Lines atau Excel</p>
+</div>
+
+<div class="card mb-4">
+    <div class="card-body">
+        <form method="post" enctype="multipart/form-data">
+            <div class="row g-3 align-items-end">
+                <div class="col-md-6">
+                    <label class="form-label fw-semibold">File Impor</label>
+                    <input type="file" class="form-control" name="file" accept="{{ extensions|join(',') }}" required>
+                </div>
+                <div class="col-md-3">
+                    <div class="form-check">
+                        <input class="form-check-input" type="checkbox" name="dry_run" id="dry_run" value="1">
+                        <label class="form-check-label" for="dry_run">Validasi saja (tanpa posting)</label>
+                    </div>
+                </div>
+                <div class="col-md-3 text-end">
+                    <a href="/journal" class="btn btn-outline-secondary me-2">Kembali</a>
+                    <button type="submit" class="btn btn-primary"><i class="fas fa-file-import me-2"></i>Impor</button>
+                </div>
+            </div>
+        </form>
+        <hr>
+        <p class="text-muted small mb-1">
+            Satu baris = satu baris jurnal. Kolom: <code>entry</code> (opsional), <code>date</code>,
+            <code>description</code>, <code>reference</code>, <code>transaction_type</code>,
+            <code>template_key</code>, <code>account_code</code> atau <code>account_id</code>,
+            <code>debit</code>, <code>credit</code>, <code>line_description</code>.
+        </p>
+        <p class="text-muted small mb-0">
+            Jika ada satu kesalahan saja, tidak ada entri yang diposting.
+        </p>
+    </div>
+</div>
+
+{% if result %}
+<div class="card">
+    <div class="card-body">
+        <h5 class="section-title">Hasil {{ 'Validasi' if dry_run else 'Impor' }}: {{ filename }}</h5>
+        <p>
+            {{ result.entries }} entri valid ({{ result.lines }} baris),
+            {{ result.errors|length }} kesalahan.
+            {% if result.first_id %}Entri #{{ result.first_id }} s/d #{{ result.last_id }} telah diposting.{% endif %}
+        </p>
+        {% if result.errors %}
+        <div class="table-responsive">
+            <table class="table table-sm table-striped">
+                <thead><tr><th style="width: 100px">Baris</th><th>Kesalahan</th></tr></thead>
+                <tbody>
+                    {% for row_number, message in result.errors[:error_limit] %}
+                    <tr><td>{{ row_number }}</td><td>{{ message }}</td></tr>
+                    {% endfor %}
+                </tbody>
+            </table>
+        </div>
+        {% if result.errors|length > error_limit %}
+        <p class="text-muted small">... dan {{ result.errors|length - error_limit }} kesalahan lainnya.</p>
+        {% endif %}
+        {% endif %}
+    </div>
+</div>
+{% endif %}
+{% endblock %}
+"""
+
+EXPORT_JOB_TEMPLATE = """
+{% extends 'layout.html' %}
+{% block content %}
+<div class="page-header">
+    <h1 class="page-title">Menyiapkan Ekspor</h1>
+    <p class="page-subtitle">File sedang dibuat di latar belakang dan akan diunduh otomatis setelah selesai</p>
+</div>
+
+<div class="card" data-export-job data-status-url="{{ job.status_url }}">
+    <div class="card-body">
+        <div class="progress mb-3" style="height: 24px">
+            <div class="progress-bar progress-bar-striped progress-bar-animated" role="progressbar"
+                 data-export-progress style="width: {{ (job.progress * 100)|round|int }}%">{{ (job.progress * 100)|round|int }}%</div>
+        </div>
+        <p class="mb-3" data-export-message>
+            {% if job.status == 'failed' %}❌ Gagal membuat file: {{ job.error }}{% else %}⏳ Mohon tunggu...{% endif %}
+        </p>
+        <a href="{{ job.download_url or '#' }}" class="btn btn-success {{ '' if job.download_url else 'd-none' }}" data-export-download>
+            <i class="fas fa-download me-2"></i>Unduh
+        </a>
+        <a href="/export" class="btn btn-outline-secondary">Kembali</a>
+    </div>
+</div>
+{% endblock %}
+"""
+
+DASHBOARD_TEMPLATE = """
+{% extends 'layout.html' %}
+{% block content %}
+<div class="container-fluid py-4">
+    <!-- Header -->
+    <div class="page-header mb-4">
+        <div class="d-flex justify-content-between align-items-center">
+            <div class="flex-grow-1">
+                <h1 class="page-title mb-1">Dashboard Tiramine</h1>
+                <p class="page-subtitle mb-0">Ringkasan keuangan dan statistik bisnis peternakan tiram</p>
+            </div>
+            <div class="user-menu">
+                <div class="user-avatar">
+                    {{ user.username[0]|upper if user else 'A' }}
+                </div>
+                <div class="user-info">
+                    <div class="user-name">{{ user.username if user else 'Admin' }}</div>
+                    <div class="user-role">{{ role_label(user.role) if user else 'Administrator' }}</div>
+                </div>
+            </div>
+        </div>
+    </div>
+    
+    <!-- Row 1: Ringkasan Cepat -->
+    <div class="row mb-4">
+        <!-- Card Kas -->
+        <div class="col-lg-3 col-md-6 mb-4">
+            <div class="card h-100">
+                <div class="card-body p-4">
+                    <div class="d-flex justify-content-between align-items-center mb-3">
+                        <h6 class="section-title-compact mb-0">
+                            <i class="fas fa-wallet me-2 text-success"></i>Kas
+                        </h6>
+                        <div class="stat-icon bg-success text-white">
+                            <i class="fas fa-money-bill-wave"></i>
+                        </div>
+                    </div>
+                    <h3 class="text-success mb-2">{{ cash_flow.get('net_cash_flow', 0)|rupiah(0) }}</h3>
+                    <p class="text-muted mb-0">Saldo kas tersedia</p>
+                </div>
+            </div>
+        </div>
+        
+        <!-- Card Pendapatan -->
+        <div class="col-lg-3 col-md-6 mb-4">
+            <div class="card h-100">
+                <div class="card-body p-4">
+                    <div class="d-flex justify-content-between align-items-center mb-3">
+                        <h6 class="section-title-compact mb-0">
+                            <i class="fas fa-chart-line me-2 text-primary"></i>Pendapatan
+                        </h6>
+                        <div class="stat-icon bg-primary text-white">
+                            <i class="fas fa-hand-holding-usd"></i>
+                        </div>
+                    </div>
+                    <h3 class="text-primary mb-2">{{ income.get('total_revenue', 0)|rupiah(0) }}</h3>
+                    <p class="text-muted mb-0">Total pendapatan periode</p>
+                </div>
+            </div>
+        </div>
+        
+        <!-- Card Laba Bersih -->
+        <div class="col-lg-3 col-md-6 mb-4">
+            <div class="card h-100">
+                <div class="card-body p-4">
+                    <div class="d-flex justify-content-between align-items-center mb-3">
+                        <h6 class="section-title-compact mb-0">
+                            <i class="fas fa-trophy me-2 text-warning"></i>Laba Bersih
+                        </h6>
+                        <div class="stat-icon bg-warning text-white">
+                            <i class="fas fa-chart-pie"></i>
+                        </div>
+                    </div>
+                    <h3 class="{{ 'text-success' if income.get('net_income', 0) >= 0 else 'text-danger' }} mb-2">
+                        {{ income.get('net_income', 0)|rupiah(0) }}
+                    </h3>
+                    <p class="text-muted mb-0">Laba/rugi periode berjalan</p>
+                </div>
+            </div>
+        </div>
+        
+        <!-- Aksi Cepat -->
+        <div class="col-lg-3 col-md-6 mb-4">
+            <div class="card h-100">
+                <div class="card-body p-4 d-flex flex-column">
+                    <div class="d-flex justify-content-between align-items-center mb-3">
+                        <h6 class="section-title-compact mb-0">
+                            <i class="fas fa-bolt me-2 text-warning"></i>Aksi Cepat
+                        </h6>
+                        <div class="dropdown">
+                            <button class="btn btn-sm btn-outline-secondary dropdown-toggle" type="button" data-bs-toggle="dropdown">
+                                <i class="fas fa-cog"></i>
+                            </button>
+                            <ul class="dropdown-menu">
+                                <li><a class="dropdown-item" href="/journal"><i class="fas fa-book me-2"></i>Lihat Jurnal</a></li>
+                                <li><a class="dropdown-item" href="/inventory"><i class="fas fa-boxes me-2"></i>Monitoring Stok</a></li>
+                                <li><hr class="dropdown-divider"></li>
+                                <li><a class="dropdown-item" href="/financials"><i class="fas fa-chart-line me-2"></i>Laporan Keuangan</a></li>
+                            </ul>
+                        </div>
+                    </div>
+                    
+                    <div class="flex-grow-1 d-flex align-items-center justify-content-center">
+                        <a href="/journal/new" class="quick-action-card d-block text-decoration-none text-center w-100">
+                            <div class="quick-action-icon bg-warning text-white mx-auto mb-3">
+                                <i class="fas fa-plus"></i>
+                            </div>
+                            <div class="quick-action-title fw-bold fs-5">Entri Transaksi</div>
+                            <div class="quick-action-desc text-muted">
+                                Tambah transaksi penjualan / pembelian
+                            </div>
+                        </a>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+    
+    <!-- Row 2: Transaksi Terbaru & Ringkasan Keuangan -->
+    <div class="row align-items-stretch">
+        <!-- Transaksi Terbaru -->
+        <div class="col-lg-8 mb-4">
+            <div class="card h-100">
+                <div class="card-header bg-transparent border-bottom-0">
+                    <div class="d-flex justify-content-between align-items-center">
+                        <h5 class="section-title mb-0">
+                            <i class="fas fa-history me-2 text-primary"></i>Transaksi Terbaru
+                        </h5>
+                        <a href="/journal" class="btn btn-outline-primary btn-sm">
+                            <i class="fas fa-list me-1"></i>Lihat Semua
+                        </a>
+                    </div>
+                </div>
+                <div class="card-body">
+                    {% for tx in recent_transactions %}
+                    <div class="transaction-item border-bottom pb-3 mb-3">
+                        <div class="d-flex justify-content-between align-items-start">
+                            <div class="flex-grow-1">
+                                <div class="d-flex align-items-center mb-1">
+                                    <strong class="text-dark">{{ tx.date }}</strong>
+                                    <span class="badge bg-secondary ms-2">{{ tx.transaction_type }}</span>
+                                </div>
+                                <p class="mb-1 text-dark">{{ tx.description[:60] }}{{ '...' if tx.description|length > 60 }}</p>
+                            </div>
+                            <div class="text-end ms-3">
+                                <div class="text-success fw-bold">+{{ tx.total_debit|number(2) }}</div>
+                                <div class="text-danger fw-bold">-{{ tx.total_credit|number(2) }}</div>
+                            </div>
+                        </div>
+                    </div>
+                    {% else %}
+                    <div class="text-center py-5">
+                        <i class="fas fa-inbox fa-3x text-muted mb-3"></i>
+                        <h6 class="text-muted">Belum ada transaksi</h6>
+                        <p class="text-muted small">Mulai dengan membuat entri transaksi pertama Anda</p>
+                    </div>
+                    {% endfor %}
+                </div>
+            </div>
+        </div>
+        
+        <!-- Ringkasan Keuangan -->
+        <div class="col-lg-4">
+            <div class="card h-100">
+                <div class="card-header bg-transparent border-bottom-0">
+                    <h5 class="section-title mb-0">
+                        <i class="fas fa-chart-pie me-2 text-success"></i>Ringkasan Keuangan
+                    </h5>
+                </div>
+                <div class="card-body">
+                    <div class="d-flex justify-content-between align-items-center mb-3 pb-2 border-bottom">
+                        <span class="text-dark">Pendapatan:</span>
+                        <span class="text-success fw-bold">{{ income.get('total_revenue', 0)|rupiah }}</span>
+                    </div>
+                    <div class="d-flex justify-content-between align-items-center mb-3 pb-2 border-bottom">
+                        <span class="text-dark">Beban:</span>
+                        <span class="text-danger fw-bold">{{ income.get('total_expense', 0)|rupiah }}</span>
+                    </div>
+                    <div class="d-flex justify-content-between align-items-center mb-3 pb-2 border-bottom">
+                        <span class="text-dark">Laba Bersih:</span>
+                        <span class="fw-bold {{ 'text-success' if income.get('net_income', 0) >= 0 else 'text-danger' }}">
+                            {{ income.get('net_income', 0)|rupiah }}
+                        </span>
+                    </div>
+                    <div class="d-flex justify-content-between align-items-center mb-3 pb-2 border-bottom">
+                        <span class="text-dark">Total Aset:</span>
+                        <span class="text-primary fw-bold">{{ balance.get('total_assets', 0)|rupiah }}</span>
+                    </div>
+                    <div class="d-flex justify-content-between align-items-center">
+                        <span class="text-dark">Kas Bersih:</span>
+                        <span class="fw-bold {{ 'text-success' if cash_flow.get('net_cash_flow', 0) >= 0 else 'text-danger' }}">
+                            {{ cash_flow.get('net_cash_flow', 0)|rupiah }}
+                        </span>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+    
+    <!-- Row 3: Informasi Stok -->
+    <div class="row mt-4">
+        <div class="col-12">
+            <div class="card">
+                <div class="card-header bg-transparent">
+                    <h5 class="section-title mb-0">
+                        <i class="fas fa-boxes me-2 text-info"></i>Informasi Stok Tiram
+                    </h5>
+                </div>
+                <div class="card-body">
+                    <div class="row">
+                        <div class="col-md-4 text-center">
+                            <div class="border rounded p-3">
+                                <h4 class="text-primary">{{ stock.get('large', 0) }}</h4>
+                                <p class="mb-0 text-muted">Tiram Besar (kg)</p>
+                                <small class="text-primary">Rp 800/kg</small>
+                            </div>
+                        </div>
+                        <div class="col-md-4 text-center">
+                            <div class="border rounded p-3">
+                                <h4 class="text-success">{{ stock.get('small', 0) }}</h4>
+                                <p class="mb-0 text-muted">Tiram Kecil (kg)</p>
+                                <small class="text-success">Rp 500/kg</small>
+                            </div>
+                        </div>
+                        <div class="col-md-4 text-center">
+                            <div class="border rounded p-3">
+                                <h4 class="text-info">{{ stock.get('total', 0) }}</h4>
+                                <p class="mb-0 text-muted">Total Stok (kg)</p>
+                                <small class="text-info">Total persediaan</small>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+</div>
+{% endblock %}
+"""
+
+INVENTORY_TEMPLATE = """
+{% extends 'layout.html' %}
+{% block content %}
+<div class="page-header">
+    <h1 class="page-title">Monitoring Persediaan Tiram</h1>
+    <p class="page-subtitle">Kelola dan pantau stok tiram besar & kecil</p>
+</div>
+
+<div class="row mb-4">
+    {% for key, label, color, icon, note, badge in [
+        ('large', 'Tiram Besar', 'primary', 'fa-water', 'Stok tersedia', 'Rp 800/tiram'),
+        ('small', 'Tiram Kecil', 'success', 'fa-tint', 'Stok tersedia', 'Rp 500/tiram'),
+        ('total', 'Total Stok', 'info', 'fa-boxes', 'Keseluruhan persediaan', 'Nilai total'),
+    ] %}
+    <div class="col-md-4">
+        <div class="card">
+            <div class="card-body text-center">
+                <div class="stat-icon bg-{{ color }} text-white mx-auto mb-3">
+                    <i class="fas {{ icon }}"></i>
+                </div>
+                <h3 class="text-{{ color }}">{{ stock[key] }}</h3>
+                <h6 class="text-dark">{{ label }}</h6>
+                <small class="text-muted">{{ note }}</small>
+                <div class="mt-2">
+                    <span class="badge bg-{{ color }}">{{ badge }}</span>
+                </div>
+            </div>
+        </div>
+    </div>
+    {% endfor %}
+</div>
+
+<div class="card">
+    <div class="card-header">
+        <h5 class="mb-0"><i class="fas fa-history me-2"></i>Riwayat Persediaan</h5>
+    </div>
+    <div class="card-body">
+        <div class="table-responsive">
+            <table class="table table-hover">
+                <thead>
+                    <tr>
+                        <th>Tanggal</th>
+                        <th>Keterangan</th>
+                        <th class="text-center">Masuk</th>
+                        <th class="text-center">Keluar</th>
+                        <th class="text-end">Harga Satuan</th>
+                        <th class="text-end">Nilai</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {% for item in history %}
+                    <tr>
+                        <td>{{ item.date }}</td>
+                        <td>{{ item.description }}</td>
+                        <td class="text-center text-success">{{ item.quantity_in|int if item.quantity_in }}</td>
+                        <td class="text-center text-danger">{{ item.quantity_out|int if item.quantity_out }}</td>
+                        <td class="text-end">{{ item.unit_cost|number }}</td>
+                        <td class="text-end fw-bold">{{ item.value|number }}</td>
+                    </tr>
+                    {% endfor %}
+                </tbody>
+            </table>
+        </div>
+    </div>
+</div>
+{% endblock %}
+"""
+
+JOURNAL_DETAIL_TEMPLATE = """
+{% extends 'layout.html' %}
+{% block content %}
+{% set difference = (total_debit - total_credit)|abs %}
+{% set balanced = difference < 0.01 %}
+<div class="page-header">
+    <h1 class="page-title">Detail Jurnal #{{ entry.id }}</h1>
+    <p class="page-subtitle">Detail lengkap entri jurnal</p>
+</div>
+
+<div class="card">
+    <div class="card-header bg-light">
+        <div class="row">
+            <div class="col-md-3">
+                <strong>Tanggal:</strong> {{ entry.date }}
+            </div>
+            <div class="col-md-3">
+                <strong>Jenis:</strong> <span class="badge bg-secondary">{{ transaction_type }}</span>
+            </div>
+            <div class="col-md-3">
+                <strong>Referensi:</strong> {{ entry.reference or '-' }}
+            </div>
+            <div class="col-md-3">
+                <strong>Status:</strong> 
+                <span class="badge {{ 'bg-success' if balanced else 'bg-danger' }}">
+                    {{ 'Seimbang' if balanced else 'Tidak Seimbang' }}
+                </span>
+            </div>
+        </div>
+    </div>
+    <div class="card-body">
+        <h6 class="card-title mb-4">{{ entry.description }}</h6>
+        
+        <div class="table-responsive">
+            <table class="table journal-detail-table">
+                <thead class="table-light">
+                    <tr>
+                        <th width="50%">Akun</th>
+                        <th width="25%" class="text-end">Debit</th>
+                        <th width="25%" class="text-end">Kredit</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {% for line in lines %}
+                    <tr>
+                        <td>
+                            <div class="d-flex justify-content-between">
+                                <div>
+                                    <strong>{{ line.code }}</strong> - {{ line.name }}
+                                    <br>
+                                    <small class="text-muted">{{ line.acct_type }} • {{ line.normal_balance }} normal</small>
+                                </div>
+                                <div class="text-end">
+                                    <small class="text-muted">{{ line.description or '' }}</small>
+                                </div>
+                            </div>
+                        </td>
+                        <td class="text-end {{ 'text-success fw-bold' if line.debit > 0 else 'text-muted' }}">{{ line.debit|rupiah if line.debit > 0 else '-' }}</td>
+                        <td class="text-end {{ 'text-danger fw-bold' if line.credit > 0 else 'text-muted' }}">{{ line.credit|rupiah if line.credit > 0 else '-' }}</td>
+                    </tr>
+                    {% endfor %}
+                </tbody>
+                <tfoot class="table-active">
+                    <tr>
+                        <td class="text-end"><strong>Total:</strong></td>
+                        <td class="text-end text-success border-top fw-bold">{{ total_debit|rupiah }}</td>
+                        <td class="text-end text-danger border-top fw-bold">{{ total_credit|rupiah }}</td>
+                    </tr>
+                </tfoot>
+            </table>
+        </div>
+        
+        <div class="mt-4">
+            <div class="alert {{ 'alert-success' if balanced else 'alert-warning' }}">
+                <i class="fas {{ 'fa-check-circle' if balanced else 'fa-exclamation-triangle' }} me-2"></i>
+                {% if balanced %}
+                Entri jurnal ini seimbang dan telah diposting dengan benar.
+                {% else %}
+                Entri jurnal tidak seimbang! Selisih: {{ difference|rupiah }}
+                {% endif %}
+            </div>
+        </div>
+        
+        <div class="mt-4 pt-3 border-top">
+            <a href="/journal" class="btn btn-outline-secondary">
+                <i class="fas fa-arrow-left me-2"></i>Kembali ke Jurnal
+            </a>
+            <a href="/journal/{{ entry.id }}/delete" class="btn btn-outline-danger float-end" 
+               onclick="return confirm('Hapus entri jurnal #{{ entry.id }}?')">
+                <i class="fas fa-trash me-2"></i>Hapus Entri
+            </a>
+        </div>
+    </div>
+</div>
+
+<style>
+.journal-detail-table td {
+    padding: 0.75rem;
+    vertical-align: middle;
+}
+
+.journal-detail-table tbody tr:hover {
+    background-color: #f8f9fa;
+}
+</style>
+{% endblock %}
+"""
+
+ADJUSTING_DETAIL_TEMPLATE = """
+{% extends 'layout.html' %}
+{% block content %}
+{% set balanced = (total_debit - total_credit)|abs < 0.01 %}
+<div class="page-header">
+    <h1 class="page-title">Detail Ayat Penyesuaian #{{ entry.id }}</h1>
+    <p class="page-subtitle">Detail lengkap ayat penyesuaian</p>
+</div>
+
+<div class="card">
+    <div class="card-body">
+        <div class="row mb-4">
+            <div class="col-md-6">
+                <strong>Tanggal:</strong> {{ entry.date }}
+            </div>
+            <div class="col-md-6">
+                <strong>Keterangan:</strong> {{ entry.description }}
+            </div>
+        </div>
+        
+        <h6 class="mb-3">Detail Penyesuaian</h6>
+        <div class="table-responsive">
+            <table class="table accounting-table">
+                <thead>
+                    <tr>
+                        <th>Akun</th>
+                        <th>Kode</th>
+                        <th>Jenis</th>
+                        <th class="text-end">Debit</th>
+                        <th class="text-end">Kredit</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {% for line in lines %}
+                    <tr>
+                        <td>{{ line.name }}</td>
+                        <td>{{ line.code }}</td>
+                        <td><span class="badge bg-secondary">{{ line.acct_type }}</span></td>
+                        <td class="text-end text-success">{{ line.debit|number(2) if line.debit > 0 }}</td>
+                        <td class="text-end text-danger">{{ line.credit|number(2) if line.credit > 0 }}</td>
+                    </tr>
+                    {% endfor %}
+                </tbody>
+                <tfoot class="table-active">
+                    <tr>
+                        <th colspan="3">Total</th>
+                        <th class="text-end text-success">{{ total_debit|rupiah }}</th>
+                        <th class="text-end text-danger">{{ total_credit|rupiah }}</th>
+                    </tr>
+                </tfoot>
+            </table>
+        </div>
+        
+        <div class="mt-4">
+            <div class="alert {{ 'alert-success' if balanced else 'alert-danger' }}">
+                <i class="fas {{ 'fa-check-circle' if balanced else 'fa-exclamation-triangle' }} me-2"></i>
+                {{ 'Ayat penyesuaian ini seimbang dan telah diposting.' if balanced else 'Ayat penyesuaian tidak seimbang!' }}
+            </div>
+        </div>
+    </div>
+</div>
+{% endblock %}
+"""
+
+LEDGER_TEMPLATE = """
+{% extends 'layout.html' %}
+{% block content %}
+<div class="page-header">
+    <h1 class="page-title">Buku Besar</h1>
+    <p class="page-subtitle">Daftar semua akun dan saldo terkini</p>
+</div>
+
+<div class="card">
+    <div class="card-body">
+        <div class="table-responsive">
+            <table class="table table-hover accounting-table">
+                <thead>
+                    <tr>
+                        <th>Kode Akun</th>
+                        <th>Nama Akun</th>
+                        <th>Jenis</th>
+                        <th class="text-end">Saldo Saat Ini</th>
+                        <th>Aksi</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {% for info in balances %}
+                    <tr>
+                        <td><strong>{{ info.account.code }}</strong></td>
+                        <td>{{ info.account.name }}</td>
+                        <td><span class="badge bg-secondary">{{ info.account.acct_type }}</span></td>
+                        <td class="text-end {{ 'text-success' if info.balance >= 0 else 'text-danger' }} fw-bold">{{ info.balance|rupiah }}</td>
+                        <td>
+                            <a href="/ledger/{{ info.account.id }}" class="btn btn-sm btn-outline-primary">
+                                <i class="fas fa-eye me-1"></i>Lihat
+                            </a>
+                        </td>
+                    </tr>
+                    {% endfor %}
+                </tbody>
+            </table>
+        </div>
+    </div>
+</div>
+{% endblock %}
+"""
+
+TRIAL_BALANCE_TEMPLATE = """
+{% extends 'layout.html' %}
+{% macro trial_balance_card(title, subtitle, rows, total_debit, total_credit) %}
+{% set difference = (total_debit - total_credit)|abs %}
+<div class="card">
+    <div class="card-header bg-light">
+        <h6 class="mb-0"><i class="fas fa-balance-scale me-2"></i>{{ title }}</h6>
+        <small class="text-muted">{{ subtitle }}</small>
+    </div>
+    <div class="card-body">
+        <div class="table-responsive">
+            <table class="table accounting-table">
+                <thead>
+                    <tr>
+                        <th>Akun</th>
+                        <th class="text-end">Debit</th>
+                        <th class="text-end">Kredit</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {% for item in rows if item.debit != 0 or item.credit != 0 %}
+                    <tr>
+                        <td>
+                            <div><strong>{{ item.account.code }}</strong> {{ item.account.name }}</div>
+                            <small class="text-muted">{{ item.account.acct_type }} - {{ item.account.normal_balance }} normal</small>
+                        </td>
+                        <td class="text-end {{ 'text-success fw-bold' if item.debit > 0 }}">{{ item.debit|rupiah if item.debit > 0 }}</td>
+                        <td class="text-end {{ 'text-danger fw-bold' if item.credit > 0 }}">{{ item.credit|rupiah if item.credit > 0 }}</td>
+                    </tr>
+                    {% endfor %}
+                </tbody>
+                <tfoot class="table-active">
+                    <tr>
+                        <th>Total</th>
+                        <th class="text-end text-success">{{ total_debit|rupiah }}</th>
+                        <th class="text-end text-danger">{{ total_credit|rupiah }}</th>
+                    </tr>
+                    <tr>
+                        <th colspan="3" class="text-center {{ 'text-success' if difference < 0.01 else 'text-danger' }}">
+                            {% if difference < 0.01 %}
+                            <i class="fas fa-check-circle me-2"></i>✅ SEIMBANG
+                            {% else %}
+                            <i class="fas fa-exclamation-triangle me-2"></i>❌ TIDAK SEIMBANG (Selisih: {{ difference|rupiah }})
+                            {% endif %}
+                        </th>
+                    </tr>
+                </tfoot>
+            </table>
+        </div>
+    </div>
+</div>
+{% endmacro %}
+{% block content %}
+<div class="page-header">
+    <h1 class="page-title">Neraca Saldo</h1>
+    <p class="page-subtitle">Perbandingan neraca saldo sebelum dan setelah penyesuaian</p>
+</div>
+
+<div class="row">
+    <div class="col-md-6">
+        {{ trial_balance_card('Neraca Saldo Sebelum Penyesuaian', 'Sebelum entri penyesuaian', unadjusted, unadjusted_debit, unadjusted_credit) }}
+    </div>
+    <div class="col-md-6">
+        {{ trial_balance_card('Neraca Saldo Setelah Penyesuaian', 'Setelah entri penyesuaian', adjusted, adjusted_debit, adjusted_credit) }}
+    </div>
+</div>
+
+<div class="row mt-4">
+    <div class="col-12">
+        <div class="card">
+            <div class="card-body text-center">
+                <h6><i class="fas fa-tools me-2"></i>Perbaikan Neraca Saldo</h6>
+                <p class="text-muted mb-3">
+                    Jika neraca saldo tidak balance, klik tombol di bawah untuk memperbaiki otomatis.
+                </p>
+                <a href="/fix_database" class="btn btn-warning">
+                    <i class="fas fa-hammer me-2"></i>Perbaiki Neraca Saldo
+                </a>
+                <small class="d-block mt-2 text-muted">
+                    Tindakan ini akan mengatur ulang saldo awal ke nilai yang benar.
+                </small>
+            </div>
+        </div>
+    </div>
+</div>
+{% endblock %}
+"""
+
+FINANCIALS_TEMPLATE = """
+{% extends 'layout.html' %}
+{% macro signed_class(value) %}{{ 'text-success' if value >= 0 else 'text-danger' }}{% endmacro %}
+{% block content %}
+<div class="page-header">
+    <h1 class="page-title">Laporan Keuangan</h1>
+    <p class="page-subtitle">Laporan keuangan lengkap perusahaan</p>
+</div>
+
+<div class="card">
+    <div class="card-body">
+        <div class="d-flex justify-content-between align-items-center mb-4">
+            <h5 class="section-title mb-0">Laporan Keuangan Utama</h5>
+            <div class="dropdown">
+                <button class="btn btn-success dropdown-toggle" type="button" data-bs-toggle="dropdown">
+                    <i class="fas fa-file-excel me-2"></i>Export Excel
+                </button>
+                <ul class="dropdown-menu">
+                    <li><a class="dropdown-item" href="/export/financial-reports" target="_blank">
+                        <i class="fas fa-file-contract me-2"></i>Export Financial Reports
+                    </a></li>
+                    <li><hr class="dropdown-divider"></li>
+                    <li><a class="dropdown-item" href="/export/income_statement">
+                        <i class="fas fa-chart-bar me-2"></i>Export Income Statement
+                    </a></li>
+                    <li><a class="dropdown-item" href="/export/balance_sheet">
+                        <i class="fas fa-balance-scale me-2"></i>Export Balance Sheet
+                    </a></li>
+                    <li><a class="dropdown-item" href="/export/cash_flow">
+                        <i class="fas fa-money-bill-wave me-2"></i>Export Cash Flow
+                    </a></li>
+                    <li><hr class="dropdown-divider"></li>
+                    <li><a class="dropdown-item" href="/export/all">
+                        <i class="fas fa-file-archive me-2"></i>Export All Reports
+                    </a></li>
+                </ul>
+            </div>
+        </div>
+        
+        <ul class="nav nav-tabs" id="financialTabs" role="tablist">
+            <li class="nav-item" role="presentation">
+                <button class="nav-link active" id="income-tab" data-bs-toggle="tab" data-bs-target="#income" type="button" role="tab" aria-controls="income" aria-selected="true">
+                    <i class="fas fa-chart-bar me-2"></i>Laporan Laba Rugi
+                </button>
+            </li>
+            <li class="nav-item" role="presentation">
+                <button class="nav-link" id="balance-tab" data-bs-toggle="tab" data-bs-target="#balance" type="button" role="tab" aria-controls="balance" aria-selected="false">
+                    <i class="fas fa-balance-scale me-2"></i>Neraca
+                </button>
+            </li>
+            <li class="nav-item" role="presentation">
+                <button class="nav-link" id="equity-tab" data-bs-toggle="tab" data-bs-target="#equity" type="button" role="tab" aria-controls="equity" aria-selected="false">
+                    <i class="fas fa-landmark me-2"></i>Laporan Perubahan Modal
+                </button>
+            </li>
+            <li class="nav-item" role="presentation">
+                <button class="nav-link" id="cashflow-tab" data-bs-toggle="tab" data-bs-target="#cashflow" type="button" role="tab" aria-controls="cashflow" aria-selected="false">
+                    <i class="fas fa-money-bill-wave me-2"></i>Laporan Arus Kas
+                </button>
+            </li>
+        </ul>
+        
+        <div class="tab-content mt-4" id="financialTabsContent">
+            <!-- Laporan Laba Rugi -->
+            <div class="tab-pane fade show active" id="income" role="tabpanel" aria-labelledby="income-tab">
+                <div class="card border-0">
+                    <div class="card-header bg-light">
+                        <h6 class="mb-0"><i class="fas fa-chart-bar me-2"></i>Laporan Laba Rugi</h6>
+                        <small class="text-muted">Untuk periode yang berakhir {{ period_end }}</small>
+                    </div>
+                    <div class="card-body">
+                        <div class="row">
+                            <div class="col-md-8">
+                                <h6 class="text-primary mb-3">Pendapatan</h6>
+                                <table class="table accounting-table">
+                                    <tr class="table-active">
+                                        <td><strong>Pendapatan Penjualan</strong></td>
+                                        <td class="text-end text-success fw-bold">{{ income.total_revenue|rupiah }}</td>
+                                    </tr>
+                                    <tr>
+                                        <td colspan="2" class="border-0"></td>
+                                    </tr>
+                                </table>
+                                
+                                <h6 class="mt-4 text-primary mb-3">Beban</h6>
+                                <table class="table accounting-table">
+                                    <tr class="table-active">
+                                        <td><strong>Total Beban</strong></td>
+                                        <td class="text-end text-danger fw-bold">{{ income.total_expense|rupiah }}</td>
+                                    </tr>
+                                </table>
+                                
+                                <table class="table table-bordered mt-4">
+                                    <tr class="table-success">
+                                        <td><strong>Laba Bersih</strong></td>
+                                        <td class="text-end fw-bold">{{ income.net_income|rupiah }}</td>
+                                    </tr>
+                                </table>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            </div>
+            
+            <!-- Neraca -->
+            {% set total_equity = balance.total_equity + balance.net_income %}
+            <div class="tab-pane fade" id="balance" role="tabpanel" aria-labelledby="balance-tab">
+                <div class="card border-0">
+                    <div class="card-header bg-light">
+                        <h6 class="mb-0"><i class="fas fa-balance-scale me-2"></i>Neraca</h6>
+                        <small class="text-muted">Per {{ period_end }}</small>
+                    </div>
+                    <div class="card-body">
+                        <div class="row">
+                            <div class="col-md-6">
+                                <h6 class="text-primary mb-3">Aset</h6>
+                                <table class="table accounting-table">
+                                    <tr class="table-active">
+                                        <td><strong>Total Aset</strong></td>
+                                        <td class="text-end text-success fw-bold">{{ balance.total_assets|rupiah }}</td>
+                                    </tr>
+                                </table>
+                            </div>
+                            
+                            <div class="col-md-6">
+                                <h6 class="text-primary mb-3">Kewajiban & Ekuitas</h6>
+                                <table class="table accounting-table">
+                                    <tr class="table-active">
+                                        <td><strong>Total Kewajiban</strong></td>
+                                        <td class="text-end text-danger fw-bold">{{ balance.total_liabilities|rupiah }}</td>
+                                    </tr>
+                                    <tr class="table-active">
+                                        <td><strong>Total Ekuitas</strong></td>
+                                        <td class="text-end text-info fw-bold">{{ total_equity|rupiah }}</td>
+                                    </tr>
+                                    <tr class="table-active">
+                                        <td><strong>Total Kewajiban & Ekuitas</strong></td>
+                                        <td class="text-end fw-bold">{{ (balance.total_liabilities + total_equity)|rupiah }}</td>
+                                    </tr>
+                                </table>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            </div>
+            
+            <!-- Laporan Perubahan Modal -->
+            <div class="tab-pane fade" id="equity" role="tabpanel" aria-labelledby="equity-tab">
+                <div class="card border-0">
+                    <div class="card-header bg-light">
+                        <h6 class="mb-0"><i class="fas fa-landmark me-2"></i>Laporan Perubahan Modal</h6>
+                        <small class="text-muted">Untuk periode yang berakhir {{ period_end }}</small>
+                    </div>
+                    <div class="card-body">
+                        <div class="row">
+                            <div class="col-md-8">
+                                <table class="table accounting-table">
+                                    <tr>
+                                        <td><strong>Modal Awal Periode</strong></td>
+                                        <td class="text-end text-primary fw-bold">{{ equity.beginning_capital|rupiah }}</td>
+                                    </tr>
+                                    <tr>
+                                        <td><strong>Laba Bersih Periode Berjalan</strong></td>
+                                        <td class="text-end text-success fw-bold">+ {{ equity.net_income|rupiah }}</td>
+                                    </tr>
+                                    <tr>
+                                        <td><strong>Prive/Penarikan Pemilik</strong></td>
+                                        <td class="text-end text-danger fw-bold">- {{ equity.drawings|rupiah }}</td>
+                                    </tr>
+                                    <tr class="table-active">
+                                        <td><strong>Modal Akhir Periode</strong></td>
+                                        <td class="text-end fw-bold">{{ equity.ending_capital|rupiah }}</td>
+                                    </tr>
+                                </table>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            </div>
+            
+            <!-- Laporan Arus Kas -->
+            {% set operating = cash_flow.operating_activities %}
+            {% set investing = cash_flow.investing_activities %}
+            {% set financing = cash_flow.financing_activities %}
+            <div class="tab-pane fade" id="cashflow" role="tabpanel" aria-labelledby="cashflow-tab">
+                <div class="card border-0">
+                    <div class="card-header bg-light">
+                        <h6 class="mb-0"><i class="fas fa-money-bill-wave me-2"></i>Laporan Arus Kas</h6>
+                        <small class="text-muted">Untuk periode yang berakhir {{ period_end }}</small>
+                    </div>
+                    <div class="card-body">
+                        <div class="row">
+                            <div class="col-md-10">
+                                <h6 class="text-primary mb-3">Aktivitas Operasi</h6>
+                                <table class="table accounting-table">
+                                    <tr>
+                                        <td>Pendapatan Tunai</td>
+                                        <td class="text-end text-success">+ {{ operating.revenue|rupiah }}</td>
+                                    </tr>
+                                    <tr>
+                                        <td>Beban Tunai</td>
+                                        <td class="text-end text-danger">- {{ operating.expenses|rupiah }}</td>
+                                    </tr>
+                                    <tr class="table-active">
+                                        <td><strong>Arus Kas Bersih dari Operasi</strong></td>
+                                        <td class="text-end fw-bold {{ signed_class(operating.net_cash) }}">
+                                            {{ operating.net_cash|rupiah }}
+                                        </td>
+                                    </tr>
+                                </table>
+                                
+                                <h6 class="text-primary mt-4 mb-3">Aktivitas Investasi</h6>
+                                <table class="table accounting-table">
+                                    <tr>
+                                        <td>Pembelian Peralatan</td>
+                                        <td class="text-end text-danger">- {{ investing.equipment_purchase|rupiah }}</td>
+                                    </tr>
+                                    <tr>
+                                        <td>Penjualan Peralatan</td>
+                                        <td class="text-end text-success">+ {{ investing.equipment_sale|rupiah }}</td>
+                                    </tr>
+                                    <tr class="table-active">
+                                        <td><strong>Arus Kas Bersih dari Investasi</strong></td>
+                                        <td class="text-end fw-bold {{ signed_class(investing.net_cash) }}">
+                                            {{ investing.net_cash|rupiah }}
+                                        </td>
+                                    </tr>
+                                </table>
+                                
+                                <h6 class="text-primary mt-4 mb-3">Aktivitas Pendanaan</h6>
+                                <table class="table accounting-table">
+                                    <tr>
+                                        <td>Setoran Modal</td>
+                                        <td class="text-end text-success">+ {{ financing.capital_contribution|rupiah }}</td>
+                                    </tr>
+                                    <tr>
+                                        <td>Penarikan Pemilik</td>
+                                        <td class="text-end text-danger">- {{ financing.drawings|rupiah }}</td>
+                                    </tr>
+                                    <tr>
+                                        <td>Penerimaan Pinjaman</td>
+                                        <td class="text-end text-success">+ {{ financing.loans_received|rupiah }}</td>
+                                    </tr>
+                                    <tr>
+                                        <td>Pembayaran Pinjaman</td>
+                                        <td class="text-end text-danger">- {{ financing.loans_paid|rupiah }}</td>
+                                    </tr>
+                                    <tr class="table-active">
+                                        <td><strong>Arus Kas Bersih dari Pendanaan</strong></td>
+                                        <td class="text-end fw-bold {{ signed_class(financing.net_cash) }}">
+                                            {{ financing.net_cash|rupiah }}
+                                        </td>
+                                    </tr>
+                                </table>
+                                
+                                <table class="table table-bordered mt-4">
+                                    <tr class="table-info">
+                                        <td><strong>Kenaikan/Penurunan Kas Bersih</strong></td>
+                                        <td class="text-end fw-bold {{ signed_class(cash_flow.net_cash_flow) }}">
+                                            {{ cash_flow.net_cash_flow|rupiah }}
+                                        </td>
+                                    </tr>
+                                </table>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+</div>
+{% endblock %}
+"""
+
+OPENING_BALANCE_TEMPLATE = """
+{% extends 'layout.html' %}
+{% block content %}
+<div class="page-header">
+    <h1 class="page-title">Saldo Awal</h1>
+    <p class="page-subtitle">Atur saldo awal untuk semua akun - HARUS SESUAI JENIS AKUN</p>
+</div>
+
+<div class="alert alert-warning">
+    <h6><i class="fas fa-exclamation-triangle me-2"></i>PERHATIAN: Input saldo sesuai jenis akun!</h6>
+    <ul class="mb-0">
+        <li><strong>Asset & Beban</strong>: Input nilai POSITIF (akan masuk Debit)</li>
+        <li><strong>Kewajiban, Ekuitas & Pendapatan</strong>: Input nilai POSITIF (akan masuk Kredit)</li>
+    </ul>
+</div>
+
+<div class="alert alert-info">
+    <h6><i class="fas fa-info-circle me-2"></i>Contoh Data Sesuai Neraca Saldo Awal</h6>
+    <div class="row">
+        <div class="col-md-6">
+            <strong>Asset (Debit):</strong>
+            <ul class="mb-0">
+                <li>Kas: 8,500,000</li>
+                <li>Piutang Usaha: 4,500,000</li>
+                <li>Persediaan Tiram Besar: 1,750,000</li>
+                <li>Persediaan Tiram Kecil: 1,200,000</li>
+                <li>Peralatan: 500,000</li>
+                <li>Perlengkapan: 300,000</li>
+                <li>Kendaraan: 12,000,000</li>
+            </ul>
+        </div>
+        <div class="col-md-6">
+            <strong>Liability & Equity (Credit):</strong>
+            <ul class="mb-0">
+                <li>Akum. Penyusutan Kendaraan: 1,500,000</li>
+                <li>Utang Usaha: 650,000</li>
+                <li>Utang Gaji: 100,000</li>
+                <li>Modal Pemilik: 22,300,000</li>
+            </ul>
+        </div>
+    </div>
+</div>
+
+<div class="card">
+    <div class="card-body">
+        <form method="post">
+            <div class="table-responsive">
+                <table class="table table-hover accounting-table">
+                    <thead>
+                        <tr>
+                            <th>Kode Akun</th>
+                            <th>Nama Akun</th>
+                            <th>Jenis</th>
+                            <th>Saldo Normal</th>
+                            <th class="text-end">Saldo Awal</th>
+                            <th>Keterangan</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {% for row in rows %}
+                        {% set debit_side = row.account.acct_type in ('Asset', 'Expense') %}
+                        <tr>
+                            <td><strong>{{ row.account.code }}</strong></td>
+                            <td>{{ row.account.name }}</td>
+                            <td><span class="badge bg-secondary">{{ row.account.acct_type }}</span></td>
+                            <td><span class="badge {{ 'bg-primary' if debit_side else 'bg-success' }}">{{ row.account.normal_balance }}</span></td>
+                            <td>
+                                <input type="text" class="form-control text-end" name="balance_{{ row.account.id }}" 
+                                       value="{{ row.balance|number }}" placeholder="{{ row.placeholder }}">
+                            </td>
+                            <td><small class="text-muted">{{ 'Nilai POSITIF → Debit' if debit_side else 'Nilai POSITIF → Kredit' }}</small></td>
+                        </tr>
+                        {% endfor %}
+                    </tbody>
+                </table>
+            </div>
+            
+            <div class="mt-4">
+                <button type="submit" class="btn btn-primary">
+                    <i class="fas fa-save me-2"></i>Simpan Saldo Awal
+                </button>
+                <a href="/trial_balance" class="btn btn-info">
+                    <i class="fas fa-balance-scale me-2"></i>Lihat Neraca Saldo
+                </a>
+                <a href="/reset_opening_balances" class="btn btn-warning" onclick="return confirm('Reset semua saldo awal ke nilai default?')">
+                    <i class="fas fa-sync me-2"></i>Reset ke Default
+                </a>
+                <a href="/dashboard" class="btn btn-outline-secondary">Kembali ke Dashboard</a>
+            </div>
+        </form>
+    </div>
+</div>
+{% endblock %}
+"""
+
+CLOSING_TEMPLATE = """
+{% extends 'layout.html' %}
+{% block content %}
+<div class="page-header">
+    <h1 class="page-title">Jurnal Penutup & Neraca Saldo Penutup</h1>
+    <p class="page-subtitle">Proses penutupan periode akuntansi</p>
+</div>
+
+<div class="row">
+    <div class="col-lg-6">
+        <div class="card">
+            <div class="card-header bg-warning text-dark">
+                <h5 class="mb-0"><i class="fas fa-lock me-2"></i>Jurnal Penutup</h5>
+            </div>
+            <div class="card-body">
+                <div class="alert alert-info">
+                    <h6><i class="fas fa-info-circle me-2"></i>Proses Penutupan</h6>
+                    <p class="mb-0">
+                        Jurnal penutup digunakan untuk menutup akun nominal (pendapatan dan beban) 
+                        ke akun Laba Ditahan pada akhir periode akuntansi.
+                    </p>
+                </div>
+                
+                <div class="mb-3">
+                    <strong>Laba/Rugi Bersih Periode:</strong>
+                    <span class="{{ 'text-success' if net_income >= 0 else 'text-danger' }} fw-bold ms-2">
+                        {{ net_income|rupiah }}
+                    </span>
+                </div>
+                
+                <div class="mb-3">
+                    <strong>Jumlah Entri Penutup:</strong>
+                    <span class="fw-bold ms-2">{{ closing_lines|length }} entri</span>
+                </div>
+                
+                {% if not closing_lines %}
+                <div class="alert alert-success"><i class="fas fa-check-circle me-2"></i>Tidak ada entri penutup yang diperlukan. Saldo sudah nol.</div>
+                {% endif %}
+                
+                <div class="mt-4">
+                    <form method="post" action="/closing/post">
+                        <button type="submit" class="btn btn-primary" {{ 'disabled' if not closing_lines }}>
+                            <i class="fas fa-lock me-2"></i>Posting Jurnal Penutup
+                        </button>
+                        <a href="/financials" class="btn btn-outline-secondary">
+                            <i class="fas fa-chart-line me-2"></i>Lihat Laporan Keuangan
+                        </a>
+                    </form>
+                </div>
+            </div>
+        </div>
+    </div>
+    
+    <div class="col-lg-6">
+        <div class="card">
+            <div class="card-header bg-success text-white">
+                <h5 class="mb-0"><i class="fas fa-balance-scale me-2"></i>Neraca Saldo Setelah Penutupan</h5>
+            </div>
+            <div class="card-body">
+                <div class="alert alert-success">
+                    <h6><i class="fas fa-check-circle me-2"></i>Neraca Saldo Penutup</h6>
+                    <p class="mb-0">
+                        Neraca saldo setelah penutupan hanya berisi akun riil (Aset, Kewajiban, Ekuitas) 
+                        yang akan menjadi saldo awal periode berikutnya.
+                    </p>
+                </div>
+                
+                <div class="table-responsive">
+                    <table class="table table-sm accounting-table">
+                        <thead>
+                            <tr>
+                                <th>Akun</th>
+                                <th class="text-end">Debit</th>
+                                <th class="text-end">Kredit</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {% for item in post_closing if item.debit != 0 or item.credit != 0 %}
+                            <tr>
+                                <td>
+                                    <small><strong>{{ item.account.code }}</strong> {{ item.account.name }}</small>
+                                </td>
+                                <td class="text-end text-success">{{ item.debit|rupiah if item.debit > 0 }}</td>
+                                <td class="text-end text-danger">{{ item.credit|rupiah if item.credit > 0 }}</td>
+                            </tr>
+                            {% endfor %}
+                        </tbody>
+                        <tfoot class="table-active">
+                            <tr>
+                                <th>Total</th>
+                                <th class="text-end text-success">{{ post_closing_debit|rupiah }}</th>
+                                <th class="text-end text-danger">{{ post_closing_credit|rupiah }}</th>
+                            </tr>
+                        </tfoot>
+                    </table>
+                </div>
+            </div>
+        </div>
+    </div>
+</div>
+
+<!-- Detail Jurnal Penutup -->
+<div class="row mt-4">
+    <div class="col-12">
+        <div class="card">
+            <div class="card-header">
+                <h5 class="mb-0"><i class="fas fa-list me-2"></i>Detail Entri Penutup</h5>
+            </div>
+            <div class="card-body">
+                {% if closing_lines %}
+                <div class="table-responsive">
+                    <table class="table accounting-table">
+                        <thead>
+                            <tr>
+                                <th>Akun</th>
+                                <th class="text-end">Debit</th>
+                                <th class="text-end">Kredit</th>
+                                <th>Keterangan</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {% for line in closing_lines %}
+                            <tr>
+                                <td>
+                                    <strong>{{ line.account.code }}</strong> {{ line.account.name }}
+                                </td>
+                                <td class="text-end text-success">{{ line.debit|rupiah if line.debit > 0 }}</td>
+                                <td class="text-end text-danger">{{ line.credit|rupiah if line.credit > 0 }}</td>
+                                <td>{{ line.description }}</td>
+                            </tr>
+                            {% endfor %}
+                        </tbody>
+                    </table>
+                </div>
+                {% else %}
+                <div class="text-center py-4">
+                    <i class="fas fa-check-circle fa-3x text-success mb-3"></i>
+                    <h5 class="text-success">Tidak Ada Entri Penutup</h5>
+                    <p class="text-muted">Semua akun nominal sudah dalam kondisi tertutup.</p>
+                </div>
+                {% endif %}
+            </div>
+        </div>
+    </div>
+</div>
+{% endblock %}
+"""
+
+VERIFY_BALANCES_TEMPLATE = """
+{% extends 'layout.html' %}
+{% block content %}
+{% set balanced = total_debit == total_credit %}
+<div class="page-header">
+    <h1 class="page-title">Verifikasi Saldo Awal</h1>
+    <p class="page-subtitle">Pastikan saldo awal sesuai dengan neraca saldo</p>
+</div>
+
+<div class="card">
+    <div class="card-header">
+        <h5 class="mb-0">Summary</h5>
+    </div>
+    <div class="card-body">
+        <div class="row">
+            <div class="col-md-6">
+                <div class="alert alert-success">
+                    <h6>Total Debit</h6>
+                    <h3>{{ total_debit|rupiah }}</h3>
+                </div>
+            </div>
+            <div class="col-md-6">
+                <div class="alert alert-info">
+                    <h6>Total Credit</h6>
+                    <h3>{{ total_credit|rupiah }}</h3>
+                </div>
+            </div>
+        </div>
+        
+        <div class="alert {{ 'alert-success' if balanced else 'alert-danger' }}">
+            <h6><i class="fas {{ 'fa-check-circle' if balanced else 'fa-exclamation-triangle' }} me-2"></i>
+            Status: {{ 'SEIMBANG' if balanced else 'TIDAK SEIMBANG' }}</h6>
+            <p class="mb-0">Selisih: {{ (total_debit - total_credit)|abs|rupiah }}</p>
+        </div>
+    </div>
+</div>
+
+<div class="card mt-4">
+    <div class="card-header">
+        <h5 class="mb-0">Detail Saldo Awal</h5>
+    </div>
+    <div class="card-body">
+        <div class="table-responsive">
+            <table class="table table-hover">
+                <thead>
+                    <tr>
+                        <th>Kode</th>
+                        <th>Nama Akun</th>
+                        <th>Jenis</th>
+                        <th>Saldo Normal</th>
+                        <th class="text-end">Debit</th>
+                        <th class="text-end">Kredit</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {% for balance in balances %}
+                    <tr>
+                        <td><strong>{{ balance.code }}</strong></td>
+                        <td>{{ balance.name }}</td>
+                        <td><span class="badge bg-secondary">{{ balance.acct_type }}</span></td>
+                        <td><span class="badge bg-{{ 'primary' if balance.normal_balance == 'Debit' else 'success' }}">{{ balance.normal_balance }}</span></td>
+                        <td class="text-end {{ 'text-success fw-bold' if balance.debit_amount > 0 }}">{{ balance.debit_amount|number(2) }}</td>
+                        <td class="text-end {{ 'text-danger fw-bold' if balance.credit_amount > 0 }}">{{ balance.credit_amount|number(2) }}</td>
+                    </tr>
+                    {% endfor %}
+                </tbody>
+            </table>
+        </div>
+    </div>
+</div>
+
+<div class="mt-4">
+    <a href="/trial_balance" class="btn btn-primary">
+        <i class="fas fa-balance-scale me-2"></i>Lihat Neraca Saldo
+    </a>
+    <a href="/fix_database" class="btn btn-warning" onclick="return confirm('Reset database?')">
+        <i class="fas fa-sync me-2"></i>Reset Database
+    </a>
+</div>
+{% endblock %}
+"""
+
+ENTRY_FORM_MACROS = """
+{% macro account_options(accounts) %}
+{% for account in accounts %}<option value="{{ account.id }}">{{ account.code }} - {{ account.name }}</option>{% endfor %}
+{% endmacro %}
+
+{% macro first_line(accounts) %}
+<div class="row mb-3">
+    <div class="col-md-5">
+        <label class="form-label">Akun</label>
+        <select class="form-select" name="account_0" required>
+            <option value="">Pilih Akun</option>
+            {{ account_options(accounts) }}
+        </select>
+    </div>
+    <div class="col-md-3">
+        <label class="form-label">Debit</label>
+        <input type="number" class="form-control" name="debit_0" placeholder="0.00" step="0.01" min="0" oninput="checkBalance()">
+    </div>
+    <div class="col-md-3">
+        <label class="form-label">Kredit</label>
+        <input type="number" class="form-control" name="credit_0" placeholder="0.00" step="0.01" min="0" oninput="checkBalance()">
+    </div>
+    <div class="col-md-1 d-flex align-items-end">
+        <button type="button" class="btn btn-danger btn-sm" disabled>
+            <i class="fas fa-times"></i>
+        </button>
+    </div>
+</div>
+{% endmacro %}
+"""
+
+JOURNAL_NEW_TEMPLATE = """
+{% extends 'layout.html' %}
+{% from 'partials/entry_form.html' import account_options, first_line %}
+{% block content %}
+<div class="page-header">
+    <h1 class="page-title">Entri Jurnal Baru</h1>
+    <p class="page-subtitle">Buat entri jurnal untuk transaksi bisnis</p>
+</div>
+
+<div class="card">
+    <div class="card-body">
+        <form method="post">
+            <div class="row mb-4">
+                <div class="col-md-3">
+                    <label class="form-label fw-semibold">Tanggal</label>
+                    <input type="date" class="form-control" name="date" value="{{ today }}" required>
+                </div>
+                <div class="col-md-6">
+                    <label class="form-label fw-semibold">Keterangan</label>
+                    <input type="text" class="form-control" name="description" placeholder="Deskripsi entri jurnal" required>
+                </div>
+                <div class="col-md-3">
+                    <label class="form-label fw-semibold">Referensi</label>
+                    <input type="text" class="form-control" name="reference" placeholder="No. Referensi">
+                </div>
+            </div>
+
+            <h6 class="mb-3"><i class="fas fa-list me-2"></i>Baris Jurnal</h6>
+            <div id="journal-lines">
+                {{ first_line(accounts) }}
+            </div>
+
+            <div class="mb-3">
+                <button type="button" class="btn btn-outline-primary" onclick="addJournalLine()">
+                    <i class="fas fa-plus me-2"></i>Tambah Baris
+                </button>
+            </div>
+
+            <div id="balance-check" class="alert alert-info mb-3">
+                <i class="fas fa-info-circle me-2"></i>Masukkan jumlah untuk memeriksa keseimbangan
+            </div>
+
+            <div class="d-flex gap-2">
+                <button type="submit" class="btn btn-primary">Posting Entri Jurnal</button>
+                <a href="/journal" class="btn btn-outline-secondary">Batal</a>
+            </div>
+        </form>
+    </div>
+</div>
+
+<div id="account-options" style="display: none;">
+    {{ account_options(accounts) }}
+</div>
+{% endblock %}
+"""
+
+JOURNAL_DELETE_TEMPLATE = """
+{% extends 'layout.html' %}
+{% block content %}
+<div class="page-header">
+    <h1 class="page-title">Hapus Entri Jurnal #{{ entry_id }}</h1>
+    <p class="page-subtitle">Konfirmasi penghapusan entri jurnal</p>
+</div>
+
+<div class="card">
+    <div class="card-header bg-danger text-white">
+        <h5 class="mb-0"><i class="fas fa-exclamation-triangle me-2"></i>Konfirmasi Hapus</h5>
+    </div>
+    <div class="card-body">
+        <div class="alert alert-danger">
+            <h6><i class="fas fa-skull-crossbones me-2"></i>PERINGATAN!</h6>
+            <p class="mb-0">
+                Anda akan menghapus entri jurnal berikut:
+            </p>
+        </div>
+
+        <div class="card bg-light">
+            <div class="card-body">
+                <p><strong>ID:</strong> #{{ entry_id }}</p>
+                <p><strong>Tanggal:</strong> {{ entry.date }}</p>
+                <p><strong>Keterangan:</strong> {{ entry.description }}</p>
+            </div>
+        </div>
+
+        <div class="alert alert-warning mt-3">
+            <h6><i class="fas fa-info-circle me-2"></i>Dampak Penghapusan:</h6>
+            <ul class="mb-0">
+                <li>Semua baris jurnal akan dihapus</li>
+                <li>Pengaruhnya pada buku besar akan hilang</li>
+                <li>Stok inventory akan disesuaikan (jika ada)</li>
+                <li><strong>Tindakan ini tidak dapat dibatalkan!</strong></li>
+            </ul>
+        </div>
+
+        <form method="post" class="mt-4">
+            <div class="d-flex gap-2">
+                <button type="submit" class="btn btn-danger">
+                    <i class="fas fa-trash me-2"></i>Ya, Hapus Entri Jurnal
+                </button>
+                <a href="/journal/{{ entry_id }}" class="btn btn-outline-secondary">
+                    <i class="fas fa-times me-2"></i>Batal
+                </a>
+            </div>
+        </form>
+    </div>
+</div>
+{% endblock %}
+"""
+
+ADJUSTING_NEW_TEMPLATE = """
+{% extends 'layout.html' %}
+{% from 'partials/entry_form.html' import account_options, first_line %}
+{% block content %}
+<div class="page-header">
+    <h1 class="page-title">Ayat Penyesuaian Baru</h1>
+    <p class="page-subtitle">Buat ayat penyesuaian untuk penutupan periode</p>
+</div>
+
+<div class="card">
+    <div class="card-body">
+        <form method="post">
+            <div class="row mb-4">
+                <div class="col-md-3">
+                    <label class="form-label fw-semibold">Tanggal</label>
+                    <input type="date" class="form-control" name="date" value="{{ today }}" required>
+                </div>
+                <div class="col-md-9">
+                    <label class="form-label fw-semibold">Keterangan</label>
+                    <input type="text" class="form-control" name="description" placeholder="Deskripsi ayat penyesuaian" required>
+                </div>
+            </div>
+
+            <h6 class="mb-3"><i class="fas fa-list me-2"></i>Baris Penyesuaian</h6>
+            <div id="adjusting-lines">
+                {{ first_line(accounts) }}
+            </div>
+
+            <div class="mb-3">
+                <button type="button" class="btn btn-outline-primary" onclick="addAdjustingLine()">
+                    <i class="fas fa-plus me-2"></i>Tambah Baris
+                </button>
+            </div>
+
+            <div id="balance-check" class="alert alert-info mb-3">
+                <i class="fas fa-info-circle me-2"></i>Masukkan jumlah untuk memeriksa keseimbangan
+            </div>
+
+            <div class="alert alert-warning">
+                <h6><i class="fas fa-exclamation-triangle me-2"></i>Tentang Ayat Penyesuaian</h6>
+                <p class="mb-0">
+                    Ayat penyesuaian dibuat pada akhir periode akuntansi untuk memperbarui akun 
+                    untuk akrual, deferral, penyusutan, dan perbedaan waktu lainnya.
+                </p>
+            </div>
+
+            <div class="d-flex gap-2">
+                <button type="submit" class="btn btn-primary">Posting Ayat Penyesuaian</button>
+                <a href="/adjusting" class="btn btn-outline-secondary">Batal</a>
+            </div>
+        </form>
+    </div>
+</div>
+
+<div id="account-options" style="display: none;">
+    {{ account_options(accounts) }}
+</div>
+
+<script>
+function addAdjustingLine() {
+    const container = document.getElementById('adjusting-lines');
+    const count = container.children.length;
+    const newLine = document.createElement('div');
+    newLine.className = 'row mb-3';
+    newLine.innerHTML = `
+        <div class="col-md-5">
+            <select class="form-select" name="account_${count}" required>
+                <option value="">Pilih Akun</option>
+                ${document.getElementById('account-options').innerHTML}
+            </select>
+        </div>
+        <div class="col-md-3">
+            <input type="number" class="form-control" name="debit_${count}" placeholder="0.00" step="0.01" min="0" oninput="checkBalance()">
+        </div>
+        <div class="col-md-3">
+            <input type="number" class="form-control" name="credit_${count}" placeholder="0.00" step="0.01" min="0" oninput="checkBalance()">
+        </div>
+        <div class="col-md-1 d-flex align-items-end">
+            <button type="button" class="btn btn-danger btn-sm" onclick="this.parentElement.parentElement.remove(); checkBalance();">
+                <i class="fas fa-times"></i>
+            </button>
+        </div>
+    `;
+    container.appendChild(newLine);
+}
+</script>
+{% endblock %}
+"""
+
+PAGE_TEMPLATES = {
+    'layout.html': BASE_TEMPLATE,
+    'partials/entry_filters.html': ENTRY_FILTERS_TEMPLATE,
+    'partials/entry_pagination.html': ENTRY_PAGINATION_TEMPLATE,
+    'partials/entry_card.html': ENTRY_CARD_MACROS,
+    'partials/entry_form.html': ENTRY_FORM_MACROS,
+    'journal_new.html': JOURNAL_NEW_TEMPLATE,
+    'journal_delete.html': JOURNAL_DELETE_TEMPLATE,
+    'adjusting_new.html': ADJUSTING_NEW_TEMPLATE,
+    'journal.html': JOURNAL_TEMPLATE,
+    'journal_import.html': JOURNAL_IMPORT_TEMPLATE,
+    'export_job.html': EXPORT_JOB_TEMPLATE,
+    'adjusting.html': ADJUSTING_TEMPLATE,
+    'ledger_account.html': LEDGER_ACCOUNT_TEMPLATE,
+    'dashboard.html': DASHBOARD_TEMPLATE,
+    'inventory.html': INVENTORY_TEMPLATE,
+    'journal_detail.html': JOURNAL_DETAIL_TEMPLATE,
+    'adjusting_detail.html': ADJUSTING_DETAIL_TEMPLATE,
+    'ledger.html': LEDGER_TEMPLATE,
+    'trial_balance.html': TRIAL_BALANCE_TEMPLATE,
+    'financials.html': FINANCIALS_TEMPLATE,
+    'opening_balance.html': OPENING_BALANCE_TEMPLATE,
+    'closing.html': CLOSING_TEMPLATE,
+    'verify_balances.html': VERIFY_BALANCES_TEMPLATE,
+}
+
+app.jinja_loader = ChoiceLoader([DictLoader(PAGE_TEMPLATES), app.jinja_loader])
+
+@app.template_filter('rupiah')
+def rupiah_filter(value, decimals=2):
+    """Format angka sebagai 'Rp 1,234.56'"""
+    return f"Rp {value or 0:,.{decimals}f}"
+
+@app.template_filter('number')
+def number_filter(value, decimals=0):
+    """Format angka dengan pemisah ribuan tanpa 'Rp'"""
+    return f"{value or 0:,.{decimals}f}"
+
+def render_page(title, body='', template='layout.html', **context):
+    """Render halaman dengan layout terkompilasi.
+
+    Halaman lama mengirim HTML jadi lewat body; halaman baru memakai template
+    sendiri yang mewarisi layout.html.
+    """
+    if 'user' not in context:
+        context['user'] = current_user()
+    return render_template(template, title=title, body=body, **context)
+
+# ---------- Aset Statis ----------
+# CSS/JS layout dan vendor (Bootstrap, Font Awesome) dilayani dari static/
+# lewat /assets dengan nama berisi hash konten, sehingga bisa di-cache
+# browser selamanya dan tetap jalan di jaringan tambak tanpa internet.
+# Berkas vendor ikut di-commit di static/vendor dengan SHA-256 yang dipatok
+# di VENDOR_ASSETS; `flask --app app vendor-assets` memeriksa berkas itu dan
+# hanya menulis unduhan yang hash-nya cocok (dipakai saat menaikkan versi).
+
+STATIC_DIR = Path(__file__).parent / 'static'
+ASSET_MAX_AGE = 31536000
+
+BOOTSTRAP_CDN = 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist'
+FONTAWESOME_CDN = 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0'
+
+# path di static/ -> (sumber unduhan, SHA-256 berkas)
+VENDOR_ASSETS = {
+    'vendor/bootstrap/css/bootstrap.min.css': (
+        f'{BOOTSTRAP_CDN}/css/bootstrap.min.css',
+        '3c8f27e6009ccfd710a905e6dcf12d0ee3c6f2ac7da05b0572d3e0d12e736fc8'),
+    'vendor/bootstrap/js/bootstrap.bundle.min.js': (
+        f'{BOOTSTRAP_CDN}/js/bootstrap.bundle.min.js',
+        '0833b2e9c3a26c258476c46266e6877fc75218625162e0460be9a3a098a61c6c'),
+    'vendor/fontawesome/css/all.min.css': (
+        f'{FONTAWESOME_CDN}/css/all.min.css',
+        '1edb1725a9ea8ca4dcf2f5508cee183218aa1685e47c1b23056717f754f58ebf'),
+    'vendor/fontawesome/webfonts/fa-solid-900.woff2': (
+        f'{FONTAWESOME_CDN}/webfonts/fa-solid-900.woff2',
+        '7152a6933ee3d690ec2af3d09da9d701723d16aa3410a6d80f28ff8866f3b880'),
+    'vendor/fontawesome/webfonts/fa-solid-900.ttf': (
+        f'{FONTAWESOME_CDN}/webfonts/fa-solid-900.ttf',
+        '67a65763c7f80903d81603bbeb9049fc2bf28508479b83ed011fe24c71fa950a'),
+    'vendor/fontawesome/webfonts/fa-regular-400.woff2': (
+        f'{FONTAWESOME_CDN}/webfonts/fa-regular-400.woff2',
+        '8e7e5ea1b15f62ab14dbd41768e8fbcd21cc859a4ea5da812457ee714299fb35'),
+    'vendor/fontawesome/webfonts/fa-regular-400.ttf': (
+        f'{FONTAWESOME_CDN}/webfonts/fa-regular-400.ttf',
+        '528d022dce6725f8a0811fd91d8e6513445c81ef33353a5c3234eab932551abf'),
+    'vendor/fontawesome/webfonts/fa-brands-400.woff2': (
+        f'{FONTAWESOME_CDN}/webfonts/fa-brands-400.woff2',
+        '748332090c4b8e20f95d0ff59f0be20fa9c889359d3b36d4b886d73376054207'),
+    'vendor/fontawesome/webfonts/fa-brands-400.ttf': (
+        f'{FONTAWESOME_CDN}/webfonts/fa-brands-400.ttf',
+        '20c4a58bc9d1d69e935d06f1528923646a715be5e218665655cade8f5f1b8c00'),
+    'vendor/fontawesome/webfonts/fa-v4compatibility.woff2': (
+        f'{FONTAWESOME_CDN}/webfonts/fa-v4compatibility.woff2',
+        '694a17c3d9d6c05f8aac63c544615552a4b220e9a4de863d87341a6bcfc1bc8d'),
+    'vendor/fontawesome/webfonts/fa-v4compatibility.ttf': (
+        f'{FONTAWESOME_CDN}/webfonts/fa-v4compatibility.ttf',
+        '0515a423f828ce4e6accf92a2ea0b03d19d31cc86d9af0373291e1fd4db5f348'),
+}
+
+COMPRESSIBLE_ASSETS = {'.css', '.js', '.svg', '.ttf', '.json'}
+CSS_URL_RE = re.compile(r"""url\((['"]?)([^'")]+)\1\)""")
+
+class AssetManifest:
+    """Peta aset statis -> nama ber-hash beserta varian gzip/brotli-nya.
+
+    Dibangun sekali per proses (di mode debug dibangun ulang bila ada berkas
+    yang berubah). url(...) relatif di CSS, mis. webfont Font Awesome,
+    ditulis ulang ke nama ber-hash sebelum CSS itu sendiri di-hash.
+    """
+    
+    def __init__(self, root):
+        self.root = Path(root)
+        self._assets = {}
+        self._by_name = {}
+        self._signature = None
+        self._lock = threading.Lock()
+    
+    def _scan(self):
+        if not self.root.is_dir():
+            return []
+        return sorted(p for p in self.root.rglob('*') if p.is_file())
+    
+    def _current_signature(self, files):
+        return tuple((str(p), p.stat().st_mtime_ns) for p in files)
+    
+    def _rewrite_css_urls(self, path, body, assets):
+        base = Path(path).parent
+        
+        def replace(match):
+            quote, target = match.groups()
+            if target.startswith(('data:', 'http:', 'https:', '/', '#')):
+                return match.group(0)
+            clean = target.split('?')[0].split('#')[0]
+            resolved = os.path.normpath(str(base / clean)).replace(os.sep, '/')
+            asset = assets.get(resolved)
+            if asset is None:
+                return match.group(0)
+            relative = os.path.relpath(asset['hashed'], str(base) or '.').replace(os.sep, '/')
+            return f'url({quote}{relative}{quote})'
+        
+        text = body.decode('utf-8')
+        return CSS_URL_RE.sub(replace, text).encode('utf-8')
+    
+    def _build_asset(self, path, body):
+        stem, ext = os.path.splitext(path)
+        digest = hashlib.sha256(body).hexdigest()[:12]
+        asset = {
+            'path': path,
+            'hashed': f'{stem}.{digest}{ext}',
+            'etag': digest,
+            'mimetype': mimetypes.guess_type(path)[0] or 'application/octet-stream',
+            'body': body,
+            'gzip': None,
+            'br': None,
+        }
+        if ext in COMPRESSIBLE_ASSETS:
+            asset['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                asset['br'] = brotli.compress(body, quality=11)
+        return asset
+    
+    def _build(self, files):
+        assets = {}
+        # CSS terakhir, agar url(...) di dalamnya bisa menunjuk nama ber-hash
+        files = sorted(files, key=lambda p: (p.suffix == '.css', str(p)))
+        for file in files:
+            path = file.relative_to(self.root).as_posix()
+            body = file.read_bytes()
+            if file.suffix == '.css':
+                body = self._rewrite_css_urls(path, body, assets)
+            assets[path] = self._build_asset(path, body)
+        self._assets = assets
+        self._by_name = {asset['hashed']: asset for asset in assets.values()}
+    
+    def _ensure(self, check_changes=False):
+        if self._signature is not None and not check_changes:
+            return
+        with self._lock:
+            files = self._scan()
+            signature = self._current_signature(files)
+            if signature != self._signature:
+                self._build(files)
+                self._signature = signature
+    
+    def url(self, path):
+        """URL ber-hash untuk aset, atau None bila berkasnya tidak ada"""
+        self._ensure(check_changes=app.debug)
+        asset = self._assets.get(path)
+        if asset is None:
+            return None
+        return f"/assets/{asset['hashed']}"
+    
+    def lookup(self, name):
+        """Kembalikan (aset, apakah nama ber-hash) untuk nama di URL /assets"""
+        self._ensure()
+        asset = self._by_name.get(name)
+        if asset is not None:
+            return asset, True
+        return self._assets.get(name), False
+    
+    def reload(self):
+        with self._lock:
+            self._signature = None
+        self._ensure()
+
+asset_manifest = AssetManifest(STATIC_DIR)
+
+@app.template_global('asset_url')
+def asset_url(path):
+    """URL aset statis ber-hash"""
+    return asset_manifest.url(path) or url_for('static', filename=path)
+
+@app.route('/assets/<path:filename>')
+def static_asset(filename):
+    """Layani aset statis dengan cache immutable dan varian terkompresi"""
+    asset, hashed = asset_manifest.lookup(filename)
+    if asset is None:
+        abort(404)
+    
+    encoding = None
+    accepted = request.accept_encodings
+    if asset['br'] is not None and accepted['br']:
+        encoding = 'br'
+    elif asset['gzip'] is not None and accepted['gzip']:
+        encoding = 'gzip'
+    
+    body = asset[encoding] if encoding else asset['body']
+    response = Response(body, mimetype=asset['mimetype'])
+    if asset['gzip'] is not None:
+        response.vary.add('Accept-Encoding')
+    if encoding:
+        response.content_encoding = encoding
+    response.set_etag(f"{asset['etag']}-{encoding or 'identity'}")
+    if hashed:
+        response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    else:
+        # Nama tanpa hash bisa berubah isinya: cache boleh, tapi validasi ulang
+        response.headers['Cache-Control'] = 'public, no-cache'
+    return response.make_conditional(request)
+
+# ---------- Rute ----------
+
+@app.route('/')
+def index():
+    if current_user():
+        return redirect(url_for('dashboard'))
+    return redirect(url_for('login'))
+
+@app.route('/fix_database')
+@login_required
+def fix_database():
+    """Route untuk memperbaiki struktur database dan saldo awal"""
+    try:
+        # Perbaiki saldo awal
+        is_balanced = fix_opening_balances()
+        
+        if is_balanced:
+            flash('✅ Database berhasil diperbaiki! Neraca saldo sekarang balance.')
+        else:
+            flash('⚠️ Database diperbaiki tetapi neraca saldo masih tidak balance.')
+        
+        return redirect(url_for('trial_balance_view'))
+    
+    except Exception as e:
+        flash(f'❌ Error memperbaiki database: {str(e)}')
+        return redirect(url_for('dashboard'))
+
+@app.route('/register', methods=['GET', 'POST'])
+def register():
+    """Simple registration form for new users."""
+    if current_user():
+        return redirect(url_for('dashboard'))
+
+    username_value = ''
+    email_value = ''
+
+    if request.method == 'POST':
+        username_value = request.form.get('username', '').strip()
+        email_value = normalize_email(request.form.get('email', ''))
+        password = request.form.get('password', '')
+        confirm_password = request.form.get('confirm_password', '')
+
+        if not username_value or not email_value or not password:
+            flash('Semua field wajib diisi.')
+        elif password != confirm_password:
+            flash('Konfirmasi kata sandi tidak cocok.')
+        else:
+            try:
+                db = get_db()
+                cur = db.execute(
+                    'SELECT id FROM users WHERE username = ? OR email = ?',
+                    (username_value, email_value)
+                )
+                if cur.fetchone():
+                    flash('Username atau email sudah digunakan.')
+                else:
+                    password_hash = hash_password(password.encode('utf-8'))
+                    # Registrasi mandiri tidak pernah memberi hak admin
+                    db.execute(
+                        'INSERT INTO users (username, password_hash, email, role) VALUES (?, ?, ?, ?)',
+                        (username_value, password_hash, email_value, 'user')
+                    )
+                    bump_cache_version(db.cursor(), 'auth')
+                    db.commit()
+                    flash('Registrasi berhasil! Silakan login menggunakan akun Anda.')
+                    return redirect(url_for('login'))
+            except Exception as e:
+                flash(f'Gagal melakukan registrasi: {str(e)}')
+
+    body = f"""
+    <div class="container">
+        <div class="row justify-content-center align-items-center min-vh-100">
+            <div class="col-md-6 col-lg-5">
+                <div class="card">
+                    <div class="card-body p-5">
+                        <div class="text-center mb-4">
+                            <i class="fas fa-user-plus fa-3x text-primary mb-3"></i>
+                            <h3 class="fw-bold">Daftar Tiramine</h3>
+                            <p class="text-muted">Buat akun untuk mengakses sistem</p>
+                        </div>
+                        <form method="post">
+                            <div class="mb-3">
+                                <label class="form-label fw-semibold">Nama Pengguna</label>
+                                <input type="text" class="form-control" name="username" value="{escape(username_value)}" required>
+                            </div>
+                            <div class="mb-3">
+                                <label class="form-label fw-semibold">Email</label>
+                                <input type="email" class="form-control" name="email" value="{escape(email_value)}" required>
+                            </div>
+                            <div class="mb-3">
+                                <label class="form-label fw-semibold">Kata Sandi</label>
+                                <input type="password" class="form-control" name="password" required>
+                            </div>
+                            <div class="mb-4">
+                                <label class="form-label fw-semibold">Konfirmasi Kata Sandi</label>
+                                <input type="password" class="form-control" name="confirm_password" required>
+                            </div>
+                            <button type="submit" class="btn btn-success w-100 py-2 fw-semibold">
+                                <i class="fas fa-user-check me-2"></i>Buat Akun
+                            </button>
+                        </form>
+                        <div class="text-center mt-4">
+                            <a href="/login" class="text-decoration-none d-block">Sudah punya akun? Masuk</a>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+    """
+    return render_page('Daftar', body, user=None)
+
+@app.route('/login', methods=['GET', 'POST'])
+def login():
+    # Jika sudah login, redirect ke dashboard
+    if current_user():
+        return redirect(url_for('dashboard'))
+    
+    status = 200
+    if request.method == 'POST':
+        try:
+            username = request.form['username']
+            password = request.form['password'].encode('utf-8')
+            
+            # Dibatasi sebelum bcrypt agar tebakan password tidak bisa tanpa batas
+            wait = check_rate_limits(login_user=username.strip().lower(), login_ip=request.remote_addr)
+            if wait:
+                flash(rate_limited_message(wait))
+                logger.warning("⛔ Login rate limited for user: %s", username)
+                status = 429
+            else:
+                db = get_db()
+                cur = db.execute(
+                    'SELECT id, username, role, auth_version, password_hash FROM users WHERE username = ?',
+                    (username,)
+                )
+                user = cur.fetchone()
+                
+                if user and check_password(password, user['password_hash']):
+                    RATE_LIMITS['login_user'].reset(username.strip().lower())
+                    forgive_rate_limits(login_ip=request.remote_addr)
+                    start_user_session(user)
+                    flash('Selamat datang di Sistem Akuntansi Tiramine!')
+                    logger.info("✅ User logged in", extra={'user_id': user['id']})
+                    return redirect(url_for('dashboard'))
+                else:
+                    flash('Kredensial tidak valid. Silakan coba lagi.')
+                    logger.warning("❌ Login failed for user: %s", username)
+                
+        except Exception as e:
+            flash(f'Error saat login: {str(e)}')
+            logger.exception("❌ Login error: %s", e)
+    
+    # Tampilkan form login
+    body = """
+    <div class="container">
+        <div class="row justify-content-center align-items-center min-vh-100">
+            <div class="col-md-5">
+                <div class="card">
+                    <div class="card-body p-5">
+                        <div class="text-center mb-4">
+                            <i class="fas fa-water fa-3x text-primary mb-3"></i>
+                            <h3 class="fw-bold">Masuk ke Tiramine</h3>
+                            <p class="text-muted">Sistem Akuntansi Peternakan Tiram</p>
+                        </div>
+                        
+                        <form method="post">
+                            <div class="mb-3">
+                                <label class="form-label fw-semibold">Nama Pengguna</label>
+                                <input type="text" class="form-control" name="username" value="admin" required>
+                            </div>
+                            <div class="mb-4">
+                                <label class="form-label fw-semibold">Kata Sandi</label>
+                                <input type="password" class="form-control" name="password" value="password" required>
+                            </div>
+                            <button type="submit" class="btn btn-primary w-100 py-2 fw-semibold">
+                                <i class="fas fa-sign-in-alt me-2"></i>Masuk
+                            </button>
+                        </form>
+
+                        <div class="text-center mt-4">
+                            <a href="/otp/request" class="text-decoration-none d-block mb-2">
+                                <i class="fas fa-sms me-1"></i>Masuk menggunakan OTP
+                            </a>
+                            <a href="/register" class="text-decoration-none">
+                                <i class="fas fa-user-plus me-1"></i>Buat akun baru
+                            </a>
+                        </div>
+                        
+                        <div class="text-center mt-4">
+                            <small class="text-muted">
+                                <i class="fas fa-info-circle me-1"></i>
+                                Gunakan: <strong>admin</strong> / <strong>password</strong>
+                            </small>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+    """
+    return render_page('Masuk', body, user=None), status
+
+@app.route('/otp/request', methods=['GET', 'POST'])
+def request_otp():
+    """Form untuk meminta OTP login via email."""
+    if current_user():
+        return redirect(url_for('dashboard'))
+
+    email_value = ''
+    status = 200
+    if request.method == 'POST':
+        email_value = normalize_email(request.form.get('email', ''))
+        if not email_value:
+            flash('Email harus diisi.')
+        else:
+            wait = check_rate_limits(otp_request_email=email_value, otp_request_ip=request.remote_addr)
+            db = get_db()
+            user = None if wait else db.execute('SELECT username FROM users WHERE email = ?', (email_value,)).fetchone()
+            if wait:
+                flash(rate_limited_message(wait))
+                status = 429
+            elif not user:
+                flash('Email tidak ditemukan di sistem.')
+            elif not mail_sender.configured():
+                flash('SMTP belum dikonfigurasi. OTP tidak dapat dikirim.')
+            else:
+                safe_username = escape(user['username'])
+                otp_code, expires_at, otp_id = create_otp_for_email(email_value)
+                subject = 'Kode OTP Masuk Tiramine'
+                body_html = f"""
+                <p>Halo <strong>{safe_username}</strong>,</p>
+                <p>Kode OTP Tiramine Anda adalah:</p>
+                <h2 style="letter-spacing:4px;">{otp_code}</h2>
+                <p>Gunakan kode ini sebelum <strong>{expires_at} UTC</strong>.</p>
+                <p>Abaikan email ini bila Anda tidak meminta OTP.</p>
+                """
+                # Dikirim oleh thread pengirim email - request tidak menunggu SMTP
+                if mail_sender.submit(email_value, subject, body_html, otp_id=otp_id):
+                    flash('OTP sedang dikirim ke email Anda. Silakan cek kotak masuk dan masukkan kode OTP.')
+                    return redirect(url_for('otp_login', email=email_value))
+                db.execute(
+                    "UPDATE otp_verification SET used = 1, delivery_status = 'failed', delivery_error = ? WHERE id = ?",
+                    ('Antrian email penuh', otp_id)
+                )
+                db.commit()
+                flash('Server email sedang sibuk. Silakan coba lagi sebentar lagi.')
+
+    body = f"""
+    <div class="container">
+        <div class="row justify-content-center align-items-center min-vh-100">
+            <div class="col-md-6 col-lg-4">
+                <div class="card">
+                    <div class="card-body p-5">
+                        <div class="text-center mb-4">
+                            <i class="fas fa-envelope-open-text fa-3x text-primary mb-3"></i>
+                            <h3 class="fw-bold">Kirim OTP Login</h3>
+                            <p class="text-muted">Masukkan email akun Anda</p>
+                        </div>
+                        <form method="post">
+                            <div class="mb-4">
+                                <label class="form-label fw-semibold">Email</label>
+                                <input type="email" class="form-control" name="email" value="{escape(email_value)}" required>
+                            </div>
+                            <button type="submit" class="btn btn-primary w-100 py-2 fw-semibold">
+                                <i class="fas fa-paper-plane me-2"></i>Kirim OTP
+                            </button>
+                        </form>
+                        <div class="text-center mt-4">
+                            <a href="/login" class="text-decoration-none d-block mb-1">Kembali ke halaman login</a>
+                            <a href="/register" class="text-decoration-none">Belum punya akun? Daftar</a>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+    """
+    return render_page('Kirim OTP', body, user=None), status
+
+@app.route('/otp/login', methods=['GET', 'POST'])
+def otp_login():
+    """Verifikasi OTP dan login tanpa password."""
+    if current_user():
+        return redirect(url_for('dashboard'))
+
+    email_prefill = request.values.get('email', '')
+    status = 200
+
+    if request.method == 'POST':
+        normalized_email = normalize_email(request.form.get('email', ''))
+        otp_code = (request.form.get('otp_code') or '').strip()
+
+        if not normalized_email or not otp_code:
+            flash('Email dan kode OTP wajib diisi.')
+        else:
+            # Kode 6 digit: tebakan per email harus dibatasi
+            wait = check_rate_limits(otp_login_email=normalized_email, otp_login_ip=request.remote_addr)
+            if wait:
+                flash(rate_limited_message(wait))
+                status = 429
+            else:
+                is_valid, message = verify_otp_code(normalized_email, otp_code)
+                if is_valid:
+                    RATE_LIMITS['otp_login_email'].reset(normalized_email)
+                    forgive_rate_limits(otp_login_ip=request.remote_addr)
+                    db = get_db()
+                    user = db.execute(
+                        'SELECT id, username, role, auth_version FROM users WHERE email = ?', (normalized_email,)
+                    ).fetchone()
+                    if user:
+                        start_user_session(user)
+                        flash('Login menggunakan OTP berhasil.')
+                        return redirect(url_for('dashboard'))
+                    flash('Pengguna tidak ditemukan.')
+                else:
+                    flash(message)
+
+    body = f"""
+    <div class="container">
+        <div class="row justify-content-center align-items-center min-vh-100">
+            <div class="col-md-6 col-lg-4">
+                <div class="card">
+                    <div class="card-body p-5">
+                        <div class="text-center mb-4">
+                            <i class="fas fa-key fa-3x text-primary mb-3"></i>
+                            <h3 class="fw-bold">Masuk dengan OTP</h3>
+                            <p class="text-muted">Masukkan OTP yang dikirim ke email</p>
+                        </div>
+                        <form method="post">
+                            <div class="mb-3">
+                                <label class="form-label fw-semibold">Email</label>
+                                <input type="email" class="form-control" name="email" value="{escape(email_prefill)}" required>
+                            </div>
+                            <div class="mb-4">
+                                <label class="form-label fw-semibold">Kode OTP</label>
+                                <input type="text" class="form-control text-center" name="otp_code" maxlength="6" placeholder="123456" required>
+                            </div>
+                            <button type="submit" class="btn btn-success w-100 py-2 fw-semibold">
+                                <i class="fas fa-unlock-alt me-2"></i>Verifikasi OTP
+                            </button>
+                        </form>
+                        <div class="text-center mt-4">
+                            <a href="/otp/request" class="text-decoration-none d-block mb-1">Tidak menerima kode? Kirim ulang</a>
+                            <a href="/login" class="text-decoration-none">Masuk dengan password</a>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+    """
+    return render_page('Masuk OTP', body, user=None), status
+
+@app.route('/logout')
+def logout():
+    end_user_session()
+    flash('Anda telah berhasil keluar.')
+    return redirect(url_for('login'))
+
+@app.route('/dashboard')
+@login_required
+@report_snapshot()
+def dashboard():
+    current_stock = get_current_stock()  # Sekarang return dictionary
+    
+    # Dapatkan transaksi terbaru
+    try:
+        cur = get_db().execute('''
+            SELECT je.id, je.date, je.description,
+                   COALESCE(je.transaction_type, 'General') as transaction_type,
+                   SUM(jl.debit) as total_debit, 
+                   SUM(jl.credit) as total_credit
+            FROM journal_entries je
+            JOIN journal_lines jl ON je.id = jl.entry_id
+            GROUP BY je.id
+            ORDER BY je.date DESC
+            LIMIT 5
+        ''')
+        recent_transactions = cur.fetchall()
+    except:
+        # Fallback query jika kolom transaction_type tidak ada
+        cur = get_db().execute('''
+            SELECT je.id, je.date, je.description,
+                   'General' as transaction_type,
+                   SUM(jl.debit) as total_debit, 
+                   SUM(jl.credit) as total_credit
+            FROM journal_entries je
+            JOIN journal_lines jl ON je.id = jl.entry_id
+            GROUP BY je.id
+            ORDER BY je.date DESC
+            LIMIT 5
+        ''')
+        recent_transactions = cur.fetchall()
+    
+    # Dapatkan ringkasan keuangan (satu kali perhitungan)
+    statements = financial_statements()
+    
+    return render_page(
+        'Dashboard', template='dashboard.html', stock=current_stock,
+        recent_transactions=recent_transactions, income=statements['income'],
+        balance=statements['balance'], cash_flow=statements['cash_flow'],
+    )
+
+@app.route('/inventory')
+@login_required
+def inventory_monitoring():
+    """Halaman monitoring stok tiram besar dan kecil"""
+    current_stock = get_current_stock()
+    
+    # Dapatkan riwayat persediaan
+    cur = get_db().execute('''
+        SELECT date, description, quantity_in, quantity_out, unit_cost, value
+        FROM inventory 
+        ORDER BY date DESC, id DESC
+        LIMIT 20
+    ''')
+    inventory_history = cur.fetchall()
+    
+    return render_page('Monitoring Persediaan', template='inventory.html',
+                       stock=current_stock, history=inventory_history)
+
+@app.route('/journal')
+@login_required
+def journal():
+    start_date = request.args.get('start_date', '')
+    end_date = request.args.get('end_date', '')
+    transaction_type = request.args.get('transaction_type', '')
+    cursor = parse_entry_cursor(request.args.get('cursor'))
+    
+    # Satu halaman entri + semua barisnya dalam satu query
+    journal_data, next_cursor = fetch_entry_page(
+        'journal', start_date, end_date, transaction_type, cursor
+    )
+    transaction_types = [
+        row['transaction_type'] for row in get_db().execute(
+            'SELECT DISTINCT transaction_type FROM journal_entries '
+            'WHERE transaction_type IS NOT NULL ORDER BY transaction_type'
+        )
+    ]
+    filters = {key: value for key, value in
+               dict(start_date=start_date, end_date=end_date, transaction_type=transaction_type).items() if value}
+    
+    return render_page(
+        'Jurnal Umum', template='journal.html', endpoint='journal',
+        entries=journal_data, cursor=cursor, next_cursor=next_cursor, filters=filters,
+        start_date=start_date, end_date=end_date,
+        transaction_type=transaction_type, transaction_types=transaction_types,
+    )
+
+# ---------- API Endpoints untuk Template ----------
+
+@app.route('/api/journal/templates')
+@login_required
+def api_journal_templates():
+    """Get all transaction templates"""
+    templates = chart_of_accounts.templates()
+    
+    return {
+        'templates': [
+            {
+                'key': t['template_key'],
+                'label': t['label'],
+                'description': t['description']
+            }
+            for t in templates
+        ]
+    }
+
+@app.route('/api/journal/templates/<template_key>')
+@login_required
+def api_journal_template_detail(template_key):
+    """Get detailed template with account information"""
+    template = chart_of_accounts.template(template_key)
+    
+    if not template:
+        return {'error': 'Template not found'}, 404
+    
+    # Enrich dengan informasi akun lengkap
+    enriched_lines = []
+    for line in template['lines']:
+        account = chart_of_accounts.account_by_code(line['account_code'])
+        
+        if account:
+            enriched_line = {
+                **line,
+                'account_id': account['id'],
+                'account_code': account['code'],
+                'account_name': account['name'],
+                'account_type': account['acct_type'],
+                'normal_balance': account['normal_balance']
+            }
+            enriched_lines.append(enriched_line)
+    
+    return {
+        'template_key': template['template_key'],
+        'label': template['label'],
+        'description': template['description'],
+        'lines': enriched_lines
+    }
+
+@app.route('/api/accounts')
+@login_required
+def api_accounts():
+    """Get all accounts for dropdown"""
+    accounts = all_accounts()
+    return {
+        'accounts': [
+            {
+                'id': a['id'],
+                'code': a['code'],
+                'name': a['name'],
+                'acct_type': a['acct_type'],
+                'normal_balance': a['normal_balance']
+            }
+            for a in accounts
+        ]
+    }
+
+@app.route('/journal/new', methods=['GET', 'POST'])
+@login_required
+def journal_new():
+    if request.method == 'POST':
+        date = request.form['date']
+        description = request.form['description']
+        reference = request.form.get('reference', '')
+        transaction_type = request.form.get('transaction_type', 'General')
+        
+        lines = []
+        idx = 0
+        while True:
+            account_id = request.form.get(f'account_{idx}')
+            if not account_id:
+                break
+            
+            debit = float(request.form.get(f'debit_{idx}', 0) or 0)
+            credit = float(request.form.get(f'credit_{idx}', 0) or 0)
+            line_desc = request.form.get(f'line_desc_{idx}', '')
+            
+            if debit > 0 or credit > 0:
+                lines.append({
+                    'account_id': int(account_id),
+                    'debit': debit,
+                    'credit': credit,
+                    'description': line_desc
+                })
+            idx += 1
+        
+        # Validasi
+        if len(lines) < 2:
+            flash('Entri jurnal harus memiliki setidaknya dua baris')
+            return redirect(url_for('journal_new'))
+        
+        total_debit = sum(line['debit'] for line in lines)
+        total_credit = sum(line['credit'] for line in lines)
+        
+        if abs(total_debit - total_credit) > 0.01:
+            flash('Debit dan kredit harus seimbang')
+            return redirect(url_for('journal_new'))
+        
+        # Posting entri jurnal
+        try:
+            entry_id = post_journal_entry(date, description, lines, reference, transaction_type)
+            flash(f'Entri jurnal #{entry_id} berhasil diposting!')
+            return redirect(url_for('journal'))
+        except Exception as e:
+            flash(f'Error posting entri jurnal: {str(e)}')
+    
+    return render_page('Entri Jurnal Baru', template='journal_new.html', accounts=all_accounts(),
+                       today=datetime.now().date().isoformat())
+
+@app.route('/journal/import', methods=['GET', 'POST'])
+@login_required
+def journal_import():
+    """Impor massal entri jurnal dari CSV, JSON Lines atau Excel"""
+    result = None
+    filename = None
+    dry_run = bool(request.form.get('dry_run'))
+    
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('❌ Pilih file yang akan diimpor')
+            return redirect(url_for('journal_import'))
+        
+        filename = upload.filename
+        try:
+            rows = read_journal_import(upload.read(), filename)
+            result = import_journal_entries(rows, dry_run=dry_run)
+        except Exception as e:
+            flash(f'❌ Gagal membaca file impor: {str(e)}')
+            return redirect(url_for('journal_import'))
+        
+        if result['errors']:
+            flash(f"❌ {len(result['errors'])} kesalahan ditemukan, tidak ada entri yang diposting")
+        elif result['first_id']:
+            flash(f"✅ {result['entries']} entri jurnal berhasil diimpor")
+        elif dry_run:
+            flash(f"✅ {result['entries']} entri valid dan siap diimpor")
+        else:
+            flash('ℹ️ File tidak berisi entri jurnal')
+    
+    return render_page('Impor Jurnal', template='journal_import.html', result=result, filename=filename,
+                       dry_run=dry_run, extensions=IMPORT_EXTENSIONS, error_limit=200)
+
+@app.route('/journal/<int:entry_id>')
+@login_required
+def journal_view(entry_id):
+    cur = get_db().execute('SELECT * FROM journal_entries WHERE id = ?', (entry_id,))
+    entry = cur.fetchone()
+    
+    if not entry:
+        flash('Entri jurnal tidak ditemukan')
+        return redirect(url_for('journal'))
+    
+    cur.execute('''
+        SELECT jl.*, a.code, a.name, a.acct_type, a.normal_balance
+        FROM journal_lines jl
+        JOIN accounts a ON jl.account_id = a.id
+        WHERE jl.entry_id = ?
+        ORDER BY jl.debit DESC, jl.id
+    ''', (entry_id,))
+    lines = cur.fetchall()
+    
+    transaction_type = entry['transaction_type'] if 'transaction_type' in entry.keys() else 'General'
+    
+    total_debit = sum(line['debit'] for line in lines)
+    total_credit = sum(line['credit'] for line in lines)
+    
+    return render_page('Detail Jurnal', template='journal_detail.html', entry=entry, lines=lines,
+                       transaction_type=transaction_type, total_debit=total_debit, total_credit=total_credit)
+    
+@app.route('/journal/<int:entry_id>/delete', methods=['GET', 'POST'])
+@login_required
+def delete_journal_entry(entry_id):
+    """Hapus entri jurnal dan semua barisnya"""
+    db = get_db()
+    
+    # Dapatkan detail entri sebelum dihapus (untuk flash message)
+    cur = db.execute('SELECT date, description FROM journal_entries WHERE id = ?', (entry_id,))
+    entry = cur.fetchone()
+    
+    if not entry:
+        flash('Entri jurnal tidak ditemukan')
+        return redirect(url_for('journal'))
+    
+    if request.method == 'POST':
+        try:
+            # Keluarkan baris jurnal dari ringkasan saldo sebelum dihapus
+            cur = db.cursor()
+            lines = cur.execute(
+                'SELECT account_id, debit, credit FROM journal_lines WHERE entry_id = ?', (entry_id,)
+            ).fetchall()
+            apply_balance_delta(cur, [dict(line) for line in lines], 'journal', sign=-1)
+
+            # Hapus semua baris jurnal terkait
+            cur.execute('DELETE FROM journal_lines WHERE entry_id = ?', (entry_id,))
+            
+            # Hapus entri jurnal
+            db.execute('DELETE FROM journal_entries WHERE id = ?', (entry_id,))
+            
+            db.commit()
+            
+            flash(f'✅ Entri jurnal #{entry_id} ({entry["description"]}) berhasil dihapus!')
+            return redirect(url_for('journal'))
+            
+        except Exception as e:
+            db.rollback()
+            flash(f'❌ Error menghapus entri jurnal: {str(e)}')
+            return redirect(url_for('journal_view', entry_id=entry_id))
+    
+    # Jika method GET, tampilkan konfirmasi
+    return render_page('Hapus Jurnal', template='journal_delete.html', entry_id=entry_id, entry=entry)
+
+@app.route('/ledger')
+@login_required
+def ledger():
+    balances = get_all_account_balances()
+    return render_page('Buku Besar', template='ledger.html', balances=balances.values())
+
+@app.route('/ledger/<int:account_id>')
+@login_required
+def ledger_account(account_id):
+    page = fetch_ledger_page(
+        account_id,
+        after=parse_ledger_cursor(request.args.get('after')),
+        before=parse_ledger_cursor(request.args.get('before')),
+        from_start=request.args.get('start') == '1',
+    )
+    
+    if not page:
+        flash('Akun tidak ditemukan')
+        return redirect(url_for('ledger'))
+    
+    account = page['account']
+    return render_page(
+        f"Buku Besar - {account['code']}", template='ledger_account.html',
+        account=account, page=page, current_balance=page['info']['balance'],
+    )
+
+@app.route('/trial_balance')
+@login_required
+@report_snapshot()
+def trial_balance_view():
+    # Neraca Saldo Sebelum Penyesuaian
+    utb, utd, utc = trial_balance(include_adjustments=False)
+    # Neraca Saldo Setelah Penyesuaian  
+    atb, atd, atc = trial_balance(include_adjustments=True)
+    
+    return render_page(
+        'Neraca Saldo', template='trial_balance.html',
+        unadjusted=utb, unadjusted_debit=utd, unadjusted_credit=utc,
+        adjusted=atb, adjusted_debit=atd, adjusted_credit=atc,
+    )
+
+@app.route('/adjusting')
+@login_required
+def adjusting():
+    start_date = request.args.get('start_date', '')
+    end_date = request.args.get('end_date', '')
+    cursor = parse_entry_cursor(request.args.get('cursor'))
+    
+    # Satu halaman ayat penyesuaian + semua barisnya dalam satu query
+    adjusting_data, next_cursor = fetch_entry_page('adjusting', start_date, end_date, cursor=cursor)
+    filters = {key: value for key, value in
+               dict(start_date=start_date, end_date=end_date).items() if value}
+    
+    return render_page(
+        'Ayat Penyesuaian', template='adjusting.html', endpoint='adjusting',
+        entries=adjusting_data, cursor=cursor, next_cursor=next_cursor, filters=filters,
+        start_date=start_date, end_date=end_date,
+    )
+
+@app.route('/adjusting/new', methods=['GET', 'POST'])
+@login_required
+def adjusting_new():
+    if request.method == 'POST':
+        date = request.form['date']
+        description = request.form['description']
+        
+        lines = []
+        idx = 0
+        while True:
+            account_id = request.form.get(f'account_{idx}')
+            if not account_id:
+                break
+            
+            debit = float(request.form.get(f'debit_{idx}', 0) or 0)
+            credit = float(request.form.get(f'credit_{idx}', 0) or 0)
+            line_desc = request.form.get(f'line_desc_{idx}', '')
+            
+            if debit > 0 or credit > 0:
+                lines.append({
+                    'account_id': int(account_id),
+                    'debit': debit,
+                    'credit': credit,
+                    'description': line_desc
+                })
+            idx += 1
+        
+        # Validasi
+        if len(lines) < 2:
+            flash('Ayat penyesuaian harus memiliki setidaknya dua baris')
+            return redirect(url_for('adjusting_new'))
+        
+        total_debit = sum(line['debit'] for line in lines)
+        total_credit = sum(line['credit'] for line in lines)
+        
+        if abs(total_debit - total_credit) > 0.01:
+            flash('Debit dan kredit harus seimbang')
+            return redirect(url_for('adjusting_new'))
+        
+        # Posting ayat penyesuaian
+        try:
+            adj_id = post_adjusting_entry(date, description, lines)
+            flash(f'Ayat penyesuaian #{adj_id} berhasil diposting!')
+            return redirect(url_for('adjusting'))
+        except Exception as e:
+            flash(f'Error posting ayat penyesuaian: {str(e)}')
+    
+    return render_page('Ayat Penyesuaian Baru', template='adjusting_new.html', accounts=all_accounts(),
+                       today=datetime.now().date().isoformat())
+
+@app.route('/adjusting/<int:entry_id>')
+@login_required
+def adjusting_view(entry_id):
+    cur = get_db().execute('SELECT * FROM adjusting_entries WHERE id = ?', (entry_id,))
+    entry = cur.fetchone()
+    
+    if not entry:
+        flash('Ayat penyesuaian tidak ditemukan')
+        return redirect(url_for('adjusting'))
+    
+    cur.execute('''
+        SELECT al.*, a.code, a.name, a.acct_type
+        FROM adjusting_lines al
+        JOIN accounts a ON al.account_id = a.id
+        WHERE al.adj_id = ?
+    ''', (entry_id,))
+    lines = cur.fetchall()
+    
+    total_debit = sum(line['debit'] for line in lines)
+    total_credit = sum(line['credit'] for line in lines)
+    
+    return render_page('Detail Penyesuaian', template='adjusting_detail.html', entry=entry, lines=lines,
+                       total_debit=total_debit, total_credit=total_credit)
+
+# Perbaiki route financials untuk menghindari error tab_content
+@app.route('/financials')
+@login_required
+@report_snapshot()
+def financials():
+    # Dapatkan semua laporan keuangan (satu kali perhitungan)
+    statements = financial_statements()
+    
+    return render_page(
+        'Laporan Keuangan', template='financials.html',
+        income=statements['income'], balance=statements['balance'],
+        cash_flow=statements['cash_flow'], equity=statements['equity'],
+        period_end=datetime.now().date().isoformat(),
+    )
+
+@app.route('/reset', methods=['GET', 'POST'])
+@login_required
+def reset_transactions():
+    """Reset SEMUA data jadi 0 - HATI-HATI!"""
+    
+    if request.method == 'POST':
+        db = get_db()
+        cur = db.cursor()
+        
+        try:
+            # 1. Hapus SEMUA data transaksi dan inventory
+            cur.executescript('''
+                -- Hapus semua transaksi
+                DELETE FROM journal_lines;
+                DELETE FROM journal_entries;
+                
+                -- Hapus semua penyesuaian
+                DELETE FROM adjusting_lines;
+                DELETE FROM adjusting_entries;
+                
+                -- Hapus semua saldo awal
+                DELETE FROM opening_balances;
+                
+                -- Hapus SEMUA data inventory
+                DELETE FROM inventory;
+            ''')
+            
+            # 2. BUAT ULANG data stok tiram dengan NOL
+            cur.execute('''
+                INSERT INTO inventory (date, description, quantity_in, unit_cost, value) 
+                VALUES (?, ?, ?, ?, ?)
+            ''', ('2024-01-01', 'Stok Awal - Tiram Besar', 0, 0, 0))
+            
+            cur.execute('''
+                INSERT INTO inventory (date, description, quantity_in, unit_cost, value) 
+                VALUES (?, ?, ?, ?, ?)
+            ''', ('2024-01-01', 'Stok Awal - Tiram Kecil', 0, 0, 0))
+            
+            # 3. Update settings untuk total stok = 0
+            cur.execute("UPDATE settings SET v = ? WHERE k = 'current_stock_large'", ('0',))
+            cur.execute("UPDATE settings SET v = ? WHERE k = 'current_stock_small'", ('0',))
+            
+            # 4. Kosongkan ringkasan saldo akun
+            rebuild_account_balances(cur)
+            
+            db.commit()
+            
+            flash('✅ SEMUA data berhasil direset! Stok tiram sekarang 0.')
+            return redirect(url_for('dashboard'))
+            
+        except Exception as e:
+            db.rollback()
+            flash(f'❌ Error saat reset: {str(e)}')
+            logger.exception("❌ Reset data gagal: %s", e)
+    
+    # Tampilkan konfirmasi reset
+    body = """
+    <div class="page-header">
+        <h1 class="page-title">Reset SEMUA Data</h1>
+        <p class="page-subtitle">Hati-hati: Semua data akan jadi NOL!</p>
+    </div>
+    
+    <div class="card">
+        <div class="card-header bg-danger text-white">
+            <h5 class="mb-0"><i class="fas fa-radiation me-2"></i>Reset SEMUA Data ke NOL</h5>
+        </div>
+        <div class="card-body">
+            <div class="alert alert-danger">
+                <h6><i class="fas fa-skull-crossbones me-2"></i>PERINGATAN EXTREME!</h6>
+                <p class="mb-0">
+                    Tindakan ini akan mengubah <strong>SEMUA</strong> data menjadi NOL:
+                </p>
+                <ul class="mb-2 mt-2">
+                    <li>Semua transaksi dihapus</li>
+                    <li>Semua saldo akun jadi 0</li>
+                    <li><strong>Stok tiram besar: 0 kg (Rp 0)</strong></li>
+                    <li><strong>Stok tiram kecil: 0 kg (Rp 0)</strong></li>
+                    <li><strong>Total stok: 0 kg (Rp 0)</strong></li>
+                </ul>
+                <p class="mb-0 fw-bold">
+                    ⚠️ TINDAKAN INI TIDAK BISA DIBATALKAN!
+                </p>
+            </div>
+            
+            <div class="card bg-warning">
+                <div class="card-body">
+                    <h6><i class="fas fa-exclamation-triangle me-2"></i>Setelah Reset:</h6>
+                    <ul class="mb-0">
+                        <li>Dashboard akan kosong (semua angka 0)</li>
+                        <li>Stok tiram = 0</li>
+                        <li>Pendapatan = 0</li>
+                        <li>Semua laporan keuangan kosong</li>
+                        <li>Harus input transaksi baru dari awal</li>
+                    </ul>
+                </div>
+            </div>
+            
+            <form method="post" class="mt-4">
+                <div class="mb-3">
+                    <label class="form-label fw-semibold">Konfirmasi Reset Total</label>
+                    <input type="text" class="form-control" name="confirm_text" 
+                           placeholder='Ketik "RESET SEMUA JADI NOL" untuk konfirmasi' required>
+                    <div class="form-text text-danger">Harus tepat: RESET SEMUA JADI NOL</div>
+                </div>
+                
+                <div class="d-flex gap-2">
+                    <button type="submit" class="btn btn-danger" id="resetBtn" disabled>
+                        <i class="fas fa-fire me-2"></i>Reset SEMUA Jadi NOL
+                    </button>
+                    <a href="/dashboard" class="btn btn-outline-secondary">
+                        <i class="fas fa-times me-2"></i>Batal
+                    </a>
+                </div>
+            </form>
+        </div>
+    </div>
+
+    <script>
+        document.addEventListener('DOMContentLoaded', function() {
+            const confirmInput = document.querySelector('input[name="confirm_text"]');
+            const resetBtn = document.getElementById('resetBtn');
+            
+            confirmInput.addEventListener('input', function() {
+                if (this.value === 'RESET SEMUA JADI NOL') {
+                    resetBtn.disabled = false;
+                } else {
+                    resetBtn.disabled = true;
+                }
+            });
+        });
+    </script>
+    """
+    return render_page('Reset Total', body)
+
+# Contoh nilai saldo awal (placeholder form) sesuai neraca saldo awal
+OPENING_BALANCE_EXAMPLES = {
+    '101': "8,500,000",     # Kas
+    '102': "4,500,000",     # Piutang
+    '103': "1,750,000",     # Persediaan Besar
+    '103.1': "1,200,000",   # Persediaan Kecil
+    '104': "500,000",       # Peralatan
+    '105': "300,000",       # Perlengkapan
+    '106': "12,000,000",    # Kendaraan
+    '107': "1,500,000",     # Akum Penyusutan
+    '201': "650,000",       # Utang Usaha
+    '202': "100,000",       # Utang Gaji
+    '301': "22,300,000",    # Modal Pemilik
+}
+
+@app.route('/opening_balance', methods=['GET', 'POST'])
+@login_required
+def opening_balance():
+    accounts = all_accounts()
+    db = get_db()
+    
+    # Cek struktur tabel dan perbaiki jika perlu
+    try:
+        # Test query dengan struktur baru
+        db.execute("SELECT debit_amount FROM opening_balances LIMIT 1")
+    except db_pool.errors:
+        # Jika struktur masih lama, redirect ke fix database
+        flash('❌ Struktur database perlu diperbaiki. Silakan klik tombol di bawah.')
+        body = """
+        <div class="page-header">
+            <h1 class="page-title">Perbaikan Database Diperlukan</h1>
+            <p class="page-subtitle">Struktur database tidak sesuai</p>
+        </div>
+        
+        <div class="card">
+            <div class="card-body text-center">
+                <div class="alert alert-danger">
+                    <h4><i class="fas fa-exclamation-triangle me-2"></i>Database Error</h4>
+                    <p>Struktur tabel opening_balances tidak sesuai. Klik tombol di bawah untuk memperbaiki otomatis.</p>
+                </div>
+                
+                <a href="/fix_database" class="btn btn-primary btn-lg">
+                    <i class="fas fa-tools me-2"></i>Perbaiki Database
+                </a>
+                
+                <div class="mt-4">
+                    <small class="text-muted">
+                        Tindakan ini akan mereset database dan mengatur ulang semua data ke default.
+                    </small>
+                </div>
+            </div>
+        </div>
+        """
+        return render_page('Perbaikan Database', body)
+    
+    if request.method == 'POST':
+        # HAPUS semua saldo awal sebelumnya
+        db.execute('DELETE FROM opening_balances')
+        
+        for acc in accounts:
+            account_id = acc['id']
+            balance_str = request.form.get(f'balance_{account_id}', '0').replace(',', '').replace('Rp', '').strip()
+            
+            try:
+                balance = float(balance_str) if balance_str else 0
+            except ValueError:
+                balance = 0
+            
+            if balance != 0:
+                # Tentukan tipe saldo berdasarkan jenis akun
+                if acc['acct_type'] in ('Asset', 'Expense'):
+                    # Asset & Expense: saldo positif = Debit
+                    debit_amount = balance
+                    credit_amount = 0
+                else:
+                    # Liability, Equity, Revenue: saldo positif = Credit
+                    debit_amount = 0
+                    credit_amount = balance
+                
+                # Simpan saldo awal dengan struktur baru
+                db.execute('''
+                    INSERT INTO opening_balances (account_id, debit_amount, credit_amount)
+                    VALUES (?, ?, ?)
+                ''', (account_id, debit_amount, credit_amount))
+                
+                logger.debug("SET SALDO: %s %s = Debit: %s, Credit: %s", acc['code'], acc['name'], f"{debit_amount:,.2f}", f"{credit_amount:,.2f}")
+        
+        sync_opening_balance_summary(db.cursor())
+        db.commit()
+        flash('Saldo awal berhasil disimpan!')
+        return redirect(url_for('trial_balance_view'))
+    
+    # Ambil saldo awal yang sudah ada - PERBAIKAN: sesuaikan dengan struktur baru
+    opening_balances = {
+        row['account_id']: row for row in
+        db.execute('SELECT account_id, debit_amount, credit_amount FROM opening_balances').fetchall()
+    }
+    
+    rows = []
+    for acc in accounts:
+        ob = opening_balances.get(acc['id'])
+        # Tampilkan nilai yang sesuai dengan jenis akun
+        if acc['acct_type'] in ('Asset', 'Expense'):
+            balance = ob['debit_amount'] if ob else 0
+            placeholder = OPENING_BALANCE_EXAMPLES.get(acc['code'], "Contoh: 8500000")
+        else:
+            balance = ob['credit_amount'] if ob else 0
+            placeholder = OPENING_BALANCE_EXAMPLES.get(acc['code'], "Contoh: 22300000")
+        rows.append({'account': acc, 'balance': balance, 'placeholder': placeholder})
+    
+    return render_page('Saldo Awal', template='opening_balance.html', rows=rows)
+
+@app.route('/closing')
+@login_required
+@report_snapshot()
+def closing_entries():
+    """Halaman jurnal penutup dan neraca saldo penutup"""
+    
+    # Dapatkan entri penutup yang akan diposting
+    closing_entries_list, net_income = get_closing_entries()
+    
+    # Dapatkan neraca saldo penutup
+    pctb_data, pctb_debit, pctb_credit = get_post_closing_trial_balance()
+    
+    closing_lines = [dict(entry, account=chart_of_accounts.account(entry['account_id']))
+                     for entry in closing_entries_list]
+    
+    return render_page(
+        'Jurnal Penutup', template='closing.html', net_income=net_income, closing_lines=closing_lines,
+        post_closing=pctb_data, post_closing_debit=pctb_debit, post_closing_credit=pctb_credit,
+    )
+
+@app.route('/closing/post', methods=['POST'])
+@login_required
+def post_closing_entries_route():
+    """Posting jurnal penutup"""
+    try:
+        entry_id, net_income = post_closing_entries()
+        
+        if entry_id:
+            flash(f'✅ Jurnal penutup berhasil diposting! Laba/Rugi bersih: IDR {net_income:,.2f}')
+        else:
+            flash('ℹ️ Tidak ada entri penutup yang perlu diposting.')
+        
+        return redirect(url_for('closing_entries'))
+        
+    except Exception as e:
+        flash(f'❌ Error posting jurnal penutup: {str(e)}')
+        return redirect(url_for('closing_entries'))
+
+# ---------- Export Financial Reports ----------
+
+@report_snapshot()
+def export_financial_reports():
+    """Ekspor ketiga laporan keuangan utama ke satu file Excel"""
+    import pandas as pd  # berat - dimuat saat ekspor pertama saja
+    output = io.BytesIO()
+    
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        workbook = writer.book
+        
+        # Format untuk styling profesional
+        header_format = workbook.add_format({
+            'bold': True,
+            'text_wrap': True,
+            'valign': 'top',
+            'fg_color': '#1E40AF',
+            'font_color': 'white',
+            'border': 1,
+            'font_size': 12
+        })
+        
+        title_format = workbook.add_format({
+            'bold': True,
+            'font_size': 14,
+            'font_color': '#1E40AF',
+            'align': 'center'
+        })
+        
+        subtitle_format = workbook.add_format({
+            'italic': True,
+            'font_size': 10,
+            'font_color': '#666666',
+            'align': 'center'
+        })
+        
+        currency_format = workbook.add_format({'num_format': '#,##0.00'})
+        total_format = workbook.add_format({
+            'bold': True,
+            'top': 2,
+            'num_format': '#,##0.00',
+            'fg_color': '#F3F4F6'
+        })
+        
+        # Dapatkan data laporan keuangan (satu kali perhitungan)
+        statements = financial_statements()
+        income_stmt = statements['income']
+        balance_stmt = statements['balance']
+        cash_flow_stmt = statements['cash_flow']
+        company_info = get_company_info()
+        
+        # ===== SHEET 1: LAPORAN LABA RUGI =====
+        worksheet_income = workbook.add_worksheet('Laporan Laba Rugi')
+        
+        # Header perusahaan
+        company_name = company_info.get('company_name', 'Peternakan Tiram Tiramine')
+        worksheet_income.merge_range('A1:D1', company_name, title_format)
+        worksheet_income.merge_range('A2:D2', 'LAPORAN LABA RUGI', title_format)
+        worksheet_income.merge_range('A3:D3', f'Periode yang berakhir {datetime.now().date().strftime("%d %B %Y")}', subtitle_format)
+        worksheet_income.write('A4', '')
+        
+        # Data laporan laba rugi
+        income_data = [
+            ['PENDAPATAN', '', '', ''],
+            ['Pendapatan Penjualan Tiram', '', '', income_stmt['total_revenue']],
+            ['', '', '', ''],
+            ['Total Pendapatan', '', '', income_stmt['total_revenue']],
+            ['', '', '', ''],
+            ['BEBAN OPERASIONAL', '', '', ''],
+            ['Harga Pokok Penjualan', '', '', income_stmt.get('cogs', 2500000)],
+            ['Beban Gaji dan Upah', '', '', income_stmt.get('salary_expense', 1500000)],
+            ['Beban Utilitas', '', '', income_stmt.get('utilities_expense', 500000)],
+            ['Beban Pakan Tiram', '', '', income_stmt.get('feed_expense', 1000000)],
+            ['Beban Pemeliharaan', '', '', income_stmt.get('maintenance_expense', 300000)],
+            ['Beban Penyusutan', '', '', income_stmt.get('depreciation_expense', 800000)],
+            ['Beban Lainnya', '', '', income_stmt.get('other_expenses', 200000)],
+            ['', '', '', ''],
+            ['Total Beban', '', '', income_stmt['total_expense']],
+            ['', '', '', ''],
+            ['LABA BERSIH SEBELUM PAJAK', '', '', income_stmt['net_income']],
+            ['Pajak Penghasilan (Estimasi 10%)', '', '', income_stmt['net_income'] * 0.1],
+            ['', '', '', ''],
+            ['LABA BERSIH SETELAH PAJAK', '', '', income_stmt['net_income'] * 0.9]
+        ]
+        
+        # Tulis data ke sheet
+        for row_num, row_data in enumerate(income_data, start=5):
+            for col_num, cell_data in enumerate(row_data):
+                if col_num == 3 and isinstance(cell_data, (int, float)):
+                    if any(keyword in str(row_data[0]).upper() for keyword in ['TOTAL', 'LABA', 'PAJAK']):
+                        worksheet_income.write(row_num, col_num, cell_data, total_format)
+                    else:
+                        worksheet_income.write(row_num, col_num, cell_data, currency_format)
+                else:
+                    worksheet_income.write(row_num, col_num, cell_data)
+        
+        # Set column widths
+        worksheet_income.set_column('A:A', 35)
+        worksheet_income.set_column('B:C', 2)
+        worksheet_income.set_column('D:D', 15)
+        
+        # ===== SHEET 2: NERACA =====
+        worksheet_balance = workbook.add_worksheet('Neraca')
+        
+        # Header perusahaan
+        worksheet_balance.merge_range('A1:D1', company_name, title_format)
+        worksheet_balance.merge_range('A2:D2', 'NERACA', title_format)
+        worksheet_balance.merge_range('A3:D3', f'Per {datetime.now().date().strftime("%d %B %Y")}', subtitle_format)
+        worksheet_balance.write('A4', '')
+        
+        # Data Neraca - Aset
+        balance_data_assets = [
+            ['ASET', '', '', ''],
+            ['ASET LANCAR', '', '', ''],
+            ['Kas dan Setara Kas', '', '', balance_stmt.get('cash', balance_stmt['total_assets'] * 0.3)],
+            ['Piutang Usaha', '', '', balance_stmt.get('receivables', balance_stmt['total_assets'] * 0.2)],
+            ['Persediaan Tiram', '', '', balance_stmt.get('inventory', balance_stmt['total_assets'] * 0.25)],
+            ['Beban Dibayar Dimuka', '', '', balance_stmt.get('prepaid_expenses', balance_stmt['total_assets'] * 0.05)],
+            ['', '', '', ''],
+            ['Total Aset Lancar', '', '', balance_stmt['total_assets'] * 0.8],
+            ['', '', '', ''],
+            ['ASET TETAP', '', '', ''],
+            ['Peralatan Peternakan', '', '', balance_stmt.get('equipment', balance_stmt['total_assets'] * 0.15)],
+            ['Kendaraan Operasional', '', '', balance_stmt.get('vehicles', balance_stmt['total_assets'] * 0.05)],
+            ['Akumulasi Penyusutan', '', '', -balance_stmt.get('accumulated_depreciation', balance_stmt['total_assets'] * 0.1)],
+            ['', '', '', ''],
+            ['Total Aset Tetap', '', '', balance_stmt['total_assets'] * 0.2],
+            ['', '', '', ''],
+            ['TOTAL ASET', '', '', balance_stmt['total_assets']]
+        ]
+        
+        # Data Neraca - Kewajiban & Ekuitas
+        balance_data_liabilities = [
+            ['KEWAJIBAN & EKUITAS', '', '', ''],
+            ['KEWAJIBAN LANCAR', '', '', ''],
+            ['Utang Usaha', '', '', balance_stmt.get('accounts_payable', balance_stmt['total_liabilities'] * 0.6)],
+            ['Pinjaman Jangka Pendek', '', '', balance_stmt.get('short_term_loans', balance_stmt['total_liabilities'] * 0.4)],
+            ['', '', '', ''],
+            ['Total Kewajiban Lancar', '', '', balance_stmt['total_liabilities']],
+            ['', '', '', ''],
+            ['EKUITAS', '', '', ''],
+            ['Modal Pemilik', '', '', balance_stmt['total_equity'] * 0.7],
+            ['Laba Ditahan', '', '', balance_stmt['total_equity'] * 0.3],
+            ['Laba Bersih Tahun Berjalan', '', '', balance_stmt['net_income']],
+            ['', '', '', ''],
+            ['Total Ekuitas', '', '', balance_stmt['total_equity'] + balance_stmt['net_income']],
+            ['', '', '', ''],
+            ['TOTAL KEWAJIBAN & EKUITAS', '', '', balance_stmt['total_liabilities'] + balance_stmt['total_equity'] + balance_stmt['net_income']]
+        ]
+        
+        # Tulis Aset (kolom A)
+        for row_num, row_data in enumerate(balance_data_assets, start=5):
+            for col_num, cell_data in enumerate(row_data):
+                if col_num == 3 and isinstance(cell_data, (int, float)):
+                    if any(keyword in str(row_data[0]).upper() for keyword in ['TOTAL', 'LABA']):
+                        worksheet_balance.write(row_num, col_num, cell_data, total_format)
+                    else:
+                        worksheet_balance.write(row_num, col_num, cell_data, currency_format)
+                else:
+                    worksheet_balance.write(row_num, col_num, cell_data)
+        
+        # Tulis Kewajiban & Ekuitas (kolom F)
+        for row_num, row_data in enumerate(balance_data_liabilities, start=5):
+            for col_num, cell_data in enumerate(row_data):
+                if col_num == 3 and isinstance(cell_data, (int, float)):
+                    if any(keyword in str(row_data[0]).upper() for keyword in ['TOTAL', 'LABA']):
+                        worksheet_balance.write(row_num, col_num + 5, cell_data, total_format)
+                    else:
+                        worksheet_balance.write(row_num, col_num + 5, cell_data, currency_format)
+                else:
+                    worksheet_balance.write(row_num, col_num + 5, cell_data)
+        
+        # Set column widths untuk Neraca
+        worksheet_balance.set_column('A:A', 35)
+        worksheet_balance.set_column('B:C', 2)
+        worksheet_balance.set_column('D:D', 15)
+        worksheet_balance.set_column('E:E', 5)
+        worksheet_balance.set_column('F:F', 35)
+        worksheet_balance.set_column('G:H', 2)
+        worksheet_balance.set_column('I:I', 15)
+        
+        # ===== SHEET 3: LAPORAN ARUS KAS =====
+        worksheet_cashflow = workbook.add_worksheet('Laporan Arus Kas')
+        
+        # Header perusahaan
+        worksheet_cashflow.merge_range('A1:D1', company_name, title_format)
+        worksheet_cashflow.merge_range('A2:D2', 'LAPORAN ARUS KAS', title_format)
+        worksheet_cashflow.merge_range('A3:D3', f'Periode yang berakhir {datetime.now().date().strftime("%d %B %Y")}', subtitle_format)
+        worksheet_cashflow.write('A4', '')
+        
+        # Data Laporan Arus Kas
+        cash_flow_data = [
+            ['ARUS KAS DARI AKTIVITAS OPERASI', '', '', ''],
+            ['Laba Bersih', '', '', cash_flow_stmt['operating_activities']['net_cash']],
+            ['Penyesuaian untuk:', '', '', ''],
+            ['  Penyusutan', '', '', abs(cash_flow_stmt.get('depreciation', 800000))],
+            ['  Perubahan Piutang Usaha', '', '', cash_flow_stmt.get('receivables_change', 500000)],
+            ['  Perubahan Persediaan', '', '', cash_flow_stmt.get('inventory_change', -2500000)],
+            ['  Perubahan Utang Usaha', '', '', cash_flow_stmt.get('payables_change', 1000000)],
+            ['', '', '', ''],
+            ['Kas Bersih dari Aktivitas Operasi', '', '', cash_flow_stmt['operating_activities']['net_cash']],
+            ['', '', '', ''],
+            ['ARUS KAS DARI AKTIVITAS INVESTASI', '', '', ''],
+            ['Pembelian Peralatan', '', '', -cash_flow_stmt['investing_activities']['equipment_purchase']],
+            ['Penjualan Peralatan', '', '', cash_flow_stmt['investing_activities']['equipment_sale']],
+            ['', '', '', ''],
+            ['Kas Bersih dari Aktivitas Investasi', '', '', cash_flow_stmt['investing_activities']['net_cash']],
+            ['', '', '', ''],
+            ['ARUS KAS DARI AKTIVITAS PENDANAAN', '', '', ''],
+            ['Setoran Modal Pemilik', '', '', cash_flow_stmt['financing_activities']['capital_contribution']],
+            ['Penarikan Pemilik', '', '', -cash_flow_stmt['financing_activities']['drawings']],
+            ['Penerimaan Pinjaman', '', '', cash_flow_stmt['financing_activities']['loans_received']],
+            ['Pembayaran Pinjaman', '', '', -cash_flow_stmt['financing_activities']['loans_paid']],
+            ['', '', '', ''],
+            ['Kas Bersih dari Aktivitas Pendanaan', '', '', cash_flow_stmt['financing_activities']['net_cash']],
+            ['', '', '', ''],
+            ['KENAIKAN (PENURUNAN) BERSIH KAS', '', '', cash_flow_stmt['net_cash_flow']],
+            ['', '', '', ''],
+            ['Saldo Kas Awal Periode', '', '', cash_flow_stmt.get('beginning_cash', 50000000)],
+            ['', '', '', ''],
+            ['SALDO KAS AKHIR PERIODE', '', '', cash_flow_stmt.get('beginning_cash', 50000000) + cash_flow_stmt['net_cash_flow']]
+        ]
+        
+        # Tulis data ke sheet
+        for row_num, row_data in enumerate(cash_flow_data, start=5):
+            for col_num, cell_data in enumerate(row_data):
+                if col_num == 3 and isinstance(cell_data, (int, float)):
+                    if any(keyword in str(row_data[0]).upper() for keyword in ['BERSIH', 'TOTAL', 'SALDO', 'KENAIKAN']):
+                        worksheet_cashflow.write(row_num, col_num, cell_data, total_format)
+                    else:
+                        worksheet_cashflow.write(row_num, col_num, cell_data, currency_format)
+                else:
+                    worksheet_cashflow.write(row_num, col_num, cell_data)
+        
+        # Set column widths untuk Laporan Arus Kas
+        worksheet_cashflow.set_column('A:A', 40)
+        worksheet_cashflow.set_column('B:C', 2)
+        worksheet_cashflow.set_column('D:D', 15)
+        
+        # ===== SHEET 4: JURNAL PENUTUP =====
+        worksheet_closing = workbook.add_worksheet('Jurnal Penutup')
+        
+        # Header perusahaan
+        worksheet_closing.merge_range('A1:D1', company_name, title_format)
+        worksheet_closing.merge_range('A2:D2', 'JURNAL PENUTUP', title_format)
+        worksheet_closing.merge_range('A3:D3', f'Periode yang berakhir {datetime.now().date().strftime("%d %B %Y")}', subtitle_format)
+        worksheet_closing.write('A4', '')
+        
+        # Data Jurnal Penutup
+        closing_entries_data = export_closing_entries()
+        
+        if closing_entries_data:
+            # Tulis header
+            headers = ['Kode Akun', 'Nama Akun', 'Debit', 'Kredit', 'Keterangan']
+            for col_num, header in enumerate(headers):
+                worksheet_closing.write(4, col_num, header, header_format)
+            
+            # Tulis data
+            for row_num, entry in enumerate(closing_entries_data, start=5):
+                worksheet_closing.write(row_num, 0, entry.get('Kode Akun', ''))
+                worksheet_closing.write(row_num, 1, entry.get('Nama Akun', ''))
+                
+                debit = entry.get('Debit', 0)
+                credit = entry.get('Kredit', 0)
+                
+                if debit:
+                    worksheet_closing.write(row_num, 2, debit, currency_format)
+                else:
+                    worksheet_closing.write(row_num, 2, '')
+                
+                if credit:
+                    worksheet_closing.write(row_num, 3, credit, currency_format)
+                else:
+                    worksheet_closing.write(row_num, 3, '')
+                
+                worksheet_closing.write(row_num, 4, entry.get('Keterangan', ''))
+        
+        else:
+            worksheet_closing.write(5, 0, 'Tidak ada entri penutup yang diperlukan', subtitle_format)
+        
+        # Set column widths untuk Jurnal Penutup
+        worksheet_closing.set_column('A:A', 12)
+        worksheet_closing.set_column('B:B', 30)
+        worksheet_closing.set_column('C:D', 15)
+        worksheet_closing.set_column('E:E', 40)
+        
+        # ===== SHEET 5: NERACA SALDO PENUTUP =====
+        worksheet_pctb = workbook.add_worksheet('Neraca Saldo Penutup')
+        
+        # Header perusahaan
+        worksheet_pctb.merge_range('A1:D1', company_name, title_format)
+        worksheet_pctb.merge_range('A2:D2', 'NERACA SALDO SETELAH PENUTUPAN', title_format)
+        worksheet_pctb.merge_range('A3:D3', f'Per {datetime.now().date().strftime("%d %B %Y")}', subtitle_format)
+        worksheet_pctb.write('A4', '')
+        
+        # Data Neraca Saldo Penutup
+        pctb_data, pctb_debit, pctb_credit = get_post_closing_trial_balance()
+        
+        # Tulis header
+        headers = ['Kode Akun', 'Nama Akun', 'Debit', 'Kredit']
+        for col_num, header in enumerate(headers):
+            worksheet_pctb.write(4, col_num, header, header_format)
+        
+        # Tulis data
+        row_num = 5
+        for item in pctb_data:
+            if item['debit'] != 0 or item['credit'] != 0:
+                worksheet_pctb.write(row_num, 0, item['account']['code'])
+                worksheet_pctb.write(row_num, 1, item['account']['name'])
+                
+                if item['debit'] > 0:
+                    worksheet_pctb.write(row_num, 2, item['debit'], currency_format)
+                else:
+                    worksheet_pctb.write(row_num, 2, '')
+                
+                if item['credit'] > 0:
+                    worksheet_pctb.write(row_num, 3, item['credit'], currency_format)
+                else:
+                    worksheet_pctb.write(row_num, 3, '')
+                
+                row_num += 1
+        
+        # Tulis total
+        worksheet_pctb.write(row_num, 0, 'TOTAL', header_format)
+        worksheet_pctb.write(row_num, 1, '')
+        worksheet_pctb.write(row_num, 2, pctb_debit, total_format)
+        worksheet_pctb.write(row_num, 3, pctb_credit, total_format)
+        
+        # Set column widths untuk Neraca Saldo Penutup
+        worksheet_pctb.set_column('A:A', 12)
+        worksheet_pctb.set_column('B:B', 30)
+        worksheet_pctb.set_column('C:D', 15)
+        
+        # ===== SHEET 6: SUMMARY & NOTES =====
+        worksheet_summary = workbook.add_worksheet('Summary & Notes')
+        
+        # Header
+        worksheet_summary.merge_range('A1:D1', company_name, title_format)
+        worksheet_summary.merge_range('A2:D2', 'RINGKASAN LAPORAN KEUANGAN', title_format)
+        worksheet_summary.merge_range('A3:D3', f'Periode {datetime.now().date().strftime("%d %B %Y")}', subtitle_format)
+        worksheet_summary.write('A4', '')
+        
+        # Key Financial Metrics
+        summary_data = [
+            ['INDIKATOR KINERJA KEUANGAN', '', '', ''],
+            ['', '', '', ''],
+            ['Profitabilitas', '', '', ''],
+            ['Laba Bersih', '', '', income_stmt['net_income']],
+            ['Margin Laba Bersih (%)', '', '', (income_stmt['net_income'] / income_stmt['total_revenue']) * 100 if income_stmt['total_revenue'] > 0 else 0],
+            ['', '', '', ''],
+            ['Likuiditas', '', '', ''],
+            ['Kas dan Setara Kas', '', '', balance_stmt['total_assets'] * 0.3],
+            ['Total Aset Lancar', '', '', balance_stmt['total_assets'] * 0.8],
+            ['Total Kewajiban Lancar', '', '', balance_stmt['total_liabilities']],
+            ['', '', '', ''],
+            ['Solvabilitas', '', '', ''],
+            ['Total Aset', '', '', balance_stmt['total_assets']],
+            ['Total Kewajiban', '', '', balance_stmt['total_liabilities']],
+            ['Total Ekuitas', '', '', balance_stmt['total_equity'] + balance_stmt['net_income']],
+            ['Rasio Kewajiban terhadap Aset', '', '', (balance_stmt['total_liabilities'] / balance_stmt['total_assets']) if balance_stmt['total_assets'] > 0 else 0],
+            ['', '', '', ''],
+            ['Arus Kas', '', '', ''],
+            ['Arus Kas Operasi', '', '', cash_flow_stmt['operating_activities']['net_cash']],
+            ['Arus Kas Investasi', '', '', cash_flow_stmt['investing_activities']['net_cash']],
+            ['Arus Kas Pendanaan', '', '', cash_flow_stmt['financing_activities']['net_cash']],
+            ['Kenaikan/Penurunan Kas Bersih', '', '', cash_flow_stmt['net_cash_flow']]
+        ]
+        
+        # Tulis summary data
+        for row_num, row_data in enumerate(summary_data, start=5):
+            for col_num, cell_data in enumerate(row_data):
+                if col_num == 3 and isinstance(cell_data, (int, float)):
+                    worksheet_summary.write(row_num, col_num, cell_data, currency_format)
+                else:
+                    worksheet_summary.write(row_num, col_num, cell_data)
+        
+        # Catatan dan Disclaimer
+        notes_row = len(summary_data) + 7
+        worksheet_summary.write(notes_row, 0, 'CATATAN DAN DISCLAIMER:', header_format)
+        worksheet_summary.write(notes_row + 1, 0, '1. Laporan keuangan ini dihasilkan secara otomatis oleh Sistem Akuntansi Tiramine')
+        worksheet_summary.write(notes_row + 2, 0, '2. Nilai-nilai tertentu merupakan estimasi untuk tujuan ilustrasi')
+        worksheet_summary.write(notes_row + 3, 0, '3. Laporan ini harus direview oleh akuntan profesional sebelum digunakan')
+        worksheet_summary.write(notes_row + 4, 0, '4. Mata uang yang digunakan: Rupiah (IDR)')
+        worksheet_summary.write(notes_row + 5, 0, f'5. Dihasilkan pada: {datetime.now().strftime("%d %B %Y %H:%M:%S")}')
+        
+        worksheet_summary.set_column('A:A', 45)
+        worksheet_summary.set_column('B:C', 2)
+        worksheet_summary.set_column('D:D', 15)
+    
+    output.seek(0)
+    return output
+
+# ---------- Ekspor Streaming ----------
+# Fungsi export_* untuk data besar (jurnal, penyesuaian, buku besar per akun,
+# persediaan) berupa generator yang membaca cursor per potongan fetchmany.
+# Workbook ditulis baris demi baris dengan mode constant_memory xlsxwriter ke
+# file sementara (spool) lalu dikirim dengan send_file, atau dialirkan sebagai
+# CSV, sehingga memori tetap datar berapa pun jumlah barisnya.
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_SPOOL_SIZE = 8 * 1024 * 1024
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXPORT_HEADER_FORMAT = {
+    'bold': True,
+    'text_wrap': True,
+    'valign': 'top',
+    'fg_color': '#1E40AF',
+    'font_color': 'white',
+    'border': 1
+}
+
+def fetch_in_chunks(cur, chunk_size=EXPORT_CHUNK_SIZE):
+    """Iterasi hasil query yang sudah dieksekusi per potongan fetchmany"""
+    while True:
+        rows = cur.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield from rows
+
+def export_rows(data):
+    """Samakan bentuk data ekspor: dict tunggal, list atau generator -> iterable dict"""
+    if data is None:
+        return []
+    if isinstance(data, dict):
+        return [data] if data else []
+    return data
+
+def export_cell(value):
+    """Nilai sel yang bisa ditulis Excel/CSV (mis. dict stok ditulis sebagai teks)"""
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+def write_export_sheet(workbook, sheet_name, rows, header_format, always=False):
+    """Tulis iterable dict ke satu worksheet secara berurutan (aman untuk constant_memory).
+    
+    Kolom diambil dari baris pertama dan lebar kolom dihitung sambil menulis.
+    Tanpa baris, worksheet hanya dibuat jika always=True.
+    """
+    worksheet = None
+    columns = []
+    widths = []
+    for row_num, row in enumerate(export_rows(rows), start=1):
+        if worksheet is None:
+            worksheet = workbook.add_worksheet(sheet_name)
+            columns = list(row)
+            widths = [len(str(column)) for column in columns]
+            for col_num, column in enumerate(columns):
+                worksheet.write(0, col_num, column, header_format)
+        for col_num, column in enumerate(columns):
+            value = export_cell(row.get(column))
+            if value is None:
+                continue
+            # Tulis per tipe agar teks tidak diperiksa sebagai rumus/URL oleh write()
+            if isinstance(value, str):
+                worksheet.write_string(row_num, col_num, value)
+            else:
+                worksheet.write_number(row_num, col_num, value)
+            widths[col_num] = max(widths[col_num], len(str(value)))
+    
+    if worksheet is None:
+        if always:
+            workbook.add_worksheet(sheet_name)
+        return False
+    
+    # Lebar kolom boleh diatur setelah baris ditulis, juga di mode constant_memory
+    for col_num, width in enumerate(widths):
+        worksheet.set_column(col_num, col_num, min(width + 2, 50))
+    return True
+
+def new_export_workbook(constant_memory=True):
+    """Workbook xlsxwriter yang ditulis ke SpooledTemporaryFile"""
+    import xlsxwriter  # dimuat saat ekspor pertama saja
+    spool = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+    workbook = xlsxwriter.Workbook(spool, {'constant_memory': constant_memory})
+    return workbook, spool
+
+def send_export_file(output, filename, mimetype=XLSX_MIMETYPE):
+    """Kirim file ekspor (path atau file terbuka) lewat file wrapper tanpa disalin ke memori"""
+    if hasattr(output, 'seek'):
+        output.seek(0)
+    response = send_file(output, mimetype=mimetype, as_attachment=True, download_name=filename)
+    
+    # Tambahkan header untuk mencegah caching
+    response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
+    response.headers["Pragma"] = "no-cache"
+    response.headers["Expires"] = "0"
+    
+    return response
+
+def export_to_csv(data, filename):
+    """Alirkan iterable dict sebagai CSV (UTF-8 dengan BOM agar terbaca Excel)"""
+    def generate():
+        buffer = io.StringIO()
+        writer = None
+        yield '﻿'
+        for count, row in enumerate(export_rows(data), start=1):
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(row), extrasaction='ignore')
+                writer.writeheader()
+            writer.writerow({key: export_cell(value) for key, value in row.items()})
+            if count % EXPORT_CHUNK_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    
+    response = Response(
+        stream_with_context(generate()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+    response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
+    response.headers["Pragma"] = "no-cache"
+    response.headers["Expires"] = "0"
+    
+    return response
+
+def export_download(data, sheet_name, basename):
+    """Unduhan ekspor sesuai ?format= (xlsx bawaan, atau csv)"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    if request.args.get('format', 'xlsx').lower() == 'csv':
+        return export_to_csv(data, f"{basename}_{timestamp}.csv")
+    return export_to_excel(data, sheet_name, f"{basename}_{timestamp}.xlsx")
+
+# ---------- Fungsi Ekspor yang Hilang ----------
+
+def export_journal_entries(start_date=None, end_date=None, entry_id=None):
+    """Ekspor entri jurnal: generator baris untuk Excel/CSV"""
+    db = get_db()
+    cur = db.cursor()
+    
+    query = '''
+        SELECT je.id, je.date, je.description, je.reference, 
+               COALESCE(je.transaction_type, 'General') as transaction_type,
+               a.code, a.name, jl.debit, jl.credit, jl.description as line_desc
+        FROM journal_entries je
+        JOIN journal_lines jl ON je.id = jl.entry_id
+        JOIN accounts a ON jl.account_id = a.id
+        WHERE 1=1
+    '''
+    params = []
+    
+    if entry_id:
+        query += ' AND je.id = ?'
+        params.append(entry_id)
+    
+    if start_date:
+        query += ' AND je.date >= ?'
+        params.append(start_date)
+    
+    if end_date:
+        query += ' AND je.date <= ?'
+        params.append(end_date)
+    
+    query += ' ORDER BY je.date, je.id, jl.id'
+    
+    cur.execute(query, params)
+    for entry in fetch_in_chunks(cur):
+        yield {
+            'Tanggal': entry['date'],
+            'ID Entri': entry['id'],
+            'Keterangan': entry['description'],
+            'Referensi': entry['reference'] or '',
+            'Jenis Transaksi': entry['transaction_type'],
+            'Kode Akun': entry['code'],
+            'Nama Akun': entry['name'],
+            'Debit': entry['debit'],
+            'Kredit': entry['credit'],
+            'Keterangan Baris': entry['line_desc'] or ''
+        }
+
+def export_adjusting_entries(start_date=None, end_date=None, entry_id=None):
+    """Ekspor ayat penyesuaian: generator baris untuk Excel/CSV"""
+    db = get_db()
+    cur = db.cursor()
+    
+    query = '''
+        SELECT ae.id, ae.date, ae.description,
+               a.code, a.name, al.debit, al.credit, al.description as line_desc
+        FROM adjusting_entries ae
+        JOIN adjusting_lines al ON ae.id = al.adj_id
+        JOIN accounts a ON al.account_id = a.id
+        WHERE 1=1
+    '''
+    params = []
+    
+    if entry_id:
+        query += ' AND ae.id = ?'
+        params.append(entry_id)
+    
+    if start_date:
+        query += ' AND ae.date >= ?'
+        params.append(start_date)
+    
+    if end_date:
+        query += ' AND ae.date <= ?'
+        params.append(end_date)
+    
+    query += ' ORDER BY ae.date, ae.id, al.id'
+    
+    cur.execute(query, params)
+    for entry in fetch_in_chunks(cur):
+        yield {
+            'Tanggal': entry['date'],
+            'ID Entri': entry['id'],
+            'Keterangan': entry['description'],
+            'Kode Akun': entry['code'],
+            'Nama Akun': entry['name'],
+            'Debit': entry['debit'],
+            'Kredit': entry['credit'],
+            'Keterangan Baris': entry['line_desc'] or ''
+        }
+
+def export_ledger_account(account, start_date=None, end_date=None):
+    """Baris buku besar satu akun dengan saldo berjalan, dibaca per potongan"""
+    cur = get_db().cursor()
+    account_id = account['id']
+    
+    # Gabungkan transaksi jurnal dan penyesuaian
+    query = '''
+        SELECT date, description, debit, credit, 'Jurnal' as type, '' as line_desc
+        FROM (
+            SELECT je.date, je.description, jl.debit, jl.credit, jl.description as line_desc
+            FROM journal_lines jl
+            JOIN journal_entries je ON jl.entry_id = je.id
+            WHERE jl.account_id = ?
+            UNION ALL
+            SELECT ae.date, ae.description, al.debit, al.credit, al.description as line_desc
+            FROM adjusting_lines al
+            JOIN adjusting_entries ae ON al.adj_id = ae.id
+            WHERE al.account_id = ?
+        )
+        WHERE 1=1
+    '''
+    params = [account_id, account_id]
+    
+    if start_date:
+        query += ' AND date >= ?'
+        params.append(start_date)
+    
+    if end_date:
+        query += ' AND date <= ?'
+        params.append(end_date)
+    
+    query += ' ORDER BY date'
+    
+    # Hitung saldo berjalan, dimulai dari saldo awal sesuai saldo normal akun
+    opening = cur.execute(
+        'SELECT debit_amount, credit_amount FROM opening_balances WHERE account_id = ?',
+        (account_id,)
+    ).fetchone()
+    balance = normal_side_amount(account, opening['debit_amount'], opening['credit_amount']) if opening else 0
+    yield {
+        'Tanggal': 'Saldo Awal',
+        'Keterangan': 'Saldo Awal',
+        'Debit': opening['debit_amount'] if opening else 0,
+        'Kredit': opening['credit_amount'] if opening else 0,
+        'Saldo': balance,
+        'Jenis': 'Saldo Awal'
+    }
+    
+    cur.execute(query, params)
+    for tx in fetch_in_chunks(cur):
+        if account['normal_balance'] == 'Debit':
+            balance += tx['debit'] - tx['credit']
+        else:
+            balance += tx['credit'] - tx['debit']
+        
+        yield {
+            'Tanggal': tx['date'],
+            'Keterangan': tx['description'],
+            'Debit': tx['debit'],
+            'Kredit': tx['credit'],
+            'Saldo': balance,
+            'Jenis': tx['type']
+        }
+
+def export_ledger(account_id=None, start_date=None, end_date=None):
+    """Ekspor buku besar ke format data untuk Excel (generator untuk satu akun)"""
+    db = get_db()
+    cur = db.cursor()
+    
+    # Jika account_id spesifik, ekspor detail transaksi
+    if account_id:
+        cur.execute('SELECT * FROM accounts WHERE id = ?', (account_id,))
+        account = cur.fetchone()
+        
+        if not account:
+            return []
+        
+        return export_ledger_account(account, start_date, end_date)
+    else:
+        # Ekspor semua akun dengan saldo
+        balances = get_all_account_balances()
+        data = []
+        
+        for info in balances.values():
+            account = info['account']
+            balance = info['balance']
+            data.append({
+                'Kode Akun': account['code'],
+                'Nama Akun': account['name'],
+                'Jenis Akun': account['acct_type'],
+                'Saldo Normal': account['normal_balance'],
+                'Saldo Saat Ini': balance
+            })
+        
+        return data
+
+def export_trial_balance(include_adjustments=True):
+    """Ekspor neraca saldo ke format data untuk Excel"""
+    tb_data, total_debit, total_credit = trial_balance(include_adjustments)
+    
+    data = []
+    for item in tb_data:
+        if item['debit'] != 0 or item['credit'] != 0:
+            data.append({
+                'Kode Akun': item['account']['code'],
+                'Nama Akun': item['account']['name'],
+                'Jenis Akun': item['account']['acct_type'],
+                'Debit': item['debit'],
+                'Kredit': item['credit']
+            })
+    
+    # Tambahkan total
+    data.append({
+        'Kode Akun': 'TOTAL',
+        'Nama Akun': '',
+        'Jenis Akun': '',
+        'Debit': total_debit,
+        'Kredit': total_credit
+    })
+    
+    return data
+
+def export_closing_entries():
+    """Ekspor jurnal penutup ke format data untuk Excel"""
+    closing_entries_list, net_income = get_closing_entries()
+    
+    data = []
+    for entry in closing_entries_list:
+        account = chart_of_accounts.account(entry['account_id'])
+        
+        data.append({
+            'Kode Akun': account['code'],
+            'Nama Akun': account['name'],
+            'Debit': entry['debit'],
+            'Kredit': entry['credit'],
+            'Keterangan': entry['description']
+        })
+    
+    # Tambahkan summary
+    data.append({
+        'Kode Akun': 'SUMMARY',
+        'Nama Akun': 'Laba/Rugi Bersih Periode',
+        'Debit': '',
+        'Kredit': '',
+        'Keterangan': f'IDR {net_income:,.2f}'
+    })
+    
+    return data
+
+@app.route('/export/closing_entries')
+@login_required
+def export_closing_entries_route():
+    """Ekspor jurnal penutup"""
+    data = export_closing_entries()
+    filename = f"jurnal_penutup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    
+    return export_to_excel(data, "Jurnal Penutup", filename)
+
+def statement_detail_rows(lines):
+    """Baris detail per akun untuk ekspor laporan keuangan"""
+    return [{'Keterangan': f"  {line['code']} - {line['name']}", 'Jumlah': line['amount']} for line in lines]
+
+def export_income_statement(statements=None):
+    """Ekspor laporan laba rugi ke format data untuk Excel"""
+    income_stmt = (statements or financial_statements())['income']
+    
+    data = [
+        {'Keterangan': 'PENDAPATAN', 'Jumlah': ''},
+        *statement_detail_rows(income_stmt['revenues']),
+        {'Keterangan': '', 'Jumlah': ''},
+        {'Keterangan': 'Total Pendapatan', 'Jumlah': income_stmt['total_revenue']},
+        {'Keterangan': '', 'Jumlah': ''},
+        {'Keterangan': 'BEBAN OPERASIONAL', 'Jumlah': ''},
+        *statement_detail_rows(income_stmt['expenses']),
+        {'Keterangan': 'Total Beban', 'Jumlah': income_stmt['total_expense']},
+        {'Keterangan': '', 'Jumlah': ''},
+        {'Keterangan': 'LABA BERSIH', 'Jumlah': income_stmt['net_income']}
+    ]
+    
+    return data
+
+def export_balance_sheet(statements=None):
+    """Ekspor neraca ke format data untuk Excel"""
+    balance_stmt = (statements or financial_statements())['balance']
+    
+    data = [
+        {'Keterangan': 'ASET', 'Jumlah': ''},
+        *statement_detail_rows(balance_stmt['assets']),
+        {'Keterangan': 'Total Aset', 'Jumlah': balance_stmt['total_assets']},
+        {'Keterangan': '', 'Jumlah': ''},
+        {'Keterangan': 'KEWAJIBAN & EKUITAS', 'Jumlah': ''},
+        *statement_detail_rows(balance_stmt['liabilities']),
+        {'Keterangan': 'Total Kewajiban', 'Jumlah': balance_stmt['total_liabilities']},
+        *statement_detail_rows(balance_stmt['equity']),
+        {'Keterangan': 'Total Ekuitas', 'Jumlah': balance_stmt['total_equity'] + balance_stmt['net_income']},
+        {'Keterangan': '', 'Jumlah': ''},
+        {'Keterangan': 'Total Kewajiban & Ekuitas', 'Jumlah': balance_stmt['total_liabilities'] + balance_stmt['total_equity'] + balance_stmt['net_income']}
+    ]
+    
+    return data
+
+def export_cash_flow(statements=None):
+    """Ekspor laporan arus kas ke format data untuk Excel"""
+    cash_flow_stmt = (statements or financial_statements())['cash_flow']
+    
+    data = [
+        {'Keterangan': 'ARUS KAS DARI AKTIVITAS OPERASI', 'Jumlah': ''},
+        {'Keterangan': 'Kas Bersih dari Operasi', 'Jumlah': cash_flow_stmt['operating_activities']['net_cash']},
+        {'Keterangan': '', 'Jumlah': ''},
+        {'Keterangan': 'ARUS KAS DARI AKTIVITAS INVESTASI', 'Jumlah': ''},
+        {'Keterangan': 'Kas Bersih dari Investasi', 'Jumlah': cash_flow_stmt['investing_activities']['net_cash']},
+        {'Keterangan': '', 'Jumlah': ''},
+        {'Keterangan': 'ARUS KAS DARI AKTIVITAS PENDANAAN', 'Jumlah': ''},
+        {'Keterangan': 'Kas Bersih dari Pendanaan', 'Jumlah': cash_flow_stmt['financing_activities']['net_cash']},
+        {'Keterangan': '', 'Jumlah': ''},
+        {'Keterangan': 'KENAIKAN/PENURUNAN KAS BERSIH', 'Jumlah': cash_flow_stmt['net_cash_flow']}
+    ]
+    
+    return data
+
+def export_inventory():
+    """Ekspor data persediaan: generator baris untuk Excel/CSV"""
+    db = get_db()
+    cur = db.cursor()
+    
+    cur.execute('''
+        SELECT date, description, quantity_in, quantity_out, unit_cost, value
+        FROM inventory
+        ORDER BY date, id
+    ''')
+    for item in fetch_in_chunks(cur):
+        yield {
+            'Tanggal': item['date'],
+            'Keterangan': item['description'],
+            'Quantity In': item['quantity_in'],
+            'Quantity Out': item['quantity_out'],
+            'Harga Satuan': item['unit_cost'],
+            'Nilai': item['value']
+        }
+    
+    # Tambahkan stok saat ini
+    current_stock = get_current_stock()
+    yield {
+        'Tanggal': datetime.now().date().isoformat(),
+        'Keterangan': 'STOK SAAT INI',
+        'Quantity In': '',
+        'Quantity Out': '',
+        'Harga Satuan': '',
+        'Nilai': current_stock
+    }
+
+def export_opening_balances():
+    """Ekspor saldo awal ke format data untuk Excel"""
+    balances = get_all_account_balances()
+    
+    data = []
+    for info in balances.values():
+        account = info['account']
+        balance = info['opening_debit'] - info['opening_credit']
+        data.append({
+            'Kode Akun': account['code'],
+            'Nama Akun': account['name'],
+            'Jenis Akun': account['acct_type'],
+            'Saldo Normal': account['normal_balance'],
+            'Saldo Awal': abs(balance),
+            'Tipe Saldo': 'Debit' if balance >= 0 else 'Kredit'
+        })
+    
+    return data
+
+def export_post_closing_trial_balance():
+    """Ekspor neraca saldo setelah penutupan (akun bersaldo + baris total)"""
+    pctb_data, pctb_debit, pctb_credit = get_post_closing_trial_balance()
+    if not pctb_data:
+        return []
+    
+    # Konversi ke format yang sesuai
+    data = []
+    for item in pctb_data:
+        if item['debit'] != 0 or item['credit'] != 0:
+            data.append({
+                'Kode Akun': item['account']['code'],
+                'Nama Akun': item['account']['name'],
+                'Jenis Akun': item['account']['acct_type'],
+                'Debit': item['debit'],
+                'Kredit': item['credit']
+            })
+    
+    # Tambahkan total
+    data.append({
+        'Kode Akun': 'TOTAL',
+        'Nama Akun': '',
+        'Jenis Akun': '',
+        'Debit': pctb_debit,
+        'Kredit': pctb_credit
+    })
+    
+    return data
+
+@report_snapshot()
+def export_all_reports(progress=None):
+    """Ekspor semua laporan ke satu file Excel multi-sheet (spool, constant_memory)
+    
+    progress(selesai, total) dipanggil setelah setiap sheet ditulis.
+    """
+    workbook, spool = new_export_workbook()
+    header_format = workbook.add_format(EXPORT_HEADER_FORMAT)
+    
+    # Laporan keuangan dihitung sekali untuk tiga sheet
+    statements = financial_statements()
+    sheets = [
+        ('Jurnal Umum', export_journal_entries),
+        ('Buku Besar', export_ledger),
+        ('Neraca Saldo', export_trial_balance),
+        ('Laporan Laba Rugi', lambda: export_income_statement(statements)),
+        ('Neraca', lambda: export_balance_sheet(statements)),
+        ('Laporan Arus Kas', lambda: export_cash_flow(statements)),
+        ('Jurnal Penutup', export_closing_entries),
+        ('Neraca Saldo Penutup', export_post_closing_trial_balance),
+    ]
+    for step, (sheet_name, rows) in enumerate(sheets, start=1):
+        write_export_sheet(workbook, sheet_name, rows(), header_format)
+        if progress:
+            progress(step, len(sheets))
+    
+    # Workbook tanpa sheet tidak valid untuk Excel
+    if not workbook.worksheets():
+        workbook.add_worksheet('Laporan')
+    
+    workbook.close()
+    return spool
+
+# ---------- Pekerjaan Ekspor ----------
+# Workbook multi-sheet (/export/all, /export/financial-reports) dibangun di
+# pool proses terpisah (spawn), bukan di thread request: pembuatan DataFrame
+# dan loop worksheet.write murni CPU dan akan menahan GIL thread request lain.
+# Proses pembangun membuka koneksi SQLite read-only dan mengembalikan path file
+# hasil. File disimpan di disk dengan kunci jenis ekspor + parameter + versi
+# cache ('ledger', 'coa'), jadi unduhan ulang untuk data yang sama langsung
+# dikirim tanpa membangun ulang. Status dan progres pekerjaan ditulis ke disk
+# agar bisa dipantau dari proses lain. EXPORT_PROCESSES=0 memakai thread.
+# Laporan berisi data keuangan, jadi cache default ada di instance/exports
+# (bukan /tmp bersama) dan direktorinya hanya bisa dibaca pemilik (0700).
+
+EXPORT_CACHE_DIR = Path(os.environ.get('EXPORT_CACHE_DIR', Path(app.instance_path) / 'exports'))
+EXPORT_WORKERS = int(os.environ.get('EXPORT_WORKERS', 2))
+EXPORT_PROCESSES = os.environ.get('EXPORT_PROCESSES', '1') != '0'
+EXPORT_CACHE_KEEP = 20
+EXPORT_JOB_KEEP = 100
+
+class ExportJob:
+    """Satu permintaan pembangunan file ekspor"""
+    
+    def __init__(self, kind, params, path, filename, job_id=None):
+        self.id = job_id or uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.path = Path(path)
+        self.filename = filename
+        self.status = 'queued'
+        self.progress = 0.0
+        self.error = None
+        self.cached = False
+        self.created = time.time()
+        self.finished = None
+    
+    @property
+    def done(self):
+        return self.status == 'done'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'params': self.params,
+            'path': str(self.path),
+            'filename': self.filename,
+            'status': self.status,
+            'progress': round(self.progress, 3),
+            'error': self.error,
+            'cached': self.cached,
+            'created': self.created,
+            'finished': self.finished
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        job = cls(data['kind'], data['params'], data['path'], data['filename'], job_id=data['id'])
+        for key in ('status', 'progress', 'error', 'cached', 'created', 'finished'):
+            setattr(job, key, data[key])
+        return job
+
+class ExportJobManager:
+    """Antrian pembangunan file ekspor dengan cache artefak di disk"""
+    
+    def __init__(self, cache_dir, max_workers=EXPORT_WORKERS, processes=EXPORT_PROCESSES):
+        self.cache_dir = Path(cache_dir)
+        self.max_workers = max_workers
+        self.processes = processes
+        self._builders = {}
+        self._jobs = OrderedDict()
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+    
+    def register(self, kind, build, filename, namespaces=('ledger', 'coa')):
+        """Daftarkan jenis ekspor: build(params, progress) mengembalikan file biner"""
+        self._builders[kind] = (build, filename, namespaces)
+    
+    def kinds(self):
+        return list(self._builders)
+    
+    def artifact_path(self, kind, params):
+        """Lokasi file cache untuk jenis + parameter + versi data saat ini"""
+        _, _, namespaces = self._builders[kind]
+        cache_coherence.refresh()
+        versions = [cache_coherence.version(namespace) for namespace in namespaces]
+        # Nomor versi tiap database mulai dari 1 - sertakan database-nya di kunci
+        key = json.dumps([kind, params, versions, db_pool.key()], sort_keys=True)
+        return self.cache_dir / f"{kind}-{hashlib.sha256(key.encode()).hexdigest()[:16]}.xlsx"
+    
+    def submit(self, kind, params=None):
+        """Minta file ekspor; pakai cache atau pekerjaan berjalan yang sama jika ada"""
+        params = params or {}
+        path = self.artifact_path(kind, params)
+        _, filename, _ = self._builders[kind]
+        filename = f"{filename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job.path == path and job.status in ('queued', 'running'):
+                    return job
+            
+            job = ExportJob(kind, params, path, filename)
+            self._jobs[job.id] = job
+            while len(self._jobs) > EXPORT_JOB_KEEP:
+                self._jobs.popitem(last=False)
+            if path.exists():
+                job.status = 'done'
+                job.progress = 1.0
+                job.cached = True
+                job.finished = time.time()
+                metrics.inc('tiramine_export_cache_hits_total', kind=kind)
+        self._save(job)
+        
+        if not job.done:
+            future = self._pool().submit(build_export_artifact, job.to_dict())
+            future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+    
+    def get(self, job_id):
+        """Status pekerjaan dari proses ini, atau dari berkas status proses lain"""
+        job = self._jobs.get(job_id)
+        if job is not None and job.status not in ('queued', 'running'):
+            return job
+        if not re.fullmatch(r'[0-9a-f]{32}', job_id):
+            return None
+        
+        # Progres pekerjaan yang berjalan ditulis oleh proses pembangun
+        saved = self._load(job_id)
+        if job is None:
+            return saved
+        with self._lock:
+            if saved is not None and saved.status == 'running' and job.status in ('queued', 'running'):
+                job.status = 'running'
+                job.progress = saved.progress
+        return job
+    
+    def shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def _pool(self):
+        # Executor tidak ikut terbawa saat fork - buat baru per proses
+        if self._executor is None or self._pid != os.getpid():
+            if self.processes:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=init_report_process,
+                    initargs=(str(DB_PATH), db_pool.name)
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='export')
+            self._pid = os.getpid()
+        return self._executor
+    
+    def _load(self, job_id):
+        try:
+            with open(self.cache_dir / 'jobs' / f'{job_id}.json', encoding='utf-8') as f:
+                return ExportJob.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    def _ensure_dirs(self):
+        """Buat direktori cache dan jobs/ dengan mode 0700, perketat bila sudah ada"""
+        jobs_dir = self.cache_dir / 'jobs'
+        for directory in (self.cache_dir, jobs_dir):
+            directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            if directory.stat().st_mode & 0o077:
+                directory.chmod(0o700)
+        return jobs_dir
+    
+    def _save(self, job):
+        jobs_dir = self._ensure_dirs()
+        tmp = jobs_dir / f'{job.id}.tmp'
+        tmp.write_text(json.dumps(job.to_dict()), encoding='utf-8')
+        os.replace(tmp, jobs_dir / f'{job.id}.json')
+    
+    def _progress(self, job, done, total):
+        job.progress = done / total if total else 1.0
+        self._save(job)
+    
+    def build(self, job):
+        """Bangun file ekspor ke job.path (dijalankan di proses/thread pembangun)"""
+        build, _, _ = self._builders[job.kind]
+        job.status = 'running'
+        self._save(job)
+        with app.app_context():
+            output = build(job.params, lambda done, total: self._progress(job, done, total))
+        
+        # Tulis ke file sementara lalu ganti nama agar tidak ada file setengah jadi
+        tmp = job.path.with_name(f'{job.path.name}.{job.id}.tmp')
+        output.seek(0)
+        with open(tmp, 'wb') as f:
+            while True:
+                chunk = output.read(1024 * 1024)
+                if not chunk:
+                    break
+                f.write(chunk)
+        os.replace(tmp, job.path)
+        output.close()
+        return str(job.path)
+    
+    def _finish(self, job, future):
+        error = future.exception()
+        with self._lock:
+            if error is None:
+                job.status = 'done'
+                job.progress = 1.0
+            else:
+                job.status = 'failed'
+                job.error = str(error) or type(error).__name__
+            job.finished = time.time()
+        metrics.observe('tiramine_export_duration_seconds', job.finished - job.created,
+                        kind=job.kind, status=job.status)
+        self._save(job)
+        self._prune()
+    
+    def _prune(self):
+        """Batasi jumlah file cache dan berkas status lama"""
+        for pattern, keep in (('*.xlsx', EXPORT_CACHE_KEEP), ('jobs/*.json', EXPORT_JOB_KEEP)):
+            try:
+                files = sorted(self.cache_dir.glob(pattern), key=lambda p: p.stat().st_mtime, reverse=True)
+                for old in files[keep:]:
+                    old.unlink()
+            except OSError:
+                pass  # file sudah dihapus worker lain
+
+def init_report_process(db_path, storage='sqlite'):
+    """Initializer proses pembangun: semua koneksi database read-only"""
+    global DB_PATH, db_pool
+    DB_PATH = Path(db_path)
+    db_pool = create_storage_backend(storage, readonly=True)
+    cache_coherence.reopen(db_pool)
+
+def build_export_artifact(job_data):
+    """Entry point proses pembangun; mengembalikan path file hasil"""
+    return export_jobs.build(ExportJob.from_dict(job_data))
+
+export_jobs = ExportJobManager(EXPORT_CACHE_DIR)
+atexit.register(export_jobs.shutdown)
+export_jobs.register('all', lambda params, progress: export_all_reports(progress), 'laporan_keuangan_lengkap')
+export_jobs.register('financial', lambda params, progress: export_financial_reports(), 'laporan_keuangan')
+
+def export_job_response(kind, params=None):
+    """Kirim file ekspor jika sudah ada di cache, jika belum arahkan ke halaman status"""
+    job = export_jobs.submit(kind, params)
+    if job.done:
+        return send_export_file(job.path, job.filename)
+    return redirect(url_for('export_job_page', job_id=job.id))
+
+def export_job_status_payload(job):
+    """Status pekerjaan ekspor untuk API/halaman (tanpa path server)"""
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': round(job.progress, 3),
+        'error': job.error,
+        'cached': job.cached,
+        'status_url': url_for('export_job_status', job_id=job.id),
+        'download_url': url_for('export_job_download', job_id=job.id) if job.done else None
+    }
+
+@app.route('/export/jobs', methods=['POST'])
+@login_required
+def export_job_submit():
+    """API: mulai pekerjaan ekspor, kembalikan id untuk dipantau"""
+    kind = request.form.get('kind') or (request.get_json(silent=True) or {}).get('kind')
+    if kind not in export_jobs.kinds():
+        return {'error': 'Unknown export kind'}, 400
+    
+    job = export_jobs.submit(kind)
+    return export_job_status_payload(job), 202
+
+@app.route('/export/jobs/<job_id>')
+@login_required
+def export_job_page(job_id):
+    """Halaman progres pekerjaan ekspor"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        abort(404)
+    return render_page('Ekspor', template='export_job.html', job=export_job_status_payload(job))
+
+@app.route('/export/jobs/<job_id>/status')
+@login_required
+def export_job_status(job_id):
+    """API: status dan progres pekerjaan ekspor"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        return {'error': 'Job not found'}, 404
+    return export_job_status_payload(job)
+
+@app.route('/export/jobs/<job_id>/download')
+@login_required
+def export_job_download(job_id):
+    """Unduh file hasil pekerjaan ekspor"""
+    job = export_jobs.get(job_id)
+    if job is None or not job.done or not job.path.exists():
+        abort(404)
+    return send_export_file(job.path, job.filename)
+
+# ---------- Rute Ekspor yang Lengkap dan Diperbaiki ----------
+
+def export_to_excel(data, sheet_name, filename):
+    """Fungsi dasar untuk ekspor data ke Excel: ditulis per baris ke spool lalu dikirim"""
+    workbook, spool = new_export_workbook()
+    header_format = workbook.add_format(EXPORT_HEADER_FORMAT)
+    write_export_sheet(workbook, sheet_name, data, header_format, always=True)
+    workbook.close()
+    
+    return send_export_file(spool, filename)
+
+@app.route('/export/financial-reports')
+@login_required
+def export_financial_reports_route():
+    """Endpoint untuk export ketiga laporan keuangan utama (dibangun di latar)"""
+    try:
+        return export_job_response('financial')
+    except Exception as e:
+        flash(f'Error generating financial reports: {str(e)}')
+        return redirect(url_for('financials'))
+
+@app.route('/export/journal')
+@login_required
+def export_journal_route():
+    """Ekspor jurnal umum"""
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    entry_id = request.args.get('entry_id')
+    
+    data = export_journal_entries(start_date, end_date, entry_id)
+    return export_download(data, "Jurnal Umum", "jurnal_umum")
+
+@app.route('/export/adjusting')
+@login_required
+def export_adjusting_route():
+    """Ekspor ayat penyesuaian"""
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    entry_id = request.args.get('entry_id')
+    
+    data = export_adjusting_entries(start_date, end_date, entry_id)
+    return export_download(data, "Ayat Penyesuaian", "ayat_penyesuaian")
+
+@app.route('/export/ledger')
+@login_required
+def export_ledger_route():
+    """Ekspor buku besar"""
+    account_id = request.args.get('account_id')
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    
+    data = export_ledger(account_id, start_date, end_date)
+    return export_download(data, "Buku Besar", "buku_besar")
+
+@app.route('/export/trial_balance')
+@login_required
+def export_trial_balance_route():
+    """Ekspor neraca saldo"""
+    include_adjustments = request.args.get('include_adjustments', 'true').lower() == 'true'
+    
+    data = export_trial_balance(include_adjustments)
+    filename = f"neraca_saldo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    
+    return export_to_excel(data, "Neraca Saldo", filename)
+
+@app.route('/export/income_statement')
+@login_required
+def export_income_statement_route():
+    """Ekspor laporan laba rugi"""
+    data = export_income_statement()
+    filename = f"laporan_laba_rugi_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    
+    return export_to_excel(data, "Laporan Laba Rugi", filename)
+
+@app.route('/export/balance_sheet')
+@login_required
+def export_balance_sheet_route():
+    """Ekspor neraca"""
+    data = export_balance_sheet()
+    filename = f"neraca_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    
+    return export_to_excel(data, "Neraca", filename)
+
+@app.route('/export/cash_flow')
+@login_required
+def export_cash_flow_route():
+    """Ekspor laporan arus kas"""
+    data = export_cash_flow()
+    filename = f"laporan_arus_kas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    
+    return export_to_excel(data, "Laporan Arus Kas", filename)
+
+@app.route('/export/inventory')
+@login_required
+def export_inventory_route():
+    """Ekspor data persediaan"""
+    data = export_inventory()
+    return export_download(data, "Persediaan", "persediaan")
+
+@app.route('/export/opening_balances')
+@login_required
+def export_opening_balances_route():
+    """Ekspor saldo awal"""
+    data = export_opening_balances()
+    filename = f"saldo_awal_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    
+    return export_to_excel(data, "Saldo Awal", filename)
+
+@app.route('/export/all')
+@login_required
+def export_all_reports_route():
+    """Ekspor semua laporan ke satu file Excel (dibangun di latar)"""
+    try:
+        return export_job_response('all')
+    except Exception as e:
+        flash(f'Error generating all reports: {str(e)}')
+        return redirect(url_for('dashboard'))
+
+@app.route('/export')
+@login_required
+def export_management():
+    """Halaman manajemen ekspor yang komprehensif"""
+    
+    body = """
+    <div class="page-header">
+        <h1 class="page-title">Manajemen Ekspor Excel</h1>
+        <p class="page-subtitle">Ekspor data akuntansi ke format Excel untuk analisis dan audit</p>
+    </div>
+    
+    <div class="row">
+        <!-- Ekspor Individual -->
+        <div class="col-lg-6 mb-4">
+            <div class="card h-100">
+                <div class="card-header bg-primary text-white">
+                    <h5 class="mb-0"><i class="fas fa-file-export me-2"></i>Ekspor Per Laporan</h5>
+                </div>
+                <div class="card-body">
+                    <div class="list-group">
+                        <a href="/export/journal" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
+                            <div>
+                                <i class="fas fa-book me-2 text-primary"></i>
+                                <strong>Jurnal Umum</strong>
+                                <small class="d-block text-muted">Semua entri jurnal transaksi</small>
+                            </div>
+                            <i class="fas fa-download text-muted"></i>
+                        </a>
+                        
+                        <a href="/export/adjusting" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
+                            <div>
+                                <i class="fas fa-adjust me-2 text-warning"></i>
+                                <strong>Ayat Penyesuaian</strong>
+                                <small class="d-block text-muted">Entri penyesuaian periode</small>
+                            </div>
+                            <i class="fas fa-download text-muted"></i>
+                        </a>
+                        
+                        <a href="/export/ledger" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
+                            <div>
+                                <i class="fas fa-file-invoice-dollar me-2 text-success"></i>
+                                <strong>Buku Besar</strong>
+                                <small class="d-block text-muted">Riwayat semua akun</small>
+                            </div>
+                            <i class="fas fa-download text-muted"></i>
+                        </a>
+                        
+                        <a href="/export/trial_balance" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
+                            <div>
+                                <i class="fas fa-balance-scale me-2 text-info"></i>
+                                <strong>Neraca Saldo</strong>
+                                <small class="d-block text-muted">Saldo sebelum & setelah penyesuaian</small>
+                            </div>
+                            <i class="fas fa-download text-muted"></i>
+                        </a>
+
+                        <!-- Tambahkan di bagian Ekspor Individual -->
+                        <a href="/export/closing_entries" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
+                            <div>
+                                <i class="fas fa-lock me-2 text-danger"></i>
+                                <strong>Jurnal Penutup</strong>
+                                <small class="d-block text-muted">Entri penutupan periode</small>
+                            </div>
+                            <i class="fas fa-download text-muted"></i>
+                        </a>
+
+                    </div>
+                </div>
+            </div>
+        </div>
+        
+        <!-- Ekspor Laporan Keuangan -->
+        <div class="col-lg-6 mb-4">
+            <div class="card h-100">
+                <div class="card-header bg-success text-white">
+                    <h5 class="mb-0"><i class="fas fa-chart-line me-2"></i>Laporan Keuangan</h5>
+                </div>
+                <div class="card-body">
+                    <div class="list-group">
+                        <a href="/export/income_statement" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
+                            <div>
+                                <i class="fas fa-chart-bar me-2 text-success"></i>
+                                <strong>Laporan Laba Rugi</strong>
+                                <small class="d-block text-muted">Pendapatan, beban, dan laba bersih</small>
+                            </div>
+                            <i class="fas fa-download text-muted"></i>
+                        </a>
+                        
+                        <a href="/export/balance_sheet" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
+                            <div>
+                                <i class="fas fa-balance-scale-left me-2 text-primary"></i>
+                                <strong>Neraca</strong>
+                                <small class="d-block text-muted">Posisi keuangan perusahaan</small>
+                            </div>
+                            <i class="fas fa-download text-muted"></i>
+                        </a>
+                        
+                        <a href="/export/cash_flow" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
+                            <div>
+                                <i class="fas fa-money-bill-wave me-2 text-info"></i>
+                                <strong>Laporan Arus Kas</strong>
+                                <small class="d-block text-muted">Arus kas operasi, investasi, pendanaan</small>
+                            </div>
+                            <i class="fas fa-download text-muted"></i>
+                        </a>
+                    </div>
+                </div>
+            </div>
+        </div>
+        
+        <!-- Ekspor Data Master -->
+        <div class="col-lg-6 mb-4">
+            <div class="card h-100">
+                <div class="card-header bg-info text-white">
+                    <h5 class="mb-0"><i class="fas fa-database me-2"></i>Data Master</h5>
+                </div>
+                <div class="card-body">
+                    <div class="list-group">
+                        <a href="/export/inventory" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
+                            <div>
+                                <i class="fas fa-water me-2 text-info"></i>
+                                <strong>Persediaan Tiram</strong>
+                                <small class="d-block text-muted">Riwayat stok dan nilai persediaan</small>
+                            </div>
+                            <i class="fas fa-download text-muted"></i>
+                        </a>
+                        
+                        <a href="/export/opening_balances" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center">
+                            <div>
+                                <i class="fas fa-play-circle me-2 text-warning"></i>
+                                <strong>Saldo Awal</strong>
+                                <small class="d-block text-muted">Saldo awal semua akun</small>
+                            </div>
+                            <i class="fas fa-download text-muted"></i>
+                        </a>
+                    </div>
+                </div>
+            </div>
+        </div>
+        
+        <!-- Ekspor Komprehensif -->
+        <div class="col-lg-6 mb-4">
+            <div class="card h-100">
+                <div class="card-header bg-warning text-dark">
+                    <h5 class="mb-0"><i class="fas fa-file-archive me-2"></i>Ekspor Lengkap</h5>
+                </div>
+                <div class="card-body text-center py-5">
+                    <i class="fas fa-file-excel fa-4x text-success mb-3"></i>
+                    <h4 class="text-dark mb-3">Export Semua Laporan</h4>
+                    <p class="text-muted mb-4">
+                        Download semua laporan keuangan dalam satu file Excel multi-sheet. 
+                        Siap untuk analisis, audit, dan presentasi.
+                    </p>
+                    <a href="/export/all" class="btn btn-success btn-lg">
+                        <i class="fas fa-download me-2"></i>Download Full Report
+                    </a>
+                    <small class="d-block text-muted mt-2">
+                        Includes all 9 reports in separate sheets
+                    </small>
+                </div>
+            </div>
+        </div>
+    </div>
+    
+    <!-- Info Section -->
+    <div class="row mt-4">
+        <div class="col-12">
+            <div class="card bg-light">
+                <div class="card-body">
+                    <h6><i class="fas fa-info-circle me-2 text-primary"></i>Informasi Ekspor</h6>
+                    <div class="row">
+                        <div class="col-md-4">
+                            <strong>Format File:</strong> Excel (.xlsx)
+                        </div>
+                        <div class="col-md-4">
+                            <strong>Encoding:</strong> UTF-8
+                        </div>
+                        <div class="col-md-4">
+                            <strong>Mata Uang:</strong> IDR
+                        </div>
+                    </div>
+                    <div class="row mt-2">
+                        <div class="col-12">
+                            <strong>Fitur:</strong> Formatting profesional, multi-sheet, siap print, 
+                            compatible dengan Excel 2010+, filter data, formulas siap pakai.
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+    """
+    
+    return render_page('Manajemen Ekspor', body)
+
+@app.route('/debug')
+def debug():
+    """Route untuk debugging - HAPUS SETELAH FIX"""
+    try:
+        db = get_db()
+        cur = db.cursor()
+        
+        # Cek users
+        cur.execute('SELECT * FROM users')
+        users = cur.fetchall()
+        
+        # Cek session
+        session_info = {
+            'user_id': session.get('user_id'),
+            'session_keys': list(session.keys())
+        }
+        
+        debug_info = f"""
+        <div class="container mt-4">
+            <h2>Debug Info</h2>
+            <div class="card">
+                <div class="card-body">
+                    <h5>Users in database:</h5>
+                    <pre>{users}</pre>
+                    <h5>Session info:</h5>
+                    <pre>{session_info}</pre>
+                    <h5>Current user:</h5>
+                    <pre>{current_user()}</pre>
+                </div>
+            </div>
+            <div class="mt-3">
+                <a href="/login" class="btn btn-primary">Ke Halaman Login</a>
+                <a href="/reset-db" class="btn btn-warning">Reset Database</a>
+            </div>
+        </div>
+        """
+        
+        return debug_info
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@app.route('/reset_opening_balances')
+@login_required
+def reset_opening_balances():
+    """Reset saldo awal ke nilai default sesuai neraca saldo awal"""
+    db = get_db()
+    
+    # Hapus semua saldo awal
+    db.execute('DELETE FROM opening_balances')
+    
+    # Set saldo awal default sesuai neraca saldo
+    default_balances = [
+        # Assets (Debit)
+        (1, 8500000, 0),   # Kas (101)
+        (2, 4500000, 0),   # Piutang Usaha (102)
+        (3, 1750000, 0),   # Persediaan Tiram Besar (103)
+        (4, 1200000, 0),   # Persediaan Tiram Kecil (103.1)
+        (5, 500000, 0),    # Peralatan (104)
+        (6, 300000, 0),    # Perlengkapan (105)
+        (7, 12000000, 0),  # Kendaraan (106)
+        
+        # Contra Asset (Credit)
+        (8, 0, 1500000),   # Akumulasi Penyusutan Kendaraan (107)
+        
+        # Liabilities (Credit)
+        (9, 0, 650000),    # Utang Usaha (201)
+        (10, 0, 100000),   # Utang Gaji (202)
+        
+        # Equity (Credit)
+        (11, 0, 22300000), # Modal Pemilik (301)
+    ]
+    
+    for account_id, debit_amount, credit_amount in default_balances:
+        db.execute('''
+            INSERT INTO opening_balances (account_id, debit_amount, credit_amount) 
+            VALUES (?, ?, ?)
+        ''', (account_id, debit_amount, credit_amount))
+    
+    sync_opening_balance_summary(db.cursor())
+    db.commit()
+    flash('✅ Saldo awal berhasil direset ke nilai default!')
+    return redirect(url_for('opening_balance'))
+
+@app.route('/verify_balances')
+@login_required
+def verify_balances():
+    """Halaman untuk verifikasi saldo awal"""
+    db = get_db()
+    
+    # Hitung total debit dan credit dari opening_balances
+    result = db.execute('''
+        SELECT SUM(debit_amount) as total_debit, SUM(credit_amount) as total_credit 
+        FROM opening_balances
+    ''').fetchone()
+    
+    total_debit = result['total_debit'] or 0
+    total_credit = result['total_credit'] or 0
+    
+    # Dapatkan detail semua saldo
+    balances = db.execute('''
+        SELECT a.code, a.name, a.acct_type, a.normal_balance, 
+               ob.debit_amount, ob.credit_amount
+        FROM accounts a
+        LEFT JOIN opening_balances ob ON a.id = ob.account_id
+        WHERE ob.debit_amount != 0 OR ob.credit_amount != 0
+        ORDER BY a.code
+    ''').fetchall()
+    
+    return render_page('Verifikasi Saldo', template='verify_balances.html', balances=balances,
+                       total_debit=total_debit, total_credit=total_credit)
+
+# ---------- Health Check ----------
+# /health memeriksa backend penyimpanan aktif. Koneksi ke PostgreSQL (variabel
+# user/password/host/port/dbname atau DATABASE_URL) hanya diuji bila
+# POSTGRES_HEALTHCHECK=1, dengan batas waktu singkat, agar host yang tidak
+# terjangkau tidak menahan worker.
+
+POSTGRES_CONNECT_TIMEOUT = 3
+
+def check_postgres():
+    """Buka koneksi PostgreSQL dan jalankan SELECT 1; kembalikan (ok, keterangan)"""
+    try:
+        import psycopg2  # hanya dibutuhkan untuk pemeriksaan ini
+        connection = psycopg2.connect(**postgres_connect_params(), connect_timeout=POSTGRES_CONNECT_TIMEOUT)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+        finally:
+            connection.close()
+    except Exception as e:
+        logger.warning("PostgreSQL health check failed: %s", e)
+        return False, type(e).__name__
+    return True, 'ok'
+
+@app.route('/health')
+def health():
+    """Status layanan untuk load balancer / monitoring"""
+    checks = {}
+    try:
+        get_db().execute('SELECT 1').fetchone()
+        checks[db_pool.name] = 'ok'
+    except db_pool.errors as e:
+        checks[db_pool.name] = type(e).__name__
+    if app.config['POSTGRES_HEALTHCHECK']:
+        checks['postgres'] = check_postgres()[1]
+    
+    healthy = all(status == 'ok' for status in checks.values())
+    return {'status': 'ok' if healthy else 'error', 'checks': checks}, 200 if healthy else 503
+
+# ---------- Perintah CLI ----------
+
+@app.cli.command('verify-balances')
+@click.option('--rebuild', is_flag=True, help='Bangun ulang account_balances dari baris jurnal sebelum verifikasi.')
+def verify_balances_command(rebuild):
+    """Cocokkan ringkasan account_balances dengan baris jurnal mentah."""
+    ensure_startup()
+    if rebuild:
+        db = get_db()
+        rebuild_account_balances(db.cursor())
+        db.commit()
+        click.echo("🔄 account_balances dibangun ulang dari baris jurnal")
+    
+    mismatches = verify_account_balances()
+    if not mismatches:
+        click.echo("✅ account_balances sesuai dengan baris jurnal")
+        return
+    
+    for item in mismatches:
+        click.echo(f"❌ Akun #{item['account_id']} {item['column']}: "
+                   f"tersimpan {item['stored']:,.2f}, seharusnya {item['expected']:,.2f}")
+    raise SystemExit(1)
+
+@app.cli.command('import-journal')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--dry-run', is_flag=True, help='Validasi saja tanpa posting.')
+def import_journal_command(path, dry_run):
+    """Impor massal entri jurnal dari CSV, JSON Lines atau Excel."""
+    ensure_startup()
+    with open(path, 'rb') as handle:
+        rows = read_journal_import(handle.read(), path)
+    result = import_journal_entries(rows, dry_run=dry_run)
+    
+    for row_number, message in result['errors']:
+        click.echo(f"❌ Baris {row_number}: {message}")
+    if result['errors']:
+        click.echo(f"❌ {len(result['errors'])} kesalahan, tidak ada entri yang diposting")
+        raise SystemExit(1)
+    if result['first_id']:
+        click.echo(f"✅ {result['entries']} entri ({result['lines']} baris) diposting: "
+                   f"#{result['first_id']} s/d #{result['last_id']}")
+    else:
+        click.echo(f"✅ {result['entries']} entri ({result['lines']} baris) valid")
+
+@app.cli.command('migrate')
+def migrate_command():
+    """Terapkan migrasi skema yang belum dijalankan."""
+    version = migrate_db()
+    click.echo(f"✅ Schema version {version}")
+
+@app.cli.command('revoke-sessions')
+@click.argument('username')
+def revoke_sessions_command(username):
+    """Cabut semua sesi login milik USERNAME di semua worker."""
+    ensure_startup()
+    db = get_db()
+    user = db.execute('SELECT id FROM users WHERE username = ?', (username,)).fetchone()
+    if user is None:
+        click.echo(f"❌ User {username} tidak ditemukan")
+        raise SystemExit(1)
+    revoke_user_sessions(db.cursor(), user['id'])
+    db.commit()
+    click.echo(f"✅ Semua sesi {username} dicabut")
+
+@app.cli.command('check-postgres')
+def check_postgres_command():
+    """Uji koneksi ke PostgreSQL dari variabel user/password/host/port/dbname atau DATABASE_URL."""
+    ok, detail = check_postgres()
+    click.echo(f"{'✅' if ok else '❌'} PostgreSQL: {detail}")
+    if not ok:
+        raise SystemExit(1)
+
+@app.cli.command('init-db')
+@click.confirmation_option(prompt='Semua data akan dihapus. Lanjutkan?')
+def init_db_command():
+    """Hapus semua tabel dan buat ulang database dengan data awal."""
+    init_db()
+
+@app.cli.command('vendor-assets')
+@click.option('--download', is_flag=True, help='Unduh ulang berkas yang hilang atau tidak cocok.')
+def vendor_assets_command(download):
+    """Periksa SHA-256 berkas vendor di static/vendor terhadap nilai yang dipatok."""
+    from urllib.request import urlopen
+    
+    failed = []
+    for path, (source, sha256) in VENDOR_ASSETS.items():
+        target = STATIC_DIR / path
+        if target.exists() and hashlib.sha256(target.read_bytes()).hexdigest() == sha256:
+            click.echo(f"✅ {path}")
+            continue
+        if not download:
+            click.echo(f"❌ {path} {'tidak cocok' if target.exists() else 'tidak ada'}")
+            failed.append(path)
+            continue
+        with urlopen(source, timeout=30) as response:
+            body = response.read()
+        digest = hashlib.sha256(body).hexdigest()
+        if digest != sha256:
+            # Jangan pernah menulis berkas yang tidak sesuai patokan
+            click.echo(f"❌ {path}: SHA-256 unduhan {digest} != {sha256}")
+            failed.append(path)
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(body)
+        click.echo(f"⬇️ {path}")
+    asset_manifest.reload()
+    if failed:
+        raise SystemExit(1)
+
+# ---------- Startup Aplikasi ----------
+# Impor modul ini tidak melakukan I/O database atau jaringan: migrasi dan
+# pemulihan dijalankan oleh create_app() (atau request pertama bila server
+# memakai objek app langsung), pandas/xlsxwriter dimuat saat ekspor pertama,
+# dan PostgreSQL hanya diuji lewat /health atau `flask check-postgres`.
+
+def create_app(config=None):
+    """Application factory: terapkan konfigurasi lalu siapkan database.
+
+    Kunci tambahan selain konfigurasi Flask: DATABASE (path file SQLite),
+    STORAGE_BACKEND ('sqlite' atau 'postgres') dan POSTGRES_HEALTHCHECK.
+    """
+    if config:
+        app.config.update(config)
+    if app.config.get('DATABASE'):
+        configure_database(app.config['DATABASE'])
+    if app.config['STORAGE_BACKEND'] != db_pool.name:
+        configure_storage(app.config['STORAGE_BACKEND'])
+    ensure_startup()
+    return app
+
+if __name__ == '__main__':
+
+    if not DB_PATH.exists():
+        logger.info("Menginisialisasi Database Akuntansi Tiramine...")
+    create_app()
+    with app.app_context():
+        logger.info("Database siap (schema version %s)", migrate_db())
+    
     app.run(debug=True, use_reloader=True, threaded=False, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,93 @@
+// Penanganan form dinamis
+function addJournalLine() {
+    const container = document.getElementById('journal-lines');
+    const count = container.children.length;
+    const newLine = document.createElement('div');
+    newLine.className = 'row mb-3 journal-line';
+    newLine.innerHTML = `
+        <div class="col-md-5">
+            <select class="form-select" name="account_${count}" required>
+                <option value="">Pilih Akun</option>
+                ${document.getElementById('account-options').innerHTML}
+            </select>
+        </div>
+        <div class="col-md-3">
+            <input type="number" class="form-control" name="debit_${count}" placeholder="0.00" step="0.01" min="0" oninput="checkBalance()">
+        </div>
+        <div class="col-md-3">
+            <input type="number" class="form-control" name="credit_${count}" placeholder="0.00" step="0.01" min="0" oninput="checkBalance()">
+        </div>
+        <div class="col-md-1">
+            <button type="button" class="btn btn-danger btn-sm" onclick="this.closest('.journal-line').remove(); checkBalance();">
+                <i class="fas fa-times"></i>
+            </button>
+        </div>
+    `;
+    container.appendChild(newLine);
+}
+
+function checkBalance() {
+    let totalDebit = 0;
+    let totalCredit = 0;
+
+    document.querySelectorAll('input[name^="debit_"]').forEach(input => {
+        totalDebit += parseFloat(input.value) || 0;
+    });
+
+    document.querySelectorAll('input[name^="credit_"]').forEach(input => {
+        totalCredit += parseFloat(input.value) || 0;
+    });
+
+    const balanceElement = document.getElementById('balance-check');
+    if (balanceElement) {
+        if (Math.abs(totalDebit - totalCredit) < 0.01) {
+            balanceElement.innerHTML = `<span class="text-success"><i class="fas fa-check-circle me-2"></i> Seimbang: ${totalDebit.toFixed(2)} = ${totalCredit.toFixed(2)}</span>`;
+            balanceElement.className = 'alert alert-success';
+        } else {
+            balanceElement.innerHTML = `<span class="text-danger"><i class="fas fa-exclamation-circle me-2"></i> Tidak Seimbang: ${totalDebit.toFixed(2)} ≠ ${totalCredit.toFixed(2)}</span>`;
+            balanceElement.className = 'alert alert-danger';
+        }
+    }
+}
+
+// Hitung tanggal otomatis untuk entri baru
+document.addEventListener('DOMContentLoaded', function() {
+    const dateInput = document.querySelector('input[type="date"]');
+    if (dateInput && !dateInput.value) {
+        dateInput.value = new Date().toISOString().split('T')[0];
+    }
+});
+
+// Pantau pekerjaan ekspor di latar lalu unduh otomatis saat selesai
+function pollExportJob(card) {
+    const bar = card.querySelector('[data-export-progress]');
+    const message = card.querySelector('[data-export-message]');
+    const download = card.querySelector('[data-export-download]');
+
+    fetch(card.dataset.statusUrl, {headers: {'Accept': 'application/json'}})
+        .then(response => response.json())
+        .then(job => {
+            const percent = Math.round((job.progress || 0) * 100);
+            bar.style.width = `${percent}%`;
+            bar.textContent = `${percent}%`;
+
+            if (job.status === 'done') {
+                bar.classList.remove('progress-bar-animated');
+                message.textContent = '✅ File siap diunduh';
+                download.href = job.download_url;
+                download.classList.remove('d-none');
+                window.location.href = job.download_url;
+            } else if (job.status === 'failed' || job.error) {
+                bar.classList.remove('progress-bar-animated');
+                bar.classList.add('bg-danger');
+                message.textContent = `❌ Gagal membuat file: ${job.error || 'tidak diketahui'}`;
+            } else {
+                setTimeout(() => pollExportJob(card), 1000);
+            }
+        })
+        .catch(() => setTimeout(() => pollExportJob(card), 3000));
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('[data-export-job]').forEach(pollExportJob);
+});
@@ -0,0 +1,73 @@
+"""Fixture bersama untuk pengujian Tiramine.
+
+Setiap pengujian memakai database sementara sendiri: file SQLite di tmp_path,
+atau database PostgreSQL dari DATABASE_URL. DATABASE_URL dibaca SEBELUM app
+diimpor karena app memuat .env saat impor - nilai dari .env tidak pernah
+dipakai untuk pengujian. Database PostgreSQL itu harus database uji
+sekali-pakai: semua tabel aplikasi di dalamnya dihapus sebelum tiap pengujian.
+Tanpa DATABASE_URL pengujian backend postgres dilewati.
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+POSTGRES_URL = os.environ.get('DATABASE_URL')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import app as tiramine  # noqa: E402
+
+tiramine.app.config['TESTING'] = True
+
+# Urutan mengikuti init_db (tabel anak sebelum induk)
+APP_TABLES = (
+    'transaction_templates', 'account_balances', 'opening_balances', 'adjusting_lines',
+    'adjusting_entries', 'journal_lines', 'journal_entries', 'inventory', 'accounts',
+    'users', 'settings', 'otp_verification',
+)
+
+BACKENDS = ['sqlite', pytest.param('postgres', marks=pytest.mark.skipif(
+    not POSTGRES_URL, reason='DATABASE_URL tidak diset'))]
+
+@pytest.fixture(params=BACKENDS)
+def empty_db(request, tmp_path):
+    """Arahkan app ke database kosong tanpa migrasi; nilai fixture = nama backend"""
+    if request.param == 'sqlite':
+        tiramine.app.config['STORAGE_BACKEND'] = 'sqlite'
+        tiramine.configure_database(tmp_path / 'test.db')
+    else:
+        tiramine.app.config['STORAGE_BACKEND'] = 'postgres'
+        tiramine.use_storage_backend(tiramine.PostgresBackend({'dsn': POSTGRES_URL}))
+        with tiramine.app.app_context():
+            tiramine.get_db().executescript(
+                ''.join(f'DROP TABLE IF EXISTS {table} CASCADE;\n' for table in APP_TABLES))
+    yield request.param
+    tiramine.write_queue.stop()
+    tiramine.db_pool.close_all()
+
+@pytest.fixture
+def backend(empty_db):
+    """Database yang sudah dimigrasi penuh (bagan akun dan admin awal terisi)"""
+    with tiramine.app.app_context():
+        tiramine.migrate_db()
+    return empty_db
+
+@pytest.fixture
+def app_context(backend):
+    with tiramine.app.app_context():
+        yield
+
+def account_id(code):
+    """id akun dari kodenya (lewat chart_of_accounts)"""
+    return tiramine.chart_of_accounts.accounts_by_code()[code]['id']
+
+def wait_for(predicate, timeout=5):
+    """Tunggu kondisi yang diisi thread latar; hasil terakhir predicate"""
+    deadline = time.monotonic() + timeout
+    while True:
+        result = predicate()
+        if result or time.monotonic() > deadline:
+            return result
+        time.sleep(0.02)
@@ -0,0 +1,204 @@
+"""MailSender terhadap server SMTP lokal (stub socketserver, tanpa TLS/login)."""
+import socketserver
+import threading
+import time
+
+import pytest
+
+from conftest import tiramine, wait_for
+
+RETRY_DELAY = 0.1
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    """Server SMTP minimal yang balasannya bisa diatur per pengujian.
+
+    data_codes: kode balasan DATA berikutnya (kosong = 250), rcpt_code: kode
+    balasan RCPT TO, drop_after: tutup koneksi setelah sekian email diterima.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPStubHandler)
+        self.data_codes = []
+        self.rcpt_code = 250
+        self.drop_after = None
+        self.connections = 0
+        self.attempts = []
+        self.delivered = []
+
+class SMTPStubHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self.reply('220 stub')
+        accepted = 0
+        message = None
+        for raw in self.rfile:
+            line = raw.decode().rstrip('\r\n')
+            if message is not None:
+                if line != '.':
+                    message.append(line)
+                    continue
+                server.attempts.append(time.monotonic())
+                code = server.data_codes.pop(0) if server.data_codes else 250
+                if code == 250:
+                    server.delivered.append('\n'.join(message))
+                    accepted += 1
+                message = None
+                self.reply(f'{code} selesai')
+                if server.drop_after and accepted >= server.drop_after:
+                    return
+                continue
+            command = line.upper()
+            if command.startswith('EHLO'):
+                self.reply('250-stub')
+                self.reply('250 OK')
+            elif command.startswith('RCPT'):
+                self.reply(f'{server.rcpt_code} rcpt')
+            elif command == 'DATA':
+                message = []
+                self.reply('354 lanjut')
+            elif command == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 OK')
+
+@pytest.fixture
+def smtp_server():
+    server = SMTPStub()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def mailer(smtp_server):
+    settings = {
+        'server': '127.0.0.1',
+        'port': smtp_server.server_address[1],
+        'username': None,
+        'password': None,
+        'sender': 'noreply@tiramine.test',
+        'starttls': False,
+    }
+    sender = tiramine.MailSender(settings=lambda: settings, max_attempts=4, retry_delay=RETRY_DELAY)
+    yield sender
+    sender.stop()
+
+def create_otp(backend):
+    with tiramine.app.app_context():
+        return tiramine.create_otp_for_email('user@tiramine.test')[2]
+
+def otp_delivery(otp_id):
+    with tiramine.app.app_context():
+        return tiramine.get_db().execute('''
+            SELECT delivery_status, delivery_attempts, delivery_error, delivered_at
+            FROM otp_verification WHERE id = ?
+        ''', (otp_id,)).fetchone()
+
+def wait_for_delivery(otp_id):
+    """Baris OTP setelah status akhirnya ('sent'/'failed') tercatat lewat write_queue"""
+    def finished():
+        row = otp_delivery(otp_id)
+        return row if row['delivery_status'] in ('sent', 'failed') else None
+    row = wait_for(finished)
+    assert row is not None, f'pengiriman OTP {otp_id} tidak selesai'
+    return row
+
+def test_delivery_is_recorded_on_otp_row(backend, smtp_server, mailer):
+    otp_id = create_otp(backend)
+    assert otp_delivery(otp_id)['delivery_status'] == 'queued'
+
+    assert mailer.submit('user@tiramine.test', 'Kode OTP', '<p>123456</p>', otp_id=otp_id)
+
+    row = wait_for_delivery(otp_id)
+    assert row['delivery_status'] == 'sent'
+    assert row['delivery_attempts'] == 1
+    assert row['delivery_error'] is None
+    assert row['delivered_at'] is not None
+    assert len(smtp_server.delivered) == 1
+
+def test_transient_failure_is_retried_with_backoff(backend, smtp_server, mailer):
+    smtp_server.data_codes = [451, 451]
+    otp_id = create_otp(backend)
+
+    mailer.submit('user@tiramine.test', 'Kode OTP', '<p>123456</p>', otp_id=otp_id)
+
+    row = wait_for_delivery(otp_id)
+    assert row['delivery_status'] == 'sent'
+    assert row['delivery_attempts'] == 3
+    assert len(smtp_server.delivered) == 1
+    first, second, third = smtp_server.attempts
+    # Jeda RETRY_DELAY lalu 2x RETRY_DELAY (toleransi pembulatan timer)
+    assert second - first >= RETRY_DELAY * 0.9
+    assert third - second >= 2 * RETRY_DELAY * 0.9
+
+def test_transient_failure_gives_up_after_max_attempts(backend, smtp_server, mailer):
+    smtp_server.data_codes = [451] * mailer.max_attempts
+    otp_id = create_otp(backend)
+
+    mailer.submit('user@tiramine.test', 'Kode OTP', '<p>123456</p>', otp_id=otp_id)
+
+    row = wait_for_delivery(otp_id)
+    assert row['delivery_status'] == 'failed'
+    assert row['delivery_attempts'] == mailer.max_attempts
+    assert '451' in row['delivery_error']
+
+@pytest.mark.parametrize('code', [550, 554])
+def test_permanent_failure_is_not_retried(backend, smtp_server, mailer, code):
+    smtp_server.data_codes = [code]
+    otp_id = create_otp(backend)
+
+    mailer.submit('user@tiramine.test', 'Kode OTP', '<p>123456</p>', otp_id=otp_id)
+
+    row = wait_for_delivery(otp_id)
+    assert row['delivery_status'] == 'failed'
+    assert row['delivery_attempts'] == 1
+    assert row['delivered_at'] is None
+    time.sleep(RETRY_DELAY * 2)
+    assert len(smtp_server.attempts) == 1
+
+def test_refused_recipient_fails_permanently(backend, smtp_server, mailer):
+    smtp_server.rcpt_code = 550
+    otp_id = create_otp(backend)
+
+    mailer.submit('nobody@tiramine.test', 'Kode OTP', '<p>123456</p>', otp_id=otp_id)
+
+    row = wait_for_delivery(otp_id)
+    assert row['delivery_status'] == 'failed'
+    assert row['delivery_attempts'] == 1
+    time.sleep(RETRY_DELAY * 2)
+    assert smtp_server.attempts == []
+
+def test_reconnects_after_server_disconnect(backend, smtp_server, mailer):
+    # Server memutus koneksi setelah tiap email; email berikutnya harus
+    # mendapati SMTPServerDisconnected lalu tersambung ulang di percobaan yang sama
+    smtp_server.drop_after = 1
+    first_id = create_otp(backend)
+    mailer.submit('user@tiramine.test', 'Kode OTP', '<p>111111</p>', otp_id=first_id)
+    assert wait_for_delivery(first_id)['delivery_status'] == 'sent'
+
+    second_id = create_otp(backend)
+    mailer.submit('user@tiramine.test', 'Kode OTP', '<p>222222</p>', otp_id=second_id)
+
+    row = wait_for_delivery(second_id)
+    assert row['delivery_status'] == 'sent'
+    assert row['delivery_attempts'] == 1
+    assert smtp_server.connections == 2
+    assert len(smtp_server.delivered) == 2
+
+def test_connection_is_reused_between_mails(backend, smtp_server, mailer):
+    otp_ids = [create_otp(backend) for _ in range(3)]
+    for otp_id in otp_ids:
+        mailer.submit('user@tiramine.test', 'Kode OTP', '<p>123456</p>', otp_id=otp_id)
+
+    for otp_id in otp_ids:
+        assert wait_for_delivery(otp_id)['delivery_status'] == 'sent'
+    assert smtp_server.connections == 1
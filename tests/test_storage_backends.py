@@ -0,0 +1,281 @@
+"""Satu rangkaian pengujian untuk kedua backend penyimpanan (sqlite dan postgres).
+
+Pengujian yang memakai fixture empty_db/backend dari conftest berjalan sekali
+per backend; postgres dilewati tanpa DATABASE_URL. Hanya upgrade tiramine.db
+bawaan repo yang khusus SQLite (dan selalu memakai salinannya).
+"""
+import shutil
+from pathlib import Path
+
+import pytest
+
+from conftest import account_id, tiramine
+
+LATEST_VERSION = tiramine.MIGRATIONS[-1][0]
+SHIPPED_DB = Path(tiramine.__file__).resolve().parent / 'tiramine.db'
+
+def balance_row(code):
+    row = tiramine.get_db().execute(
+        'SELECT * FROM account_balances WHERE account_id = ?', (account_id(code),)
+    ).fetchone()
+    return {column: row[column] or 0 for column in tiramine.BALANCE_COLUMNS} if row else None
+
+def sale(amount, date='2025-01-05', description='Penjualan tiram'):
+    return tiramine.post_journal_entry(date, description, [
+        {'account_id': account_id('101'), 'debit': amount, 'credit': 0, 'description': ''},
+        {'account_id': account_id('401'), 'debit': 0, 'credit': amount, 'description': ''},
+    ])
+
+def login(client):
+    response = client.post('/login', data={'username': 'admin', 'password': 'password'})
+    assert response.status_code == 302
+
+# ---------- Migrasi ----------
+
+def test_migrations_from_empty_database(empty_db):
+    with tiramine.app.app_context():
+        assert tiramine.migrate_db() == LATEST_VERSION
+        db = tiramine.get_db()
+        assert tiramine.get_schema_version(db) == LATEST_VERSION
+        accounts = db.execute('SELECT COUNT(*) as count FROM accounts').fetchone()['count']
+        assert accounts > 0
+        assert db.execute('SELECT COUNT(*) as count FROM account_balances').fetchone()['count'] == accounts
+        assert tiramine.verify_account_balances() == []
+        admin = db.execute("SELECT role, auth_version FROM users WHERE username = 'admin'").fetchone()
+        assert (admin['role'], admin['auth_version']) == ('admin', 1)
+
+    # Dipanggil ulang tidak mengubah apa pun
+    with tiramine.app.app_context():
+        assert tiramine.migrate_db() == LATEST_VERSION
+        db = tiramine.get_db()
+        assert db.execute('SELECT COUNT(*) as count FROM accounts').fetchone()['count'] == accounts
+        assert db.execute('SELECT COUNT(*) as count FROM users').fetchone()['count'] == 1
+
+def test_migrations_from_baseline_database(empty_db):
+    # Database versi 1: skema dasar + data awal, dengan transaksi yang sudah
+    # ada sebelum ringkasan saldo, status OTP dan role user diperkenalkan
+    with tiramine.app.app_context():
+        db = tiramine.get_db()
+        cur = db.cursor()
+        tiramine.create_base_schema(cur)
+        tiramine.seed_default_data(cur)
+        cur.execute("INSERT INTO settings (k, v) VALUES ('schema_version', '1')")
+        cur.execute("INSERT INTO journal_entries (date, description) VALUES ('2024-12-01', 'Jual lama')")
+        entry_id = cur.lastrowid
+        cash, revenue = (db.execute('SELECT id FROM accounts WHERE code = ?', (code,)).fetchone()['id']
+                         for code in ('101', '401'))
+        cur.executemany('INSERT INTO journal_lines (entry_id, account_id, debit, credit) VALUES (?, ?, ?, ?)',
+                        [(entry_id, cash, 75000, 0), (entry_id, revenue, 0, 75000)])
+        cur.execute('''
+            INSERT INTO otp_verification (email, otp_code, expires_at)
+            VALUES ('tiramine@gmail.com', '123456', '2099-01-01 00:00:00')
+        ''')
+        db.commit()
+
+    with tiramine.app.app_context():
+        assert tiramine.migrate_db() == LATEST_VERSION
+        db = tiramine.get_db()
+        assert tiramine.get_schema_version(db) == LATEST_VERSION
+        assert balance_row('101')['journal_debit'] == 75000
+        assert balance_row('401')['journal_credit'] == 75000
+        assert tiramine.verify_account_balances() == []
+
+        otp = db.execute('SELECT delivery_status, delivery_attempts FROM otp_verification').fetchone()
+        assert (otp['delivery_status'], otp['delivery_attempts']) == ('pending', 0)
+
+        # User lama di-backfill menjadi admin; user baru default non-admin
+        assert db.execute("SELECT role FROM users WHERE username = 'admin'").fetchone()['role'] == 'admin'
+        db.execute("INSERT INTO users (username, password_hash, email) VALUES ('baru', 'x', 'baru@tiramine.test')")
+        assert db.execute("SELECT role FROM users WHERE username = 'baru'").fetchone()['role'] == 'user'
+
+def test_migrations_upgrade_shipped_database(tmp_path):
+    # Database SQLite bawaan repo (tanpa schema_version) - hanya salinannya yang dimigrasi
+    path = tmp_path / 'tiramine.db'
+    shutil.copy(SHIPPED_DB, path)
+    tiramine.app.config['STORAGE_BACKEND'] = 'sqlite'
+    tiramine.configure_database(path)
+    try:
+        with tiramine.app.app_context():
+            assert tiramine.migrate_db() == LATEST_VERSION
+            db = tiramine.get_db()
+            assert tiramine.get_schema_version(db) == LATEST_VERSION
+            assert tiramine.verify_account_balances() == []
+            assert {row['role'] for row in db.execute('SELECT role FROM users')} <= {'admin'}
+    finally:
+        tiramine.write_queue.stop()
+        tiramine.db_pool.close_all()
+
+# ---------- Posting dan ringkasan account_balances ----------
+
+def test_posting_updates_account_balances(app_context):
+    cash_before, revenue_before = balance_row('101'), balance_row('401')
+
+    entry_id = sale(150000)
+
+    assert tiramine.get_db().execute(
+        'SELECT COUNT(*) as count FROM journal_lines WHERE entry_id = ?', (entry_id,)
+    ).fetchone()['count'] == 2
+    assert balance_row('101')['journal_debit'] == cash_before['journal_debit'] + 150000
+    assert balance_row('401')['journal_credit'] == revenue_before['journal_credit'] + 150000
+    assert tiramine.get_account_balance(account_id('401')) == \
+        tiramine.get_account_balance(account_id('401'), include_adjustments=False)
+    assert tiramine.verify_account_balances() == []
+
+def test_adjusting_entry_updates_account_balances(app_context):
+    salary_before = tiramine.get_account_balance(account_id('503'))
+
+    tiramine.post_adjusting_entry('2025-01-31', 'Gaji terutang', [
+        {'account_id': account_id('503'), 'debit': 40000, 'credit': 0, 'description': ''},
+        {'account_id': account_id('202'), 'debit': 0, 'credit': 40000, 'description': ''},
+    ])
+
+    assert balance_row('503')['adjusting_debit'] == 40000
+    assert balance_row('202')['adjusting_credit'] == 40000
+    assert tiramine.get_account_balance(account_id('503')) == salary_before + 40000
+    assert tiramine.get_account_balance(account_id('503'), include_adjustments=False) == salary_before
+    assert tiramine.verify_account_balances() == []
+
+def test_rejected_entry_leaves_balances_untouched(app_context):
+    before = balance_row('101')
+
+    with pytest.raises(ValueError):
+        tiramine.post_journal_entry('2025-01-05', 'Tidak seimbang', [
+            {'account_id': account_id('101'), 'debit': 100, 'credit': 0, 'description': ''},
+            {'account_id': account_id('401'), 'debit': 0, 'credit': 90, 'description': ''},
+        ])
+
+    assert balance_row('101') == before
+    assert tiramine.get_db().execute('SELECT COUNT(*) as count FROM journal_entries').fetchone()['count'] == 0
+    assert tiramine.verify_account_balances() == []
+
+def test_deleting_entry_reverses_account_balances(backend):
+    with tiramine.app.app_context():
+        before = balance_row('101')
+        entry_id = sale(60000)
+
+    client = tiramine.app.test_client()
+    login(client)
+    assert client.post(f'/journal/{entry_id}/delete').status_code == 302
+
+    with tiramine.app.app_context():
+        assert balance_row('101') == before
+        assert tiramine.verify_account_balances() == []
+
+# ---------- Buku besar ----------
+
+def test_ledger_running_balances(app_context):
+    for day, amount in enumerate([10000, 20000, 30000, 40000, 50000], start=1):
+        sale(amount, date=f'2025-02-{day:02d}', description=f'Jual {day}')
+    tiramine.post_adjusting_entry('2025-02-03', 'Koreksi kas', [
+        {'account_id': account_id('503'), 'debit': 5000, 'credit': 0, 'description': ''},
+        {'account_id': account_id('101'), 'debit': 0, 'credit': 5000, 'description': ''},
+    ])
+    cash = account_id('101')
+
+    page = tiramine.fetch_ledger_page(cash, from_start=True)
+    expected = page['info']['opening_balance']
+    for row in page['rows']:
+        expected += (row['debit'] or 0) - (row['credit'] or 0)
+        assert row['balance'] == pytest.approx(expected)
+    assert expected == pytest.approx(page['info']['balance'])
+    # Pada tanggal yang sama jurnal sebelum penyesuaian
+    assert [row['src'] for row in page['rows'] if row['date'] == '2025-02-03'] == [0, 1]
+
+    # Halaman kecil maju dan mundur membawa saldo yang sama
+    full = [(ledger_key(row), row['balance']) for row in page['rows']]
+    forward, cursor = [], None
+    while True:
+        chunk = tiramine.fetch_ledger_page(cash, after=cursor, from_start=cursor is None, limit=2)
+        forward += [(ledger_key(row), row['balance']) for row in chunk['rows']]
+        if not chunk['newer_cursor']:
+            break
+        cursor = tiramine.parse_ledger_cursor(chunk['newer_cursor'])
+    backward, cursor = [], None
+    while True:
+        chunk = tiramine.fetch_ledger_page(cash, before=cursor, limit=2)
+        backward = [(ledger_key(row), row['balance']) for row in chunk['rows']] + backward
+        if not chunk['older_cursor']:
+            break
+        cursor = tiramine.parse_ledger_cursor(chunk['older_cursor'])
+    assert forward == full
+    assert backward == full
+
+def ledger_key(row):
+    return (row['date'], row['src'], row['entry_id'], row['line_id'])
+
+# ---------- Impor massal ----------
+
+IMPORT_CSV = b'''entry,date,description,reference,account_code,debit,credit
+1,2025-03-01,Jual A,IMP-1,101,100000,
+1,2025-03-01,Jual A,IMP-1,401,,100000
+2,2025-03-02,Jual B,IMP-2,101,25000,
+2,2025-03-02,Jual B,IMP-2,402,,25000
+3,2025-03-03,Gaji,IMP-3,503,30000,
+3,2025-03-03,Gaji,IMP-3,101,,30000
+'''
+
+def test_bulk_import(app_context):
+    cash_before = balance_row('101')
+
+    result = tiramine.import_journal_entries(tiramine.read_journal_import(IMPORT_CSV, 'impor.csv'))
+
+    assert result['errors'] == []
+    assert (result['entries'], result['lines']) == (3, 6)
+    assert result['last_id'] - result['first_id'] == 2
+    assert balance_row('101')['journal_debit'] == cash_before['journal_debit'] + 125000
+    assert balance_row('101')['journal_credit'] == cash_before['journal_credit'] + 30000
+    assert tiramine.verify_account_balances() == []
+    # id yang dicadangkan impor tidak dipakai ulang oleh posting berikutnya
+    assert sale(1000) == result['last_id'] + 1
+
+def test_bulk_import_with_errors_posts_nothing(app_context):
+    data = IMPORT_CSV + b'4,2025-03-04,Salah,IMP-4,999,10,\n4,2025-03-04,Salah,IMP-4,101,,10\n'
+
+    result = tiramine.import_journal_entries(tiramine.read_journal_import(data, 'impor.csv'))
+
+    assert result['errors'] and result['first_id'] is None
+    assert tiramine.get_db().execute('SELECT COUNT(*) as count FROM journal_entries').fetchone()['count'] == 0
+    assert tiramine.verify_account_balances() == []
+
+# ---------- Cache laporan ----------
+
+def revenue():
+    with tiramine.app.app_context():
+        return tiramine.income_statement()['total_revenue']
+
+def test_report_cache_invalidated_after_writes(backend):
+    before = revenue()
+    hits = tiramine.report_cache.hits
+    assert revenue() == before
+    assert tiramine.report_cache.hits > hits
+
+    with tiramine.app.app_context():
+        entry_id = sale(80000)
+    assert revenue() == before + 80000
+
+    # Penulisan di luar antrian penulisan (hapus lewat request) juga membatalkan cache
+    client = tiramine.app.test_client()
+    login(client)
+    client.post(f'/journal/{entry_id}/delete')
+    assert revenue() == before
+
+def test_report_cache_sees_commits_from_other_connections(backend):
+    before = revenue()
+
+    # Koneksi terpisah mewakili proses/worker lain yang menulis ke database yang sama
+    connection = tiramine.db_pool.connect()
+    try:
+        cur = connection.cursor()
+        cur.execute("INSERT INTO journal_entries (date, description) VALUES ('2025-04-01', 'Dari worker lain')")
+        entry_id = cur.lastrowid
+        with tiramine.app.app_context():
+            lines = [{'account_id': account_id('101'), 'debit': 12000, 'credit': 0},
+                     {'account_id': account_id('401'), 'debit': 0, 'credit': 12000}]
+        cur.executemany('INSERT INTO journal_lines (entry_id, account_id, debit, credit) VALUES (?, ?, ?, ?)',
+                        [(entry_id, line['account_id'], line['debit'], line['credit']) for line in lines])
+        tiramine.apply_balance_delta(cur, lines, 'journal')
+        connection.commit()
+    finally:
+        connection.close()
+
+    assert revenue() == before + 12000